@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Script to measure API route analysis throughput on a synthetic repository, in one process and across workers.
+
+Usage: python benchmarks/api_routes.py [--handlers N] [--per-file N] [--workers N ...]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from github_review_bot.scripts.api_routes import analyze_changed_files  # noqa: E402
+from github_review_bot.scripts.changed_files import ChangedFile, ChangedFiles  # noqa: E402
+
+HEADERS = {
+    'flask': "import requests\nfrom flask import Blueprint, jsonify, request\n"
+             "from flask_login import login_required\n\nbp = Blueprint('api', __name__)\n",
+    'fastapi': "from fastapi import APIRouter, Depends, HTTPException\n\nrouter = APIRouter()\n",
+    'django': "from django.contrib.auth.decorators import login_required\nfrom django.http import JsonResponse\n"
+              "from rest_framework.views import APIView\n",
+}
+
+HANDLERS = {
+    'flask': '''
+@bp.route("/orders/{n}", methods=["POST"])
+@login_required
+def create_order_{n}():
+    data = request.get_json()
+    try:
+        response = requests.post("https://payments.example.com/charge", json=data, timeout=5)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        return jsonify(error=str(e)), 502
+    total = sum(item["price"] * item["quantity"] for item in data["items"])
+    return jsonify(id={n}, total=total)
+''',
+    'fastapi': '''
+@router.get("/items/{n}/{{item_id}}")
+async def read_item_{n}(item_id: int, user=Depends(get_current_user)):
+    item = await repository.find(item_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return {{"id": item_id, "owner": user.id, "tags": [tag.name for tag in item.tags]}}
+''',
+    'django': '''
+class OrderView{n}(APIView):
+    throttle_classes = [UserRateThrottle]
+
+    def get(self, request, pk):
+        order = Order.objects.get(pk=pk)
+        return JsonResponse({{"id": order.id, "status": order.status}})
+
+    def delete(self, request, pk):
+        try:
+            Order.objects.filter(pk=pk).delete()
+        except Exception:
+            pass
+        return JsonResponse({{}}, status=204)
+''',
+}
+
+
+def write_repository(root: str, handlers: int, per_file: int) -> ChangedFiles:
+    """Write files with about per_file handlers each, cycling through the frameworks."""
+    files = []
+    frameworks = sorted(HANDLERS)
+    written = 0
+    while written < handlers:
+        framework = frameworks[len(files) % len(frameworks)]
+        path = f"api/{framework}_{len(files)}.py"
+        # Django views define two handlers per class
+        count = min(per_file, handlers - written)
+        classes = (count + 1) // 2 if framework == 'django' else count
+        source = HEADERS[framework] + ''.join(HANDLERS[framework].format(n=n) for n in range(classes))
+        os.makedirs(os.path.join(root, 'api'), exist_ok=True)
+        with open(os.path.join(root, path), 'w') as f:
+            f.write(source)
+        files.append(ChangedFile(path, 'modified', len(source)))
+        written += classes * 2 if framework == 'django' else classes
+    return ChangedFiles(files, root)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--handlers', type=int, default=10000, help='Route handlers in the repository')
+    parser.add_argument('--per-file', type=int, default=20, help='Handlers per file')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1],
+                        help='Worker counts to compare')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        changed = write_repository(root, args.handlers, args.per_file)
+        print(f"{'workers':>8} {'files':>6} {'handlers':>9} {'seconds':>8} {'handlers/s':>11} {'findings':>9}")
+        for workers in args.workers:
+            stats = {}
+            start = time.perf_counter()
+            findings = analyze_changed_files(changed, max_workers=workers, stats=stats)
+            elapsed = time.perf_counter() - start
+            print(f"{workers:>8} {stats['files']:>6} {stats['handlers']:>9} {elapsed:>8.2f} "
+                  f"{stats['handlers'] / elapsed:>11.0f} {len(findings):>9}")
+
+
+if __name__ == "__main__":
+    main()
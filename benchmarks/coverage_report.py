@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Script to measure coverage report reading time and peak memory on a large synthetic monorepo report.
+
+Usage: python benchmarks/coverage_report.py [--mb N] [--wanted N]
+"""
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from github_review_bot.scripts.coverage_report import read_report  # noqa: E402
+
+LINES_PER_FILE = 400
+
+
+def write_cobertura(path: str, size: int) -> int:
+    """Write a Cobertura report of about size bytes, streaming it out; return the file count."""
+    files = 0
+    with open(path, 'w') as f:
+        f.write('<?xml version="1.0" ?>\n<coverage version="7.4">\n<sources><source>.</source></sources>\n'
+                '<packages><package name="monorepo"><classes>\n')
+        while f.tell() < size:
+            f.write(f'<class name="m{files}.py" filename="pkg{files % 100}/m{files}.py"><methods/><lines>\n')
+            f.write(''.join(f'<line number="{line}" hits="{line % 3}"/>\n' for line in range(1, LINES_PER_FILE)))
+            f.write('</lines></class>\n')
+            files += 1
+        f.write('</classes></package></packages></coverage>\n')
+    return files
+
+
+def write_lcov(path: str, size: int) -> int:
+    """Write an lcov tracefile of about size bytes; return the file count."""
+    files = 0
+    with open(path, 'w') as f:
+        while f.tell() < size:
+            f.write(f'SF:pkg{files % 100}/m{files}.py\n')
+            f.write(''.join(f'DA:{line},{line % 3}\n' for line in range(1, LINES_PER_FILE)))
+            f.write('end_of_record\n')
+            files += 1
+    return files
+
+
+def peak_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--mb', type=int, default=100, help='Size of each report in megabytes')
+    parser.add_argument('--wanted', type=int, default=50, help='Files the pull request touched')
+    args = parser.parse_args()
+
+    print(f"{'format':>10} {'MB':>6} {'files':>8} {'kept':>5} {'seconds':>8} {'MB/s':>7} {'peak RSS MB':>12}")
+    with tempfile.TemporaryDirectory() as root:
+        for name, write in (('coverage.xml', write_cobertura), ('lcov.info', write_lcov)):
+            report = os.path.join(root, name)
+            files = write(report, args.mb << 20)
+            wanted = [f"pkg{index % 100}/m{index}.py" for index in range(0, files, max(1, files // args.wanted))]
+            start = time.perf_counter()
+            hits = read_report(report, wanted, root)
+            elapsed = time.perf_counter() - start
+            size = os.path.getsize(report) / (1 << 20)
+            print(f"{name:>10} {size:>6.0f} {files:>8} {len(hits):>5} {elapsed:>8.1f} {size / elapsed:>7.1f} "
+                  f"{peak_mb():>12.0f}")
+            os.remove(report)
+
+
+if __name__ == "__main__":
+    main()
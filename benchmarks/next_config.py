@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Script to measure the cost of reading next.config.js statically, cold and from the parse cache.
+
+Usage: python benchmarks/next_config.py [--rounds N] [--keys N]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from github_review_bot.scripts.js_config import ConfigParseCache, extract_object  # noqa: E402
+
+TYPICAL = '''/** @type {import('next').NextConfig} */
+const nextConfig = {
+  reactStrictMode: true,
+  swcMinify: true,
+  images: {
+    remotePatterns: [{ protocol: 'https', hostname: 'images.example.com' }],
+    formats: ['image/avif', 'image/webp'],
+  },
+  async redirects() {
+    return [{ source: '/old', destination: '/new', permanent: true }]
+  },
+  webpack: (config, { isServer }) => {
+    if (!isServer) config.resolve.fallback = { fs: false }
+    return config
+  },
+}
+
+module.exports = withBundleAnalyzer(nextConfig)
+'''
+
+
+def large_config(keys: int) -> str:
+    """Return a config with many nested keys, like a generated i18n or rewrites table."""
+    entries = ',\n'.join(f"    {{ source: '/page-{i}', destination: `/p/${{id}}/{i}`, locale: false }}"
+                         for i in range(keys))
+    return f"module.exports = {{\n  i18n: {{ locales: ['en', 'de'] }},\n  rewrites: [\n{entries}\n  ],\n}}\n"
+
+
+def measure(function, rounds: int) -> list:
+    """Return the duration in microseconds of each call."""
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1e6)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=200, help='Parses per config')
+    parser.add_argument('--keys', type=int, default=500, help='Rewrites in the large config')
+    args = parser.parse_args()
+
+    configs = {'typical': TYPICAL, f'{args.keys} rewrites': large_config(args.keys)}
+    print(f"{'config':<16} {'bytes':>8} {'keys':>6} {'cold us':>10} {'cached us':>10}")
+    for name, source in configs.items():
+        cache = ConfigParseCache()
+        cache.get(source)
+        cold = measure(lambda: extract_object(source), args.rounds)
+        cached = measure(lambda: cache.get(source), args.rounds)
+        print(f"{name:<16} {len(source):>8} {len(extract_object(source)):>6} "
+              f"{statistics.median(cold):>10.0f} {statistics.median(cached):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
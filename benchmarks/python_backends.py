@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Script to compare per-file latency of the subprocess and in-process Python linter backends.
+
+Usage: python benchmarks/python_backends.py [--files N] [--rounds N]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from github_review_bot.scripts.changed_files import ChangedFile  # noqa: E402
+from github_review_bot.scripts.python_linters import BACKENDS  # noqa: E402
+from github_review_bot.scripts.result_cache import run_with_cache  # noqa: E402
+from github_review_bot.scripts.run_analysis import python_tools  # noqa: E402
+from github_review_bot.scripts.tool_executor import ToolExecutor  # noqa: E402
+
+SAMPLE = '''import os, subprocess
+
+
+def handler(event, context):
+    command = event.get("command")
+    subprocess.call(command, shell=True)
+    return   os.path.join("a",'b')
+'''
+
+
+def benchmark(backend: str, files: list, rounds: int) -> list:
+    """Return the per-file latency in milliseconds of each round."""
+    # One file per call, as in a webhook reviewing a one-file change
+    executor = ToolExecutor(max_workers=1)
+    tools = python_tools(backend)
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for changed_file in files:
+            run_with_cache(executor, None, tools, [changed_file])
+        timings.append((time.perf_counter() - start) * 1000 / len(files))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--files', type=int, default=10, help='Files per round')
+    parser.add_argument('--rounds', type=int, default=3, help='Rounds per backend')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        files = []
+        for i in range(args.files):
+            name = f'module_{i}.py'
+            with open(name, 'w') as f:
+                f.write(SAMPLE)
+            files.append(ChangedFile(name, 'modified', size=len(SAMPLE)))
+
+        print(f"{'backend':<12} {'median ms/file':>15} {'min ms/file':>12}")
+        for backend in BACKENDS:
+            timings = benchmark(backend, files, args.rounds)
+            print(f"{backend:<12} {statistics.median(timings):>15.1f} {min(timings):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Script to compare the single-pass rule engine with one pass per rule and with an external complexity tool.
+
+Usage: python benchmarks/python_rules.py [--files N] [--functions N]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from github_review_bot.scripts.python_rules import RuleEngine, build_rules  # noqa: E402
+
+FUNCTION = '''
+def process_{n}(records, options=None):
+    """Aggregate the records that match the options."""
+    options = options or {{}}
+    totals = {{}}
+    for record in records:
+        if record.get("skip") or not record.get("amount"):
+            continue
+        key = record["region"] if options.get("by_region") else record["country"]
+        try:
+            amount = float(record["amount"])
+        except (TypeError, ValueError):
+            amount = 0.0
+        while amount > options.get("cap", 1e9):
+            amount /= 2
+        totals[key] = totals.get(key, 0.0) + amount
+    return {{key: round(value, 2) for key, value in totals.items() if value}}
+
+
+class Report{n}:
+    def render(self, rows):
+        return "\\n".join(f"{{row[0]}}: {{row[1]}}" for row in rows if row)
+'''
+
+
+def write_files(root: str, files: int, functions: int):
+    """Write files of functions each, and return their paths and sources."""
+    sources = []
+    for index in range(files):
+        source = '"""Generated module."""\n' + ''.join(FUNCTION.format(n=n) for n in range(functions))
+        path = os.path.join(root, f"module_{index}.py")
+        with open(path, 'w') as f:
+            f.write(source)
+        sources.append((path, source))
+    return sources
+
+
+def timed(run):
+    start = time.perf_counter()
+    findings = run()
+    return time.perf_counter() - start, findings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--files', type=int, default=200, help='Files to check')
+    parser.add_argument('--functions', type=int, default=40, help='Functions (and classes) per file')
+    args = parser.parse_args()
+
+    rules = build_rules({'rules': {'max_complexity': 6, 'max_function_lines': 15}})
+    with tempfile.TemporaryDirectory() as root:
+        sources = write_files(root, args.files, args.functions)
+        engine = RuleEngine(rules)
+        single = engine.check_source
+        per_rule = [RuleEngine([rule]).check_source for rule in rules]
+        runs = [
+            ('one pass, all rules', lambda: sum(len(single(source, path)) for path, source in sources)),
+            (f'one pass per rule ({len(rules)})',
+             lambda: sum(len(check(source, path)) for check in per_rule for path, source in sources)),
+        ]
+        flake8 = shutil.which('flake8')
+        if flake8:
+            runs.append(('flake8 C901 only', lambda: len(subprocess.run(
+                [flake8, '--select=C901', '--max-complexity=6', root],
+                capture_output=True, text=True).stdout.splitlines())))
+
+        print(f"{'run':<24} {'files':>6} {'seconds':>8} {'files/s':>8} {'findings':>9}")
+        for name, run in runs:
+            elapsed, findings = timed(run)
+            print(f"{name:<24} {args.files:>6} {elapsed:>8.2f} {args.files / elapsed:>8.0f} {findings:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,10 @@ import sys
 from github import Github
 import yaml
 from .scripts.load_config import load_config
-from .scripts.run_analysis import run_analysis
+from .scripts.run_analysis import build_time_budget, run_analysis
+from .scripts.changed_files import build_changed_files
+from .scripts.diff_index import ChangedLineIndex
+from .scripts.filter_findings import filter_findings
 from .scripts.generate_review import generate_review
 from .scripts.post_comments import post_comments
 import json
@@ -68,10 +71,23 @@ def main():
     print(f"Using config from: {config_path}")
     config = load_config(config_path)
     
+    # Start the clock before any work so the review is posted on time
+    budget = build_time_budget(config)
+    
     print(f"Running analysis on PR #{pr_number}...")
     
-    # Run analysis
-    analysis_results = run_analysis(pr, config)
+    # Index the changed files once for every analyzer
+    changed_files = build_changed_files(pr)
+    
+    # Run analysis; checks that do not fit the budget are skipped or cut
+    analysis_results = run_analysis(pr, config, changed_files, budget)
+    skipped = analysis_results['stats'].get('skipped_checks')
+    if skipped:
+        print(f"Posting a partial review, skipped: {', '.join(entry['check'] for entry in skipped)}")
+    
+    # Drop findings on lines the PR did not change
+    line_index = ChangedLineIndex.from_changed_files(changed_files)
+    analysis_results = filter_findings(analysis_results, line_index, config)
     
     # Generate review content
     review_body, review_action = generate_review(analysis_results, config)
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+Script to index model references, SDK calls, prompts and model-output parsing in a repository.
+"""
+
+import json
+import os
+import re
+import subprocess
+import tempfile
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from .changed_files import ChangedFiles
+from .diff_index import normalize_path
+from .manifests import git_blob_sha
+from .repo_index import RepoIndex
+
+# Bump when the entry format or the scan changes
+INDEX_FORMAT = 1
+
+# Model families whose IDs are worth tracking
+MODEL_FAMILIES = (
+    'gpt-3.5-turbo', 'gpt-4', 'gpt-4o', 'gpt-4o-mini', 'gpt-4.1', 'gpt-4.5', 'gpt-5', 'chatgpt-4o',
+    'o1', 'o1-mini', 'o3', 'o3-mini', 'o4-mini', 'claude', 'gemini',
+    'mistral', 'mixtral', 'codestral', 'text-embedding',
+)
+
+# IDs, or ID prefixes, that providers have deprecated or retired
+DEPRECATED_MODELS = (
+    'text-davinci', 'code-davinci', 'text-curie', 'text-babbage', 'text-ada',
+    'gpt-3.5-turbo-0301', 'gpt-3.5-turbo-0613', 'gpt-3.5-turbo-16k', 'gpt-4-0314', 'gpt-4-32k',
+    'gpt-4-vision-preview', 'gpt-4.5-preview',
+    'claude-instant', 'claude-1', 'claude-2', 'claude-3-sonnet', 'claude-3-opus', 'claude-3-5-sonnet',
+    'text-bison', 'chat-bison', 'code-bison', 'gemini-pro', 'gemini-1.0', 'gemini-1.5',
+)
+
+# Snapshot suffixes that pin an ID to one model version: dates
+# (-2024-08-06, -20241022, -0613, @20240620), numbered releases (-002)
+# and Bedrock versions (-v1:0)
+PINNED_SUFFIX = re.compile(r'(?:-\d{4}-\d{2}-\d{2}|-\d{8}|-\d{4}|-\d{3}|@\d{8})(?:-v\d+(?::\d+)?)?$|-v\d+:\d+$')
+
+# Routing prefixes in front of a model ID: openai/, models/, Bedrock's
+# anthropic. and its cross-region us.anthropic.
+PROVIDER_PREFIX = re.compile(r'^(?:.*/)?(?:(?:[a-z]{2}\.)?(?:anthropic|meta|amazon|cohere|mistral|ai21|google)\.)?')
+MODEL_ID = re.compile(r'[a-z0-9][a-z0-9._:@-]{1,99}')
+
+# File names such as gpt-4.py are not model IDs
+FILE_SUFFIX = re.compile(r'\.[a-z]{1,5}$')
+
+# Characters allowed right after a trie key for it to match
+BOUNDARY = '-.:@'
+
+STRING_LITERAL = re.compile(r'''(["'`])((?:\\.|(?!\1)[^\\\n])*)\1''')
+
+# Calls into LLM SDKs: OpenAI, Anthropic, Google, Vercel AI SDK, LangChain
+SDK_CALL = re.compile(
+    r'\b(?P<call>chat\.completions\.create|chat\.completions\.parse|ChatCompletion\.create|Completion\.create'
+    r'|completions\.create|responses\.create|messages\.create|messages\.stream|generate_content'
+    r'|generateContent|GenerativeModel|generateText|streamText|generateObject|streamObject'
+    r'|ChatOpenAI|ChatAnthropic|ChatGoogleGenerativeAI|init_chat_model)\s*\('
+)
+
+# Prompt templates: assignments to *prompt* or *instructions* names, and template classes
+PROMPT_ASSIGN = re.compile(
+    r'\b(?P<name>\w*(?:prompt|PROMPT|Prompt|instructions|INSTRUCTIONS|Instructions)\w*)'
+    r'\s*(?::\s*[\w\[\], .]+)?=\s*(?:[fFrRbBuU]{0,2}(?:"""|\'\'\'|"|\')|`|dedent\(|textwrap\.dedent\()'
+)
+PROMPT_CLASS = re.compile(r'\b(?P<name>(?:Chat|System|Human)?(?:Message)?PromptTemplate)(?:\.\w+)?\s*\(')
+PROMPT_FILE_EXTENSIONS = ('.prompt', '.jinja', '.jinja2', '.j2', '.mustache')
+PROMPT_DIR_EXTENSIONS = ('.txt', '.md', '.yaml', '.yml')
+
+# A system prompt built with interpolated values
+SYSTEM_INTERPOLATION = re.compile(
+    r'''(?:["']role["']\s*:\s*["']system["']\s*,\s*["']content["']\s*:\s*(?:f["']|`)'''
+    r'''|\bsystem(?:_prompt)?\s*[=:]\s*(?:f["']|`))(?:[^"'`\n]*?)(?:\{|\$\{)'''
+)
+
+# Parsing of model output
+RESPONSE_PARSE = re.compile(
+    r'\b(?P<parser>json\.loads|JSON\.parse|yaml\.load|yaml\.safe_load|ast\.literal_eval|eval)\s*\((?P<arg>.*)'
+)
+RESPONSE_ACCESS = re.compile(
+    r'choices\s*\[|\.message\.content|\.content\s*\[\s*0\s*\]\s*\.text|\.output_text|\.candidates\s*\['
+    r'|\b(?:response|completion|result|message)\.text\b'
+)
+RESPONSE_VALIDATION = re.compile(
+    r'model_validate|parse_obj|parse_raw|TypeAdapter|validate\(|\.safeParse\(|\w+\.parse\(\s*JSON\.parse'
+)
+
+SOURCE_EXTENSIONS = ('.py', '.js', '.jsx', '.ts', '.tsx', '.mjs', '.cjs')
+
+# Larger files are generated code or data, not agent logic
+MAX_FILE_BYTES = 1 << 20
+
+# Base commits whose index is kept
+DEFAULT_MAX_BASES = 10
+
+# Unchanged files read per run while the base index is cold; the rest
+# are read by later runs, which reuse the files already indexed
+DEFAULT_MAX_SCAN = 2000
+
+
+class ModelTrie:
+    """
+    Character trie of model families and deprecated IDs.
+
+    A key matches a string when it is a prefix followed by the end of the
+    string or a separator, so `gpt-4` matches `gpt-4-turbo` but not
+    `gpt-4o`; the longest matching key wins.
+    """
+
+    _END = ''
+
+    def __init__(self, families: Iterable[str] = MODEL_FAMILIES,
+                 deprecated: Iterable[str] = DEPRECATED_MODELS):
+        self._root: Dict[str, Any] = {}
+        for family in families:
+            self.insert(family, 'family')
+        for model in deprecated:
+            self.insert(model, 'deprecated')
+
+    def insert(self, key: str, kind: str) -> None:
+        """Add a family or a deprecated ID."""
+        node = self._root
+        for char in key.lower():
+            node = node.setdefault(char, {})
+        node[self._END] = kind
+
+    def longest_match(self, model: str) -> Optional[Tuple[str, str]]:
+        """
+        Find the longest key matching the start of a model ID.
+
+        Returns:
+            (key, kind) or None if no key matches
+        """
+        node = self._root
+        best = None
+        for i, char in enumerate(model):
+            node = node.get(char)
+            if node is None:
+                break
+            if self._END in node and (i + 1 == len(model) or model[i + 1] in BOUNDARY):
+                best = (model[:i + 1], node[self._END])
+        return best
+
+    def classify(self, model: str) -> Optional[str]:
+        """
+        Classify a model ID.
+
+        Returns:
+            'deprecated', 'pinned' or 'unpinned', or None if it is not a
+            known model
+        """
+        match = self.longest_match(model)
+        if match is None:
+            return None
+        if match[1] == 'deprecated':
+            return 'deprecated'
+        return 'pinned' if PINNED_SUFFIX.search(model) and not model.endswith('-latest') else 'unpinned'
+
+
+MODEL_TRIE = ModelTrie()
+
+
+def model_id(literal: str) -> Optional[str]:
+    """Strip routing prefixes from a string literal and return it if it looks like a model ID."""
+    candidate = PROVIDER_PREFIX.sub('', literal.strip().lower(), count=1)
+    if not MODEL_ID.fullmatch(candidate) or FILE_SUFFIX.search(candidate):
+        return None
+    return candidate
+
+
+def unpinned_name(model: str) -> str:
+    """Drop the snapshot suffix of a model ID."""
+    return PINNED_SUFFIX.sub('', model)
+
+
+class FileEntry:
+    """What a file holds of interest to AI checks, with positions as (line, column)."""
+
+    __slots__ = ('sha', 'models', 'calls', 'prompts', 'parses', 'interpolations')
+
+    def __init__(self, sha: Optional[str], models: Sequence[Tuple[int, int, str]] = (),
+                 calls: Sequence[Tuple[int, str]] = (), prompts: Sequence[Tuple[int, str]] = (),
+                 parses: Sequence[Tuple[int, int, str, bool]] = (),
+                 interpolations: Sequence[Tuple[int, int]] = ()):
+        self.sha = sha
+        self.models = [tuple(model) for model in models]
+        self.calls = [tuple(call) for call in calls]
+        self.prompts = [tuple(prompt) for prompt in prompts]
+        self.parses = [tuple(parse) for parse in parses]
+        self.interpolations = [tuple(position) for position in interpolations]
+
+    def to_json(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> 'FileEntry':
+        return cls(**{slot: data.get(slot) or () for slot in cls.__slots__ if slot != 'sha'},
+                   sha=data.get('sha'))
+
+
+def _guarded_lines(lines: Sequence[str], python: bool) -> List[bool]:
+    """Whether each line starts inside the body of a try block."""
+    guarded = []
+    stack: List[int] = []
+    if python:
+        for text in lines:
+            stripped = text.lstrip()
+            if stripped and not stripped.startswith('#'):
+                indent = len(text) - len(stripped)
+                while stack and indent <= stack[-1]:
+                    stack.pop()
+            guarded.append(bool(stack))
+            if stripped.startswith('try:'):
+                stack.append(len(text) - len(stripped))
+        return guarded
+    depth = 0
+    for text in lines:
+        guarded.append(bool(stack))
+        opens_try = re.search(r'\btry\s*\{', text)
+        for i, char in enumerate(text):
+            if char == '{':
+                if opens_try and i == opens_try.end() - 1:
+                    stack.append(depth)
+                depth += 1
+            elif char == '}':
+                depth -= 1
+                while stack and depth <= stack[-1]:
+                    stack.pop()
+    return guarded
+
+
+def is_prompt_file(path: str) -> bool:
+    """Whether a path is a prompt template file."""
+    path = path.lower()
+    if path.endswith(PROMPT_FILE_EXTENSIONS):
+        return True
+    return path.endswith(PROMPT_DIR_EXTENSIONS) and ('/prompts/' in f"/{path}")
+
+
+def is_indexed(path: str) -> bool:
+    """Whether a path is scanned into the index."""
+    return path.endswith(SOURCE_EXTENSIONS) or is_prompt_file(path)
+
+
+def scan_source(text: str, path: str, sha: Optional[str] = None, trie: ModelTrie = MODEL_TRIE) -> FileEntry:
+    """
+    Index one file.
+
+    Args:
+        text: File content
+        path: Repository-relative path, which decides the language
+        sha: Blob SHA of the content, kept to revalidate the entry later
+        trie: Known model families and deprecated IDs
+
+    Returns:
+        FileEntry
+    """
+    if is_prompt_file(path):
+        return FileEntry(sha, prompts=[(1, os.path.basename(path))])
+    lines = text.splitlines()
+    guarded = _guarded_lines(lines, path.endswith('.py'))
+    models, calls, prompts, parses, interpolations = [], [], [], [], []
+    for number, line in enumerate(lines, 1):
+        for literal in STRING_LITERAL.finditer(line):
+            model = model_id(literal.group(2))
+            if model is not None and trie.longest_match(model) is not None:
+                models.append((number, literal.start(2) + 1, model))
+        calls.extend((number, call.group('call')) for call in SDK_CALL.finditer(line))
+        prompts.extend((number, prompt.group('name')) for prompt in PROMPT_ASSIGN.finditer(line))
+        prompts.extend((number, prompt.group('name')) for prompt in PROMPT_CLASS.finditer(line))
+        interpolations.extend((number, m.start() + 1) for m in SYSTEM_INTERPOLATION.finditer(line))
+        for parse in RESPONSE_PARSE.finditer(line):
+            if RESPONSE_ACCESS.search(parse.group('arg')):
+                checked = guarded[number - 1] or RESPONSE_VALIDATION.search(line) is not None
+                parses.append((number, parse.start() + 1, parse.group('parser'), checked))
+    return FileEntry(sha, models, calls, prompts, parses, interpolations)
+
+
+def tree_blob_shas(commit: str, repo_path: str = '.') -> Optional[Dict[str, str]]:
+    """Return the blob SHA of every file of a commit, with one git call."""
+    try:
+        result = subprocess.run(['git', 'ls-tree', '-r', '-z', commit], capture_output=True,
+                                text=True, cwd=repo_path, timeout=60)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    shas = {}
+    for record in result.stdout.split('\0'):
+        meta, _, path = record.partition('\t')
+        fields = meta.split()
+        if len(fields) == 3 and fields[1] == 'blob':
+            shas[path] = fields[2]
+    return shas
+
+
+class AIIndexStore:
+    """
+    Indexes of base commits kept between runs.
+
+    Files live at `<cache_dir>/ai_index/<base_sha>.json`. A base commit
+    seen for the first time is seeded with the most recent index, whose
+    entries are kept when their blob SHA still matches the base tree.
+    """
+
+    def __init__(self, cache_dir: str, max_bases: int = DEFAULT_MAX_BASES):
+        if not isinstance(cache_dir, str):
+            raise TypeError(f"cache_dir must be a string, got {type(cache_dir)}")
+        self.directory = os.path.join(cache_dir, 'ai_index')
+        self.max_bases = max_bases
+
+    def _read(self, path: str) -> Optional[Dict[str, FileEntry]]:
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get('format') != INDEX_FORMAT:
+            return None
+        return {path: FileEntry.from_json(entry) for path, entry in data.get('files', {}).items()}
+
+    def load(self, sha: Optional[str]) -> Optional[Dict[str, FileEntry]]:
+        """Return the index of a base commit, by path."""
+        if not sha:
+            return None
+        return self._read(os.path.join(self.directory, f"{sha}.json"))
+
+    def latest(self) -> Optional[Dict[str, FileEntry]]:
+        """Return the most recently saved index of any base commit."""
+        try:
+            paths = [entry.path for entry in os.scandir(self.directory) if entry.name.endswith('.json')]
+        except OSError:
+            return None
+        return self._read(max(paths, key=os.path.getmtime)) if paths else None
+
+    def save(self, sha: str, files: Dict[str, FileEntry]) -> None:
+        """Record the index of a base commit atomically, dropping the oldest bases."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'format': INDEX_FORMAT,
+                           'files': {path: entry.to_json() for path, entry in files.items()}}, f)
+            os.replace(tmp_path, os.path.join(self.directory, f"{sha}.json"))
+            saved = sorted((entry.path for entry in os.scandir(self.directory) if entry.name.endswith('.json')),
+                           key=os.path.getmtime)
+            for path in saved[:-self.max_bases]:
+                os.remove(path)
+        except OSError as e:
+            print(f"Could not save the AI index: {e}")
+
+
+class AIIndex:
+    """
+    Index of the AI-related code of a repository at the PR head.
+
+    Files the PR changed are always read again. The other files come from
+    the cached index of the base commit, so a large agent codebase is read
+    in full only once per cache, spread over runs by the scan limit.
+    Without a cache only the changed files are indexed.
+    """
+
+    def __init__(self, files: Dict[str, FileEntry], changed: Sequence[str] = (),
+                 stats: Optional[Dict[str, Any]] = None):
+        self.files = files
+        self.changed = tuple(changed)
+        self.stats = stats or {}
+
+    @classmethod
+    def build(cls, changed_files: ChangedFiles, repo_index: Optional[RepoIndex] = None,
+              store: Optional[AIIndexStore] = None, trie: ModelTrie = MODEL_TRIE,
+              max_scan: int = DEFAULT_MAX_SCAN, cancel: Optional[threading.Event] = None) -> 'AIIndex':
+        """
+        Index the changed files, and the rest of the checkout when a repo index and store are given.
+
+        Args:
+            changed_files: Index of the files changed by the PR
+            repo_index: Index of the checkout; only changed files are
+                indexed without it
+            store: Cache of base-commit indexes; only changed files are
+                indexed without it
+            trie: Known model families and deprecated IDs
+            max_scan: Unchanged files read at most in this run; the ones
+                left are counted as `pending` in the stats
+            cancel: Optional event that stops reading unchanged files
+
+        Returns:
+            AIIndex
+
+        Raises:
+            TypeError: If changed_files is not a ChangedFiles index
+        """
+        if not isinstance(changed_files, ChangedFiles):
+            raise TypeError(f"changed_files must be a ChangedFiles index, got {type(changed_files)}")
+        repo_path = changed_files.repo_path
+        base_sha = changed_files.base_sha
+        changed = {normalize_path(f.path): f for f in changed_files}
+
+        base: Dict[str, FileEntry] = {}
+        exact = None
+        if repo_index is not None and store is not None:
+            exact = store.load(base_sha)
+            if exact is not None:
+                base = exact
+            else:
+                # Entries of another base are kept where the blob is unchanged
+                seed = store.latest() or {}
+                tree = tree_blob_shas(base_sha, repo_path) if seed and base_sha else None
+                base = {path: entry for path, entry in seed.items()
+                        if tree is not None and entry.sha is not None and tree.get(path) == entry.sha}
+
+        files: Dict[str, FileEntry] = {}
+        unchanged: Dict[str, FileEntry] = {}
+        scanned = reused = pending = 0
+        indexed = repo_index is not None and store is not None
+        paths = [p for p in repo_index.files() if is_indexed(p)] if indexed else []
+        for path in paths:
+            if path in changed:
+                continue
+            entry = base.get(path)
+            if entry is None:
+                if scanned >= max_scan or (cancel is not None and cancel.is_set()):
+                    pending += 1
+                    continue
+                if (repo_index.size(path) or 0) > MAX_FILE_BYTES:
+                    continue
+                entry = _scan_file(repo_path, path, None, trie)
+                if entry is None:
+                    continue
+                scanned += 1
+            else:
+                reused += 1
+            files[path] = unchanged[path] = entry
+        for path, changed_file in changed.items():
+            if changed_file.status == 'removed' or not is_indexed(path):
+                continue
+            if changed_file.size is not None and changed_file.size > MAX_FILE_BYTES:
+                continue
+            entry = _scan_file(repo_path, path, changed_file.sha, trie)
+            if entry is not None:
+                files[path] = entry
+
+        # Only files the PR left alone hold the base commit's content
+        if indexed and base_sha and (scanned or exact is None):
+            store.save(base_sha, unchanged)
+        changed_paths = [p for p in changed if p in files]
+        return cls(files, changed_paths, {'files': len(files), 'scanned': scanned + len(changed_paths),
+                                          'reused': reused, 'pending': pending})
+
+    def model_references(self) -> Dict[str, List[Tuple[str, int]]]:
+        """Return where each model ID is used, as (path, line) pairs."""
+        references: Dict[str, List[Tuple[str, int]]] = {}
+        for path, entry in sorted(self.files.items()):
+            for line, _, model in entry.models:
+                references.setdefault(model, []).append((path, line))
+        return references
+
+
+def _scan_file(repo_path: str, path: str, sha: Optional[str], trie: ModelTrie) -> Optional[FileEntry]:
+    try:
+        with open(os.path.join(repo_path, path), 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    return scan_source(data.decode('utf-8', errors='replace'), path, sha or git_blob_sha(data), trie)
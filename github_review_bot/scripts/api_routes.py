@@ -0,0 +1,506 @@
+#!/usr/bin/env python3
+"""
+Script to check Flask, FastAPI and Django route handlers for authentication, rate limiting and error handling.
+"""
+
+import ast
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, FrozenSet, Iterator, List, Optional, Pattern, Sequence, Set, Tuple
+from .changed_files import ChangedFiles
+from .findings import Finding
+from .tool_executor import process_pool_context
+
+# Top-level packages whose import marks a file as using a web framework
+FRAMEWORKS = {'flask': 'flask', 'fastapi': 'fastapi', 'starlette': 'fastapi',
+              'django': 'django', 'rest_framework': 'django'}
+
+# Decorator attributes that register a route: @app.route, @router.post, ...
+ROUTE_DECORATORS = ('route', 'get', 'post', 'put', 'patch', 'delete', 'head', 'options', 'api_route')
+
+# Handler methods of Django class-based views and DRF viewsets
+VIEW_METHODS = {'get': 'GET', 'post': 'POST', 'put': 'PUT', 'patch': 'PATCH', 'delete': 'DELETE',
+                'list': 'GET', 'retrieve': 'GET', 'create': 'POST', 'update': 'PUT',
+                'partial_update': 'PATCH', 'destroy': 'DELETE'}
+VIEW_BASE = re.compile(r'View$|ViewSet$|APIView$')
+
+# Names of decorators, dependencies, mixins and middleware, matched on their last dotted part
+AUTH_NAME = re.compile(r'auth|login|jwt|permission|token|roles?_required|admin_required|current_user|api_key|oauth',
+                       re.IGNORECASE)
+RATE_LIMIT_NAME = re.compile(r'limit|throttl', re.IGNORECASE)
+ERROR_HANDLER_NAME = re.compile(r'error|exception', re.IGNORECASE)
+PUBLIC_NAME = re.compile(r'public|anonymous|allow_?any', re.IGNORECASE)
+
+# Routes and views that are expected to be reachable without credentials
+PUBLIC_ROUTE = re.compile(r'health|ready|alive|ping|status|login|logout|sign_?in|sign_?up|register|docs|openapi|'
+                          r'swagger|metrics|favicon|robots', re.IGNORECASE)
+
+# Calls that fail on bad input or unavailable services
+RISKY_ATTRS = frozenset(('get_json', 'loads', 'commit', 'execute', 'executemany', 'save', 'urlopen',
+                         'raise_for_status'))
+RISKY_CLIENTS = frozenset(('requests', 'httpx', 'boto3', 'subprocess'))
+PARSERS = frozenset(('int', 'float', 'Decimal', 'UUID'))
+
+# Checks, as named under `api_checks`, and the rules they report
+RULE_GROUPS = {
+    'authentication': ('missing-auth',),
+    'rate_limiting': ('missing-rate-limit',),
+    'error_handling': ('unhandled-errors', 'broad-except', 'exception-leak'),
+}
+
+# Application-wide setup that covers every route for a rule: found in any
+# analyzed file, it suppresses the rule's findings
+RULE_MARKERS = {'missing-auth': 'auth', 'missing-rate-limit': 'rate_limit', 'unhandled-errors': 'error_handler'}
+
+# Nodes the handler scan does not enter, and try statements (TryStar is Python 3.11+)
+NESTED_SCOPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)
+TRY_NODES = (ast.Try,) + ((ast.TryStar,) if hasattr(ast, 'TryStar') else ())
+
+# Nodes without calls or returns below them, skipped by the handler scan
+LEAF_NODES = frozenset({ast.Name, ast.Constant, str, int, type(None)} |
+                       {kind for base in (ast.expr_context, ast.operator, ast.cmpop, ast.boolop, ast.unaryop)
+                        for kind in base.__subclasses__()})
+
+# Text that application-wide setup needs; files without it skip the walk for it
+SETUP_HINT = re.compile(r'Limiter|error_handler|exception_handler|errorhandler|add_middleware|FastAPI|'
+                        r'process_exception|before_request|DEFAULT_|EXCEPTION_HANDLER|handler500|MIDDLEWARE')
+
+# Routes named in one missing-rate-limit finding
+MAX_NAMED_ROUTES = 5
+
+# Files sent to a worker at a time
+FILES_PER_TASK = 16
+
+# (path, handlers, markers, finding tuples) returned by workers
+FileResult = Tuple[str, int, Tuple[str, ...], List[Tuple]]
+
+
+def dotted_name(node: ast.AST) -> str:
+    """Return `a.b.c` for a name or attribute chain, and the callee's name for a call."""
+    if isinstance(node, ast.Call):
+        return dotted_name(node.func)
+    if isinstance(node, ast.Attribute):
+        base = dotted_name(node.value)
+        return f"{base}.{node.attr}" if base else node.attr
+    if isinstance(node, ast.Name):
+        return node.id
+    return ''
+
+
+def _last_name(node: ast.AST) -> str:
+    return dotted_name(node).rsplit('.', 1)[-1]
+
+
+def _names(node: ast.AST) -> Iterator[str]:
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name):
+            yield child.id
+        elif isinstance(child, ast.Attribute):
+            yield child.attr
+
+
+def _matches(pattern: Pattern, names: Iterator[str]) -> bool:
+    return any(pattern.search(name) for name in names)
+
+
+def _dependencies(node: ast.AST) -> Iterator[Tuple[str, ast.Call]]:
+    # Depends(...) and Security(...) calls in parameters, annotations and decorator arguments
+    for child in ast.walk(node):
+        if isinstance(child, ast.Call) and _last_name(child) in ('Depends', 'Security'):
+            yield _last_name(child), child
+
+
+class Route:
+    """A route handler and what protects it."""
+
+    __slots__ = ('name', 'line', 'column', 'path', 'methods', 'public', 'auth', 'rate_limited')
+
+    def __init__(self, name: str, node: ast.AST, path: Optional[str] = None, methods: Sequence[str] = ()):
+        self.name = name
+        self.line = node.lineno
+        self.column = node.col_offset + 1
+        self.path = path
+        self.methods = tuple(methods)
+        self.public = bool(PUBLIC_ROUTE.search(path or name))
+        self.auth = False
+        self.rate_limited = False
+
+    @property
+    def label(self) -> str:
+        """`POST /users (create_user)`, or `view UserView.post` for routes without a path."""
+        if self.path is None:
+            return f"view {self.name}"
+        return f"{'/'.join(self.methods)} {self.path} ({self.name})"
+
+    def protect(self, names: List[str]) -> None:
+        """Record the decorators, dependencies or bases that apply to the route."""
+        if any(PUBLIC_NAME.search(name) for name in names):
+            self.public = True
+        self.auth = self.auth or any(AUTH_NAME.search(name) for name in names)
+        self.rate_limited = self.rate_limited or any(RATE_LIMIT_NAME.search(name) for name in names)
+
+
+def _is_risky(call: ast.Call, name: str) -> bool:
+    parts = name.split('.')
+    if len(parts) > 1 and (parts[-1] in RISKY_ATTRS or parts[0] in RISKY_CLIENTS or name.endswith('.objects.get')):
+        return True
+    return name in PARSERS and any(isinstance(child, ast.Name) and child.id == 'request'
+                                   for arg in call.args for child in ast.walk(arg))
+
+
+def _swallows(handler: ast.ExceptHandler) -> bool:
+    broad = handler.type is None or dotted_name(handler.type) in ('Exception', 'BaseException')
+    return broad and all(isinstance(statement, (ast.Pass, ast.Continue)) or
+                         (isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Constant))
+                         for statement in handler.body)
+
+
+class HandlerScan:
+    """
+    Unguarded risky calls, swallowed exceptions and leaked exception details of one handler.
+
+    The handler body is walked once with an explicit stack that carries
+    whether the node is inside a `try` with handlers and the name bound
+    by the enclosing `except ... as name`. Nested functions and lambdas
+    are not entered: they run later, if at all.
+    """
+
+    __slots__ = ('unguarded', 'swallowed', 'leaks')
+
+    def __init__(self, node: ast.AST):
+        self.unguarded: Optional[Tuple[ast.Call, str]] = None
+        self.swallowed: List[ast.ExceptHandler] = []
+        self.leaks: List[Tuple[ast.Return, str]] = []
+        stack: List[Tuple[ast.AST, bool, Optional[str]]] = [(statement, False, None) for statement in node.body]
+        while stack:
+            item, guarded, exception = stack.pop()
+            kind = type(item)
+            if kind in NESTED_SCOPES:
+                continue
+            if kind in TRY_NODES:
+                for statement in item.orelse + item.finalbody:
+                    stack.append((statement, guarded, exception))
+                for handler in item.handlers:
+                    if _swallows(handler):
+                        self.swallowed.append(handler)
+                    stack.append((handler, guarded, handler.name or exception))
+                for statement in item.body:
+                    stack.append((statement, guarded or bool(item.handlers), exception))
+                continue
+            if kind is ast.Call and not guarded:
+                name = dotted_name(item)
+                if _is_risky(item, name) and (self.unguarded is None or
+                                              _position(item) < _position(self.unguarded[0])):
+                    self.unguarded = (item, name)
+            elif kind is ast.Return and exception and item.value is not None and \
+                    any(isinstance(child, ast.Name) and child.id == exception for child in ast.walk(item.value)):
+                self.leaks.append((item, exception))
+            for field in item._fields:
+                value = getattr(item, field, None)
+                if type(value) is list:
+                    stack.extend((child, guarded, exception) for child in value if type(child) not in LEAF_NODES)
+                elif value is not None and type(value) not in LEAF_NODES and isinstance(value, ast.AST):
+                    stack.append((value, guarded, exception))
+        self.swallowed.sort(key=_position)
+        self.leaks.sort(key=lambda leak: _position(leak[0]))
+
+
+def _position(node: ast.AST) -> Tuple[int, int]:
+    return node.lineno, node.col_offset
+
+
+class FileAnalysis:
+    """The routes of one file, the application-wide setup it contains and its findings."""
+
+    __slots__ = ('path', 'routes', 'markers', 'findings')
+
+    def __init__(self, path: str):
+        self.path = path
+        self.routes: List[Route] = []
+        self.markers: Set[str] = set()
+        self.findings: List[Finding] = []
+
+    def add(self, rule: str, severity: str, node: ast.AST, message: str) -> None:
+        """Record a finding at a node."""
+        self.findings.append(Finding('api', rule, severity, self.path, node.lineno, node.col_offset + 1, message))
+
+
+def _frameworks(tree: ast.Module) -> Set[str]:
+    frameworks = set()
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules = [node.module]
+        else:
+            continue
+        frameworks.update(FRAMEWORKS[module.split('.')[0]] for module in modules
+                          if module.split('.')[0] in FRAMEWORKS)
+    return frameworks
+
+
+def _receivers(tree: ast.Module) -> Dict[str, List[str]]:
+    """Return the dependency names protecting each router or app object created at module level."""
+    receivers: Dict[str, List[str]] = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Call) and \
+                _last_name(node.value) in ('APIRouter', 'Blueprint', 'Flask'):
+            dependencies = [keyword.value for keyword in node.value.keywords if keyword.arg == 'dependencies']
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    receivers[target.id] = [name for value in dependencies for name in _names(value)]
+    return receivers
+
+
+def _find_markers(tree: ast.Module, analysis: FileAnalysis) -> None:
+    """Record application-wide error handlers, rate limits and authentication anywhere in a file."""
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            callee = _last_name(node)
+            keywords = {keyword.arg: keyword.value for keyword in node.keywords}
+            if callee == 'Limiter' and ('default_limits' in keywords or 'application_limits' in keywords):
+                analysis.markers.add('rate_limit')
+            elif callee in ('register_error_handler', 'add_exception_handler'):
+                analysis.markers.add('error_handler')
+            elif callee == 'add_middleware' and node.args:
+                middleware = _last_name(node.args[0])
+                for marker, pattern in (('rate_limit', RATE_LIMIT_NAME), ('auth', AUTH_NAME),
+                                        ('error_handler', ERROR_HANDLER_NAME)):
+                    if pattern.search(middleware):
+                        analysis.markers.add(marker)
+            elif callee == 'FastAPI' and 'dependencies' in keywords and \
+                    _matches(AUTH_NAME, _names(keywords['dependencies'])):
+                analysis.markers.add('auth')
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            decorators = [_last_name(decorator) for decorator in node.decorator_list]
+            if 'errorhandler' in decorators or 'exception_handler' in decorators or node.name == 'process_exception':
+                analysis.markers.add('error_handler')
+            if 'before_request' in decorators and _matches(AUTH_NAME, _names(node)):
+                analysis.markers.add('auth')
+        elif isinstance(node, ast.Dict):
+            keys = {key.value for key in node.keys if isinstance(key, ast.Constant)}
+            if keys & {'DEFAULT_PERMISSION_CLASSES', 'DEFAULT_AUTHENTICATION_CLASSES'}:
+                analysis.markers.add('auth')
+            if 'DEFAULT_THROTTLE_CLASSES' in keys:
+                analysis.markers.add('rate_limit')
+            if 'EXCEPTION_HANDLER' in keys:
+                analysis.markers.add('error_handler')
+        elif isinstance(node, ast.Assign):
+            targets = [target.id for target in node.targets if isinstance(target, ast.Name)]
+            if 'handler500' in targets:
+                analysis.markers.add('error_handler')
+            elif 'MIDDLEWARE' in targets and any(isinstance(child, ast.Constant) and isinstance(child.value, str)
+                                                 and RATE_LIMIT_NAME.search(child.value)
+                                                 for child in ast.walk(node.value)):
+                analysis.markers.add('rate_limit')
+
+
+def _decorator_routes(node: ast.AST, receivers: Dict[str, List[str]]) -> Optional[Route]:
+    # Flask and FastAPI: @app.route("/x", methods=[...]), @router.post("/x", dependencies=[...])
+    for decorator in node.decorator_list:
+        if not isinstance(decorator, ast.Call) or not isinstance(decorator.func, ast.Attribute) \
+                or decorator.func.attr not in ROUTE_DECORATORS:
+            continue
+        arguments = decorator.args[:1] + [keyword.value for keyword in decorator.keywords if keyword.arg == 'path']
+        if not arguments or not isinstance(arguments[0], ast.Constant) or not isinstance(arguments[0].value, str):
+            continue
+        methods = [decorator.func.attr.upper()]
+        if decorator.func.attr in ('route', 'api_route'):
+            methods = ['GET']
+            for keyword in decorator.keywords:
+                if keyword.arg == 'methods' and isinstance(keyword.value, (ast.List, ast.Tuple)):
+                    methods = [element.value.upper() for element in keyword.value.elts
+                               if isinstance(element, ast.Constant) and isinstance(element.value, str)]
+        route = Route(node.name, node, arguments[0].value, methods)
+        route.protect([_last_name(other) for other in node.decorator_list if other is not decorator])
+        route.protect([name for keyword in decorator.keywords if keyword.arg == 'dependencies'
+                       for name in _names(keyword.value)])
+        route.protect(receivers.get(dotted_name(decorator.func.value), []))
+        for kind, dependency in _dependencies(node.args):
+            route.auth = route.auth or kind == 'Security'
+            route.protect([name for argument in dependency.args for name in _names(argument)])
+        return route
+    return None
+
+
+def _view_routes(node: ast.AST, function_views: bool) -> Iterator[Tuple[Route, ast.AST]]:
+    # Django function views take the request first (only counted in views modules, where
+    # helpers taking a request are rare); class-based views and viewsets define handler methods
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        decorators = [_last_name(decorator) for decorator in node.decorator_list]
+        arguments = node.args.posonlyargs + node.args.args if hasattr(node.args, 'posonlyargs') else node.args.args
+        if 'api_view' in decorators or (function_views and arguments and arguments[0].arg == 'request'):
+            route = Route(node.name, node)
+            route.protect(decorators)
+            yield route, node
+    elif isinstance(node, ast.ClassDef) and any(VIEW_BASE.search(_last_name(base)) for base in node.bases):
+        shared = [_last_name(base) for base in node.bases] + \
+            [name for decorator in node.decorator_list for name in _names(decorator)]
+        for statement in node.body:
+            if isinstance(statement, ast.Assign):
+                targets = [target.id for target in statement.targets if isinstance(target, ast.Name)]
+                values = list(_names(statement.value))
+                if ('permission_classes' in targets or 'authentication_classes' in targets) and \
+                        not all(PUBLIC_NAME.search(value) for value in values):
+                    shared.append('permission_classes')
+                elif 'permission_classes' in targets:
+                    shared.append('AllowAny')
+                if 'throttle_classes' in targets and values:
+                    shared.append('throttle_classes')
+        for statement in node.body:
+            if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)) and statement.name in VIEW_METHODS:
+                route = Route(f"{node.name}.{statement.name}", statement)
+                route.public = route.public or bool(PUBLIC_ROUTE.search(node.name))
+                route.protect(shared + [_last_name(decorator) for decorator in statement.decorator_list])
+                yield route, statement
+
+
+def analyze_source(source: str, path: str) -> FileAnalysis:
+    """
+    Parse a file once and run the authentication, rate-limiting and error-handling rules on its routes.
+
+    Args:
+        source: Contents of the file
+        path: Path reported in findings
+
+    Returns:
+        FileAnalysis; files that use no supported framework or do not parse have no routes
+    """
+    analysis = FileAnalysis(path)
+    if not any(framework in source for framework in FRAMEWORKS):
+        return analysis
+    try:
+        tree = ast.parse(source, path)
+    except (SyntaxError, ValueError):
+        return analysis
+    frameworks = _frameworks(tree)
+    if not frameworks:
+        return analysis
+    if SETUP_HINT.search(source):
+        _find_markers(tree, analysis)
+    receivers = _receivers(tree)
+    function_views = 'django' in frameworks and os.path.basename(path).startswith('views')
+
+    handlers: List[Tuple[Route, ast.AST]] = []
+    for node in tree.body:
+        route = None
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and frameworks & {'flask', 'fastapi'}:
+            route = _decorator_routes(node, receivers)
+            if route is not None:
+                handlers.append((route, node))
+        if route is None and frameworks & {'django', 'flask'}:
+            handlers.extend(_view_routes(node, function_views))
+    analysis.routes = [route for route, _ in handlers]
+
+    unlimited = []
+    for route, node in handlers:
+        if not route.auth and not route.public:
+            analysis.add('missing-auth', 'warning', node,
+                         f"{route.label} has no authentication decorator, dependency or permission class; "
+                         f"protect it, or name it as public if it is meant to be.")
+        if not route.rate_limited:
+            unlimited.append(route)
+        visitor = HandlerScan(node)
+        if visitor.unguarded is not None:
+            call, name = visitor.unguarded
+            analysis.add('unhandled-errors', 'info', call,
+                         f"{route.label} calls {name}() outside try/except and no error handler is "
+                         f"registered; a failure returns an unformatted 500.")
+        for handler in visitor.swallowed:
+            analysis.add('broad-except', 'warning', handler,
+                         f"{route.label} silently swallows every exception; catch the expected errors and "
+                         f"return an error response.")
+        for statement, name in visitor.leaks:
+            analysis.add('exception-leak', 'warning', statement,
+                         f"{route.label} returns exception details ({name}) to the client; log them and "
+                         f"return a generic error message.")
+    if unlimited:
+        names = ', '.join(route.name for route in unlimited[:MAX_NAMED_ROUTES])
+        more = f" and {len(unlimited) - MAX_NAMED_ROUTES} more" if len(unlimited) > MAX_NAMED_ROUTES else ''
+        analysis.findings.append(Finding(
+            'api', 'missing-rate-limit', 'info', path, unlimited[0].line, unlimited[0].column,
+            f"{len(unlimited)} route(s) have no rate limit ({names}{more}); add a per-route limit or "
+            f"rate-limiting middleware."))
+    return analysis
+
+
+def _analyze_files(items: List[Tuple[str, str]]) -> List[FileResult]:
+    # Runs in a worker: each file is read and parsed once, and only tuples travel back
+    results = []
+    for path, full_path in items:
+        try:
+            with open(full_path, 'rb') as f:
+                source = f.read().decode('utf-8', errors='replace')
+        except OSError:
+            continue
+        analysis = analyze_source(source, path)
+        results.append((path, len(analysis.routes), tuple(sorted(analysis.markers)),
+                        [finding.as_tuple() for finding in analysis.findings]))
+    return results
+
+
+def analyze_changed_files(changed_files: ChangedFiles, rules: Optional[FrozenSet[str]] = None,
+                          max_workers: Optional[int] = None,
+                          stats: Optional[Dict[str, int]] = None,
+                          files_per_task: int = FILES_PER_TASK,
+                          cancel: Optional[threading.Event] = None) -> List[Finding]:
+    """
+    Check the route handlers in the Python files a PR changed.
+
+    Files are parsed in a process pool, a batch of files per task, and
+    every rule runs on the one AST of each file. Application-wide setup
+    found in any of the files (error handlers, rate-limiting middleware,
+    global permission classes) suppresses the matching rule.
+
+    Args:
+        changed_files: Index of the files changed by the PR
+        rules: Optional rules to report; all rules of RULE_GROUPS when None
+        max_workers: Optional worker cap (default: CPU count); files are
+            analyzed in this process with 1 worker or a single batch
+        stats: Optional dictionary receiving `files` and `handlers` counts
+        files_per_task: Files a worker reads and analyzes per task
+        cancel: Event that stops the analysis before the next batch
+
+    Returns:
+        Findings sorted by file and line; those of the batches analyzed
+        so far when cancelled
+    """
+    if not isinstance(changed_files, ChangedFiles):
+        raise TypeError(f"changed_files must be a ChangedFiles, got {type(changed_files)}")
+    items = [(changed_file.path, os.path.join(changed_files.repo_path, changed_file.path))
+             for changed_file in changed_files.by_language('python') if changed_file.status != 'removed']
+    batches = [items[start:start + files_per_task] for start in range(0, len(items), files_per_task)]
+    workers = min(max_workers or os.cpu_count() or 1, len(batches))
+
+    def cancelled() -> bool:
+        return cancel is not None and cancel.is_set()
+
+    results = []
+    if workers <= 1:
+        for batch in batches:
+            if cancelled():
+                break
+            results.extend(_analyze_files(batch))
+    else:
+        with ProcessPoolExecutor(workers, mp_context=process_pool_context()) as pool:
+            futures = [pool.submit(_analyze_files, batch) for batch in batches]
+            for future in futures:
+                if cancelled():
+                    # Batches not started yet are dropped
+                    for pending in futures:
+                        pending.cancel()
+                    break
+                results.extend(future.result())
+
+    markers = {marker for _, _, file_markers, _ in results for marker in file_markers}
+    if rules is None:
+        rules = frozenset(rule for group in RULE_GROUPS.values() for rule in group)
+    findings = [Finding.from_tuple(values) for _, _, _, tuples in results for values in tuples]
+    findings = [finding for finding in findings
+                if finding.rule in rules and RULE_MARKERS.get(finding.rule) not in markers]
+    if stats is not None:
+        stats['files'] = len(results)
+        stats['handlers'] = sum(handlers for _, handlers, _, _ in results)
+    return sorted(findings, key=Finding.sort_key)
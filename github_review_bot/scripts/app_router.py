@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Script to scan a Next.js App Router directory one route file at a time.
+"""
+
+import os
+import re
+from typing import Any, Dict, Iterable, Iterator, Optional, Set
+from .repo_index import RepoIndex
+
+# Directories holding the App Router, in the order Next.js looks for them
+APP_DIRS = ('app', 'src/app')
+
+# Special files of a route segment, by name without extension
+ROUTE_FILE_KINDS = ('layout', 'page', 'route', 'loading', 'error')
+ROUTE_FILE_EXTENSIONS = ('.js', '.jsx', '.ts', '.tsx')
+
+# Client components above this size are flagged: all of it ships to the browser
+MAX_CLIENT_COMPONENT_BYTES = 50 * 1024
+
+# Enough of a file to find a directive behind a license header
+DIRECTIVE_READ_BYTES = 4096
+
+DIRECTIVE = re.compile(r'''\A(?:\s+|//[^\n]*|/\*.*?\*/)*(['"])use client\1''', re.DOTALL)
+METADATA_EXPORT = re.compile(
+    r'export\s+(?:const|let|var)\s+metadata\b'
+    r'|export\s+(?:async\s+)?function\s+generateMetadata\b'
+    r'|export\s*\{[^}]*\b(?:metadata|generateMetadata)\b'
+)
+
+
+class RouteFile:
+    """A special file of the App Router."""
+
+    __slots__ = ('path', 'kind', 'route', 'size')
+
+    def __init__(self, path: str, kind: str, route: str, size: int):
+        self.path = path
+        self.kind = kind
+        self.route = route
+        self.size = size
+
+    def __repr__(self) -> str:
+        return f"RouteFile({self.path!r}, {self.kind!r}, route={self.route!r})"
+
+
+def find_app_dir(repo_index: RepoIndex) -> Optional[str]:
+    """Return the App Router directory of a project, or None if it has none."""
+    return next((d for d in APP_DIRS if repo_index.is_dir(d)), None)
+
+
+def route_of(segments: Any) -> str:
+    """
+    Return the URL path of a route directory.
+
+    Route groups `(name)` and parallel route slots `@name` do not appear
+    in the URL.
+    """
+    parts = [s for s in segments if not (s.startswith('(') and s.endswith(')')) and not s.startswith('@')]
+    return '/' + '/'.join(parts)
+
+
+def as_route_file(repo_index: RepoIndex, path: str, app_dir: str = 'app') -> Optional[RouteFile]:
+    """
+    Classify one path of a project as an App Router special file.
+
+    Private folders (`_name`) are not routes.
+
+    Returns:
+        RouteFile, or None if path is not a layout, page, route, loading
+        or error file of the App Router directory
+    """
+    directory, name = os.path.split(path)
+    stem, extension = os.path.splitext(name)
+    if stem not in ROUTE_FILE_KINDS or extension not in ROUTE_FILE_EXTENSIONS:
+        return None
+    if directory != app_dir and not directory.startswith(app_dir + '/'):
+        return None
+    segments = directory[len(app_dir):].strip('/').split('/') if directory != app_dir else []
+    if any(segment.startswith('_') for segment in segments) or not repo_index.is_file(path):
+        return None
+    return RouteFile(path, stem, route_of(segments), repo_index.size(path) or 0)
+
+
+def iter_route_files(repo_index: RepoIndex, app_dir: str = 'app',
+                     paths: Optional[Iterable[str]] = None) -> Iterator[RouteFile]:
+    """
+    Yield the special files of an App Router directory.
+
+    Walks the in-memory index lazily, so memory does not grow with the
+    number of routes. Given paths, only those are looked up, so the cost
+    follows the size of the change rather than of the app.
+
+    Args:
+        repo_index: Index of the project
+        app_dir: App Router directory within the project
+        paths: Optional project-relative paths to consider instead of
+            every file below app_dir
+
+    Yields:
+        RouteFile per layout, page, route, loading and error file
+    """
+    for path in repo_index.files(app_dir) if paths is None else paths:
+        route_file = as_route_file(repo_index, path, app_dir)
+        if route_file is not None:
+            yield route_file
+
+
+def _read(repo_index: RepoIndex, path: str, limit: int = -1) -> Optional[str]:
+    try:
+        with open(os.path.join(repo_index.root, path), encoding='utf-8', errors='replace') as f:
+            return f.read(limit)
+    except OSError:
+        return None
+
+
+def check_route_file(repo_index: RepoIndex, route_file: RouteFile, app_dir: str = 'app',
+                     max_client_bytes: int = MAX_CLIENT_COMPONENT_BYTES) -> Iterator[Dict[str, Any]]:
+    """
+    Check one route file, reading no more of it than the checks need.
+
+    Args:
+        repo_index: Index of the project
+        route_file: File to check
+        app_dir: App Router directory within the project
+        max_client_bytes: Size above which a client component is flagged
+
+    Yields:
+        Issues with type, message and file keys
+    """
+    head = _read(repo_index, route_file.path, DIRECTIVE_READ_BYTES)
+    if head is None:
+        return
+    client = bool(DIRECTIVE.match(head))
+
+    if client and route_file.kind == 'layout':
+        yield {
+            "type": "warning",
+            "message": f"Layout of {route_file.route} is a client component. Keep layouts on the server "
+                       "and move interactive parts into client components they render.",
+            "file": route_file.path
+        }
+    if client and route_file.size > max_client_bytes:
+        yield {
+            "type": "warning",
+            "message": f"Client component is {route_file.size // 1024} KB, all of which ships to the "
+                       f"browser. Split it or move logic to server components "
+                       f"(limit {max_client_bytes // 1024} KB).",
+            "file": route_file.path
+        }
+    if route_file.kind not in ('layout', 'page'):
+        return
+
+    content = head if len(head) < DIRECTIVE_READ_BYTES else _read(repo_index, route_file.path)
+    exports_metadata = bool(content and METADATA_EXPORT.search(content))
+    if client and exports_metadata:
+        yield {
+            "type": "error",
+            "message": "metadata and generateMetadata are only supported in server components; "
+                       "remove \"use client\" or move the metadata to a server file.",
+            "file": route_file.path
+        }
+    elif (not exports_metadata and route_file.kind == 'layout' and route_file.route == '/'
+          and os.path.dirname(route_file.path) == app_dir):
+        yield {
+            "type": "info",
+            "message": "Consider adding metadata to your root layout for better SEO.",
+            "file": route_file.path
+        }
+
+
+def scan_app_router(repo_index: RepoIndex, app_dir: str = 'app', touched: Optional[Set[str]] = None,
+                    max_client_bytes: int = MAX_CLIENT_COMPONENT_BYTES) -> Iterator[Dict[str, Any]]:
+    """
+    Check the route files of an App Router directory, one at a time.
+
+    Args:
+        repo_index: Index of the project
+        app_dir: App Router directory within the project
+        touched: Project-relative paths changed by the PR; only these are
+            looked up and read. Every route file is checked when not given
+        max_client_bytes: Size above which a client component is flagged
+
+    Yields:
+        Issues with type, message and file keys
+
+    Raises:
+        TypeError: If repo_index is not a RepoIndex
+    """
+    if not isinstance(repo_index, RepoIndex):
+        raise TypeError(f"repo_index must be a RepoIndex, got {type(repo_index)}")
+    paths = None if touched is None else sorted(touched)
+    for route_file in iter_route_files(repo_index, app_dir, paths):
+        yield from check_route_file(repo_index, route_file, app_dir, max_client_bytes)
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Script to measure the first-load JS of Next.js routes and check it against a budget.
+"""
+
+import json
+import mmap
+import os
+import tempfile
+import threading
+import zlib
+from typing import Any, Dict, Iterable, List, Optional
+from .repo_index import RepoIndex
+
+BUILD_DIR = '.next'
+BUILD_MANIFEST = 'build-manifest.json'
+APP_BUILD_MANIFEST = 'app-build-manifest.json'
+
+# Entries of the pages manifest that are not routes
+SPECIAL_PAGES = ('/_app', '/_error', '/_document')
+
+# Window fed to the compressor when sizing a chunk
+READ_WINDOW = 1 << 16
+
+# Default allowed growth of a route's first-load JS over the baseline
+DEFAULT_MAX_GROWTH_KB = 10
+
+BASELINE_DIR = 'bundle_baselines'
+
+
+def _read_json(path: str) -> Any:
+    """Parse a build manifest, or return None if it is missing or invalid."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def gzip_size(path: str) -> int:
+    """
+    Return the gzipped size of a file, as Next.js reports first-load JS.
+
+    The file is mapped into memory and compressed in windows, so memory
+    use does not grow with the chunk size.
+    """
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+    size = 0
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, len(view), READ_WINDOW):
+                    size += len(compressor.compress(view[offset:offset + READ_WINDOW]))
+            finally:
+                view.release()
+    return size + len(compressor.flush())
+
+
+def route_chunks(build_dir: str) -> Dict[str, List[str]]:
+    """
+    Read the JS chunks each route loads on first visit from the build manifests.
+
+    Args:
+        build_dir: Path to the `.next` directory
+
+    Returns:
+        Dict of route to chunk paths relative to build_dir; empty when
+        there is no build output
+    """
+    routes: Dict[str, List[str]] = {}
+    build = _read_json(os.path.join(build_dir, BUILD_MANIFEST)) or {}
+    pages = build.get('pages') or {}
+    shared = list(pages.get('/_app') or [])
+    for route, chunks in pages.items():
+        if route not in SPECIAL_PAGES:
+            routes[route] = shared + list(chunks)
+
+    app = _read_json(os.path.join(build_dir, APP_BUILD_MANIFEST)) or {}
+    root_main = list(build.get('rootMainFiles') or [])
+    for entry, chunks in (app.get('pages') or {}).items():
+        if entry.endswith('/page'):
+            routes[entry[:-len('/page')] or '/'] = root_main + list(chunks)
+
+    return {route: list(dict.fromkeys(c for c in chunks if c.endswith('.js')))
+            for route, chunks in routes.items()}
+
+
+def first_load_sizes(build_dir: str) -> Dict[str, int]:
+    """
+    Measure the gzipped first-load JS of every route of a build.
+
+    Chunks shared by several routes are sized once.
+
+    Returns:
+        Dict of route to bytes; empty when there is no build output
+    """
+    sizes: Dict[str, int] = {}
+    chunk_sizes: Dict[str, int] = {}
+    for route, chunks in route_chunks(build_dir).items():
+        total = 0
+        for chunk in chunks:
+            if chunk not in chunk_sizes:
+                try:
+                    chunk_sizes[chunk] = gzip_size(os.path.join(build_dir, chunk))
+                except OSError:
+                    chunk_sizes[chunk] = 0
+            total += chunk_sizes[chunk]
+        sizes[route] = total
+    return sizes
+
+
+class BundleBaselineStore:
+    """
+    First-load JS sizes recorded per commit, for each Next.js project.
+
+    A job on the base branch records its sizes under the commit SHA, and
+    reviews compare against the baseline of ChangedFiles.base_sha: the
+    base branch tip for PR reviews, whose checkout is the PR merged into
+    it, and the merge base for local runs from git.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.directory = os.path.join(cache_dir, BASELINE_DIR)
+
+    def load(self, sha: Optional[str]) -> Optional[Dict[str, Dict[str, int]]]:
+        """Return the sizes recorded for a commit, keyed by project then route."""
+        if not sha:
+            return None
+        try:
+            with open(os.path.join(self.directory, f"{sha}.json")) as f:
+                baseline = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return baseline if isinstance(baseline, dict) else None
+
+    def save(self, sha: str, sizes: Dict[str, Dict[str, int]]) -> str:
+        """Record the sizes of a commit atomically and return the file path."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{sha}.json")
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(sizes, f, sort_keys=True)
+        os.replace(tmp_path, path)
+        return path
+
+
+class BundleBudget:
+    """
+    Limits on the first-load JS of each route.
+
+    A route fails the budget when it exceeds max_first_load_kb, or when it
+    grew by more than max_growth_kb over the baseline of the base commit.
+    """
+
+    def __init__(self, max_first_load_kb: Optional[float] = None,
+                 max_growth_kb: Optional[float] = DEFAULT_MAX_GROWTH_KB,
+                 store: Optional[BundleBaselineStore] = None, base_sha: Optional[str] = None):
+        self.max_first_load_kb = max_first_load_kb
+        self.max_growth_kb = max_growth_kb
+        self.store = store
+        self.base_sha = base_sha
+        self._lock = threading.Lock()
+        self._baseline: Optional[Dict[str, Dict[str, int]]] = None
+        self._loaded = False
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], cache_dir: Optional[str] = None,
+                    base_sha: Optional[str] = None) -> Optional['BundleBudget']:
+        """
+        Build the budget from the `nextjs.bundle_budget` config section.
+
+        Returns:
+            BundleBudget, or None when the section is set to false
+        """
+        section = config.get('nextjs', {}).get('bundle_budget', {})
+        if section is False:
+            return None
+        section = section if isinstance(section, dict) else {}
+        return cls(section.get('max_first_load_kb'),
+                   section.get('max_growth_kb', DEFAULT_MAX_GROWTH_KB),
+                   BundleBaselineStore(cache_dir) if cache_dir else None, base_sha)
+
+    def baseline(self, project: str) -> Dict[str, int]:
+        """Return the base commit's sizes of a project, by route; empty if unknown."""
+        with self._lock:
+            if not self._loaded:
+                self._baseline = self.store.load(self.base_sha) if self.store else None
+                self._loaded = True
+        return (self._baseline or {}).get(project or '.', {})
+
+    def check(self, sizes: Dict[str, int], project: str = '') -> List[Dict[str, Any]]:
+        """
+        Compare measured sizes with the budget.
+
+        Args:
+            sizes: First-load JS bytes by route
+            project: Repository-relative directory of the Next.js project
+
+        Returns:
+            One issue per route over budget
+        """
+        baseline = self.baseline(project)
+        issues = []
+        for route, size in sorted(sizes.items()):
+            kb = size / 1024
+            if self.max_first_load_kb is not None and kb > self.max_first_load_kb:
+                issues.append({
+                    "type": "error",
+                    "message": f"First-load JS of {route} is {kb:.1f} KB, over the "
+                               f"{self.max_first_load_kb:g} KB budget.",
+                    "file": None
+                })
+            elif route in baseline and self.max_growth_kb is not None:
+                growth = (size - baseline[route]) / 1024
+                if growth > self.max_growth_kb:
+                    issues.append({
+                        "type": "warning",
+                        "message": f"First-load JS of {route} grew by {growth:.1f} KB to {kb:.1f} KB "
+                                   f"(allowed growth {self.max_growth_kb:g} KB).",
+                        "file": None
+                    })
+        return issues
+
+
+def record_baselines(repo_path: str, cache_dir: str, sha: str,
+                     projects: Iterable[str] = ('',)) -> Dict[str, Dict[str, int]]:
+    """
+    Measure the builds of Next.js projects and store them as a commit's baseline.
+
+    Args:
+        repo_path: Path to the repository root
+        cache_dir: Cache directory shared with the reviews
+        sha: Commit the builds were made from
+        projects: Repository-relative project directories, '' for the root
+
+    Returns:
+        The recorded sizes, keyed by project then route
+    """
+    sizes = {}
+    for project in projects:
+        measured = first_load_sizes(os.path.join(repo_path, project, BUILD_DIR))
+        if measured:
+            sizes[project or '.'] = measured
+    BundleBaselineStore(cache_dir).save(sha, sizes)
+    return sizes
+
+
+def main():
+    """Record the bundle baseline of the checked-out commit, for base-branch jobs."""
+    import subprocess
+    import sys
+    from .load_config import load_config
+    from .result_cache import resolve_cache_dir
+    from .workspaces import discover_workspaces
+
+    cache_dir = resolve_cache_dir(load_config())
+    if not cache_dir:
+        print("Caching is disabled, no baseline recorded")
+        sys.exit(1)
+    sha = sys.argv[1] if len(sys.argv) > 1 else subprocess.run(
+        ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    projects = [''] + [w.path for w in discover_workspaces(RepoIndex.build('.'))]
+    sizes = record_baselines('.', cache_dir, sha, projects)
+    print(f"Recorded first-load JS of {sum(len(r) for r in sizes.values())} routes for {sha}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Script to build the index of files changed by a pull request.
+"""
+
+import os
+import subprocess
+from typing import Dict, Iterator, List, Optional
+
+# Language of a file, keyed by extension
+LANGUAGE_EXTENSIONS: Dict[str, str] = {
+    '.py': 'python',
+    '.pyi': 'python',
+    '.js': 'javascript',
+    '.jsx': 'javascript',
+    '.mjs': 'javascript',
+    '.cjs': 'javascript',
+    '.ts': 'typescript',
+    '.tsx': 'typescript',
+    '.json': 'json',
+    '.yml': 'yaml',
+    '.yaml': 'yaml',
+    '.md': 'markdown'
+}
+
+# Languages linted by the JavaScript/TypeScript analyzers
+JS_LANGUAGES = ('javascript', 'typescript')
+
+# Normalization of `git diff --name-status` letters to GitHub file statuses
+GIT_STATUSES: Dict[str, str] = {
+    'A': 'added',
+    'D': 'removed',
+    'M': 'modified',
+    'R': 'renamed',
+    'C': 'copied',
+    'T': 'changed'
+}
+
+
+def detect_language(path: str) -> Optional[str]:
+    """
+    Detect the language of a file from its extension.
+
+    Args:
+        path: Repository-relative file path
+
+    Returns:
+        Language name, or None for unknown extensions
+    """
+    return LANGUAGE_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+
+class ChangedFile:
+    """A single file touched by the pull request."""
+
+    __slots__ = ('path', 'status', 'language', 'size', 'patch', 'sha')
+
+    def __init__(self, path: str, status: str, size: Optional[int] = None,
+                 patch: Optional[str] = None, sha: Optional[str] = None):
+        self.path = path
+        self.status = status
+        self.language = detect_language(path)
+        self.size = size
+        self.patch = patch
+        self.sha = sha
+
+    @property
+    def exists(self) -> bool:
+        """Whether the file is present in the checked-out head revision."""
+        return self.status != 'removed' and self.size is not None
+
+    def __repr__(self) -> str:
+        return f"ChangedFile({self.path!r}, {self.status!r}, size={self.size})"
+
+
+class ChangedFiles:
+    """
+    Index of the files changed by a pull request, built once per run and
+    shared by every analyzer and checker.
+    """
+
+    def __init__(self, files: List[ChangedFile], repo_path: str = '.', base_sha: Optional[str] = None):
+        self.repo_path = repo_path
+        # Commit the changes are compared against, when known
+        self.base_sha = base_sha
+        self._files: Dict[str, ChangedFile] = {f.path: f for f in files}
+
+    @classmethod
+    def from_pull_request(cls, pr, repo_path: str = '.') -> 'ChangedFiles':
+        """
+        Build the index from the PR's file list (a single paginated API listing).
+
+        Args:
+            pr: The GitHub pull request object
+            repo_path: Path to the checked-out head revision
+
+        Returns:
+            ChangedFiles index
+        """
+        files = []
+        for pr_file in pr.get_files():
+            patch = getattr(pr_file, 'patch', None)
+            sha = getattr(pr_file, 'sha', None)
+            files.append(ChangedFile(
+                pr_file.filename,
+                pr_file.status,
+                size=_file_size(repo_path, pr_file.filename),
+                patch=patch if isinstance(patch, str) else None,
+                sha=sha if isinstance(sha, str) else None
+            ))
+        base_sha = getattr(getattr(pr, 'base', None), 'sha', None)
+        return cls(files, repo_path, base_sha if isinstance(base_sha, str) else None)
+
+    @classmethod
+    def from_git(cls, base_ref: str = 'origin/main', repo_path: str = '.') -> 'ChangedFiles':
+        """
+        Build the index with a single git call against the merge-base of
+        base_ref and HEAD.
+
+        Args:
+            base_ref: Branch the pull request targets
+            repo_path: Path to the git checkout
+
+        Returns:
+            ChangedFiles index, empty if git fails
+        """
+        result = subprocess.run(
+            ['git', 'diff', '--name-status', '-z', f'{base_ref}...HEAD'],
+            capture_output=True,
+            text=True,
+            cwd=repo_path
+        )
+        if result.returncode != 0:
+            print(f"Could not list changed files against {base_ref}: {result.stderr.strip()}")
+            return cls([], repo_path)
+
+        files = []
+        fields = result.stdout.split('\0')
+        i = 0
+        while i < len(fields) - 1:
+            status = fields[i]
+            # Renames and copies carry the old and the new path
+            if status[:1] in ('R', 'C'):
+                path = fields[i + 2]
+                i += 3
+            else:
+                path = fields[i + 1]
+                i += 2
+            files.append(ChangedFile(
+                path,
+                GIT_STATUSES.get(status[:1], 'modified'),
+                size=_file_size(repo_path, path)
+            ))
+        merge_base = subprocess.run(['git', 'merge-base', base_ref, 'HEAD'],
+                                    capture_output=True, text=True, cwd=repo_path)
+        return cls(files, repo_path, merge_base.stdout.strip() if merge_base.returncode == 0 else None)
+
+    def __iter__(self) -> Iterator[ChangedFile]:
+        return iter(self._files.values())
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def __contains__(self, path: object) -> bool:
+        return path in self._files
+
+    def get(self, path: str) -> Optional[ChangedFile]:
+        """Return the entry for path, or None if the PR did not touch it."""
+        return self._files.get(path)
+
+    def by_language(self, *languages: str) -> List[ChangedFile]:
+        """Return the changed files in any of the given languages."""
+        return [f for f in self if f.language in languages]
+
+    def has_language(self, *languages: str) -> bool:
+        """Whether the PR touched any file in the given languages."""
+        return any(f.language in languages for f in self)
+
+    def lint_files(self, *languages: str) -> List[ChangedFile]:
+        """Return files in the given languages that exist in the head revision."""
+        return [f for f in self.by_language(*languages) if f.exists]
+
+    def lint_targets(self, *languages: str) -> List[str]:
+        """Return paths in the given languages that exist in the head revision."""
+        return [f.path for f in self.lint_files(*languages)]
+
+
+def _file_size(repo_path: str, path: str) -> Optional[int]:
+    """Return the byte size of a checked-out file, or None if it is absent."""
+    try:
+        return os.stat(os.path.join(repo_path, path)).st_size
+    except OSError:
+        return None
+
+
+def build_changed_files(pr, repo_path: str = '.') -> ChangedFiles:
+    """
+    Build the changed-file index for a pull request.
+
+    Uses the PR's file list, falling back to a single git diff against the
+    merge-base when the API cannot be reached.
+
+    Args:
+        pr: The GitHub pull request object
+        repo_path: Path to the checked-out head revision
+
+    Returns:
+        ChangedFiles index
+    """
+    try:
+        return ChangedFiles.from_pull_request(pr, repo_path)
+    except Exception as e:
+        print(f"Could not list PR files from the API ({e}), falling back to git")
+        base = getattr(getattr(pr, 'base', None), 'ref', None)
+        return ChangedFiles.from_git(f'origin/{base}' if isinstance(base, str) else 'origin/main',
+                                     repo_path)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+AI agent checks for the GitHub Review Bot.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional
+from .ai_index import (
+    AIIndex, AIIndexStore, DEFAULT_MAX_SCAN, DEPRECATED_MODELS, MODEL_FAMILIES, ModelTrie, unpinned_name
+)
+from .changed_files import ChangedFiles
+from .findings import Finding
+from .repo_index import RepoIndex
+
+# Parsers that execute model output rather than parse it
+EXECUTING_PARSERS = ('eval',)
+
+class AIChecker:
+    """
+    Checks the files a PR changed against the repository's AI index.
+
+    Each group of checks follows its `ai_checks` flag: model_versioning,
+    response_validation and prompt_engineering (default: enabled).
+    """
+
+    def __init__(self, index: AIIndex, config: Optional[Dict[str, Any]] = None,
+                 trie: Optional[ModelTrie] = None):
+        self.index = index
+        self.config = config or {}
+        self.trie = trie or model_trie(self.config)
+        self.issues: List[Dict[str, Any]] = []
+
+    def enabled(self, key: str) -> bool:
+        """Whether an `ai_checks` flag is on."""
+        return (self.config.get('ai_checks') or {}).get(key, True) is not False
+
+    def _add(self, rule: str, severity: str, path: str, line: int, column: Optional[int], message: str) -> None:
+        self.issues.append(Finding('ai', rule, severity, path, line, column, message).to_dict())
+
+    def check_model_versions(self) -> None:
+        """Flag deprecated and unpinned model IDs, and snapshots that differ from the rest of the repo."""
+        references = self.index.model_references()
+        for path in self.index.changed:
+            for line, column, model in self.index.files[path].models:
+                status = self.trie.classify(model)
+                if status == 'deprecated':
+                    self._add('deprecated-model', 'error', path, line, column,
+                              f"Model {model} is deprecated or retired by its provider; migrate to a current model.")
+                elif status == 'unpinned':
+                    self._add('unpinned-model', 'warning', path, line, column,
+                              f"Model {model} is an alias that can change behind the same name; "
+                              f"pin a dated snapshot for reproducible behavior.")
+                elif status == 'pinned':
+                    others = sorted({other for other in references if other != model
+                                     and self.trie.classify(other) == 'pinned'
+                                     and unpinned_name(other) == unpinned_name(model)})
+                    if others:
+                        where = references[others[0]][0]
+                        self._add('model-snapshot-drift', 'info', path, line, column,
+                                  f"Model {model} differs from {others[0]} pinned in {where[0]}:{where[1]}; "
+                                  f"keep one snapshot per model across the repository.")
+
+    def check_response_parsing(self) -> None:
+        """Flag model output that is parsed without error handling or validation, or executed."""
+        for path in self.index.changed:
+            for line, column, parser, checked in self.index.files[path].parses:
+                if parser in EXECUTING_PARSERS:
+                    self._add('eval-model-output', 'error', path, line, column,
+                              f"Model output is passed to {parser}(); parse it as data instead of executing it.")
+                elif not checked:
+                    self._add('unvalidated-response-parse', 'warning', path, line, column,
+                              f"Model output is parsed with {parser}() without error handling or schema "
+                              f"validation; malformed output will raise. Catch the error and validate the "
+                              f"result (e.g. Pydantic, zod or structured outputs).")
+
+    def check_prompts(self) -> None:
+        """Flag system prompts that interpolate runtime values."""
+        for path in self.index.changed:
+            for line, column in self.index.files[path].interpolations:
+                self._add('system-prompt-interpolation', 'warning', path, line, column,
+                          "System prompt interpolates runtime values; keep user input in user messages, "
+                          "or delimit it clearly, to limit prompt injection.")
+
+    def run_checks(self) -> List[Dict[str, Any]]:
+        """Run the enabled AI checks."""
+        if self.enabled('model_versioning'):
+            self.check_model_versions()
+        if self.enabled('response_validation'):
+            self.check_response_parsing()
+        if self.enabled('prompt_engineering'):
+            self.check_prompts()
+        return self.issues
+
+def model_trie(config: Dict[str, Any]) -> ModelTrie:
+    """Build the model trie, with the extra deprecated IDs of `ai_agent.deprecated_models`."""
+    extra = (config.get('ai_agent') or {}).get('deprecated_models') or ()
+    return ModelTrie(MODEL_FAMILIES, tuple(DEPRECATED_MODELS) + tuple(extra))
+
+def check_ai(changed_files: ChangedFiles, config: Optional[Dict[str, Any]] = None,
+             repo_index: Optional[RepoIndex] = None, cache_dir: Optional[str] = None,
+             stats: Optional[Dict[str, Any]] = None,
+             cancel: Optional[threading.Event] = None) -> List[Dict[str, Any]]:
+    """
+    Main function to run AI agent checks.
+
+    Args:
+        changed_files: Index of the files changed by the PR
+        config: The bot configuration dictionary
+        repo_index: Optional index of the checkout; with it and a cache
+            the whole repository is indexed, the changed files only
+            without them
+        cache_dir: Optional cache directory keeping the base commit's index
+        stats: Optional run stats, receiving the index stats as `ai_index`
+        cancel: Optional event that stops indexing unchanged files
+
+    Returns:
+        List of issue dictionaries with keys tool, rule, type, message,
+        file, line and column
+    """
+    config = config or {}
+    trie = model_trie(config)
+    max_scan = (config.get('ai_agent') or {}).get('max_index_scan', DEFAULT_MAX_SCAN)
+    index = AIIndex.build(changed_files, repo_index, AIIndexStore(cache_dir) if cache_dir else None, trie,
+                          max_scan, cancel)
+    if index.stats.get('pending'):
+        print(f"AI index: {index.stats['pending']} unchanged files left for later runs")
+    if stats is not None:
+        stats['ai_index'] = dict(index.stats, models=len(index.model_references()),
+                                 prompts=sum(len(entry.prompts) for entry in index.files.values()))
+    return AIChecker(index, config, trie).run_checks()
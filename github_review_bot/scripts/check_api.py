@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+API checks for the GitHub Review Bot.
+"""
+
+import functools
+import os
+import threading
+from typing import Any, Dict, List, Optional
+from .api_routes import RULE_GROUPS, analyze_changed_files
+from .changed_files import ChangedFile, ChangedFiles
+from .findings import Finding
+from .openapi_spec import (
+    ParsedSpec, SpecCache, SpecDiff, base_blob_sha, breaking_changes, git_blob, is_spec_file, validate_units
+)
+from .repo_index import RepoIndex
+from .result_cache import blob_sha
+
+class APIChecker:
+    """
+    Checks the OpenAPI specs and route handlers a PR changed.
+
+    Each spec is parsed at the base and head revisions through a cache
+    keyed by blob SHA and diffed unit by unit (path items, operations,
+    components). Breaking changes are reported from the diff and only
+    added or changed units are validated. Route handlers in changed
+    Python files are checked for authentication, rate limiting and error
+    handling. The checks follow the `api_checks` flags:
+    openapi_validation, breaking_changes, authentication, rate_limiting
+    and error_handling (default: enabled).
+    """
+
+    def __init__(self, changed_files: ChangedFiles, config: Optional[Dict[str, Any]] = None,
+                 repo_index: Optional[RepoIndex] = None, cache: Optional[SpecCache] = None,
+                 max_workers: Optional[int] = None, cancel: Optional[threading.Event] = None):
+        if not isinstance(changed_files, ChangedFiles):
+            raise TypeError(f"changed_files must be a ChangedFiles, got {type(changed_files)}")
+        self.changed_files = changed_files
+        self.config = config or {}
+        self.repo_index = repo_index
+        self.cache = cache or SpecCache()
+        self.max_workers = max_workers
+        # Set when the review runs out of time; checked between files
+        self.cancel = cancel
+        self.spec_paths = set((self.config.get('api') or {}).get('spec_paths') or ())
+        self.issues: List[Dict[str, Any]] = []
+        self.stats = {'specs': 0, 'units': 0, 'validated': 0}
+        self.route_stats: Dict[str, int] = {}
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel is not None and self.cancel.is_set()
+
+    def enabled(self, key: str) -> bool:
+        """Whether an `api_checks` flag is on."""
+        return (self.config.get('api_checks') or {}).get(key, True) is not False
+
+    def is_spec(self, path: str) -> bool:
+        """Whether a path is an OpenAPI spec, by name or listed under `api.spec_paths`."""
+        return path in self.spec_paths or is_spec_file(path)
+
+    def _add(self, rule: str, severity: str, path: str, message: str) -> None:
+        self.issues.append(Finding('openapi', rule, severity, path, None, None, message).to_dict())
+
+    def _report(self, rule: str, severity: str, path: str, found: List[Any]) -> None:
+        for _, message in found:
+            self._add(rule, severity, path, message)
+
+    def load_head(self, changed_file: ChangedFile) -> ParsedSpec:
+        """Parse the checked-out revision of a spec."""
+        full_path = os.path.join(self.changed_files.repo_path, changed_file.path)
+        return self.cache.get(blob_sha(changed_file, self.changed_files.repo_path), changed_file.path,
+                              functools.partial(open, full_path, 'rb'))
+
+    def load_base(self, path: str) -> Optional[ParsedSpec]:
+        """Parse the base revision of a spec, or return None if it did not exist there."""
+        if not self.changed_files.base_sha:
+            return None
+        sha = base_blob_sha(self.changed_files.base_sha, path, self.changed_files.repo_path)
+        if sha is None:
+            return None
+        return self.cache.get(sha, path, functools.partial(git_blob, sha, self.changed_files.repo_path))
+
+    def check_spec(self, changed_file: ChangedFile, base: Optional[ParsedSpec] = None) -> None:
+        """
+        Diff and validate one changed spec.
+
+        Args:
+            changed_file: The changed spec
+            base: Optional parsed base revision; read from git when omitted
+        """
+        path = changed_file.path
+        if base is None:
+            base = self.load_base(path)
+        if base is not None and base.error:
+            base = None
+        if changed_file.status == 'removed':
+            if base is not None and self.enabled('breaking_changes'):
+                self._add('spec-removed', 'warning', path,
+                          f"OpenAPI spec {path} was removed with {len(base.hashes)} definitions")
+            return
+        head = self.load_head(changed_file)
+        self.stats['specs'] += 1
+        if head.error:
+            self._add('spec-parse-error', 'error', path, head.error)
+            return
+        diff = SpecDiff(base, head)
+        self.stats['units'] += len(head.hashes)
+        if base is not None and self.enabled('breaking_changes'):
+            self._report('breaking-change', 'error', path, breaking_changes(base, head, diff))
+        if self.enabled('openapi_validation'):
+            units = diff.added + diff.changed
+            self.stats['validated'] += len(units)
+            self._report('invalid-spec', 'error', path, validate_units(head, units))
+
+    def check_specs(self) -> None:
+        """Check every spec the PR changed, and require a spec when `api.require_openapi` is set."""
+        specs = [changed_file for changed_file in self.changed_files if self.is_spec(changed_file.path)]
+        for changed_file in specs:
+            if self.cancelled:
+                return
+            self.check_spec(changed_file)
+        if not specs and (self.config.get('api') or {}).get('require_openapi') and self.repo_index is not None:
+            if not any(self.is_spec(path) for path in self.repo_index.files()):
+                self._add('missing-spec', 'warning', 'openapi.yaml',
+                          "API repositories should document their endpoints in an OpenAPI spec "
+                          "(openapi.yaml, or list its path under api.spec_paths)")
+
+    def check_routes(self) -> None:
+        """Check the route handlers of changed Python files with the enabled rules."""
+        rules = frozenset(rule for key, group in RULE_GROUPS.items() if self.enabled(key) for rule in group)
+        if rules and not self.cancelled:
+            findings = analyze_changed_files(self.changed_files, rules, self.max_workers, self.route_stats,
+                                             cancel=self.cancel)
+            self.issues.extend(finding.to_dict() for finding in findings)
+
+    def run_checks(self) -> List[Dict[str, Any]]:
+        """Run the enabled API checks."""
+        self.check_specs()
+        self.check_routes()
+        return self.issues
+
+def check_api(changed_files: ChangedFiles, config: Optional[Dict[str, Any]] = None,
+              repo_index: Optional[RepoIndex] = None, cache_dir: Optional[str] = None,
+              stats: Optional[Dict[str, Any]] = None, max_workers: Optional[int] = None,
+              cancel: Optional[threading.Event] = None) -> List[Dict[str, Any]]:
+    """
+    Main function to run API checks.
+
+    Args:
+        changed_files: Index of the files changed by the PR
+        config: The bot configuration dictionary
+        repo_index: Optional index of the checkout, used to find a spec
+            when the PR changed none
+        cache_dir: Optional cache directory keeping parsed specs by blob SHA
+        stats: Optional run stats, receiving the spec stats as `openapi`
+            and the route stats as `api_routes`
+        max_workers: Optional cap on the processes parsing route files
+        cancel: Optional event that stops the checks between files
+
+    Returns:
+        List of issue dictionaries with keys tool, rule, type, message,
+        file, line and column
+    """
+    cache = SpecCache(cache_dir)
+    checker = APIChecker(changed_files, config, repo_index, cache, max_workers, cancel)
+    issues = checker.run_checks()
+    if stats is not None:
+        stats['openapi'] = dict(checker.stats, cache_hits=cache.hits, cache_misses=cache.misses)
+        stats['api_routes'] = checker.route_stats
+    return issues
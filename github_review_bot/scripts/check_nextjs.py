@@ -5,18 +5,33 @@ Next.js specific checks for the GitHub Review Bot.
 
 import os
 import json
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Set
 from pathlib import Path
+from .changed_files import ChangedFiles
+from .repo_index import RepoIndex
+from .manifests import ManifestCache
+from .app_router import find_app_dir, scan_app_router
+from .js_config import parse_config
+from .workspaces import NEXT_CONFIGS
+from .bundle_budget import BUILD_DIR, BundleBudget, first_load_sizes
 
 class NextJSChecker:
-    def __init__(self, repo_path: str):
+    def __init__(self, repo_path: str, changed_files: Optional[ChangedFiles] = None,
+                 repo_index: Optional[RepoIndex] = None, manifests: Optional[ManifestCache] = None,
+                 bundle_budget: Optional[BundleBudget] = None):
         self.repo_path = Path(repo_path)
+        self.changed_files = changed_files
+        # Existence checks are answered from one scan of the checkout
+        self.index = repo_index if repo_index is not None else RepoIndex.build(self.repo_path)
+        # package.json is parsed once per run and shared read-only
+        self.manifests = manifests if manifests is not None else ManifestCache(self.repo_path, self.index)
+        self.bundle_budget = bundle_budget
         self.issues: List[Dict] = []
 
     def check_next_config(self) -> None:
-        """Check next.config.js for common issues."""
-        config_path = self.repo_path / "next.config.js"
-        if not config_path.exists():
+        """Check the keys of next.config.js/.mjs/.ts for common issues."""
+        config_name = next((name for name in NEXT_CONFIGS if self.index.is_file(name)), None)
+        if config_name is None:
             self.issues.append({
                 "type": "warning",
                 "message": "No next.config.js found. Consider adding one for better configuration control.",
@@ -24,36 +39,37 @@ class NextJSChecker:
             })
             return
 
-        try:
-            with open(config_path, 'r') as f:
-                content = f.read()
-                
-            # Check for common issues
-            if "images.unoptimized" in content:
-                self.issues.append({
-                    "type": "warning",
-                    "message": "Images are set to unoptimized. Consider enabling image optimization.",
-                    "file": "next.config.js"
-                })
-                
-            if "swcMinify" not in content:
-                self.issues.append({
-                    "type": "info",
-                    "message": "Consider enabling swcMinify for faster builds.",
-                    "file": "next.config.js"
-                })
-
-        except Exception as e:
+        content = self.index.read_text(config_name)
+        if content is None:
             self.issues.append({
                 "type": "error",
-                "message": f"Error reading next.config.js: {str(e)}",
-                "file": "next.config.js"
+                "message": f"Error reading {config_name}.",
+                "file": config_name
+            })
+            return
+
+        # Keys set by code rather than literals cannot be judged statically
+        config = parse_config(content)
+        if config is None:
+            return
+        if config.get("images.unoptimized") is True:
+            self.issues.append({
+                "type": "warning",
+                "message": "Images are set to unoptimized. Consider enabling image optimization.",
+                "file": config_name
+            })
+
+        if config.get("swcMinify", False) is False:
+            self.issues.append({
+                "type": "info",
+                "message": "Consider enabling swcMinify for faster builds.",
+                "file": config_name
             })
 
     def check_app_directory(self) -> None:
-        """Check for app directory structure and conventions."""
-        app_dir = self.repo_path / "app"
-        if not app_dir.exists():
+        """Check the App Router files the PR touched for Next.js conventions."""
+        app_dir = find_app_dir(self.index)
+        if app_dir is None:
             self.issues.append({
                 "type": "warning",
                 "message": "No app directory found. Consider using the App Router for better performance and features.",
@@ -61,77 +77,90 @@ class NextJSChecker:
             })
             return
 
-        # Check for common app directory issues
-        if (app_dir / "layout.tsx").exists():
-            # Check for metadata
-            layout_content = (app_dir / "layout.tsx").read_text()
-            if "metadata" not in layout_content:
-                self.issues.append({
-                    "type": "info",
-                    "message": "Consider adding metadata to your root layout for better SEO.",
-                    "file": "app/layout.tsx"
-                })
+        self.issues.extend(scan_app_router(self.index, app_dir, self._touched_paths()))
+
+    def _touched_paths(self) -> Optional[Set[str]]:
+        """Paths changed by the PR relative to the project, or None to check everything."""
+        if self.changed_files is None:
+            return None
+        prefix = self.index.prefix + '/' if self.index.prefix else ''
+        return {f.path[len(prefix):] for f in self.changed_files if f.path.startswith(prefix)}
 
     def check_package_json(self) -> None:
         """Check package.json for Next.js specific dependencies and scripts."""
-        package_path = self.repo_path / "package.json"
-        if not package_path.exists():
+        manifest = self.manifests.get("package.json")
+        if not manifest.exists:
             self.issues.append({
                 "type": "error",
                 "message": "No package.json found.",
                 "file": "package.json"
             })
             return
+        if manifest.data is None:
+            self._report_parse_error("package.json")
+            return
+        package = manifest.data
 
-        try:
-            with open(package_path, 'r') as f:
-                package = json.load(f)
+        # Check Next.js version
+        next_version = package.get("dependencies", {}).get("next")
+        if not next_version:
+            self.issues.append({
+                "type": "error",
+                "message": "Next.js not found in dependencies.",
+                "file": "package.json"
+            })
+        elif next_version.startswith("12"):
+            self.issues.append({
+                "type": "warning",
+                "message": "Using Next.js 12. Consider upgrading to a newer version for better features and performance.",
+                "file": "package.json"
+            })
 
-            # Check Next.js version
-            next_version = package.get("dependencies", {}).get("next")
-            if not next_version:
+        # Check for recommended dependencies
+        recommended = ["@vercel/analytics", "next-themes"]
+        for dep in recommended:
+            if dep not in package.get("dependencies", {}):
                 self.issues.append({
-                    "type": "error",
-                    "message": "Next.js not found in dependencies.",
-                    "file": "package.json"
-                })
-            elif next_version.startswith("12"):
-                self.issues.append({
-                    "type": "warning",
-                    "message": "Using Next.js 12. Consider upgrading to a newer version for better features and performance.",
+                    "type": "info",
+                    "message": f"Consider adding {dep} for better functionality.",
                     "file": "package.json"
                 })
 
-            # Check for recommended dependencies
-            recommended = ["@vercel/analytics", "next-themes"]
-            for dep in recommended:
-                if dep not in package.get("dependencies", {}):
-                    self.issues.append({
-                        "type": "info",
-                        "message": f"Consider adding {dep} for better functionality.",
-                        "file": "package.json"
-                    })
-
-        except json.JSONDecodeError:
-            self.issues.append({
-                "type": "error",
-                "message": "Invalid package.json format.",
-                "file": "package.json"
-            })
+    def _report_parse_error(self, path: str) -> None:
+        """Report an invalid manifest unless another checker already did."""
+        issue = self.manifests.parse_error_issue(path)
+        if issue:
+            self.issues.append(issue)
+
+    def check_bundle_budget(self) -> None:
+        """Check the first-load JS of each built route against the bundle budget."""
+        if self.bundle_budget is None or not self.index.is_dir(BUILD_DIR):
+            return
+        sizes = first_load_sizes(str(self.repo_path / BUILD_DIR))
+        self.issues.extend(self.bundle_budget.check(sizes, self.index.prefix))
 
     def run_checks(self) -> List[Dict]:
         """Run all Next.js specific checks."""
         self.check_next_config()
         self.check_app_directory()
         self.check_package_json()
+        self.check_bundle_budget()
         return self.issues
 
-def check_nextjs(repo_path: str) -> List[Dict[str, Any]]:
+def check_nextjs(repo_path: str, changed_files: Optional[ChangedFiles] = None,
+                 repo_index: Optional[RepoIndex] = None,
+                 manifests: Optional[ManifestCache] = None,
+                 bundle_budget: Optional[BundleBudget] = None) -> List[Dict[str, Any]]:
     """
     Main function to run Next.js checks.
     
     Args:
         repo_path: Path to the repository root
+        changed_files: Optional index of the files changed by the PR
+        repo_index: Optional index of the checkout; scanned when not given
+        manifests: Optional manifest cache shared with other checkers
+        bundle_budget: Optional first-load JS budget, checked when the
+            project has a .next build
         
     Returns:
         List of dictionaries containing check results with keys:
@@ -140,7 +169,7 @@ def check_nextjs(repo_path: str) -> List[Dict[str, Any]]:
         - file: Optional[str] path to relevant file
         - line: Optional[int] line number
     """
-    checker = NextJSChecker(repo_path)
+    checker = NextJSChecker(repo_path, changed_files, repo_index, manifests, bundle_budget)
     return checker.run_checks()
 
 if __name__ == "__main__":
@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Script to declare analysis checks and run them as a dependency graph.
+"""
+
+import copy
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from .changed_files import ChangedFiles
+from .findings import Finding
+from .repo_index import RepoIndex
+from .workspaces import Workspace
+from .time_budget import CostModel, TimeBudget
+
+
+class CheckContext:
+    """
+    Inputs shared by every check of one run, plus the memoized results of
+    the checks that already ran.
+    """
+
+    def __init__(self, changed_files: ChangedFiles, config: Dict[str, Any],
+                 stats: Optional[Dict[str, Any]] = None, **resources: Any):
+        self.changed_files = changed_files
+        self.config = config
+        self.stats: Dict[str, Any] = stats if stats is not None else {}
+        # Shared helpers such as the tool executor, keyed by name
+        self.resources = resources
+        self._futures: Dict[str, 'Future[Any]'] = {}
+        self._cancelled = threading.Event()
+        self._cancel_callbacks: List[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the run was cut short."""
+        return self._cancelled.is_set()
+
+    @property
+    def cancel_event(self) -> threading.Event:
+        """Event set when the run is cut; in-process checks test it between files."""
+        return self._cancelled
+
+    def scoped(self) -> 'CheckContext':
+        """
+        Return a view of this context for one check, with its own stats.
+
+        The registry merges the stats of a check into the run's stats only
+        when it completes, so a cut check that is still winding down
+        cannot change them.
+        """
+        view = copy.copy(self)
+        view.stats = {}
+        return view
+
+    def on_cancel(self, callback: Callable[[], None]) -> None:
+        """Register a callback that stops in-flight work when the run is cut."""
+        self._cancel_callbacks.append(callback)
+
+    def cancel(self) -> None:
+        """Cut the run short, stopping in-flight work."""
+        self._cancelled.set()
+        for callback in self._cancel_callbacks:
+            callback()
+
+    def result(self, name: str) -> Any:
+        """
+        Return the result of a prerequisite, waiting for it if needed.
+
+        Raises:
+            KeyError: If the check is not part of the running plan
+        """
+        return self._futures[name].result()
+
+    def analysis(self, key: str, default: Any = None) -> Any:
+        """Read a setting of the `analysis` config section."""
+        return self.config.get('analysis', {}).get(key, default)
+
+
+class Check:
+    """
+    Declaration of one check.
+
+    A check is selected when the repository type is one of repo_types (any
+    type if empty), its config_key is enabled under `rules` or
+    `enabled_checks`, or its own section for dotted keys (default: enabled), the PR touched one of its
+    languages (any change if empty) and one of its marker files exists
+    (no requirement if empty), at the root or, with in_workspaces, in a
+    monorepo workspace. Checks with report set produce a
+    (passed, issues) analyzer result; others produce shared intermediate
+    values and run only as prerequisites. Prerequisites are pulled into
+    the plan by the checks that need them, whatever their own conditions.
+    """
+
+    def __init__(self, name: str, run: Callable[[CheckContext], Any],
+                 requires: Sequence[str] = (), repo_types: Sequence[str] = (),
+                 config_key: Optional[str] = None, languages: Sequence[str] = (),
+                 files: Sequence[str] = (), report: bool = True, description: str = '',
+                 value: float = 1.0, cost: Optional[float] = None, in_workspaces: bool = False):
+        self.name = name
+        self.run = run
+        self.requires = tuple(requires)
+        self.repo_types = tuple(repo_types)
+        self.config_key = config_key
+        self.languages = tuple(languages)
+        self.files = tuple(files)
+        self.in_workspaces = in_workspaces
+        self.report = report
+        self.description = description
+        # Relative worth of the findings, and the expected seconds before
+        # the cost has been learned; together they order the run
+        self.value = value
+        self.cost = cost
+
+    def skip_reason(self, config: Dict[str, Any], changed_files: ChangedFiles,
+                    repo_index: Optional[RepoIndex] = None,
+                    workspaces: Sequence[Workspace] = ()) -> Optional[str]:
+        """
+        Explain why the check does not apply, or return None if it does.
+
+        Args:
+            config: The bot configuration dictionary
+            changed_files: Index of the files changed by the PR
+            repo_index: Index of the checkout answering the marker file
+                lookups; the filesystem is asked when not given
+            workspaces: Workspaces of a monorepo checkout
+
+        Returns:
+            Human-readable reason, or None when the check is selected
+        """
+        repo_type = repo_type_of(config)
+        if self.repo_types and repo_type not in self.repo_types:
+            return f"repository type is {repo_type}"
+        if self.config_key and not check_enabled(config, self.config_key):
+            return f"{self.config_key} is disabled"
+        if self.languages and not changed_files.has_language(*self.languages):
+            return f"no {'/'.join(self.languages)} files changed"
+
+        def exists(name: str) -> bool:
+            if repo_index is not None:
+                return repo_index.exists(name)
+            return os.path.exists(os.path.join(changed_files.repo_path, name))
+
+        roots = [''] + ([f"{w.path}/" for w in workspaces] if self.in_workspaces else [])
+        if self.files and not any(exists(root + f) for root in roots for f in self.files):
+            return f"no {' or '.join(self.files)} found"
+        return None
+
+
+class PlanEntry:
+    """A check in a plan, with whether it runs and why."""
+
+    def __init__(self, check: Check, selected: bool, reason: str):
+        self.check = check
+        self.selected = selected
+        self.reason = reason
+
+    @property
+    def name(self) -> str:
+        return self.check.name
+
+
+def repo_type_of(config: Dict[str, Any]) -> str:
+    """Return the repository type, accepting both `type` and `repo_type`."""
+    return config.get('type') or config.get('repo_type') or 'default'
+
+
+def check_enabled(config: Dict[str, Any], key: str) -> bool:
+    """
+    Whether a check key is enabled under `rules` or `enabled_checks`, or
+    for a dotted key such as `data_privacy.pii_scan`, under its own section.
+    """
+    if '.' in key:
+        section, name = key.split('.', 1)
+        value = (config.get(section) or {}).get(name)
+        return True if value is None else bool(value)
+    for section in ('rules', 'enabled_checks'):
+        value = config.get(section, {}).get(key)
+        if value is not None:
+            return bool(value)
+    return True
+
+
+class CheckRegistry:
+    """
+    Registered checks, run as a dependency graph.
+
+    Every selected check runs exactly once per run, as soon as its
+    prerequisites are done and at the same time as the checks that do not
+    depend on it; dependents read the memoized result through
+    CheckContext.result.
+    """
+
+    def __init__(self, checks: Sequence[Check] = ()):
+        self._checks: Dict[str, Check] = {}
+        for check in checks:
+            self.register(check)
+
+    def register(self, check: Check) -> Check:
+        """
+        Add a check after the ones it requires.
+
+        Raises:
+            TypeError: If check is not a Check
+            ValueError: If the name is taken or a prerequisite is unknown,
+                which also rules out cycles
+        """
+        if not isinstance(check, Check):
+            raise TypeError(f"check must be a Check, got {type(check)}")
+        if check.name in self._checks:
+            raise ValueError(f"check {check.name!r} is already registered")
+        missing = [name for name in check.requires if name not in self._checks]
+        if missing:
+            raise ValueError(f"check {check.name!r} requires unknown checks {missing}")
+        self._checks[check.name] = check
+        return check
+
+    def __iter__(self) -> Iterator[Check]:
+        return iter(self._checks.values())
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._checks
+
+    def plan(self, config: Dict[str, Any], changed_files: ChangedFiles,
+             repo_index: Optional[RepoIndex] = None,
+             workspaces: Sequence[Workspace] = ()) -> List[PlanEntry]:
+        """
+        Decide which checks run, in dependency order.
+
+        Args:
+            config: The bot configuration dictionary
+            changed_files: Index of the files changed by the PR
+            repo_index: Index of the checkout, if one was built
+            workspaces: Workspaces of a monorepo checkout
+
+        Returns:
+            One entry per registered check; prerequisites come before
+            their dependents
+        """
+        reasons = {check.name: check.skip_reason(config, changed_files, repo_index, workspaces)
+                   for check in self}
+        # Checks that only feed others run when a selected check needs them
+        for check in self:
+            if not check.report and reasons[check.name] is None:
+                reasons[check.name] = 'no selected check requires it'
+        selected = {name for name, reason in reasons.items() if reason is None}
+        needed_by: Dict[str, List[str]] = {}
+        # Registration order is a topological order, so walking it backwards
+        # reaches every dependent before its prerequisites
+        for check in reversed(list(self)):
+            if check.name in selected:
+                for name in check.requires:
+                    selected.add(name)
+                    needed_by.setdefault(name, []).append(check.name)
+
+        plan = []
+        for check in self:
+            if check.name not in selected:
+                plan.append(PlanEntry(check, False, reasons[check.name] or ''))
+            elif reasons[check.name] is None:
+                plan.append(PlanEntry(check, True, 'applies'))
+            else:
+                plan.append(PlanEntry(check, True, f"required by {', '.join(needed_by[check.name])}"))
+        return plan
+
+    def schedule(self, checks: Sequence[Check], costs: CostModel, budget: TimeBudget,
+                 parallelism: int = 1) -> Tuple[List[Check], List[Tuple[str, str]]]:
+        """
+        Order checks by value per second and drop those the budget cannot fit.
+
+        A reporting check is admitted together with its prerequisites when
+        its own chain fits in the remaining time and the admitted work fits
+        in the remaining time of `parallelism` concurrent workers.
+
+        Args:
+            checks: Selected checks, prerequisites before dependents
+            costs: Learned cost estimates
+            budget: Time budget of the review
+            parallelism: Number of checks that can make progress at once
+
+        Returns:
+            Tuple of the checks to start, in start order with prerequisites
+            first, and (name, reason) pairs of the reporting checks dropped
+        """
+        by_name = {check.name: check for check in checks}
+
+        def chain(check: Check) -> List[Check]:
+            """The check and its transitive prerequisites, prerequisites first."""
+            seen: Dict[str, Check] = {}
+
+            def visit(current: Check) -> None:
+                for name in current.requires:
+                    if name not in seen and name in by_name:
+                        visit(by_name[name])
+                seen[current.name] = current
+            visit(check)
+            return list(seen.values())
+
+        def estimate(check: Check) -> float:
+            return costs.estimate(check.name, check.cost)
+
+        # Sorting is stable, so equally valuable checks keep plan order
+        reporting = sorted((check for check in checks if check.report),
+                           key=lambda check: -check.value / max(sum(map(estimate, chain(check))), 1e-3))
+        remaining = budget.remaining()
+        admitted: Dict[str, Check] = {}
+        skipped: List[Tuple[str, str]] = []
+        committed = 0.0
+        for check in reporting:
+            pending = [c for c in chain(check) if c.name not in admitted]
+            needed = sum(map(estimate, pending))
+            if remaining is not None and (sum(map(estimate, chain(check))) > remaining or
+                                          committed + needed > remaining * parallelism):
+                skipped.append((check.name, f"estimated {needed:.0f}s does not fit the remaining "
+                                            f"{remaining:.0f}s of the time budget"))
+                continue
+            for c in pending:
+                admitted[c.name] = c
+            committed += needed
+
+        order = {c.name: c for check in reporting if check.name in admitted for c in chain(check)}
+        return list(order.values()), skipped
+
+    def run(self, context: CheckContext, plan: Optional[List[PlanEntry]] = None,
+            budget: Optional[TimeBudget] = None, costs: Optional[CostModel] = None,
+            parallelism: int = 1) -> Iterator[Tuple[str, Any]]:
+        """
+        Run the selected checks of a plan within a time budget.
+
+        When the budget runs out, checks still running are cut: the
+        context is cancelled, and their results and stats are dropped.
+        In-process checks stop at their next file; cut checks are not
+        waited for. Dropped and cut checks are listed in
+        `stats['skipped_checks']`.
+
+        Args:
+            context: Shared inputs of the run
+            plan: Plan to run; built from the context when not given
+            budget: Time budget of the review, unlimited when not given
+            costs: Cost estimates, updated with the checks that complete
+            parallelism: Number of checks that can make progress at once
+
+        Yields:
+            (name, (passed, issues)) for every reporting check that
+            completed, in plan order, each as soon as it and the ones
+            before it are done; a check that raised, or whose
+            prerequisite did, fails with a single tool-error issue
+        """
+        if plan is None:
+            plan = self.plan(context.config, context.changed_files, context.resources.get('repo_index'),
+                             context.resources.get('workspaces', ()))
+        budget = budget or TimeBudget()
+        costs = costs or CostModel()
+        checks = [entry.check for entry in plan if entry.selected]
+        order, skipped = self.schedule(checks, costs, budget, parallelism)
+        context.stats['checks'] = [check.name for check in order]
+        context.stats['skipped_checks'] = []
+        if not order:
+            context.stats['skipped_checks'] = [{'check': n, 'reason': r} for n, r in skipped]
+            return
+
+        def run_check(check: Check) -> Any:
+            for name in check.requires:
+                context.result(name)
+            start = time.monotonic()
+            scoped = context.scoped()
+            result = check.run(scoped)
+            # A check cut short says nothing about how long it takes, and
+            # its partial stats describe work that was thrown away
+            if not context.cancelled:
+                costs.record(check.name, time.monotonic() - start)
+                with stats_lock:
+                    context.stats.update(scoped.stats)
+            return result
+
+        stats_lock = threading.Lock()
+        # One thread per check: a check waiting on its prerequisites never
+        # starves them, since those were submitted earlier
+        pool = ThreadPoolExecutor(max_workers=len(order))
+        started = {check.name for check in order}
+        cut: Optional[List[str]] = None
+        try:
+            for check in order:
+                context._futures[check.name] = pool.submit(run_check, check)
+            for check in checks:
+                if not check.report or check.name not in started:
+                    continue
+                future = context._futures[check.name]
+                if cut is None:
+                    try:
+                        future.result(timeout=budget.remaining())
+                    except FutureTimeout:
+                        cut = [name for name in started if not context._futures[name].done()]
+                        context.cancel()
+                    except Exception:
+                        # Reported below, as the check's result
+                        pass
+                if cut is not None and check.name in cut:
+                    skipped.append((check.name, 'cut off when the time budget ran out'))
+                    continue
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = _crashed(check.name, e)
+                yield check.name, result
+        finally:
+            # Cut checks wind down on their own once their tools are killed
+            # and their next file sees the cancel
+            pool.shutdown(wait=cut is None)
+            costs.save()
+            context.stats['skipped_checks'] = [{'check': n, 'reason': r} for n, r in skipped]
+
+
+def _crashed(name: str, error: Exception) -> Tuple[bool, List[Dict[str, Any]]]:
+    """Report a check that raised, so the other checks still make it into the review."""
+    print(f"Check {name} failed: {type(error).__name__}: {error}")
+    finding = Finding(name, 'tool-error', 'error', '', None, None,
+                      f"{name} check failed: {type(error).__name__}: {error}")
+    return False, [finding.to_dict()]
+
+
+def format_plan(plan: List[PlanEntry], costs: Optional[CostModel] = None) -> str:
+    """
+    Render a plan for a dry run.
+
+    Args:
+        plan: Plan built by CheckRegistry.plan
+        costs: Cost estimates to show for the checks that would run
+
+    Returns:
+        One line per check: whether it runs, its prerequisites and why
+    """
+    lines = []
+    for entry in plan:
+        marker = 'run ' if entry.selected else 'skip'
+        requires = f" (after {', '.join(entry.check.requires)})" if entry.check.requires else ''
+        estimate = ''
+        if costs and entry.selected:
+            estimate = f" [~{costs.estimate(entry.name, entry.check.cost):.0f}s]"
+        lines.append(f"{marker} {entry.name}{requires}: {entry.reason}{estimate}")
+    return '\n'.join(lines)
@@ -7,46 +7,48 @@ import os
 import json
 from typing import Dict, List, Optional, Any
 from pathlib import Path
+from .changed_files import ChangedFiles
+from .repo_index import RepoIndex
+from .manifests import ManifestCache
 
 class VercelChecker:
-    def __init__(self, repo_path: str):
+    def __init__(self, repo_path: str, changed_files: Optional[ChangedFiles] = None,
+                 repo_index: Optional[RepoIndex] = None, manifests: Optional[ManifestCache] = None):
         self.repo_path = Path(repo_path)
+        self.changed_files = changed_files
+        # Existence checks are answered from one scan of the checkout
+        self.index = repo_index if repo_index is not None else RepoIndex.build(self.repo_path)
+        # Manifests are parsed once per run and shared read-only
+        self.manifests = manifests if manifests is not None else ManifestCache(self.repo_path, self.index)
         self.issues: List[Dict] = []
 
     def check_vercel_json(self) -> None:
         """Check vercel.json for common issues."""
-        config_path = self.repo_path / "vercel.json"
-        if not config_path.exists():
+        manifest = self.manifests.get("vercel.json")
+        if not manifest.exists:
             self.issues.append({
                 "type": "info",
                 "message": "No vercel.json found. Consider adding one for better deployment configuration.",
                 "file": "vercel.json"
             })
             return
+        if manifest.data is None:
+            self._report_parse_error("vercel.json")
+            return
+        config = manifest.data
 
-        try:
-            with open(config_path, 'r') as f:
-                config = json.load(f)
-
-            # Check for common issues
-            if "rewrites" not in config:
-                self.issues.append({
-                    "type": "info",
-                    "message": "Consider adding rewrites configuration for better routing control.",
-                    "file": "vercel.json"
-                })
-
-            if "headers" not in config:
-                self.issues.append({
-                    "type": "info",
-                    "message": "Consider adding headers configuration for better security and performance.",
-                    "file": "vercel.json"
-                })
+        # Check for common issues
+        if "rewrites" not in config:
+            self.issues.append({
+                "type": "info",
+                "message": "Consider adding rewrites configuration for better routing control.",
+                "file": "vercel.json"
+            })
 
-        except json.JSONDecodeError:
+        if "headers" not in config:
             self.issues.append({
-                "type": "error",
-                "message": "Invalid vercel.json format.",
+                "type": "info",
+                "message": "Consider adding headers configuration for better security and performance.",
                 "file": "vercel.json"
             })
 
@@ -59,8 +61,7 @@ class VercelChecker:
         ]
 
         for env_file in env_files:
-            env_path = self.repo_path / env_file
-            if env_path.exists():
+            if self.index.exists(env_file):
                 self.issues.append({
                     "type": "warning",
                     "message": f"{env_file} found in repository. Consider using Vercel's environment variables instead.",
@@ -69,48 +70,41 @@ class VercelChecker:
 
     def check_build_settings(self) -> None:
         """Check package.json for Vercel build settings."""
-        package_path = self.repo_path / "package.json"
-        if not package_path.exists():
+        manifest = self.manifests.get("package.json")
+        if not manifest.exists:
             return
+        if manifest.data is None:
+            self._report_parse_error("package.json")
+            return
+        package = manifest.data
 
-        try:
-            with open(package_path, 'r') as f:
-                package = json.load(f)
-
-            # Check build script
-            build_script = package.get("scripts", {}).get("build")
-            if not build_script:
-                self.issues.append({
-                    "type": "error",
-                    "message": "No build script found in package.json.",
-                    "file": "package.json"
-                })
-            elif "next build" not in build_script:
-                self.issues.append({
-                    "type": "warning",
-                    "message": "Build script should include 'next build' for Vercel deployment.",
-                    "file": "package.json"
-                })
-
-            # Check for Vercel CLI
-            if "@vercel/cli" not in package.get("devDependencies", {}):
-                self.issues.append({
-                    "type": "info",
-                    "message": "Consider adding @vercel/cli for local development and testing.",
-                    "file": "package.json"
-                })
-
-        except json.JSONDecodeError:
+        # Check build script
+        build_script = package.get("scripts", {}).get("build")
+        if not build_script:
             self.issues.append({
                 "type": "error",
-                "message": "Invalid package.json format.",
+                "message": "No build script found in package.json.",
+                "file": "package.json"
+            })
+        elif "next build" not in build_script:
+            self.issues.append({
+                "type": "warning",
+                "message": "Build script should include 'next build' for Vercel deployment.",
+                "file": "package.json"
+            })
+
+        # Check for Vercel CLI
+        if "@vercel/cli" not in package.get("devDependencies", {}):
+            self.issues.append({
+                "type": "info",
+                "message": "Consider adding @vercel/cli for local development and testing.",
                 "file": "package.json"
             })
 
     def check_deployment_files(self) -> None:
         """Check for deployment-specific files."""
         # Check for .vercelignore
-        if not (self.repo_path / ".vercelignore").exists():
+        if not self.index.exists(".vercelignore"):
             self.issues.append({
                 "type": "info",
                 "message": "Consider adding .vercelignore to exclude unnecessary files from deployment.",
@@ -118,20 +112,21 @@ class VercelChecker:
             })
 
         # Check for Vercel Analytics
-        if not (self.repo_path / "package.json").exists():
+        package = self.manifests.get("package.json").data
+        if package is None:
             return
+        if "@vercel/analytics" not in package.get("dependencies", {}):
+            self.issues.append({
+                "type": "info",
+                "message": "Consider adding @vercel/analytics for better deployment insights.",
+                "file": "package.json"
+            })
 
-        try:
-            with open(self.repo_path / "package.json", 'r') as f:
-                package = json.load(f)
-                if "@vercel/analytics" not in package.get("dependencies", {}):
-                    self.issues.append({
-                        "type": "info",
-                        "message": "Consider adding @vercel/analytics for better deployment insights.",
-                        "file": "package.json"
-                    })
-        except:
-            pass
+    def _report_parse_error(self, path: str) -> None:
+        """Report an invalid manifest unless another checker already did."""
+        issue = self.manifests.parse_error_issue(path)
+        if issue:
+            self.issues.append(issue)
 
     def run_checks(self) -> List[Dict]:
         """Run all Vercel specific checks."""
@@ -141,12 +136,17 @@ class VercelChecker:
         self.check_deployment_files()
         return self.issues
 
-def check_vercel(repo_path: str) -> List[Dict[str, Any]]:
+def check_vercel(repo_path: str, changed_files: Optional[ChangedFiles] = None,
+                 repo_index: Optional[RepoIndex] = None,
+                 manifests: Optional[ManifestCache] = None) -> List[Dict[str, Any]]:
     """
     Main function to run Vercel deployment checks.
     
     Args:
         repo_path: Path to the repository root
+        changed_files: Optional index of the files changed by the PR
+        repo_index: Optional index of the checkout; scanned when not given
+        manifests: Optional manifest cache shared with other checkers
         
     Returns:
         List of dictionaries containing check results with keys:
@@ -155,7 +155,7 @@ def check_vercel(repo_path: str) -> List[Dict[str, Any]]:
         - file: Optional[str] path to relevant file
         - line: Optional[int] line number
     """
-    checker = VercelChecker(repo_path)
+    checker = VercelChecker(repo_path, changed_files, repo_index, manifests)
     return checker.run_checks()
 
 if __name__ == "__main__":
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Script to read coverage.xml or lcov.info reports and measure the coverage of the lines a pull request added.
+"""
+
+import os
+import xml.etree.ElementTree as ElementTree
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from .changed_files import ChangedFiles
+from .diff_index import ChangedLineIndex, LineIntervals, normalize_path
+from .findings import Finding
+
+# Reports looked for when `rules.coverage_report` is not set, in order
+COVERAGE_REPORTS = ('coverage.xml', 'coverage/cobertura-coverage.xml', 'lcov.info', 'coverage/lcov.info')
+
+DEFAULT_MIN_COVERAGE = 80
+
+# Uncovered line ranges listed in one finding
+MAX_LISTED_RANGES = 8
+
+# path -> {line: hits} for the executable lines of the files kept
+LineHits = Dict[str, Dict[int, int]]
+
+
+class PathMatcher:
+    """Maps the file paths a report uses to the repository-relative paths of interest."""
+
+    def __init__(self, paths: Iterable[str], repo_path: str = '.'):
+        self.paths = {normalize_path(path) for path in paths}
+        self.root = os.path.realpath(repo_path)
+        self.sources: List[str] = ['']
+
+    def add_source(self, source: str) -> None:
+        """Register a Cobertura `<source>` directory that file names are relative to."""
+        source = source.strip()
+        if os.path.isabs(source):
+            source = os.path.relpath(os.path.realpath(source), self.root)
+            if source.startswith('..'):
+                return
+        source = '' if source == '.' else normalize_path(source)
+        if source not in self.sources:
+            self.sources.append(source)
+
+    def match(self, filename: str) -> Optional[str]:
+        """Return the path of interest a report file name refers to, or None."""
+        if os.path.isabs(filename):
+            filename = os.path.relpath(os.path.realpath(filename), self.root)
+        filename = normalize_path(filename.replace('\\', '/'))
+        for source in self.sources:
+            path = f"{source}/{filename}" if source else filename
+            if path in self.paths:
+                return path
+        return None
+
+
+def read_cobertura(report: str, matcher: PathMatcher) -> LineHits:
+    """
+    Stream a Cobertura coverage.xml, keeping only the files the matcher knows.
+
+    Elements are dropped as soon as they end, so memory stays bounded by
+    the kept files rather than by the report.
+
+    Raises:
+        ValueError: If the report is not well-formed XML
+    """
+    hits: LineHits = {}
+    stack: List[Any] = []
+    current: Optional[Dict[int, int]] = None
+    in_methods = 0
+    try:
+        for event, element in ElementTree.iterparse(report, events=('start', 'end')):
+            tag = element.tag
+            if event == 'start':
+                stack.append(element)
+                if tag == 'class':
+                    path = matcher.match(element.get('filename', ''))
+                    # A file split into several classes adds its lines to one entry
+                    current = hits.setdefault(path, {}) if path is not None else None
+                elif tag == 'methods':
+                    in_methods += 1
+                continue
+            stack.pop()
+            if tag == 'source':
+                matcher.add_source(element.text or '')
+            elif tag == 'line' and current is not None and not in_methods:
+                number = element.get('number')
+                if number is not None:
+                    line = int(number)
+                    current[line] = max(current.get(line, 0), int(element.get('hits', '0')))
+            elif tag == 'methods':
+                in_methods -= 1
+            elif tag == 'class':
+                current = None
+            element.clear()
+            if stack:
+                # Drop the finished element from its parent so the tree does not grow
+                stack[-1].remove(element)
+    except ElementTree.ParseError as e:
+        raise ValueError(f"Could not parse {report}: {e}") from e
+    return hits
+
+
+def read_lcov(report: str, matcher: PathMatcher) -> LineHits:
+    """Stream an lcov tracefile line by line, keeping only the files the matcher knows."""
+    hits: LineHits = {}
+    current: Optional[Dict[int, int]] = None
+    with open(report, encoding='utf-8', errors='replace') as f:
+        for text in f:
+            if text.startswith('SF:'):
+                path = matcher.match(text[3:].strip())
+                current = hits.setdefault(path, {}) if path is not None else None
+            elif text.startswith('DA:') and current is not None:
+                fields = text[3:].split(',')
+                try:
+                    line, count = int(fields[0]), int(float(fields[1]))
+                except (IndexError, ValueError):
+                    continue
+                current[line] = max(current.get(line, 0), count)
+            elif text.startswith('end_of_record'):
+                current = None
+    return hits
+
+
+def find_report(repo_path: str = '.', configured: Optional[str] = None) -> Optional[str]:
+    """Return the configured report, or the first of COVERAGE_REPORTS in the checkout."""
+    candidates = (configured,) if configured else COVERAGE_REPORTS
+    for candidate in candidates:
+        path = os.path.join(repo_path, candidate)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def read_report(report: str, paths: Iterable[str], repo_path: str = '.') -> LineHits:
+    """
+    Read the line hits of the given files from a Cobertura or lcov report.
+
+    Args:
+        report: Path to coverage.xml or an lcov tracefile
+        paths: Repository-relative paths to keep
+        repo_path: Root the report's paths are resolved against
+
+    Returns:
+        Dictionary mapping each kept path found in the report to {line: hits}
+    """
+    matcher = PathMatcher(paths, repo_path)
+    if report.endswith('.xml'):
+        return read_cobertura(report, matcher)
+    return read_lcov(report, matcher)
+
+
+def _ranges(lines: Sequence[int]) -> str:
+    # 3, 4, 5, 9 -> "3-5, 9"
+    ranges: List[Tuple[int, int]] = []
+    for line in lines:
+        if ranges and line == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], line)
+        else:
+            ranges.append((line, line))
+    text = ', '.join(f"{start}-{end}" if end > start else str(start) for start, end in ranges[:MAX_LISTED_RANGES])
+    return text + (f" and {len(ranges) - MAX_LISTED_RANGES} more" if len(ranges) > MAX_LISTED_RANGES else '')
+
+
+class PatchCoverage:
+    """Coverage of the executable lines a pull request added, per file and overall."""
+
+    def __init__(self, hits: LineHits, changed_lines: Dict[str, LineIntervals]):
+        self.files: Dict[str, Tuple[int, List[int]]] = {}
+        for path, lines in hits.items():
+            intervals = changed_lines.get(path)
+            if intervals is None:
+                continue
+            added = [line for line in lines if line in intervals]
+            if added:
+                self.files[path] = (len(added), sorted(line for line in added if lines[line] == 0))
+
+    @property
+    def lines(self) -> int:
+        """Executable added lines."""
+        return sum(lines for lines, _ in self.files.values())
+
+    @property
+    def covered(self) -> int:
+        """Executable added lines that ran at least once."""
+        return sum(lines - len(missed) for lines, missed in self.files.values())
+
+    @property
+    def percent(self) -> Optional[float]:
+        """Covered share of the executable added lines, or None when there are none."""
+        return 100.0 * self.covered / self.lines if self.lines else None
+
+
+def check_coverage(changed_files: ChangedFiles, config: Optional[Dict[str, Any]] = None,
+                   stats: Optional[Dict[str, Any]] = None) -> List[Finding]:
+    """
+    Compare the patch coverage of a pull request with `rules.min_test_coverage`.
+
+    Reads `rules.coverage_report`, or the first of COVERAGE_REPORTS, as
+    produced earlier in the workflow.
+
+    Args:
+        changed_files: Index of the files changed by the PR, with patches
+        config: Optional bot configuration
+        stats: Optional run stats, receiving the coverage stats as `coverage`
+
+    Returns:
+        An error when patch coverage is below the minimum, and the
+        uncovered added lines of each file; nothing without a report
+    """
+    if not isinstance(changed_files, ChangedFiles):
+        raise TypeError(f"changed_files must be a ChangedFiles, got {type(changed_files)}")
+    rules = (config or {}).get('rules') or {}
+    report = find_report(changed_files.repo_path, rules.get('coverage_report'))
+    if report is None:
+        print("No coverage report found, skipping patch coverage")
+        return []
+    index = ChangedLineIndex.from_changed_files(changed_files)
+    if not any(changed_file.patch is not None for changed_file in changed_files) and changed_files.base_sha:
+        # Indexes built from a local git diff carry no patches
+        index = ChangedLineIndex.from_git(changed_files.base_sha, changed_files.repo_path)
+    paths = [changed_file.path for changed_file in changed_files if index.covers(changed_file.path)]
+    try:
+        hits = read_report(report, paths, changed_files.repo_path)
+    except (OSError, ValueError) as e:
+        return [Finding('coverage', 'coverage-report', 'warning', os.path.relpath(report, changed_files.repo_path),
+                        None, None, str(e))]
+    coverage = PatchCoverage(hits, {path: index.get(path) for path in paths})
+    minimum = rules.get('min_test_coverage', DEFAULT_MIN_COVERAGE)
+    if stats is not None:
+        stats['coverage'] = {'report': report, 'files': len(coverage.files), 'lines': coverage.lines,
+                             'covered': coverage.covered, 'percent': coverage.percent}
+
+    findings = []
+    for path, (_, missed) in sorted(coverage.files.items()):
+        if missed:
+            findings.append(Finding('coverage', 'uncovered-lines', 'info', path, missed[0], None,
+                                    f"Added lines {_ranges(missed)} are not covered by tests."))
+    percent = coverage.percent
+    if percent is not None and minimum is not None and percent < minimum:
+        worst = max(coverage.files, key=lambda path: len(coverage.files[path][1]))
+        findings.insert(0, Finding('coverage', 'patch-coverage', 'error', worst, None, None,
+                                   f"Patch coverage is {percent:.1f}% ({coverage.covered} of {coverage.lines} "
+                                   f"added lines), below the minimum of {minimum}%; add tests for the "
+                                   f"uncovered lines."))
+    return findings
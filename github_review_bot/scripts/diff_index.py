@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Script to index the line ranges a pull request changed in each file.
+"""
+
+import os
+import re
+import subprocess
+from bisect import bisect_right
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from .changed_files import ChangedFiles
+
+# Hunk header of a unified diff: @@ -old_start,old_len +new_start,new_len @@
+HUNK_HEADER = re.compile(r'^@@ -\d+(?:,\d+)? \+(\d+)(?:,\d+)? @@')
+
+
+class LineIntervals:
+    """Sorted, disjoint, inclusive line ranges with O(log n) membership."""
+
+    __slots__ = ('starts', 'ends')
+
+    def __init__(self, ranges: Iterable[Tuple[int, int]] = ()):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        for start, end in sorted(ranges):
+            # Merge overlapping and adjacent ranges
+            if self.ends and start <= self.ends[-1] + 1:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def __contains__(self, line: object) -> bool:
+        if not isinstance(line, int):
+            return False
+        i = bisect_right(self.starts, line) - 1
+        return i >= 0 and line <= self.ends[i]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self):
+        return iter(zip(self.starts, self.ends))
+
+    def line_count(self) -> int:
+        """Number of lines covered by the ranges."""
+        return sum(end - start + 1 for start, end in self)
+
+
+def parse_patch(patch: str) -> LineIntervals:
+    """
+    Parse the added lines of a single file's patch.
+
+    Args:
+        patch: Hunks of a unified diff, e.g. the `patch` field of a PR file
+
+    Returns:
+        LineIntervals of line numbers in the new revision that were added or modified
+    """
+    ranges: List[Tuple[int, int]] = []
+    line = 0
+    run_start: Optional[int] = None
+    for text in patch.splitlines():
+        header = HUNK_HEADER.match(text)
+        if header:
+            if run_start is not None:
+                ranges.append((run_start, line - 1))
+                run_start = None
+            line = int(header.group(1))
+            continue
+        if text.startswith('+'):
+            if run_start is None:
+                run_start = line
+            line += 1
+            continue
+        if run_start is not None:
+            ranges.append((run_start, line - 1))
+            run_start = None
+        if text.startswith(' '):
+            line += 1
+        # '-' lines and '\ No newline at end of file' do not advance the new file
+    if run_start is not None:
+        ranges.append((run_start, line - 1))
+    return LineIntervals(ranges)
+
+
+def iter_lines(text: str) -> Iterator[str]:
+    """Yield the lines of a text one at a time, without splitting it up front."""
+    start = 0
+    length = len(text)
+    while start < length:
+        end = text.find('\n', start)
+        if end < 0:
+            end = length
+        yield text[start:end].rstrip('\r')
+        start = end + 1
+
+
+def iter_added_lines(patch: str) -> Iterator[Tuple[int, str]]:
+    """
+    Stream the added lines of a single file's patch.
+
+    Runs in one pass and constant extra memory, for patches of any size.
+
+    Args:
+        patch: Hunks of a unified diff, e.g. the `patch` field of a PR file
+
+    Yields:
+        (line number in the new revision, text without the leading `+`)
+    """
+    line = 0
+    for text in iter_lines(patch):
+        if text.startswith('@@'):
+            header = HUNK_HEADER.match(text)
+            if header:
+                line = int(header.group(1))
+            continue
+        if text.startswith('+'):
+            yield line, text[1:]
+            line += 1
+        elif text.startswith(' '):
+            line += 1
+
+
+def parse_unified_diff(diff: str) -> Dict[str, LineIntervals]:
+    """
+    Parse a multi-file unified diff, as produced by `git diff`.
+
+    Args:
+        diff: Unified diff text
+
+    Returns:
+        Dictionary mapping each new-revision path to its added line ranges
+    """
+    patches: Dict[str, List[str]] = {}
+    current: Optional[List[str]] = None
+    for text in diff.splitlines():
+        if text.startswith('diff --git '):
+            current = None
+        elif text.startswith('+++ ') and current is None:
+            path = text[4:].strip()
+            if path == '/dev/null':
+                continue
+            current = patches.setdefault(path[2:] if path.startswith('b/') else path, [])
+        elif current is not None:
+            current.append(text)
+    return {path: parse_patch('\n'.join(lines)) for path, lines in patches.items()}
+
+
+class ChangedLineIndex:
+    """Per-file interval index of the lines changed by a pull request."""
+
+    def __init__(self, files: Dict[str, LineIntervals]):
+        self._files = files
+
+    @classmethod
+    def from_changed_files(cls, changed_files: ChangedFiles) -> 'ChangedLineIndex':
+        """
+        Build the index from the patches carried by the changed-file index.
+
+        Files without a patch (binary files, or diffs too large for the API)
+        are left out, so findings in them cannot be filtered.
+
+        Args:
+            changed_files: Index of the files changed by the PR
+
+        Returns:
+            ChangedLineIndex
+        """
+        if not isinstance(changed_files, ChangedFiles):
+            raise TypeError(f"changed_files must be a ChangedFiles index, got {type(changed_files)}")
+        return cls({
+            f.path: parse_patch(f.patch) for f in changed_files if f.patch is not None
+        })
+
+    @classmethod
+    def from_git(cls, base_ref: str = 'origin/main', repo_path: str = '.') -> 'ChangedLineIndex':
+        """
+        Build the index from a single zero-context git diff against the
+        merge-base of base_ref and HEAD.
+
+        Args:
+            base_ref: Branch the pull request targets
+            repo_path: Path to the git checkout
+
+        Returns:
+            ChangedLineIndex, empty if git fails
+        """
+        result = subprocess.run(
+            ['git', 'diff', '--no-color', '--unified=0', f'{base_ref}...HEAD'],
+            capture_output=True,
+            text=True,
+            cwd=repo_path
+        )
+        if result.returncode != 0:
+            print(f"Could not diff against {base_ref}: {result.stderr.strip()}")
+            return cls({})
+        return cls(parse_unified_diff(result.stdout))
+
+    def covers(self, path: str) -> bool:
+        """Whether changed-line information is known for path."""
+        return normalize_path(path) in self._files
+
+    def contains(self, path: str, line: int) -> bool:
+        """Whether the PR changed the given line of path."""
+        intervals = self._files.get(normalize_path(path))
+        return intervals is not None and line in intervals
+
+    def get(self, path: str) -> Optional[LineIntervals]:
+        """Return the changed line ranges of path, if known."""
+        return self._files.get(normalize_path(path))
+
+
+def normalize_path(path: str) -> str:
+    """Normalize a tool-reported path to the repository-relative form."""
+    while path.startswith('./'):
+        path = path[2:]
+    return path
+
+
+def iter_lines_in(path: str, intervals: LineIntervals) -> Iterator[Tuple[int, str]]:
+    """
+    Stream the lines of a file that fall in the given ranges.
+
+    Args:
+        path: File to read
+        intervals: Line ranges to keep
+
+    Yields:
+        (line number, text without the newline); nothing if the file cannot be read
+    """
+    last = intervals.ends[-1] if len(intervals) else 0
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            for number, text in enumerate(f, 1):
+                if number > last:
+                    return
+                if number in intervals:
+                    yield number, text.rstrip('\n')
+    except OSError:
+        return
+
+
+class UnpatchedAddedLines:
+    """
+    Added lines of changed files that carry no patch, read from the checkout.
+
+    ChangedFiles.from_git, and the API for diffs that are too large, leave
+    modified files without patch text. Their changed line ranges come from
+    one zero-context git diff against the merge-base, run on first use.
+    """
+
+    def __init__(self, changed_files: ChangedFiles):
+        if not isinstance(changed_files, ChangedFiles):
+            raise TypeError(f"changed_files must be a ChangedFiles index, got {type(changed_files)}")
+        self.changed_files = changed_files
+        self._index: Optional[ChangedLineIndex] = None
+
+    def get(self, path: str) -> Optional[Iterator[Tuple[int, str]]]:
+        """Stream the added lines of path, or return None when its diff is unknown."""
+        if self._index is None:
+            base_sha = self.changed_files.base_sha
+            self._index = ChangedLineIndex.from_git(base_sha, self.changed_files.repo_path) \
+                if base_sha else ChangedLineIndex({})
+        intervals = self._index.get(path)
+        if intervals is None:
+            return None
+        return iter_lines_in(os.path.join(self.changed_files.repo_path, path), intervals)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Script to drop analysis findings on lines the pull request did not change.
+"""
+
+from typing import Any, Dict, List, Optional
+from .diff_index import ChangedLineIndex
+
+# Review scopes accepted in `analysis.scope`
+SCOPE_CHANGED_LINES = 'changed_lines'
+SCOPE_WHOLE_FILE = 'whole_file'
+SCOPES = (SCOPE_CHANGED_LINES, SCOPE_WHOLE_FILE)
+
+
+def _keep(line_index: ChangedLineIndex, path: str, line: Optional[int]) -> bool:
+    """Whether a finding at path:line survives the changed-lines filter."""
+    if line is None or not line_index.covers(path):
+        # File-level findings and files without diff information are kept
+        return True
+    return line_index.contains(path, line)
+
+
+def filter_findings(analysis_results: Dict[str, Any], line_index: ChangedLineIndex,
+                    config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Keep only the findings located on lines the pull request changed.
+
+    Runs between run_analysis and generate_review, on the `file`/`line`
+    keys of each issue.
+
+    Args:
+        analysis_results: Results returned by run_analysis
+        line_index: Changed-line index of the pull request
+        config: The bot configuration dictionary; `analysis.scope` selects
+            'changed_lines' (default) or 'whole_file'
+
+    Returns:
+        New analysis results dictionary with the filtered issues
+
+    Raises:
+        TypeError: If arguments are of wrong type
+        ValueError: If `analysis.scope` is not a known scope
+    """
+    if not isinstance(analysis_results, dict):
+        raise TypeError(f"analysis_results must be a dictionary, got {type(analysis_results)}")
+    if not isinstance(line_index, ChangedLineIndex):
+        raise TypeError(f"line_index must be a ChangedLineIndex, got {type(line_index)}")
+    if not isinstance(config, dict):
+        raise TypeError(f"config must be a dictionary, got {type(config)}")
+
+    scope = config.get('analysis', {}).get('scope', SCOPE_CHANGED_LINES)
+    if scope not in SCOPES:
+        raise ValueError(f"analysis.scope must be one of {SCOPES}, got {scope!r}")
+    if scope == SCOPE_WHOLE_FILE:
+        return analysis_results
+
+    issues: List[Dict[str, Any]] = []
+    removed = 0
+    for issue in analysis_results.get('issues', []):
+        if _keep(line_index, issue.get('file') or '', issue.get('line')):
+            issues.append(issue)
+        else:
+            removed += 1
+
+    filtered = dict(analysis_results)
+    filtered['issues'] = issues
+    # Findings on untouched lines must not block the PR on their own
+    if removed and not issues:
+        filtered['passed'] = True
+    filtered['stats'] = {
+        **analysis_results.get('stats', {}),
+        'scope': scope,
+        'filtered_findings': removed
+    }
+    return filtered
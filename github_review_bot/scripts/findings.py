@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Script to parse analysis tool output into structured findings.
+"""
+
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+from .diff_index import normalize_path
+
+# Finding severities, aligned with the `type` of checker issues
+SEVERITIES = ('error', 'warning', 'info')
+
+# flake8 default format: path:line:col: CODE message
+FLAKE8_LINE = re.compile(r'^(?P<path>.+?):(?P<line>\d+):(?P<col>\d+): (?P<rule>[A-Z]+\d+) (?P<msg>.*)$')
+
+# tsc --pretty false format: path(line,col): error TS1234: message
+TSC_LINE = re.compile(
+    r'^(?P<path>.+?)\((?P<line>\d+),(?P<col>\d+)\): (?P<level>error|warning|message) '
+    r'(?P<rule>TS\d+): (?P<msg>.*)$'
+)
+
+# Diagnostics without a location, such as tsconfig errors: error TS5023: message
+TSC_GLOBAL = re.compile(r'^(?P<level>error|warning|message) (?P<rule>TS\d+): (?P<msg>.*)$')
+
+# black --check reports files it would change
+BLACK_LINE = re.compile(r'^would reformat (?P<path>.+)$')
+
+# flake8 code prefixes that are real errors rather than style warnings
+FLAKE8_ERROR_PREFIXES = ('E9', 'F')
+
+BANDIT_SEVERITIES = {'HIGH': 'error', 'MEDIUM': 'warning', 'LOW': 'info'}
+ESLINT_SEVERITIES = {2: 'error', 1: 'warning'}
+
+
+class Finding:
+    """A single finding reported by an analysis tool."""
+
+    __slots__ = ('tool', 'rule', 'severity', 'path', 'line', 'column', 'message')
+
+    def __init__(self, tool: str, rule: str, severity: str, path: str,
+                 line: Optional[int], column: Optional[int], message: str):
+        self.tool = tool
+        self.rule = rule
+        self.severity = severity
+        self.path = path
+        self.line = line
+        self.column = column
+        self.message = message
+
+    def as_tuple(self) -> Tuple[Any, ...]:
+        """Compact tuple form, used for caching and ordering."""
+        return (self.tool, self.rule, self.severity, self.path, self.line, self.column, self.message)
+
+    @classmethod
+    def from_tuple(cls, values: Iterable[Any]) -> 'Finding':
+        """Rebuild a finding from its tuple form."""
+        return cls(*values)
+
+    def sort_key(self) -> Tuple[str, int, int, str, str]:
+        """Stable ordering by location, then tool and rule."""
+        return (self.path, self.line or 0, self.column or 0, self.tool, self.rule)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert to the issue dictionary schema shared with the checkers.
+
+        Returns:
+            Dictionary with keys tool, rule, type, message, file, line, column
+        """
+        return {
+            'tool': self.tool,
+            'rule': self.rule,
+            'type': self.severity,
+            'message': self.message,
+            'file': self.path,
+            'line': self.line,
+            'column': self.column
+        }
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Finding) and self.as_tuple() == other.as_tuple()
+
+    def __hash__(self) -> int:
+        return hash(self.as_tuple())
+
+    def __repr__(self) -> str:
+        return f"Finding({self.tool}:{self.rule} {self.path}:{self.line}:{self.column} {self.message!r})"
+
+
+def relative_path(path: str) -> str:
+    """Normalize a tool-reported path to the repository-relative form."""
+    return normalize_path(os.path.relpath(path) if os.path.isabs(path) else path)
+
+
+def flake8_finding(path: str, line: int, column: int, rule: str, message: str) -> Finding:
+    """Build the Finding of one flake8 violation."""
+    return Finding(
+        'flake8',
+        rule,
+        'error' if rule.startswith(FLAKE8_ERROR_PREFIXES) else 'warning',
+        relative_path(path),
+        line,
+        column,
+        message
+    )
+
+
+def parse_flake8(lines: Iterable[str]) -> Iterator[Finding]:
+    """
+    Parse flake8's default output format line by line.
+
+    Args:
+        lines: Output lines of flake8
+
+    Yields:
+        One Finding per reported violation
+    """
+    for text in lines:
+        match = FLAKE8_LINE.match(text.rstrip('\n'))
+        if not match:
+            continue
+        yield flake8_finding(match.group('path'), int(match.group('line')), int(match.group('col')),
+                             match.group('rule'), match.group('msg'))
+
+
+def black_finding(path: str) -> Finding:
+    """Build the file-level Finding of a file black would reformat."""
+    return Finding('black', 'format', 'warning', relative_path(path), None, None,
+                   'File would be reformatted by black')
+
+
+def parse_black(lines: Iterable[str]) -> Iterator[Finding]:
+    """
+    Parse `black --check` output line by line.
+
+    Args:
+        lines: Output lines of black (it reports on stderr)
+
+    Yields:
+        One file-level Finding per file black would reformat
+    """
+    for text in lines:
+        match = BLACK_LINE.match(text.rstrip('\n'))
+        if match:
+            yield black_finding(match.group('path'))
+
+
+def parse_bandit_results(results: Iterable[Dict[str, Any]]) -> Iterator[Finding]:
+    """
+    Convert bandit issues in their JSON report form into findings.
+
+    Args:
+        results: Issue dictionaries, as in the `results` list of the report
+
+    Yields:
+        One Finding per issue
+    """
+    for issue in results:
+        yield Finding(
+            'bandit',
+            issue.get('test_id', ''),
+            BANDIT_SEVERITIES.get(issue.get('issue_severity', ''), 'warning'),
+            relative_path(issue.get('filename', '')),
+            issue.get('line_number'),
+            issue.get('col_offset'),
+            issue.get('issue_text', '')
+        )
+
+
+def parse_bandit_json(output: str) -> Iterator[Finding]:
+    """
+    Parse `bandit -f json` output.
+
+    Args:
+        output: JSON document printed by bandit
+
+    Yields:
+        One Finding per reported issue
+    """
+    try:
+        report = json.loads(output) if output.strip() else {}
+    except ValueError:
+        return
+    yield from parse_bandit_results(report.get('results', []))
+
+
+def parse_eslint_json(output: str) -> Iterator[Finding]:
+    """
+    Parse `eslint --format json` output.
+
+    Args:
+        output: JSON document printed by eslint
+
+    Yields:
+        One Finding per reported message
+    """
+    try:
+        report = json.loads(output) if output.strip() else []
+    except ValueError:
+        return
+    for file_result in report:
+        path = relative_path(file_result.get('filePath', ''))
+        for message in file_result.get('messages', []):
+            yield Finding(
+                'eslint',
+                message.get('ruleId') or ('parse-error' if message.get('fatal') else ''),
+                ESLINT_SEVERITIES.get(message.get('severity'), 'warning'),
+                path,
+                message.get('line'),
+                message.get('column'),
+                message.get('message', '')
+            )
+
+
+def parse_tsc(lines: Iterable[str]) -> Iterator[Finding]:
+    """
+    Parse `tsc --pretty false` diagnostics line by line.
+
+    Indented continuation lines (message chains) are folded into the
+    message of the diagnostic they belong to. Diagnostics without a
+    location, such as tsconfig errors, get an empty path.
+
+    Args:
+        lines: Output lines of tsc
+
+    Yields:
+        One Finding per diagnostic
+    """
+    pending: Optional[Finding] = None
+    for text in lines:
+        text = text.rstrip('\n')
+        match = TSC_LINE.match(text) or TSC_GLOBAL.match(text)
+        if match:
+            if pending:
+                yield pending
+            located = match.re is TSC_LINE
+            pending = Finding(
+                'typescript',
+                match.group('rule'),
+                'error' if match.group('level') == 'error' else 'warning',
+                relative_path(match.group('path')) if located else '',
+                int(match.group('line')) if located else None,
+                int(match.group('col')) if located else None,
+                match.group('msg')
+            )
+        elif pending and text.startswith(' '):
+            pending.message += '\n' + text.strip()
+    if pending:
+        yield pending
+
+
+def tool_failure(tool: str, returncode: Optional[int], stderr: str, timed_out: bool = False,
+                 cancelled: bool = False) -> Finding:
+    """
+    Build a finding reporting that a tool did not produce usable results.
+
+    Args:
+        tool: Tool name
+        returncode: Exit status, None if the tool did not finish
+        stderr: Error output of the tool
+        timed_out: Whether the tool was killed for exceeding its timeout
+        cancelled: Whether the tool was cancelled
+
+    Returns:
+        Error-level Finding without a location
+    """
+    if timed_out:
+        message = f"{tool} timed out"
+    elif cancelled:
+        message = f"{tool} was cancelled"
+    else:
+        detail = stderr.strip().splitlines()[-1] if stderr.strip() else 'no output'
+        message = f"{tool} failed with exit status {returncode}: {detail}"
+    return Finding(tool, 'tool-error', 'error', '', None, None, message)
@@ -3,26 +3,40 @@
 Script to generate a review summary from analysis results.
 """
 
-import os
-import json
 from pathlib import Path
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, List, Tuple
+from .result_sink import load_results
 
-def load_analysis_results():
-    """Load all analysis results from JSON files."""
-    results = {}
-    
-    # Load Python analysis results
-    if os.path.exists('analysis_results.json'):
-        with open('analysis_results.json', 'r') as f:
-            results['python'] = json.load(f)
-    
-    # Load JavaScript analysis results
-    if os.path.exists('js_analysis_results.json'):
-        with open('js_analysis_results.json', 'r') as f:
-            results['javascript'] = json.load(f)
-    
-    return results
+def load_analysis_results(results_dir: str) -> Dict[str, Any]:
+    """Load analysis results persisted by a run's ResultSink."""
+    return {'issues': load_results(results_dir)}
+
+def format_issue(issue: Dict[str, Any]) -> str:
+    """Format a structured issue as a single markdown line."""
+    location = issue.get('file') or ''
+    if location and issue.get('line'):
+        location += f":{issue['line']}"
+        if issue.get('column'):
+            location += f":{issue['column']}"
+    parts = [f"**{issue.get('type', 'info')}**"]
+    if issue.get('workspace'):
+        parts.append(f"[{issue['workspace']}]")
+    if location:
+        parts.append(f"`{location}`")
+    message = issue.get('message', '')
+    parts.append(f"{issue['rule']}: {message}" if issue.get('rule') else message)
+    return ' '.join(parts)
+
+def group_issues(issues: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Group structured issues by the tool or checker that reported them, sorted by location."""
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for issue in issues:
+        if 'message' in issue:
+            groups.setdefault(issue.get('tool') or 'project checks', []).append(issue)
+    for group in groups.values():
+        group.sort(key=lambda issue: (issue.get('file') or '', issue.get('line') or 0,
+                                      issue.get('column') or 0))
+    return groups
 
 def generate_summary_markdown(results: Dict[str, Any], config: Dict[str, Any]) -> str:
     """Generate a markdown summary of the review."""
@@ -44,14 +58,9 @@ def generate_summary_markdown(results: Dict[str, Any], config: Dict[str, Any]) -
     # Add issues from test case format
     if 'issues' in results:
         has_issues = bool(results['issues'])
-        for issue in results['issues']:
-            tool = issue.get('tool', '')
-            output = issue.get('output', '')
-            if tool and output:
-                summary.append(f"## {tool.title()} Issues")
-                summary.append("```")
-                summary.append(str(output))
-                summary.append("```")
+        for group, issues in group_issues(results['issues']).items():
+            summary.append(f"## {group.title()} Issues")
+            summary.extend(f"- {format_issue(issue)}" for issue in issues)
     
     # Add Python analysis results
     if 'python' in results:
@@ -79,6 +88,13 @@ def generate_summary_markdown(results: Dict[str, Any], config: Dict[str, Any]) -
                     summary.append(str(output))
                     summary.append("```")
     
+    # List checks the time budget did not leave room for
+    skipped = results.get('stats', {}).get('skipped_checks') or []
+    if skipped:
+        summary.append("\n## Skipped Checks")
+        summary.append("⏱️ This is a partial review: the time budget ran out before these checks completed.")
+        summary.extend(f"- {entry['check']}: {entry['reason']}" for entry in skipped)
+    
     # Add recommendations
     summary.append("\n## Recommendations")
     if not has_issues:
@@ -103,7 +119,8 @@ def generate_review(analysis_results: Dict[str, Any], config: Dict[str, Any]) ->
     Returns:
         Tuple[str, str] containing:
             - review_body: The generated review summary in markdown format
-            - review_action: The suggested action ('APPROVE' or 'REQUEST_CHANGES')
+            - review_action: The suggested action ('APPROVE' or 'REQUEST_CHANGES', or
+              'COMMENT' for a partial review whose completed checks passed)
             
     Raises:
         TypeError: If analysis_results is not a dictionary
@@ -118,6 +135,9 @@ def generate_review(analysis_results: Dict[str, Any], config: Dict[str, Any]) ->
     
     # Determine review action based on analysis results
     review_action = 'APPROVE' if analysis_results.get('passed', False) else 'REQUEST_CHANGES'
+    # Never approve on the strength of checks that did not run
+    if review_action == 'APPROVE' and analysis_results.get('stats', {}).get('skipped_checks'):
+        review_action = 'COMMENT'
     
     return review_body, review_action
 
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Script to read the exported object literal of a JavaScript config file without Node.
+"""
+
+import ast
+import re
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, List, Mapping, Optional
+from .manifests import git_blob_sha
+
+
+class _Marker:
+    """Placeholder value of a key whose value is not a plain literal."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+# Values of keys holding a nested object, an array, or any other expression
+OBJECT = _Marker('OBJECT')
+ARRAY = _Marker('ARRAY')
+DYNAMIC = _Marker('DYNAMIC')
+
+# Parsed configs kept in memory, keyed by content
+DEFAULT_CACHE_SIZE = 256
+
+TOKEN = re.compile(r'''
+    (?P<space>\s+)
+  | (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+  | (?P<number>(?:0[xXbBoO][0-9a-fA-F_]+|(?:\d[\d_]*(?:\.[\d_]*)?|\.\d[\d_]*)(?:[eE][+-]?\d+)?)n?)
+  | (?P<name>[A-Za-z_$][\w$]*)
+  | (?P<punct>\.\.\.|=>|[=!]==?|<=|>=|&&|\|\||\?\?|\?\.|[{}()\[\];,:.=+\-*%<>!?&|^~@#])
+''', re.VERBOSE | re.DOTALL)
+
+# Tokens after which a slash divides instead of starting a regular expression
+_VALUE_END = {')', ']', '}'}
+_KEYWORDS = {'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw',
+             'case', 'do', 'else', 'yield', 'await'}
+_LITERALS = {'true': True, 'false': False, 'null': None, 'undefined': None}
+_OPENERS = {'(': ')', '[': ']', '{': '}'}
+
+
+class Token:
+    """One JavaScript token."""
+
+    __slots__ = ('kind', 'text', 'pos')
+
+    def __init__(self, kind: str, text: str, pos: int):
+        self.kind = kind
+        self.text = text
+        self.pos = pos
+
+    def __repr__(self) -> str:
+        return f"Token({self.kind}, {self.text!r})"
+
+
+def _template_end(source: str, pos: int) -> int:
+    """Return the index after the template literal starting at pos."""
+    i = pos + 1
+    while i < len(source):
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '`':
+            return i + 1
+        if source.startswith('${', i):
+            depth = 1
+            i += 2
+            while i < len(source) and depth:
+                char = source[i]
+                if char in '\'"':
+                    match = TOKEN.match(source, i)
+                    i = match.end() if match and match.lastgroup == 'string' else i + 1
+                    continue
+                if char == '`':
+                    i = _template_end(source, i)
+                    continue
+                depth += {'{': 1, '}': -1}.get(char, 0)
+                i += 1
+            continue
+        i += 1
+    return len(source)
+
+
+def _regex_end(source: str, pos: int) -> int:
+    """Return the index after the regular expression literal starting at pos."""
+    i = pos + 1
+    in_class = False
+    while i < len(source) and source[i] != '\n':
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            i += 1
+            while i < len(source) and (source[i].isalnum() or source[i] == '_'):
+                i += 1
+            return i
+        i += 1
+    return i
+
+
+def tokenize(source: str) -> Iterator[Token]:
+    """
+    Split JavaScript or TypeScript source into tokens, dropping comments.
+
+    Template literals and regular expressions are returned whole, as
+    `template` and `regex` tokens.
+
+    Args:
+        source: Source text
+
+    Yields:
+        Tokens of kind name, string, template, regex, number or punct
+    """
+    pos = 0
+    previous: Optional[Token] = None
+    while pos < len(source):
+        char = source[pos]
+        if char == '`':
+            end = _template_end(source, pos)
+            token = Token('template', source[pos:end], pos)
+        elif char == '/' and not source.startswith(('//', '/*'), pos) and (
+                previous is None or (previous.kind == 'punct' and previous.text not in _VALUE_END)
+                or (previous.kind == 'name' and previous.text in _KEYWORDS)):
+            end = _regex_end(source, pos)
+            token = Token('regex', source[pos:end], pos)
+        else:
+            match = TOKEN.match(source, pos)
+            if match is None:
+                # Characters JavaScript configs do not use, such as stray
+                # unicode, are passed through one at a time
+                end = pos + 1
+                token = Token('punct', char, pos)
+            else:
+                end = match.end()
+                if match.lastgroup in ('space', 'comment'):
+                    pos = end
+                    continue
+                token = Token(match.lastgroup, match.group(), pos)
+        previous = token
+        pos = end
+        yield token
+
+
+def _literal(token: Token) -> Any:
+    """Return the Python value of a literal token, or DYNAMIC."""
+    if token.kind == 'string':
+        try:
+            return ast.literal_eval(token.text)
+        except (ValueError, SyntaxError):
+            return token.text[1:-1]
+    if token.kind == 'template':
+        return token.text[1:-1] if '${' not in token.text else DYNAMIC
+    if token.kind == 'number':
+        text = token.text.replace('_', '').rstrip('n')
+        try:
+            return int(text, 0)
+        except ValueError:
+            try:
+                return float(text)
+            except ValueError:
+                return DYNAMIC
+    if token.kind == 'name' and token.text in _LITERALS:
+        return _LITERALS[token.text]
+    return DYNAMIC
+
+
+class _Parser:
+    """Reads object literals out of a token list into key-path maps."""
+
+    def __init__(self, tokens: List[Token]):
+        self.tokens = tokens
+
+    def text(self, i: int) -> Optional[str]:
+        return self.tokens[i].text if i < len(self.tokens) else None
+
+    def skip_balanced(self, i: int) -> int:
+        """Return the index after the bracketed group opening at i."""
+        depth = 0
+        while i < len(self.tokens):
+            text = self.tokens[i].text if self.tokens[i].kind == 'punct' else None
+            if text in _OPENERS:
+                depth += 1
+            elif text in (')', ']', '}'):
+                depth -= 1
+                if depth <= 0:
+                    return i + 1
+            i += 1
+        return i
+
+    def skip_expression(self, i: int) -> int:
+        """Return the index of the `,` or closing bracket ending the expression at i."""
+        while i < len(self.tokens):
+            token = self.tokens[i]
+            if token.kind == 'punct':
+                if token.text in _OPENERS:
+                    i = self.skip_balanced(i)
+                    continue
+                if token.text in (',', ')', ']', '}', ';'):
+                    return i
+            i += 1
+        return i
+
+    def value(self, i: int, path: str, out: Dict[str, Any]) -> int:
+        """Read the value starting at i into out; return the index after it."""
+        text = self.text(i)
+        if text == '{' and self.tokens[i].kind == 'punct':
+            out[path] = OBJECT
+            i = self.object(i, path + '.', out)
+        elif text == '[' and self.tokens[i].kind == 'punct':
+            out[path] = ARRAY
+            i = self.array(i, path + '.', out)
+        else:
+            end = self.skip_expression(i)
+            expression = self.tokens[i:end]
+            if len(expression) == 1:
+                out[path] = _literal(expression[0])
+            elif (len(expression) == 2 and expression[0].text == '-'
+                  and expression[1].kind == 'number' and isinstance(_literal(expression[1]), (int, float))):
+                out[path] = -_literal(expression[1])
+            else:
+                out[path] = DYNAMIC
+            return end
+        # `{...} as const`, `[...] satisfies X` and the like
+        return self.skip_expression(i)
+
+    def array(self, i: int, prefix: str, out: Dict[str, Any]) -> int:
+        i += 1
+        index = 0
+        while i < len(self.tokens) and self.text(i) != ']':
+            if self.text(i) == ',':
+                i += 1
+                index += 1
+                continue
+            if self.text(i) == '...':
+                i = self.skip_expression(i + 1)
+            else:
+                i = self.value(i, f"{prefix}{index}", out)
+            if self.text(i) == ',':
+                i += 1
+                index += 1
+            elif self.text(i) != ']':
+                i = self.skip_expression(i + 1)
+        return i + 1
+
+    def object(self, i: int, prefix: str, out: Dict[str, Any]) -> int:
+        i += 1
+        while i < len(self.tokens) and self.text(i) != '}':
+            token = self.tokens[i]
+            if token.text == ',':
+                i += 1
+                continue
+            if token.text == '...':
+                i = self.skip_expression(i + 1)
+                continue
+            if token.text == '[':
+                # Computed keys cannot be read statically
+                i = self.skip_expression(self.skip_balanced(i))
+                continue
+            # Accessors and async or generator methods
+            while (token.kind == 'name' and token.text in ('async', 'get', 'set', 'static')
+                   and self.text(i + 1) not in (':', '(', ',', '}')) or token.text == '*':
+                i += 1
+                token = self.tokens[i]
+            key = _literal(token) if token.kind in ('string', 'number') else token.text
+            path = f"{prefix}{key}"
+            following = self.text(i + 1)
+            if following == ':':
+                i = self.value(i + 2, path, out)
+            elif following == '(':
+                out[path] = DYNAMIC
+                i = self.skip_balanced(i + 1)
+                if self.text(i) == ':':
+                    i = self.skip_type(i + 1)
+                i = self.skip_balanced(i) if self.text(i) == '{' else i
+            else:
+                # Shorthand property: the value is a variable
+                out[path] = DYNAMIC
+                i += 1
+            if self.text(i) not in (',', '}'):
+                i = self.skip_expression(i)
+        return i + 1
+
+    def skip_type(self, i: int) -> int:
+        """Return the index of the `=`, `{` or `,` ending a type annotation at i."""
+        depth = 0
+        while i < len(self.tokens):
+            text = self.text(i)
+            if text in ('<', '(', '['):
+                depth += 1
+            elif text in ('>', ')', ']'):
+                depth -= 1
+            elif depth <= 0 and text in ('=', '{', ',', ';'):
+                return i
+            i += 1
+        return i
+
+    def exported_object(self) -> Optional[int]:
+        """Return the index of the `{` of the exported config object, if found."""
+        declared: Dict[str, int] = {}
+        exported: Optional[int] = None
+        depth = 0
+        i = 0
+        while i < len(self.tokens):
+            token = self.tokens[i]
+            if token.kind == 'punct' and token.text in _OPENERS:
+                depth += 1
+            elif token.kind == 'punct' and token.text in (')', ']', '}'):
+                depth -= 1
+            elif depth == 0 and token.text in ('const', 'let', 'var') and token.kind == 'name':
+                name = self.text(i + 1)
+                j = i + 2
+                if self.text(j) == ':':
+                    j = self.skip_type(j + 1)
+                if self.text(j) == '=' and self.text(j + 1) == '{':
+                    declared[name] = j + 1
+            elif depth == 0 and (
+                    (token.text == 'module' and self.text(i + 1) == '.' and self.text(i + 2) == 'exports'
+                     and self.text(i + 3) == '=')
+                    or (token.text == 'export' and self.text(i + 1) == 'default')):
+                exported = i + (4 if token.text == 'module' else 2)
+            i += 1
+        if exported is None:
+            return None
+        return self.export_target(exported, declared)
+
+    def export_target(self, i: int, declared: Dict[str, int]) -> Optional[int]:
+        """Find the object an export expression evaluates to."""
+        previous = None
+        in_body = False
+        while i < len(self.tokens):
+            token = self.tokens[i]
+            if token.kind == 'punct' and token.text == ';' and not in_body:
+                return None
+            if token.kind == 'punct' and token.text == '{':
+                if previous in (None, 'return'):
+                    return i
+                if previous in ('(', ','):
+                    end = self.skip_balanced(i)
+                    j = end
+                    while self.text(j) == ',':
+                        j = self.skip_expression(j + 1)
+                    if self.text(j) == ')' and self.text(j + 1) == '(':
+                        # Options of a curried wrapper, withX({...})(config):
+                        # the config is in the next argument list
+                        previous = '}'
+                        i = end
+                        continue
+                    if not (self.text(j) == ')' and self.text(j + 1) in ('=>', '{')):
+                        return i
+                    # A destructured parameter of the config function
+                    previous = '}'
+                    i = end
+                    continue
+                if previous in ('=>', ')'):
+                    # A function body: the config is what it returns
+                    previous = token.text
+                    in_body = True
+                    i += 1
+                else:
+                    # Some other object, such as a local variable
+                    previous = '}'
+                    i = self.skip_balanced(i)
+                continue
+            if token.kind == 'name' and token.text in declared and self.text(i + 1) != '(':
+                return declared[token.text]
+            previous = token.text
+            i += 1
+        return None
+
+
+def extract_object(source: str) -> Optional[Dict[str, Any]]:
+    """
+    Turn the exported object literal of a config file into a key-path map.
+
+    Understands `module.exports = {...}`, `export default {...}`, exported
+    variables, TypeScript annotations and wrapper calls such as
+    `withBundleAnalyzer(nextConfig)` or `withX({...})(nextConfig)`. Nested keys are joined with dots and
+    array items use their index, e.g. `images.remotePatterns.0.hostname`.
+
+    Args:
+        source: Source of the config file
+
+    Returns:
+        Dict of key path to literal value, or to OBJECT, ARRAY or DYNAMIC;
+        None when no exported object literal is found
+    """
+    parser = _Parser(list(tokenize(source)))
+    start = parser.exported_object()
+    if start is None:
+        return None
+    out: Dict[str, Any] = {}
+    parser.object(start, '', out)
+    return out
+
+
+class ConfigParseCache:
+    """
+    Parsed configs keyed by the blob SHA of their content.
+
+    A process reviewing many PRs parses each distinct config once; the
+    least recently used entries are dropped beyond maxsize.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, Optional[Mapping[str, Any]]]' = OrderedDict()
+
+    def get(self, source: str) -> Optional[Mapping[str, Any]]:
+        """
+        Return the read-only key-path map of a config, parsing it on a miss.
+
+        Raises:
+            TypeError: If source is not a string
+        """
+        if not isinstance(source, str):
+            raise TypeError(f"source must be a string, got {type(source)}")
+        key = git_blob_sha(source.encode('utf-8'))
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self.misses += 1
+        values = extract_object(source)
+        parsed = MappingProxyType(values) if values is not None else None
+        with self._lock:
+            self._entries[key] = parsed
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return parsed
+
+
+# Shared by every checker of the process
+CONFIG_CACHE = ConfigParseCache()
+
+
+def parse_config(source: str) -> Optional[Mapping[str, Any]]:
+    """Return the cached key-path map of a config file's exported object."""
+    return CONFIG_CACHE.get(source)
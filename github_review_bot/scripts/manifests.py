@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Script to parse project manifests such as package.json once and share them.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from types import MappingProxyType
+from typing import Any, Dict, Optional, Set
+from .diff_index import normalize_path
+from .repo_index import RepoIndex
+
+
+def git_blob_sha(content: bytes) -> str:
+    """Return the SHA git and the GitHub API give a file with this content."""
+    return hashlib.sha1(b'blob %d\0' % len(content) + content).hexdigest()
+
+
+def freeze(value: Any) -> Any:
+    """Return a read-only copy of parsed JSON: mappings become proxies, lists tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class Manifest:
+    """
+    One parsed manifest.
+
+    data is a read-only view of the top-level JSON object, or None when
+    the file is missing or invalid; error says why it is invalid.
+    """
+
+    __slots__ = ('path', 'blob_sha', 'data', 'error')
+
+    def __init__(self, path: str, blob_sha: Optional[str] = None, data: Any = None,
+                 error: Optional[str] = None):
+        self.path = path
+        self.blob_sha = blob_sha
+        self.data = data
+        self.error = error
+
+    @property
+    def exists(self) -> bool:
+        return self.blob_sha is not None
+
+
+class ManifestCache:
+    """
+    Parsed manifests of a checkout, shared by every checker of a run.
+
+    Each manifest is read and parsed once. A long-lived process can keep
+    the cache across reviews and pass the blob SHA it expects; entries
+    whose content has a different SHA are parsed again.
+    """
+
+    def __init__(self, repo_path: str = '.', repo_index: Optional[RepoIndex] = None):
+        self.repo_path = os.fspath(repo_path)
+        self.repo_index = repo_index
+        self._lock = threading.Lock()
+        self._manifests: Dict[str, Manifest] = {}
+        self._reported: Set[str] = set()
+
+    def get(self, path: str, blob_sha: Optional[str] = None) -> Manifest:
+        """
+        Return a parsed manifest.
+
+        Args:
+            path: Repository-relative path of the manifest
+            blob_sha: Expected blob SHA; a cached entry with another SHA
+                is parsed again
+
+        Returns:
+            The Manifest, with data None if the file is missing or invalid
+        """
+        path = normalize_path(path)
+        with self._lock:
+            manifest = self._manifests.get(path)
+            if manifest is None or (blob_sha is not None and manifest.blob_sha != blob_sha):
+                manifest = self._load(path)
+                self._manifests[path] = manifest
+                self._reported.discard(path)
+            return manifest
+
+    def _load(self, path: str) -> Manifest:
+        if self.repo_index is not None and not self.repo_index.is_file(path):
+            return Manifest(path)
+        try:
+            with open(os.path.join(self.repo_path, path), 'rb') as f:
+                content = f.read()
+        except OSError:
+            return Manifest(path)
+        blob_sha = git_blob_sha(content)
+        try:
+            data = json.loads(content)
+        except ValueError as e:
+            return Manifest(path, blob_sha, error=str(e))
+        if not isinstance(data, dict):
+            return Manifest(path, blob_sha, error=f"expected an object, got {type(data).__name__}")
+        return Manifest(path, blob_sha, freeze(data))
+
+    def parse_error_issue(self, path: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the issue for an invalid manifest to the first checker that asks.
+
+        Returns:
+            Error issue for the manifest, or None if it is valid, missing
+            or already reported
+        """
+        manifest = self.get(path)
+        with self._lock:
+            if manifest.error is None or manifest.path in self._reported:
+                return None
+            self._reported.add(manifest.path)
+        return {
+            "type": "error",
+            "message": f"Invalid {manifest.path} format.",
+            "file": manifest.path
+        }
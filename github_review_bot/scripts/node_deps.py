@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Script to prepare node_modules for JavaScript analysis, reusing installs by lockfile.
+"""
+
+import hashlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore
+from .changed_files import ChangedFiles, JS_LANGUAGES
+from .result_cache import tool_version
+from .tool_executor import DEFAULT_TOOL_TIMEOUT
+
+# Lockfiles in order of preference, with the clean-install command of their package manager
+LOCKFILES = [
+    ('package-lock.json', ['npm', 'ci', '--prefer-offline', '--no-audit', '--no-fund']),
+    ('pnpm-lock.yaml', ['pnpm', 'install', '--frozen-lockfile', '--prefer-offline']),
+    ('yarn.lock', ['yarn', 'install', '--frozen-lockfile', '--prefer-offline'])
+]
+
+# Without a lockfile there is nothing to key a cache on
+FALLBACK_INSTALL = ['npm', 'install', '--no-audit', '--no-fund']
+
+# Installed trees kept in the cache, most recently used first
+DEFAULT_MAX_INSTALLS = 3
+
+# ioctl cloning one file into another on Linux; None where it is unavailable
+FICLONE = 0x40049409 if fcntl is not None and sys.platform.startswith('linux') else None
+
+# Written into node_modules to recognize a tree that is already current
+STAMP_FILE = '.review-bot-deps.json'
+META_FILE = 'install.json'
+
+
+def find_lockfile(repo_path: str = '.') -> Optional[Tuple[str, List[str]]]:
+    """
+    Find the lockfile of a project.
+
+    Args:
+        repo_path: Path to the project root
+
+    Returns:
+        (lockfile name, install command), or None without a lockfile
+    """
+    for name, command in LOCKFILES:
+        if os.path.isfile(os.path.join(repo_path, name)):
+            return name, command
+    return None
+
+
+def dependency_key(lockfile: str, repo_path: str = '.') -> str:
+    """
+    Hash everything an installed node_modules tree depends on.
+
+    Native modules are built for one Node.js version and platform, so
+    both are part of the key alongside the lockfile content.
+
+    Args:
+        lockfile: Lockfile name
+        repo_path: Path to the project root
+
+    Returns:
+        Hex digest identifying the install
+    """
+    digest = hashlib.sha256()
+    with open(os.path.join(repo_path, lockfile), 'rb') as f:
+        digest.update(lockfile.encode() + b'\0' + f.read())
+    node = tool_version(['node', '--version']) or 'unknown'
+    digest.update(f'\0{node}\0{platform.system()}\0{platform.machine()}'.encode())
+    return digest.hexdigest()
+
+
+def _clone_or_copy(src: str, dst: str) -> str:
+    """
+    Copy a file as a copy-on-write clone where the filesystem supports it
+    (Btrfs, XFS), and as a plain copy otherwise.
+
+    Unlike a hard link, the copy has its own inode, so tools writing into
+    node_modules (`.cache` directories, postinstall patches) never change
+    the cached tree.
+    """
+    if FICLONE is not None:
+        try:
+            with open(src, 'rb') as source, open(dst, 'wb') as target:
+                fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+            shutil.copystat(src, dst)
+            return dst
+        except OSError:
+            pass
+    return shutil.copy2(src, dst)
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _install(command: List[str], repo_path: str) -> bool:
+    """Run an install command, returning whether it succeeded."""
+    try:
+        result = subprocess.run(command, cwd=repo_path, capture_output=True, text=True,
+                                timeout=DEFAULT_TOOL_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"Could not run {' '.join(command)}: {e}")
+        return False
+    if result.returncode != 0:
+        detail = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'no output'
+        print(f"{' '.join(command)} failed with exit status {result.returncode}: {detail}")
+        return False
+    return True
+
+
+class NodeModulesCache:
+    """
+    Installed node_modules trees keyed by dependency_key.
+
+    Each entry is `<cache_dir>/node_modules/<key>/` holding the tree and
+    the time its install took. Trees are saved and restored as
+    copy-on-write clones where the filesystem supports them, else as
+    copies, so a restore costs one directory walk instead of a download
+    and build, and nothing written into a checkout reaches the cache.
+    """
+
+    def __init__(self, cache_dir: str, max_installs: int = DEFAULT_MAX_INSTALLS):
+        if not isinstance(cache_dir, str):
+            raise TypeError(f"cache_dir must be a string, got {type(cache_dir)}")
+        self.root = os.path.join(cache_dir, 'node_modules')
+        self.max_installs = max_installs
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def restore(self, key: str, target: str) -> Optional[Dict[str, Any]]:
+        """
+        Restore a cached tree to target.
+
+        Args:
+            key: Dependency key
+            target: node_modules directory to create; must not exist
+
+        Returns:
+            Metadata of the cached install, or None on a miss
+        """
+        meta_path = os.path.join(self._entry(key), META_FILE)
+        meta = _read_json(meta_path)
+        if meta is None:
+            return None
+        try:
+            shutil.copytree(os.path.join(self._entry(key), 'node_modules'), target,
+                            symlinks=True, copy_function=_clone_or_copy)
+            os.utime(meta_path)
+        except (OSError, shutil.Error) as e:
+            print(f"Could not restore cached node_modules: {e}")
+            shutil.rmtree(target, ignore_errors=True)
+            return None
+        return meta
+
+    def save(self, key: str, source: str, install_seconds: float) -> None:
+        """
+        Store a freshly installed tree; failures only cost a future miss.
+
+        Args:
+            key: Dependency key
+            source: Installed node_modules directory
+            install_seconds: Time the install took
+        """
+        if os.path.isdir(self._entry(key)):
+            return
+        tmp_dir = None
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            tmp_dir = tempfile.mkdtemp(dir=self.root, prefix='.tmp-')
+            shutil.copytree(source, os.path.join(tmp_dir, 'node_modules'),
+                            symlinks=True, copy_function=_clone_or_copy)
+            with open(os.path.join(tmp_dir, META_FILE), 'w') as f:
+                json.dump({'install_seconds': install_seconds}, f)
+            # Publish atomically; a concurrent runner may have won the race
+            os.rename(tmp_dir, self._entry(key))
+            tmp_dir = None
+        except (OSError, shutil.Error) as e:
+            print(f"Could not cache node_modules: {e}")
+        finally:
+            if tmp_dir:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Drop the least recently used trees beyond max_installs.
+
+        Returns:
+            Number of trees removed
+        """
+        if not os.path.isdir(self.root):
+            return 0
+        entries = []
+        for entry in os.scandir(self.root):
+            if entry.name.startswith('.'):
+                continue
+            try:
+                entries.append((os.stat(os.path.join(entry.path, META_FILE)).st_mtime, entry.path))
+            except OSError:
+                continue
+        entries.sort(reverse=True)
+        for _, path in entries[self.max_installs:]:
+            shutil.rmtree(path, ignore_errors=True)
+        return max(0, len(entries) - self.max_installs)
+
+
+def prepare_node_dependencies(changed_files: ChangedFiles, repo_path: str = '.',
+                              cache: Optional[NodeModulesCache] = None) -> Dict[str, Any]:
+    """
+    Make node_modules match the lockfile before JavaScript tools run.
+
+    Installation is skipped when no lintable JS/TS file changed or when
+    node_modules already matches the lockfile. Otherwise a cached tree is
+    restored, and only when there is none the package manager runs a
+    clean, offline-first install whose result is cached for later runs.
+
+    Args:
+        changed_files: Index of the files changed by the PR
+        repo_path: Path to the project root
+        cache: Cache of installed trees, or None to always install
+
+    Returns:
+        Statistics with keys status (skipped, current, restored, installed
+        or failed), lockfile, seconds and saved_seconds
+
+    Raises:
+        TypeError: If changed_files is not a ChangedFiles index
+    """
+    if not isinstance(changed_files, ChangedFiles):
+        raise TypeError(f"changed_files must be a ChangedFiles index, got {type(changed_files)}")
+
+    stats: Dict[str, Any] = {'status': 'skipped', 'lockfile': None, 'seconds': 0.0, 'saved_seconds': 0.0}
+    if not changed_files.lint_files(*JS_LANGUAGES):
+        return stats
+
+    start = time.monotonic()
+    target = os.path.join(repo_path, 'node_modules')
+    stamp_path = os.path.join(target, STAMP_FILE)
+    lockfile = find_lockfile(repo_path)
+    if lockfile is None:
+        print("No lockfile found, running a full npm install")
+        stats['status'] = 'installed' if _install(FALLBACK_INSTALL, repo_path) else 'failed'
+        stats['seconds'] = time.monotonic() - start
+        return stats
+
+    name, command = lockfile
+    key = dependency_key(name, repo_path)
+    stats['lockfile'] = name
+
+    stamp = _read_json(stamp_path)
+    if stamp and stamp.get('key') == key:
+        stats['status'] = 'current'
+    else:
+        shutil.rmtree(target, ignore_errors=True)
+        meta = cache.restore(key, target) if cache else None
+        if meta is not None:
+            stamp = {'key': key, 'install_seconds': meta.get('install_seconds', 0.0)}
+            stats['status'] = 'restored'
+        else:
+            print(f"Installing dependencies from {name}...")
+            if not _install(command, repo_path):
+                stats['status'] = 'failed'
+                stats['seconds'] = time.monotonic() - start
+                return stats
+            stamp = {'key': key, 'install_seconds': time.monotonic() - start}
+            stats['status'] = 'installed'
+            if cache:
+                cache.save(key, target, stamp['install_seconds'])
+        try:
+            with open(stamp_path, 'w') as f:
+                json.dump(stamp, f)
+        except OSError:
+            pass
+
+    stats['seconds'] = time.monotonic() - start
+    if stats['status'] != 'installed':
+        stats['saved_seconds'] = max(0.0, stamp.get('install_seconds', 0.0) - stats['seconds'])
+    return stats
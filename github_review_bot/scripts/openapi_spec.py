@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+Script to load OpenAPI specs, diff two revisions and validate the parts that changed.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Callable, ContextManager, Dict, Iterator, List, Optional, Set, Tuple
+import yaml
+
+SPEC_FILES = ('openapi.yaml', 'openapi.yml', 'openapi.json', 'swagger.yaml', 'swagger.yml', 'swagger.json')
+HTTP_METHODS = ('get', 'put', 'post', 'delete', 'options', 'head', 'patch', 'trace')
+PARAMETER_LOCATIONS = ('query', 'header', 'path', 'cookie', 'body', 'formData')
+
+# libyaml parses straight from the stream, several times faster than the pure Python loader
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Bump when the cached entry format changes
+SPEC_FORMAT = 1
+
+# Parsed specs kept in memory
+DEFAULT_MAXSIZE = 16
+
+# (JSON pointer of the unit, message)
+SpecIssue = Tuple[str, str]
+
+
+def is_spec_file(path: str) -> bool:
+    """Whether a path is an OpenAPI or Swagger document by its name."""
+    return os.path.basename(path).lower() in SPEC_FILES
+
+
+def load_spec(stream: BinaryIO, path: str) -> Any:
+    """
+    Parse a spec from a binary stream, without reading it into memory first.
+
+    Raises:
+        ValueError: If the document is not valid JSON or YAML
+    """
+    try:
+        if path.lower().endswith('.json'):
+            return json.load(stream)
+        return yaml.load(stream, Loader=SafeLoader)
+    except yaml.YAMLError as e:
+        raise ValueError(str(e)) from e
+
+
+def normalize(value: Any) -> Any:
+    """Make a parsed document JSON-safe: string keys (YAML reads `200:` as an int), ISO dates."""
+    if isinstance(value, dict):
+        return {str(key): normalize(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [normalize(item) for item in value]
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+def pointer(*parts: str) -> str:
+    """Build a JSON pointer in the `#/...` form used by $ref."""
+    return '#/' + '/'.join(part.replace('~', '~0').replace('/', '~1') for part in parts)
+
+
+def pointer_parts(ref: str) -> List[str]:
+    """Split a `#/...` JSON pointer into its unescaped parts."""
+    return [part.replace('~1', '/').replace('~0', '~') for part in ref[2:].split('/')] if ref != '#' else []
+
+
+def resolve(spec: Any, ref: str) -> Any:
+    """Return the node a local $ref points to, or None if it does not exist."""
+    node = spec
+    for part in pointer_parts(ref):
+        if isinstance(node, dict) and part in node:
+            node = node[part]
+        elif isinstance(node, list) and part.isdigit() and int(part) < len(node):
+            node = node[int(part)]
+        else:
+            return None
+    return node
+
+
+def spec_units(spec: Any) -> Dict[str, Any]:
+    """
+    Split a spec into the units that are diffed and validated on their own.
+
+    Units are the document header, each path item's shared fields, each
+    operation and each reusable component, keyed by JSON pointer.
+    """
+    if not isinstance(spec, dict):
+        return {}
+    units: Dict[str, Any] = {'#/info': {key: spec.get(key) for key in ('openapi', 'swagger', 'info')}}
+    for path, item in (spec.get('paths') or {}).items():
+        if not isinstance(item, dict):
+            units[pointer('paths', path)] = item
+            continue
+        units[pointer('paths', path)] = {key: value for key, value in item.items() if key not in HTTP_METHODS}
+        for method in HTTP_METHODS:
+            if method in item:
+                units[pointer('paths', path, method)] = item[method]
+    for name, schema in (spec.get('definitions') or {}).items():
+        units[pointer('definitions', name)] = schema
+    for kind, components in (spec.get('components') or {}).items():
+        if isinstance(components, dict):
+            for name, component in components.items():
+                units[pointer('components', kind, name)] = component
+    return units
+
+
+def unit_hash(unit: Any) -> str:
+    """Hash a unit's canonical JSON form."""
+    return hashlib.sha1(json.dumps(unit, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+
+
+def describe(unit: str) -> str:
+    """Name a unit for messages: `GET /pets/{id}`, `schema Pet`, `path /pets`."""
+    parts = pointer_parts(unit)
+    if parts[:1] == ['paths']:
+        return f"{parts[2].upper()} {parts[1]}" if len(parts) == 3 else f"path {parts[1]}"
+    if parts[:2] == ['components', 'schemas'] or parts[:1] == ['definitions']:
+        return f"schema {parts[-1]}"
+    if parts[:1] == ['components']:
+        return f"{parts[1]} {parts[-1]}"
+    return 'document info'
+
+
+class ParsedSpec:
+    """A parsed spec with the hashes of its units."""
+
+    __slots__ = ('sha', 'spec', 'units', 'hashes', 'error')
+
+    def __init__(self, sha: Optional[str], spec: Any, hashes: Optional[Dict[str, str]] = None,
+                 error: Optional[str] = None):
+        self.sha = sha
+        self.spec = spec
+        self.units = spec_units(spec)
+        self.hashes = hashes if hashes is not None else {unit: unit_hash(value)
+                                                         for unit, value in self.units.items()}
+        self.error = error
+
+
+class SpecCache:
+    """
+    Parsed specs keyed by git blob SHA.
+
+    Specs are kept in memory and, with a cache directory, at
+    `<cache_dir>/openapi/<sha>.json` together with their unit hashes, so a
+    base revision is parsed once across runs. Parse errors are not cached.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, maxsize: int = DEFAULT_MAXSIZE):
+        self.directory = os.path.join(cache_dir, 'openapi') if cache_dir else None
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._specs: 'OrderedDict[str, ParsedSpec]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sha: Optional[str], path: str,
+            open_stream: Callable[[], ContextManager[BinaryIO]]) -> ParsedSpec:
+        """
+        Return the parsed spec of a blob, parsing it on a miss.
+
+        Args:
+            sha: Blob SHA of the document; it is parsed without caching if None
+            path: Path of the document, which decides JSON or YAML
+            open_stream: Opens the document as a binary stream
+
+        Returns:
+            ParsedSpec, with error set when the document cannot be read or parsed
+        """
+        if sha is not None:
+            with self._lock:
+                if sha in self._specs:
+                    self._specs.move_to_end(sha)
+                    self.hits += 1
+                    return self._specs[sha]
+            parsed = self._read(sha)
+            if parsed is not None:
+                self.hits += 1
+                self._remember(parsed)
+                return parsed
+        self.misses += 1
+        try:
+            with open_stream() as stream:
+                parsed = ParsedSpec(sha, normalize(load_spec(stream, path)))
+        except (OSError, ValueError) as e:
+            return ParsedSpec(sha, None, {}, f"Could not parse {path}: {e}")
+        if sha is not None:
+            self._remember(parsed)
+            self._write(parsed)
+        return parsed
+
+    def _remember(self, parsed: ParsedSpec) -> None:
+        with self._lock:
+            self._specs[parsed.sha] = parsed
+            while len(self._specs) > self.maxsize:
+                self._specs.popitem(last=False)
+
+    def _read(self, sha: str) -> Optional[ParsedSpec]:
+        if self.directory is None:
+            return None
+        try:
+            with open(os.path.join(self.directory, f"{sha}.json")) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get('format') != SPEC_FORMAT:
+            return None
+        return ParsedSpec(sha, data.get('spec'), data.get('hashes'))
+
+    def _write(self, parsed: ParsedSpec) -> None:
+        if self.directory is None:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'format': SPEC_FORMAT, 'spec': parsed.spec, 'hashes': parsed.hashes}, f)
+            os.replace(tmp_path, os.path.join(self.directory, f"{parsed.sha}.json"))
+        except OSError as e:
+            print(f"Could not cache the parsed spec: {e}")
+
+
+def base_blob_sha(base_sha: str, path: str, repo_path: str = '.') -> Optional[str]:
+    """Return the blob SHA of a file at a commit, or None if it did not exist."""
+    result = subprocess.run(['git', 'ls-tree', base_sha, '--', path], capture_output=True,
+                            text=True, cwd=repo_path)
+    fields = result.stdout.split()
+    return fields[2] if result.returncode == 0 and len(fields) >= 3 and fields[1] == 'blob' else None
+
+
+@contextmanager
+def git_blob(sha: str, repo_path: str = '.') -> Iterator[BinaryIO]:
+    """Stream a blob from git."""
+    process = subprocess.Popen(['git', 'cat-file', 'blob', sha], stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, cwd=repo_path)
+    try:
+        yield process.stdout
+    finally:
+        process.stdout.close()
+        if process.wait() != 0:
+            raise OSError(f"git cat-file failed for {sha}")
+
+
+class SpecDiff:
+    """Units added, removed and changed between two revisions of a spec."""
+
+    def __init__(self, base: Optional[ParsedSpec], head: ParsedSpec):
+        base_hashes = base.hashes if base is not None else {}
+        self.added = sorted(unit for unit in head.hashes if unit not in base_hashes)
+        self.removed = sorted(unit for unit in base_hashes if unit not in head.hashes)
+        self.changed = sorted(unit for unit, digest in head.hashes.items()
+                              if unit in base_hashes and base_hashes[unit] != digest)
+
+
+def _schema_type(schema: Any) -> Any:
+    return schema.get('type') if isinstance(schema, dict) else None
+
+
+def _deref(spec: Any, node: Any) -> Any:
+    # Follow one level of $ref; schemas that are themselves refs compare by name
+    if isinstance(node, dict) and isinstance(node.get('$ref'), str) and node['$ref'].startswith('#/'):
+        return resolve(spec, node['$ref'])
+    return node
+
+
+def _compare_schemas(base: Any, head: Any, where: str, issues: List[str], depth: int = 0) -> None:
+    if not isinstance(base, dict) or not isinstance(head, dict) or depth > 8:
+        return
+    if '$ref' in base or '$ref' in head:
+        if base.get('$ref') != head.get('$ref'):
+            issues.append(f"{where} now references {head.get('$ref') or 'an inline schema'} "
+                          f"instead of {base.get('$ref') or 'an inline schema'}")
+        return
+    if _schema_type(base) and _schema_type(head) and _schema_type(base) != _schema_type(head):
+        issues.append(f"{where} changed type from {_schema_type(base)} to {_schema_type(head)}")
+        return
+    removed_values = [value for value in base.get('enum') or () if value not in (head.get('enum') or ())]
+    if head.get('enum') is not None and removed_values:
+        issues.append(f"{where} no longer allows {', '.join(map(str, removed_values))}")
+    base_properties = base.get('properties') or {}
+    head_properties = head.get('properties') or {}
+    for name in base_properties:
+        if name not in head_properties:
+            issues.append(f"{where} property {name} was removed")
+    newly_required = set(head.get('required') or ()) - set(base.get('required') or ())
+    for name in sorted(newly_required):
+        issues.append(f"{where} property {name} is now required")
+    for name, prop in head_properties.items():
+        if name in base_properties:
+            _compare_schemas(base_properties[name], prop, f"{where}.{name}", issues, depth + 1)
+    if 'items' in base and 'items' in head:
+        _compare_schemas(base['items'], head['items'], f"{where}[]", issues, depth + 1)
+
+
+def _parameters(spec: Any, node: Any) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    parameters = {}
+    for parameter in (node.get('parameters') or []) if isinstance(node, dict) else []:
+        parameter = _deref(spec, parameter)
+        if isinstance(parameter, dict) and 'name' in parameter:
+            parameters[(str(parameter.get('in')), str(parameter['name']))] = parameter
+    return parameters
+
+
+def _compare_operations(base_spec: Any, base: Any, head_spec: Any, head: Any, issues: List[str]) -> None:
+    base_params = _parameters(base_spec, base)
+    for key, parameter in _parameters(head_spec, head).items():
+        before = base_params.get(key)
+        label = f"{key[0]} parameter {key[1]}"
+        if before is None:
+            if parameter.get('required'):
+                issues.append(f"new required {label}")
+            continue
+        if parameter.get('required') and not before.get('required'):
+            issues.append(f"{label} is now required")
+        _compare_schemas(_deref(base_spec, before.get('schema')), _deref(head_spec, parameter.get('schema')),
+                         label, issues)
+    if not isinstance(base, dict) or not isinstance(head, dict):
+        return
+    base_body = _deref(base_spec, base.get('requestBody')) or {}
+    head_body = _deref(head_spec, head.get('requestBody')) or {}
+    if head_body.get('required') and not base_body.get('required'):
+        issues.append("request body is now required")
+    for media, content in (head_body.get('content') or {}).items():
+        before = (base_body.get('content') or {}).get(media)
+        if isinstance(before, dict) and isinstance(content, dict):
+            _compare_schemas(before.get('schema'), content.get('schema'), f"request body ({media})", issues)
+    base_responses = base.get('responses') or {}
+    head_responses = head.get('responses') or {}
+    for code in base_responses:
+        if str(code).startswith('2') and code not in head_responses:
+            issues.append(f"{code} response was removed")
+    for code, response in head_responses.items():
+        before = _deref(base_spec, base_responses.get(code))
+        response = _deref(head_spec, response)
+        if isinstance(before, dict) and isinstance(response, dict):
+            for media, content in (response.get('content') or {}).items():
+                previous = (before.get('content') or {}).get(media)
+                if isinstance(previous, dict) and isinstance(content, dict):
+                    _compare_schemas(previous.get('schema'), content.get('schema'),
+                                     f"{code} response ({media})", issues)
+    if head.get('security') and not base.get('security'):
+        issues.append("now requires authentication")
+
+
+def breaking_changes(base: ParsedSpec, head: ParsedSpec, diff: SpecDiff) -> List[SpecIssue]:
+    """
+    Find the changes from base to head that can break existing clients.
+
+    Only units in the diff are compared; shared parameters and schemas are
+    compared on their own unit, where they changed.
+
+    Returns:
+        (unit, message) pairs
+    """
+    issues: List[SpecIssue] = []
+    for unit in diff.removed:
+        parts = pointer_parts(unit)
+        if (parts[:1] == ['paths'] and len(parts) == 3) or parts[:2] == ['components', 'schemas'] \
+                or parts[:1] == ['definitions']:
+            issues.append((unit, f"{describe(unit)} was removed"))
+    for unit in diff.changed:
+        parts = pointer_parts(unit)
+        found: List[str] = []
+        if parts[:2] == ['components', 'schemas'] or parts[:1] == ['definitions']:
+            # Schema messages already start with the schema's name
+            _compare_schemas(base.units[unit], head.units[unit], describe(unit), found)
+            issues.extend((unit, message) for message in found)
+            continue
+        if parts[:1] == ['paths']:
+            _compare_operations(base.spec, base.units[unit], head.spec, head.units[unit], found)
+        elif parts[:2] == ['components', 'parameters']:
+            _compare_operations(base.spec, {'parameters': [base.units[unit]]},
+                                head.spec, {'parameters': [head.units[unit]]}, found)
+        issues.extend((unit, f"{describe(unit)}: {message}") for message in found)
+    return issues
+
+
+def _refs(node: Any) -> Iterator[str]:
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            ref = item.get('$ref')
+            if isinstance(ref, str):
+                yield ref
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+
+
+def validate_units(head: ParsedSpec, units: List[str]) -> List[SpecIssue]:
+    """
+    Validate the given units of a spec.
+
+    Checks the document header, that path templates declare their path
+    parameters, that operations have responses and unique operationIds,
+    that parameters have a name and a known location, that required
+    properties exist and that local $refs resolve.
+
+    Returns:
+        (unit, message) pairs
+    """
+    spec = head.spec
+    issues: List[SpecIssue] = []
+    operation_ids: Dict[str, List[str]] = {}
+    for unit, value in head.units.items():
+        if isinstance(value, dict) and isinstance(value.get('operationId'), str) and len(pointer_parts(unit)) == 3 \
+                and unit.startswith('#/paths/'):
+            operation_ids.setdefault(value['operationId'], []).append(unit)
+
+    for unit in units:
+        value = head.units.get(unit)
+        parts = pointer_parts(unit)
+        name = describe(unit)
+        if unit == '#/info':
+            version = str(value.get('openapi') or value.get('swagger') or '')
+            if not (version.startswith('3.') or version == '2.0'):
+                issues.append((unit, "Document must declare `openapi: 3.x` or `swagger: '2.0'`"))
+            info = value.get('info')
+            if not isinstance(info, dict) or not info.get('title') or not info.get('version'):
+                issues.append((unit, "info.title and info.version are required"))
+            continue
+        if not isinstance(value, dict):
+            issues.append((unit, f"{name} must be an object"))
+            continue
+        if parts[:1] == ['paths'] and len(parts) == 2 and not parts[1].startswith('/'):
+            issues.append((unit, f"{name} must start with /"))
+        if parts[:1] == ['paths'] and len(parts) == 3:
+            if not value.get('responses'):
+                issues.append((unit, f"{name} has no responses"))
+            operation_id = value.get('operationId')
+            if isinstance(operation_id, str) and len(operation_ids.get(operation_id, ())) > 1:
+                issues.append((unit, f"{name} reuses operationId {operation_id}"))
+            declared = _parameters(spec, resolve(spec, pointer('paths', parts[1])))
+            declared.update(_parameters(spec, value))
+            template = [segment[1:-1] for segment in parts[1].split('/')
+                        if segment.startswith('{') and segment.endswith('}')]
+            for parameter in template:
+                if ('path', parameter) not in declared:
+                    issues.append((unit, f"{name} does not declare path parameter {parameter}"))
+                elif not declared[('path', parameter)].get('required'):
+                    issues.append((unit, f"{name} path parameter {parameter} must be required"))
+        if parts[:1] == ['paths'] or parts[:2] == ['components', 'parameters']:
+            parameters = value.get('parameters') or [] if parts[:1] == ['paths'] else [value]
+            for parameter in parameters:
+                parameter = _deref(spec, parameter)
+                if isinstance(parameter, dict) and (not parameter.get('name')
+                                                    or parameter.get('in') not in PARAMETER_LOCATIONS):
+                    issues.append((unit, f"{name} has a parameter without a name or a valid `in`"))
+        if parts[:2] == ['components', 'schemas'] or parts[:1] == ['definitions']:
+            properties = value.get('properties')
+            if isinstance(properties, dict):
+                missing = [prop for prop in value.get('required') or () if prop not in properties]
+                if missing:
+                    issues.append((unit, f"{name} requires undefined properties {', '.join(map(str, missing))}"))
+        unresolved: Set[str] = {ref for ref in _refs(value) if ref.startswith('#') and resolve(spec, ref) is None}
+        for ref in sorted(unresolved):
+            issues.append((unit, f"{name} references missing {ref}"))
+    return issues
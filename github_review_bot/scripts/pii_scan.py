@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Script to find personal data in the lines a pull request adds.
+"""
+
+import ipaddress
+import itertools
+import os
+import re
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from .changed_files import ChangedFiles
+from .diff_index import UnpatchedAddedLines, iter_added_lines
+from .findings import Finding
+from .secret_scan import SKIPPED_FILES, redact
+from .tool_executor import process_pool_context
+
+# Kinds of personal data: (rule, description, severity, trigger, pattern)
+PII_RULES: Sequence[Tuple[str, str, str, str, str]] = (
+    ('email', 'email address', 'warning', 'at',
+     r'(?<![\w.%+-])[A-Za-z0-9._%+-]{1,64}@(?:[A-Za-z0-9-]{1,63}\.)+[A-Za-z]{2,24}\b'),
+    ('phone-number', 'phone number', 'warning', 'digits',
+     r'(?<![\w+])\+[1-9]\d{7,14}\b|(?<![\w(])\(?[2-9]\d{2}\)?[-. ][2-9]\d{2}[-. ]\d{4}\b'),
+    ('us-ssn', 'US social security number', 'error', 'digits',
+     r'\b(?!000|666|9\d\d)\d{3}-(?!00)\d{2}-(?!0000)\d{4}\b'),
+    ('uk-nino', 'UK national insurance number', 'error', 'digits',
+     r'\b(?!BG|GB|KN|NK|NT|TN|ZZ)[A-CEGHJ-PR-TW-Z][A-CEGHJ-NPR-TW-Z] ?\d{2} ?\d{2} ?\d{2} ?[A-D]\b'),
+    ('card-number', 'payment card number', 'error', 'digits',
+     r'(?<![\w.-])(?:\d[ -]?){12,18}\d(?![\w.-])'),
+    ('ip-address', 'public IP address', 'warning', 'digits',
+     r'(?<![\w.])(?:(?:25[0-5]|2[0-4]\d|1?\d?\d)\.){3}(?:25[0-5]|2[0-4]\d|1?\d?\d)(?![\w.])'),
+    ('ip-address', 'public IP address', 'warning', 'colons',
+     r'(?<![\w:])(?:[0-9A-Fa-f]{1,4}:){7}[0-9A-Fa-f]{1,4}(?![\w:])'
+     r'|(?<![\w:])(?:[0-9A-Fa-f]{1,4}:){1,6}:(?:[0-9A-Fa-f]{1,4}(?::[0-9A-Fa-f]{1,4}){0,5})?(?![\w:])'),
+)
+
+# At least six digits with separators: the shortest phone number, SSN,
+# national insurance number, card number or IPv4 address
+DIGIT_RUN = re.compile(r'\d[\d .()/-]{4,}\d')
+
+# Characters around a digit run that a pattern may also need, such as
+# the `(` of a phone number or the letters of a national insurance number
+DIGIT_CONTEXT = 3
+
+
+def _whole_line(text: str, needle: str) -> List[Tuple[int, int]]:
+    return [(0, len(text))] if needle in text else []
+
+
+def _digit_windows(text: str) -> List[Tuple[int, int]]:
+    windows: List[Tuple[int, int]] = []
+    for run in DIGIT_RUN.finditer(text):
+        start = max(run.start() - DIGIT_CONTEXT, windows[-1][1] if windows else 0)
+        windows.append((start, min(run.end() + DIGIT_CONTEXT, len(text))))
+    return windows
+
+
+def _colon_windows(text: str) -> List[Tuple[int, int]]:
+    return [(0, len(text))] if '::' in text or text.count(':') >= 7 else []
+
+
+# Characters without which no trigger returns a span, searched once
+# over a whole chunk
+CANDIDATE = re.compile(r'[@:\d](?:(?<=@)|(?<=:)(?::|[0-9A-Fa-f]{1,4}:)|(?<=\d)[\d .()/-]{4,}\d)')
+
+# Cheap scans run on candidate lines, returning the spans a rule's pattern
+# must search; most source lines have none, and skip the patterns
+TRIGGERS: Dict[str, Callable[[str], List[Tuple[int, int]]]] = {
+    'at': lambda text: _whole_line(text, '@'),
+    'digits': _digit_windows,
+    'colons': _colon_windows,
+}
+
+# Domains reserved for documentation and tests (RFC 2606, RFC 6761)
+ALLOWED_EMAIL_DOMAINS = ('example.com', 'example.org', 'example.net', 'test', 'example',
+                         'invalid', 'localhost', 'users.noreply.github.com')
+
+# Card numbers published by payment providers for testing
+TEST_CARD_NUMBERS = frozenset((
+    '4111111111111111', '4242424242424242', '4000056655665556', '4012888888881881',
+    '5555555555554444', '5105105105105100', '2223003122003222', '378282246310005',
+    '371449635398431', '6011111111111117', '3056930009020004', '36227206271667',
+    '3566002020360505', '6200000000000005',
+))
+
+# Marker that allows a line of deliberate sample data
+ALLOW_MARKER = 'pragma: allowlist pii'
+
+# Bytes of added lines handed to a worker at a time
+CHUNK_BYTES = 1 << 20
+
+# Chunks queued per worker, so memory stays bounded on huge diffs
+CHUNKS_IN_FLIGHT = 2
+
+# (path, line number, text) of one added line
+Line = Tuple[str, int, str]
+
+
+def luhn_valid(digits: str) -> bool:
+    """Whether a string of digits passes the Luhn checksum of card numbers."""
+    total = 0
+    for i, digit in enumerate(reversed(digits)):
+        value = ord(digit) - 48
+        if i % 2:
+            value *= 2
+            if value > 9:
+                value -= 9
+        total += value
+    return total % 10 == 0
+
+
+def _valid_email(value: str) -> bool:
+    domain = value.rsplit('@', 1)[1].lower()
+    return not any(domain == allowed or domain.endswith('.' + allowed) for allowed in ALLOWED_EMAIL_DOMAINS)
+
+
+def _valid_phone(value: str) -> bool:
+    # Fictional 555-01xx numbers, and runs of one digit
+    digits = re.sub(r'\D', '', value)
+    return '55501' not in digits and len(set(digits)) > 2
+
+
+def _valid_card(value: str) -> bool:
+    digits = value.replace(' ', '').replace('-', '')
+    return (13 <= len(digits) <= 19 and digits[0] in '23456' and digits not in TEST_CARD_NUMBERS
+            and len(set(digits)) > 2 and luhn_valid(digits))
+
+
+def _valid_ip(value: str) -> bool:
+    # Private, loopback and documentation ranges are not personal data
+    try:
+        return ipaddress.ip_address(value).is_global
+    except ValueError:
+        return False
+
+
+# Second-stage checks that cut false positives of the patterns
+VALIDATORS: Dict[str, Callable[[str], bool]] = {
+    'email': _valid_email,
+    'phone-number': _valid_phone,
+    'card-number': _valid_card,
+    'ip-address': _valid_ip,
+}
+
+
+class PIIScanner:
+    """
+    Finds personal data line by line.
+
+    Patterns sharing a trigger are combined into one regular expression
+    compiled once, and only search the spans of a line its trigger
+    returns. Each
+    candidate is then confirmed by its validator (Luhn checksum for card
+    numbers, global address ranges for IPs, non-reserved domains for
+    emails) before it is reported.
+    """
+
+    def __init__(self, allowlist: Sequence[str] = ()):
+        """
+        Args:
+            allowlist: Regular expressions of values never reported, e.g.
+                `support@mycompany\\.com`; each must match a whole value
+
+        Raises:
+            TypeError: If allowlist is a string instead of a sequence
+        """
+        if isinstance(allowlist, str):
+            raise TypeError(f"allowlist must be a sequence of patterns, got {type(allowlist)}")
+        self.allowlist = tuple(allowlist)
+        self._rules = {f"r{i}": (rule, description, severity)
+                       for i, (rule, description, severity, _, _) in enumerate(PII_RULES)}
+        self._groups = [
+            (TRIGGERS[trigger], re.compile('|'.join(f"(?P<r{i}>{pattern})"
+                                                   for i, (_, _, _, t, pattern) in enumerate(PII_RULES)
+                                                   if t == trigger)))
+            for trigger in dict.fromkeys(t for _, _, _, t, _ in PII_RULES)
+        ]
+        self._allowed = re.compile('|'.join(f"(?:{pattern})" for pattern in self.allowlist)) \
+            if self.allowlist else None
+
+    def scan_line(self, text: str) -> Iterator[Tuple[str, str, str, int, str]]:
+        """
+        Find the personal data on one line.
+
+        Yields:
+            (rule, description, severity, column, value) per match
+        """
+        if ALLOW_MARKER in text:
+            return
+        for trigger, pattern in self._groups:
+            for start, end in trigger(text):
+                for match in pattern.finditer(text, start, end):
+                    rule, description, severity = self._rules[match.lastgroup]
+                    value = match.group()
+                    validator = VALIDATORS.get(rule)
+                    if validator is not None and not validator(value):
+                        continue
+                    if self._allowed is not None and self._allowed.fullmatch(value):
+                        continue
+                    yield rule, description, severity, match.start() + 1, value
+
+    def scan_chunk(self, chunk: Sequence[Line]) -> Iterator[Finding]:
+        """
+        Scan a chunk of added lines.
+
+        The chunk is searched as one text for any trigger character, so
+        only the few lines that may hold personal data are scanned one by
+        one.
+
+        Args:
+            chunk: (path, line number, text) triples
+
+        Yields:
+            Finding per match, with the value redacted
+        """
+        text = '\n'.join(line[2] for line in chunk)
+        index = 0
+        position = 0
+        candidate = CANDIDATE.search(text)
+        while candidate is not None:
+            index += text.count('\n', position, candidate.start())
+            path, number, line = chunk[index]
+            for rule, description, severity, column, value in self.scan_line(line):
+                yield Finding('pii', rule, severity, path, number, column,
+                              f"Possible {description} ({redact(value)}) added; use synthetic data or "
+                              f"add it to data_privacy.allowlist")
+            # Continue on the next line
+            position = text.find('\n', candidate.start())
+            if position < 0:
+                break
+            candidate = CANDIDATE.search(text, position + 1)
+
+
+def iter_chunks(changed_files: ChangedFiles, chunk_bytes: int = CHUNK_BYTES) -> Iterator[List[Line]]:
+    """
+    Stream the added lines of a pull request in chunks of about chunk_bytes.
+
+    Patches are read line by line, so a chunk may hold the end of one file
+    and the start of the next, and a huge patch spans several chunks.
+    Files without a patch are read from the checkout when they are new;
+    for other files the added lines come from a git diff against the
+    merge-base.
+    """
+    chunk: List[Line] = []
+    size = 0
+    unpatched = UnpatchedAddedLines(changed_files)
+    for changed_file in changed_files:
+        if os.path.basename(changed_file.path) in SKIPPED_FILES or changed_file.status == 'removed':
+            continue
+        if changed_file.patch is not None:
+            lines: Iterable[Tuple[int, str]] = iter_added_lines(changed_file.patch)
+        elif changed_file.status == 'added':
+            lines = _read_lines(os.path.join(changed_files.repo_path, changed_file.path))
+        else:
+            unpatched_lines = unpatched.get(changed_file.path)
+            if unpatched_lines is None:
+                print(f"No diff for {changed_file.path}, skipping its personal data scan")
+                continue
+            lines = unpatched_lines
+        for number, text in lines:
+            chunk.append((changed_file.path, number, text))
+            size += len(text) + 1
+            if size >= chunk_bytes:
+                yield chunk
+                chunk, size = [], 0
+    if chunk:
+        yield chunk
+
+
+def _read_lines(path: str) -> Iterator[Tuple[int, str]]:
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            for number, text in enumerate(f, 1):
+                yield number, text.rstrip('\n')
+    except OSError:
+        return
+
+
+# Scanner of a worker process, built once by _init_worker
+_worker_scanner: Optional[PIIScanner] = None
+
+
+def _init_worker(allowlist: Sequence[str]) -> None:
+    global _worker_scanner
+    _worker_scanner = PIIScanner(allowlist)
+
+
+def _scan_chunk(chunk: List[Line]) -> List[Tuple]:
+    # Tuples pickle faster than Finding objects on the way back
+    return [finding.as_tuple() for finding in _worker_scanner.scan_chunk(chunk)]
+
+
+def scan_changed_files(changed_files: ChangedFiles, allowlist: Sequence[str] = (),
+                       max_workers: Optional[int] = None,
+                       chunk_bytes: int = CHUNK_BYTES,
+                       cancel: Optional[threading.Event] = None) -> List[Finding]:
+    """
+    Scan the lines added by a pull request for personal data.
+
+    Added lines are cut into fixed-size chunks that worker processes scan
+    in parallel, with a bounded number of chunks in flight. A diff that
+    fits in one chunk is scanned in this process, without starting a pool.
+
+    Args:
+        changed_files: Index of the files changed by the PR
+        allowlist: Regular expressions of values never reported
+        max_workers: Worker processes (default: CPU count)
+        chunk_bytes: Bytes of added lines per chunk
+        cancel: Event that stops the scan before the next chunk
+
+    Returns:
+        Findings sorted by location; those of the chunks scanned so far
+        when cancelled
+
+    Raises:
+        TypeError: If changed_files is not a ChangedFiles index
+    """
+    if not isinstance(changed_files, ChangedFiles):
+        raise TypeError(f"changed_files must be a ChangedFiles index, got {type(changed_files)}")
+
+    def cancelled() -> bool:
+        return cancel is not None and cancel.is_set()
+
+    chunks = iter_chunks(changed_files, chunk_bytes)
+    first = next(chunks, None)
+    if first is None:
+        return []
+    second = next(chunks, None)
+    workers = max_workers or os.cpu_count() or 1
+    if second is None or workers == 1:
+        scanner = PIIScanner(allowlist)
+        findings = []
+        for chunk in itertools.chain((first, second or []), chunks):
+            if cancelled():
+                break
+            findings.extend(scanner.scan_chunk(chunk))
+        return sorted(findings, key=Finding.sort_key)
+
+    findings = []
+    with ProcessPoolExecutor(workers, mp_context=process_pool_context(), initializer=_init_worker,
+                             initargs=(tuple(allowlist),)) as pool:
+        pending = {pool.submit(_scan_chunk, first), pool.submit(_scan_chunk, second)}
+        for chunk in chunks:
+            if cancelled():
+                break
+            if len(pending) >= workers * CHUNKS_IN_FLIGHT:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    findings.extend(Finding.from_tuple(values) for values in future.result())
+            pending.add(pool.submit(_scan_chunk, chunk))
+        for future in pending:
+            # Chunks not started yet are dropped after a cancel
+            if cancelled() and future.cancel():
+                continue
+            findings.extend(Finding.from_tuple(values) for values in future.result())
+    return sorted(findings, key=Finding.sort_key)
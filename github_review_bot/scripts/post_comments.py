@@ -7,6 +7,7 @@ import os
 import sys
 from typing import Optional, Dict, Any
 from github import Github, PullRequest
+from .generate_review import format_issue, group_issues
 
 def post_comments(pr: PullRequest, analysis_results: Dict[str, Any]) -> bool:
     """
@@ -32,12 +33,15 @@ def post_comments(pr: PullRequest, analysis_results: Dict[str, Any]) -> bool:
         # Extract issues from analysis results
         issues = analysis_results.get('issues', [])
         
-        # Post each issue as a separate comment
-        for issue in issues:
-            comment = f"**{issue.get('tool', 'Analysis')} Issue:**\n\n```\n{issue.get('output', '')}\n```"
-            pr.create_issue_comment(comment)
+        # Post findings as one comment per tool
+        posted = 0
+        for group, group_issues_list in group_issues(issues).items():
+            lines = [f"**{group.title()} Issues:**", ""]
+            lines.extend(f"- {format_issue(issue)}" for issue in group_issues_list)
+            pr.create_issue_comment("\n".join(lines))
+            posted += 1
         
-        print(f"Posted {len(issues)} review comments successfully")
+        print(f"Posted {posted} review comments successfully")
         return True
     except Exception as e:
         print(f"Error posting review comments: {e}")
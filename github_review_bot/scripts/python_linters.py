@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Script to run flake8, black and bandit in-process instead of as subprocesses.
+"""
+
+import dataclasses
+import io
+import os
+import threading
+import tokenize
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Optional
+from .findings import Finding, black_finding, flake8_finding, parse_bandit_results
+from .tool_executor import ToolResult
+
+# Python linter backends accepted in `python.backend`
+BACKEND_SUBPROCESS = 'subprocess'
+BACKEND_INPROCESS = 'inprocess'
+BACKENDS = (BACKEND_SUBPROCESS, BACKEND_INPROCESS)
+
+# Exit status black uses when a file cannot be parsed
+BLACK_ERROR_STATUS = 123
+
+_flake8 = threading.local()
+_black_modes: Dict[Optional[str], Any] = {}
+
+
+def _black_mode(paths: List[str]) -> Any:
+    """Build black's Mode from the pyproject.toml black itself would use."""
+    import black
+
+    config_path = black.find_pyproject_toml(tuple(paths))
+    if config_path not in _black_modes:
+        config = black.parse_pyproject_toml(config_path) if config_path else {}
+        _black_modes[config_path] = black.Mode(
+            target_versions={black.TargetVersion[v.upper()] for v in config.get('target_version', [])},
+            line_length=config.get('line_length', black.DEFAULT_LINE_LENGTH),
+            string_normalization=not config.get('skip_string_normalization', False),
+            magic_trailing_comma=not config.get('skip_magic_trailing_comma', False),
+            preview=config.get('preview', False)
+        )
+    return _black_modes[config_path]
+
+
+def _is_set(cancel: Optional[threading.Event]) -> bool:
+    return cancel is not None and cancel.is_set()
+
+
+def black_check(paths: List[str], cancel: Optional[threading.Event] = None) -> ToolResult:
+    """
+    Run the equivalent of `black --check` on file contents in memory.
+
+    Args:
+        paths: Files to check
+        cancel: Event that stops the check before the next file
+
+    Returns:
+        ToolResult with exit status 0 (nothing to do), 1 (files would be
+        reformatted) or 123 (a file could not be parsed), like black's CLI;
+        cancelled if the event was set
+    """
+    import black
+
+    mode = _black_mode(paths)
+    findings: List[Finding] = []
+    errors: List[str] = []
+    for path in paths:
+        if _is_set(cancel):
+            return ToolResult('black', cancelled=True)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Decode the way black does: PEP 263 encoding, universal newlines
+            encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+            source = io.TextIOWrapper(io.BytesIO(data), encoding).read()
+            black.format_file_contents(source, fast=False,
+                                       mode=dataclasses.replace(mode, is_pyi=path.endswith('.pyi')))
+        except black.NothingChanged:
+            continue
+        except Exception as e:
+            errors.append(f"error: cannot format {path}: {e}")
+            continue
+        findings.append(black_finding(path))
+    returncode = BLACK_ERROR_STATUS if errors else (1 if findings else 0)
+    return ToolResult('black', returncode=returncode, stderr='\n'.join(errors), findings=findings)
+
+
+def _flake8_app() -> Any:
+    """
+    Return this thread's flake8 application, initialized once per working
+    directory so option parsing and plugin discovery are paid only once.
+    """
+    from flake8.main.application import Application
+
+    cwd = os.getcwd()
+    if getattr(_flake8, 'cwd', None) != cwd:
+        app = Application()
+        # Run checks on this thread; in-process shards share the GIL, so they
+        # overlap only on file I/O (use the subprocess backend for CPU parallelism)
+        app.initialize(['--jobs=1'])
+        _flake8.app = app
+        _flake8.cwd = cwd
+    return _flake8.app
+
+
+def flake8_check(paths: List[str], cancel: Optional[threading.Event] = None) -> ToolResult:
+    """
+    Run flake8 through its application API.
+
+    Config files, select/ignore, per-file-ignores and noqa comments are
+    applied exactly as the CLI applies them.
+
+    Args:
+        paths: Files to check
+        cancel: Event that stops the check before the next file
+
+    Returns:
+        ToolResult with exit status 1 if any violation was reported;
+        cancelled if the event was set
+    """
+    app = _flake8_app()
+    violations: List[Any] = []
+    app.formatter.handle = violations.append
+    app.catastrophic_failure = False
+    # One file per checker run, so a cancel is seen between files
+    for path in paths:
+        if _is_set(cancel):
+            return ToolResult('flake8', cancelled=True)
+        app.options.filenames = [path]
+        app.make_file_checker_manager([])
+        app.run_checks()
+        app.report_errors()
+    findings = [flake8_finding(v.filename, v.line_number, v.column_number, v.code, v.text)
+                for v in violations]
+    return ToolResult('flake8', returncode=1 if findings or app.catastrophic_failure else 0,
+                      findings=findings)
+
+
+def bandit_check(paths: List[str], cancel: Optional[threading.Event] = None) -> ToolResult:
+    """
+    Run bandit through its manager with the CLI's default profile.
+
+    Args:
+        paths: Files to check
+        cancel: Event that stops the check before the next file
+
+    Returns:
+        ToolResult with exit status 1 if any issue was reported; cancelled
+        if the event was set
+    """
+    from bandit.core import config as bandit_config
+    from bandit.core import constants, manager
+
+    bandit_manager = manager.BanditManager(bandit_config.BanditConfig(), 'file', quiet=True)
+    bandit_manager.discover_files(list(paths))
+    # Issues accumulate on the manager across runs of one file each
+    for path in bandit_manager.files_list:
+        if _is_set(cancel):
+            return ToolResult('bandit', cancelled=True)
+        bandit_manager.files_list = [path]
+        bandit_manager.run_tests()
+    issues = bandit_manager.get_issue_list(constants.RANKING[0], constants.RANKING[0])
+    # The JSON report lists issues sorted by file
+    results = sorted((issue.as_dict() for issue in issues), key=itemgetter('filename'))
+    findings = list(parse_bandit_results(results))
+    return ToolResult('bandit', returncode=1 if findings else 0, findings=findings)
+
+
+# In-process equivalents of the subprocess Python tools, by tool name
+INPROCESS_CHECKS: Dict[str, Callable[[List[str], Optional[threading.Event]], ToolResult]] = {
+    'flake8': flake8_check,
+    'black': black_check,
+    'bandit': bandit_check
+}
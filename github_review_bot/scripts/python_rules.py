@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Script to check Python files against the thresholds under `rules` with one parse and one traversal per file.
+"""
+
+import ast
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+from .changed_files import ChangedFiles
+from .findings import Finding
+
+# Defaults for the thresholds under `rules`
+DEFAULT_MAX_COMPLEXITY = 10
+DEFAULT_MAX_FUNCTION_LINES = 50
+DEFAULT_MAX_FILE_SIZE_KB = 100
+
+FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+# Nodes without children, plus the strings some nodes list (e.g. Global.names)
+LEAF_NODES = frozenset({ast.Name, ast.Constant, ast.alias, str, type(None)} |
+                       {kind for base in (ast.expr_context, ast.operator, ast.cmpop, ast.boolop, ast.unaryop)
+                        for kind in base.__subclasses__()})
+
+# Nodes that add a path through a function, as radon counts cyclomatic complexity
+BRANCH_NODES = (ast.If, ast.IfExp, ast.For, ast.AsyncFor, ast.While, ast.ExceptHandler, ast.Assert,
+                ast.comprehension) + ((ast.match_case,) if hasattr(ast, 'match_case') else ())
+
+
+class FileContext:
+    """A parsed file, the functions enclosing the node being visited, and the findings so far."""
+
+    __slots__ = ('path', 'source', 'size', 'tree', 'functions', 'findings')
+
+    def __init__(self, path: str, source: str, size: int, tree: ast.Module):
+        self.path = path
+        self.source = source
+        self.size = size
+        self.tree = tree
+        self.functions: List[ast.AST] = []
+        self.findings: List[Finding] = []
+
+    def report(self, rule: str, severity: str, node: Optional[ast.AST], message: str) -> None:
+        """Record a finding at a node, or at the top of the file without one."""
+        line = node.lineno if node is not None else 1
+        column = node.col_offset + 1 if node is not None else 1
+        self.findings.append(Finding('python-rules', rule, severity, self.path, line, column, message))
+
+
+class Rule:
+    """
+    A check run during the shared traversal.
+
+    Subclasses define `visit_<NodeType>(node, context)` to see nodes on the
+    way down and `leave_<NodeType>(node, context)` on the way back up, and
+    may override `check_file` for file-level checks.
+    """
+
+    name = ''
+
+    def check_file(self, context: FileContext) -> None:
+        """Check the file as a whole, before its nodes are visited."""
+
+
+class ComplexityRule(Rule):
+    """Cyclomatic complexity per function: one plus each branch, loop, handler and boolean operator."""
+
+    name = 'complexity'
+
+    def __init__(self, max_complexity: int = DEFAULT_MAX_COMPLEXITY):
+        self.max_complexity = max_complexity
+        self._counts: List[int] = []
+
+    def visit_FunctionDef(self, node: ast.AST, context: FileContext) -> None:
+        self._counts.append(1)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def leave_FunctionDef(self, node: ast.AST, context: FileContext) -> None:
+        complexity = self._counts.pop()
+        if complexity > self.max_complexity:
+            context.report(self.name, 'warning', node,
+                           f"{node.name} has a cyclomatic complexity of {complexity} "
+                           f"(max {self.max_complexity}); split it into smaller functions.")
+
+    leave_AsyncFunctionDef = leave_FunctionDef
+
+    def _branch(self, node: ast.AST, context: FileContext) -> None:
+        if self._counts:
+            self._counts[-1] += 1
+
+    def visit_BoolOp(self, node: ast.BoolOp, context: FileContext) -> None:
+        if self._counts:
+            self._counts[-1] += len(node.values) - 1
+
+
+for _kind in BRANCH_NODES:
+    setattr(ComplexityRule, f"visit_{_kind.__name__}", ComplexityRule._branch)
+
+
+class FunctionLengthRule(Rule):
+    """Lines per function, from the `def` (or first decorator) to the last line of the body."""
+
+    name = 'function-length'
+
+    def __init__(self, max_lines: int = DEFAULT_MAX_FUNCTION_LINES):
+        self.max_lines = max_lines
+
+    def visit_FunctionDef(self, node: ast.AST, context: FileContext) -> None:
+        start = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+        lines = node.end_lineno - start + 1
+        if lines > self.max_lines:
+            context.report(self.name, 'warning', node,
+                           f"{node.name} is {lines} lines long (max {self.max_lines}); "
+                           f"split it into smaller functions.")
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+
+class FileSizeRule(Rule):
+    """File size in kilobytes."""
+
+    name = 'file-size'
+
+    def __init__(self, max_kb: int = DEFAULT_MAX_FILE_SIZE_KB):
+        self.max_kb = max_kb
+
+    def check_file(self, context: FileContext) -> None:
+        if context.size > self.max_kb * 1024:
+            context.report(self.name, 'warning', None,
+                           f"File is {context.size / 1024:.0f} KB (max {self.max_kb} KB); "
+                           f"split it into smaller modules.")
+
+
+class DocstringRule(Rule):
+    """Docstrings on modules and on public classes, functions and methods, except in tests."""
+
+    name = 'missing-docstring'
+
+    def check_file(self, context: FileContext) -> None:
+        if not _is_test(context.path) and context.tree.body and ast.get_docstring(context.tree) is None:
+            context.report(self.name, 'info', None, "Module has no docstring.")
+
+    def visit_ClassDef(self, node: ast.AST, context: FileContext) -> None:
+        # Nested functions are implementation details, documented or not
+        if not context.functions and not node.name.startswith('_') and not _is_test(context.path) \
+                and ast.get_docstring(node) is None:
+            kind = 'Class' if isinstance(node, ast.ClassDef) else 'Function'
+            context.report(self.name, 'info', node, f"{kind} {node.name} has no docstring.")
+
+    visit_FunctionDef = visit_ClassDef
+    visit_AsyncFunctionDef = visit_ClassDef
+
+
+def _is_test(path: str) -> bool:
+    name = os.path.basename(path)
+    return name.startswith('test_') or name.endswith('_test.py') or name == 'conftest.py'
+
+
+class RuleEngine:
+    """
+    Runs many rules over one traversal of each file's AST.
+
+    The `visit_` and `leave_` methods of the rules are collected once into
+    a table by node type, so visiting a node costs one lookup plus a call
+    per interested rule, and nodes no rule handles cost only the lookup.
+    """
+
+    def __init__(self, rules: Sequence[Rule]):
+        self.rules = list(rules)
+        self._visitors: Dict[type, List[Callable[[ast.AST, FileContext], None]]] = {}
+        self._leavers: Dict[type, List[Callable[[ast.AST, FileContext], None]]] = {}
+        for kind in _node_types():
+            visitors = [getattr(rule, f"visit_{kind.__name__}") for rule in self.rules
+                        if hasattr(rule, f"visit_{kind.__name__}")]
+            leavers = [getattr(rule, f"leave_{kind.__name__}") for rule in self.rules
+                       if hasattr(rule, f"leave_{kind.__name__}")]
+            if visitors:
+                self._visitors[kind] = visitors
+            if leavers:
+                self._leavers[kind] = leavers
+        # Leaves no rule handles are not pushed at all
+        self._skipped = frozenset(kind for kind in LEAF_NODES
+                                  if kind not in self._visitors and kind not in self._leavers)
+
+    def check_source(self, source: str, path: str, size: Optional[int] = None) -> List[Finding]:
+        """
+        Parse a file once and run every rule on it.
+
+        Args:
+            source: Contents of the file
+            path: Path reported in findings
+            size: Size of the file in bytes (default: the encoded source)
+
+        Returns:
+            Findings in traversal order; files that do not parse only get
+            file-level checks, as flake8 reports their syntax error
+        """
+        try:
+            tree = ast.parse(source, path)
+        except (SyntaxError, ValueError):
+            tree = ast.Module(body=[], type_ignores=[])
+        context = FileContext(path, source, len(source.encode()) if size is None else size, tree)
+        for rule in self.rules:
+            rule.check_file(context)
+        self._walk(tree, context)
+        return context.findings
+
+    def _walk(self, tree: ast.AST, context: FileContext) -> None:
+        visitors = self._visitors
+        leavers = self._leavers
+        skipped = self._skipped
+        # Nodes are pushed in reverse so they pop in source order; a node to
+        # leave after its children is pushed again wrapped in a 1-tuple
+        stack: List[Any] = [tree]
+        while stack:
+            node = stack.pop()
+            if type(node) is tuple:
+                node = node[0]
+                if type(node) in FUNCTION_NODES:
+                    context.functions.pop()
+                for leave in leavers.get(type(node), ()):
+                    leave(node, context)
+                continue
+            kind = type(node)
+            if kind in visitors:
+                for visit in visitors[kind]:
+                    visit(node, context)
+            if kind in leavers or kind in FUNCTION_NODES:
+                stack.append((node,))
+                if kind in FUNCTION_NODES:
+                    context.functions.append(node)
+            for field in reversed(node._fields):
+                value = getattr(node, field, None)
+                if type(value) is list:
+                    stack.extend(child for child in reversed(value) if type(child) not in skipped)
+                elif value is not None and type(value) not in skipped and isinstance(value, ast.AST):
+                    stack.append(value)
+
+
+def _node_types() -> Iterable[type]:
+    kinds, pending = [], [ast.AST]
+    while pending:
+        kind = pending.pop()
+        kinds.append(kind)
+        pending.extend(kind.__subclasses__())
+    return kinds
+
+
+def build_rules(config: Optional[Dict[str, Any]] = None) -> List[Rule]:
+    """
+    Build the rules from the `rules` section: max_complexity,
+    max_function_lines and max_file_size_kb, plus docstrings when
+    `rules.documentation` is on. A threshold set to 0 or null turns its rule off.
+    """
+    rules_config = (config or {}).get('rules') or {}
+    rules: List[Rule] = []
+    for rule, key, default in ((ComplexityRule, 'max_complexity', DEFAULT_MAX_COMPLEXITY),
+                               (FunctionLengthRule, 'max_function_lines', DEFAULT_MAX_FUNCTION_LINES),
+                               (FileSizeRule, 'max_file_size_kb', DEFAULT_MAX_FILE_SIZE_KB)):
+        threshold = rules_config.get(key, default)
+        if threshold:
+            rules.append(rule(threshold))
+    if rules_config.get('documentation', True):
+        rules.append(DocstringRule())
+    return rules
+
+
+def check_changed_files(changed_files: ChangedFiles, config: Optional[Dict[str, Any]] = None,
+                        rules: Optional[Sequence[Rule]] = None,
+                        cancel: Optional[threading.Event] = None) -> List[Finding]:
+    """
+    Run the rules on the Python files a PR changed.
+
+    Args:
+        changed_files: Index of the files changed by the PR
+        config: Optional bot configuration, read for the rule thresholds
+        rules: Optional rules to run instead of the configured ones
+        cancel: Event that stops the check before the next file
+
+    Returns:
+        Findings sorted by file and line; those of the files checked so
+        far when cancelled
+    """
+    if not isinstance(changed_files, ChangedFiles):
+        raise TypeError(f"changed_files must be a ChangedFiles, got {type(changed_files)}")
+    engine = RuleEngine(build_rules(config) if rules is None else rules)
+    findings: List[Finding] = []
+    for changed_file in changed_files.lint_files('python'):
+        if cancel is not None and cancel.is_set():
+            break
+        try:
+            with open(os.path.join(changed_files.repo_path, changed_file.path), 'rb') as f:
+                data = f.read()
+        except OSError:
+            continue
+        findings.extend(engine.check_source(data.decode('utf-8', errors='replace'), changed_file.path, len(data)))
+    return sorted(findings, key=Finding.sort_key)
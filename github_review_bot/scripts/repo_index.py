@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Script to index the checked-out repository with a single filesystem walk.
+"""
+
+import os
+from typing import Dict, FrozenSet, Iterator, Optional
+from .diff_index import normalize_path
+
+# Directories recorded as present but never descended into
+IGNORED_DIRS = frozenset({'node_modules', '.git', '.next'})
+
+
+class IndexEntry:
+    """
+    Metadata of one indexed path.
+
+    The type comes from the walk; size and mtime are read by one stat call
+    on first use and kept.
+    """
+
+    __slots__ = ('path', 'is_dir', 'root', '_stat')
+
+    def __init__(self, path: str, is_dir: bool, root: str = '.'):
+        self.path = path
+        self.is_dir = is_dir
+        self.root = root
+        self._stat: Optional[os.stat_result] = None
+
+    def stat(self) -> Optional[os.stat_result]:
+        """Return the stat data of the path, or None if it cannot be read."""
+        if self._stat is None:
+            try:
+                self._stat = os.stat(os.path.join(self.root, self.path))
+            except OSError:
+                return None
+        return self._stat
+
+    @property
+    def size(self) -> int:
+        """Byte size of a file; 0 for a directory or a file that cannot be read."""
+        stat = None if self.is_dir else self.stat()
+        return stat.st_size if stat is not None else 0
+
+    @property
+    def mtime(self) -> float:
+        """Modification time, or 0.0 if the path cannot be read."""
+        stat = self.stat()
+        return stat.st_mtime if stat is not None else 0.0
+
+    def __repr__(self) -> str:
+        return f"IndexEntry({self.path!r}, is_dir={self.is_dir})"
+
+
+class RepoIndex:
+    """
+    In-memory index of the files and directories of a checkout.
+
+    Built by one os.scandir walk, whose directory entries carry the type,
+    so existence and type queries afterwards cost no system calls. Size
+    and mtime stat a path only when asked for, once. Paths are
+    repository-relative with forward slashes, or relative to the
+    directory of a scoped view.
+    """
+
+    def __init__(self, root: str, entries: Dict[str, IndexEntry], prefix: str = ''):
+        self.root = root
+        self._entries = entries
+        # Directory of a scoped view, with a trailing slash; empty at the root
+        self._prefix = prefix
+
+    @classmethod
+    def build(cls, root: str = '.', ignored_dirs: FrozenSet[str] = IGNORED_DIRS) -> 'RepoIndex':
+        """
+        Walk the checkout once.
+
+        Args:
+            root: Path to the repository root
+            ignored_dirs: Directory names to record without descending
+
+        Returns:
+            RepoIndex of root; empty if root cannot be read
+
+        Raises:
+            TypeError: If root is not a string or path-like object
+        """
+        root = os.fspath(root)
+        entries: Dict[str, IndexEntry] = {}
+        pending = ['']
+        while pending:
+            relative = pending.pop()
+            try:
+                scanner = os.scandir(os.path.join(root, relative) if relative else root)
+            except OSError:
+                continue
+            with scanner:
+                for entry in scanner:
+                    path = f"{relative}/{entry.name}" if relative else entry.name
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        continue
+                    entries[path] = IndexEntry(path, is_dir, root)
+                    if is_dir and entry.name not in ignored_dirs and not entry.is_symlink():
+                        pending.append(path)
+        return cls(root, entries)
+
+    def scoped(self, directory: str) -> 'RepoIndex':
+        """
+        Return a view of a subdirectory that shares this index.
+
+        Args:
+            directory: Path of the subdirectory
+
+        Returns:
+            RepoIndex whose paths are relative to the subdirectory
+        """
+        directory = normalize_path(directory).strip('/')
+        if not directory:
+            return self
+        return RepoIndex(os.path.join(self.root, directory), self._entries,
+                         f"{self._prefix}{directory}/")
+
+    @property
+    def prefix(self) -> str:
+        """Repository-relative directory of a scoped view, empty at the root."""
+        return self._prefix.rstrip('/')
+
+    def _key(self, path: str) -> str:
+        return self._prefix + normalize_path(path)
+
+    def get(self, path: str) -> Optional[IndexEntry]:
+        """Return the entry of a path, or None if it does not exist."""
+        return self._entries.get(self._key(path))
+
+    def exists(self, path: str) -> bool:
+        """Whether a file or directory exists."""
+        return self._key(path) in self._entries
+
+    def is_file(self, path: str) -> bool:
+        """Whether a regular file exists."""
+        entry = self.get(path)
+        return entry is not None and not entry.is_dir
+
+    def is_dir(self, path: str) -> bool:
+        """Whether a directory exists."""
+        entry = self.get(path)
+        return entry is not None and entry.is_dir
+
+    def size(self, path: str) -> Optional[int]:
+        """Return the byte size of a file, stat on first use, or None if it does not exist."""
+        entry = self.get(path)
+        return entry.size if entry is not None and not entry.is_dir else None
+
+    def mtime(self, path: str) -> Optional[float]:
+        """Return the modification time of a path, stat on first use, or None if it does not exist."""
+        entry = self.get(path)
+        return entry.mtime if entry is not None else None
+
+    def _paths(self, prefix: str, dirs: bool) -> Iterator[str]:
+        below = self._key(prefix).rstrip('/')
+        below = below + '/' if below else ''
+        for path, entry in self._entries.items():
+            if entry.is_dir == dirs and path.startswith(below):
+                yield path[len(self._prefix):]
+
+    def files(self, prefix: str = '') -> Iterator[str]:
+        """Yield the paths of the indexed files, optionally below a directory."""
+        return self._paths(prefix, dirs=False)
+
+    def dirs(self, prefix: str = '') -> Iterator[str]:
+        """Yield the paths of the indexed directories, optionally below a directory."""
+        return self._paths(prefix, dirs=True)
+
+    def read_text(self, path: str) -> Optional[str]:
+        """
+        Read an indexed file.
+
+        Returns:
+            The file content, or None if the file is not in the index or
+            cannot be read
+        """
+        if not self.is_file(path):
+            return None
+        try:
+            with open(os.path.join(self.root, normalize_path(path)), encoding='utf-8') as f:
+                return f.read()
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def __len__(self) -> int:
+        if not self._prefix:
+            return len(self._entries)
+        return sum(1 for path in self._entries if path.startswith(self._prefix))
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Script to cache per-file tool results on disk, keyed by blob content.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from .changed_files import ChangedFile
+from .findings import Finding, tool_failure
+from .sharding import shard_count_for, shard_files
+from .tool_executor import ToolExecutor, ToolResult, ToolSpec
+
+# Bump when the layout or the entry format changes
+CACHE_FORMAT = 'v2'
+
+# Default cache location and size limit
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'github-review-bot')
+DEFAULT_CACHE_MAX_MB = 256
+
+# Exit statuses meaning "the tool ran and reported its findings"
+COMPLETED_STATUSES = (0, 1)
+
+_versions: Dict[Tuple[str, ...], Optional[str]] = {}
+_versions_lock = threading.Lock()
+
+
+class CachedTool:
+    """
+    A per-file tool whose results can be cached by file content.
+
+    call, when given, runs the tool in-process on a list of paths in place
+    of the command built by build_args; it also gets the executor's cancel
+    event and returns a cancelled ToolResult once it is set.
+    """
+
+    def __init__(self, name: str, build_args: Callable[[List[str]], List[str]],
+                 parse: Callable[[ToolResult], Iterable[Finding]],
+                 version_args: Sequence[str], config_files: Sequence[str] = (),
+                 call: Optional[Callable[[List[str], threading.Event], ToolResult]] = None):
+        self.name = name
+        self.build_args = build_args
+        self.parse = parse
+        self.version_args = tuple(version_args)
+        self.config_files = tuple(config_files)
+        self.call = call
+
+
+class ResultCache:
+    """
+    Content-addressed store of per-file tool findings.
+
+    Entries live at `<cache_dir>/v2/<key[:2]>/<key>.json` and are written
+    atomically (temp file + rename), so several runners can share the
+    directory through actions/cache or a shared volume. The mtime of an
+    entry is bumped on every hit and eviction drops the least recently
+    used entries until the total size fits the limit.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR,
+                 max_bytes: int = DEFAULT_CACHE_MAX_MB * 1024 * 1024):
+        if not isinstance(cache_dir, str):
+            raise TypeError(f"cache_dir must be a string, got {type(cache_dir)}")
+        self.root = os.path.join(cache_dir, CACHE_FORMAT)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(blob_sha: str, tool: str, version: str, config_hash: str, path: str) -> str:
+        """
+        Build the cache key of one file's results for one tool setup.
+
+        The path is part of the key: findings carry it, and tool settings
+        such as per-file ignores depend on it.
+        """
+        return hashlib.sha256('\0'.join([blob_sha, tool, version, config_hash, path]).encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key + '.json')
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up an entry.
+
+        Args:
+            key: Key built by ResultCache.key
+
+        Returns:
+            The stored entry, or None on a miss or an unreadable entry
+        """
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        """
+        Store an entry atomically; failures only cost a future miss.
+
+        Args:
+            key: Key built by ResultCache.key
+            entry: JSON-serializable entry
+        """
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not write result cache entry: {e}")
+
+    def _entries(self) -> Iterator[Tuple[float, int, str]]:
+        """Yield (mtime, size, path) of every entry."""
+        if not os.path.isdir(self.root):
+            return
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                yield stat.st_mtime, stat.st_size, entry.path
+
+    def evict(self) -> int:
+        """
+        Drop least recently used entries until the cache fits max_bytes.
+
+        Returns:
+            Number of entries removed
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                # Another runner evicted it first
+                pass
+            total -= size
+        return removed
+
+
+def blob_sha(changed_file: ChangedFile, repo_path: str = '.') -> Optional[str]:
+    """
+    Return the git blob SHA of a changed file's head revision.
+
+    Uses the SHA reported for the PR file when available and otherwise
+    hashes the checked-out content the way `git hash-object` does.
+    """
+    if changed_file.sha:
+        return changed_file.sha
+    try:
+        with open(os.path.join(repo_path, changed_file.path), 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+
+
+def tool_version(version_args: Sequence[str]) -> Optional[str]:
+    """Return a tool's version string, computed once per process."""
+    key = tuple(version_args)
+    with _versions_lock:
+        if key in _versions:
+            return _versions[key]
+    try:
+        result = subprocess.run(list(key), capture_output=True, text=True, timeout=60)
+        version = (result.stdout or result.stderr).strip() if result.returncode == 0 else None
+    except (OSError, subprocess.TimeoutExpired):
+        version = None
+    with _versions_lock:
+        _versions[key] = version
+    return version
+
+
+def config_hash(tool: CachedTool, repo_path: str = '.') -> str:
+    """Hash a tool's invocation template and the config files it reads."""
+    digest = hashlib.sha256(' '.join(tool.build_args(['<files>'])).encode())
+    for name in tool.config_files:
+        try:
+            with open(os.path.join(repo_path, name), 'rb') as f:
+                digest.update(name.encode() + b'\0' + f.read())
+        except OSError:
+            continue
+    return digest.hexdigest()
+
+
+def run_with_cache(executor: ToolExecutor, cache: Optional[ResultCache],
+                   tools: Sequence[CachedTool], files: Sequence[ChangedFile],
+                   uncached: Sequence[ToolSpec] = (),
+                   repo_path: str = '.', shard_count: Optional[int] = None) -> Dict[str, ToolResult]:
+    """
+    Run per-file tools, sending only files without a cached result to them.
+
+    Files that do reach a tool are split into size-balanced shards, one
+    tool process each, which the executor runs side by side.
+
+    Args:
+        executor: Executor used to run the tools concurrently
+        cache: Result cache, or None to run every file
+        tools: Tools to run
+        files: Changed files to analyze
+        uncached: Whole-project tools to run alongside
+        repo_path: Path to the checked-out head revision
+        shard_count: Shards per tool, or None to size them automatically
+
+    Returns:
+        Dictionary mapping tool name to a ToolResult whose findings merge
+        cached and fresh per-file findings in a stable order. Tools that
+        did not complete carry a single tool-error finding instead.
+    """
+    keys: Dict[str, Dict[str, Optional[str]]] = {}
+    cached: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    shard_names: Dict[str, List[str]] = {}
+    shard_paths: Dict[str, List[str]] = {}
+    specs = []
+    for tool in tools:
+        version = tool_version(tool.version_args) if cache else None
+        settings = config_hash(tool, repo_path) if version else None
+        keys[tool.name] = {}
+        cached[tool.name] = {}
+        misses: List[ChangedFile] = []
+        for changed_file in files:
+            sha = blob_sha(changed_file, repo_path) if version else None
+            key = (ResultCache.key(sha, tool.name, version, settings, changed_file.path)
+                   if sha and version and settings else None)
+            entry = cache.get(key) if cache and key else None
+            keys[tool.name][changed_file.path] = key
+            if entry is None:
+                misses.append(changed_file)
+            else:
+                cached[tool.name][changed_file.path] = entry
+        shards = shard_files(misses, shard_count_for(misses, executor.max_workers, shard_count))
+        shard_names[tool.name] = []
+        for i, shard in enumerate(shards):
+            name = tool.name if len(shards) == 1 else f'{tool.name}#{i}'
+            shard_names[tool.name].append(name)
+            shard_paths[name] = [f.path for f in shard]
+            call = functools.partial(tool.call, shard_paths[name], executor.cancel_event) if tool.call else None
+            specs.append(ToolSpec(name, tool.build_args(shard_paths[name]), parse=tool.parse, call=call))
+
+    fresh = executor.run(specs + list(uncached))
+
+    results = {}
+    for spec in uncached:
+        ran = fresh[spec.name]
+        if not ran.ok and not ran.findings:
+            ran.findings = [_failure(ran)]
+        results[spec.name] = ran
+
+    for tool in tools:
+        entries = dict(cached[tool.name])
+        shard_results = {name: fresh[name] for name in shard_names[tool.name]}
+        crashed = [ran for ran in shard_results.values() if ran.returncode not in COMPLETED_STATUSES]
+        if crashed:
+            # Crashes, timeouts and cancellations are reported, never cached
+            crashed[0].findings = [_failure(crashed[0])]
+            crashed[0].name = tool.name
+            results[tool.name] = crashed[0]
+            continue
+        for name, ran in shard_results.items():
+            per_file: Dict[str, List[Finding]] = {path: [] for path in shard_paths[name]}
+            for finding in ran.findings:
+                if finding.path in per_file:
+                    per_file[finding.path].append(finding)
+            for path, path_findings in per_file.items():
+                entry = {
+                    'findings': [finding.as_tuple() for finding in path_findings],
+                    'failed': ran.returncode != 0 and bool(path_findings)
+                }
+                entries[path] = entry
+                key = keys[tool.name][path]
+                if cache and key:
+                    cache.put(key, entry)
+
+        # Merge shards back in changed-file order
+        findings = [Finding.from_tuple(values) for f in files for values in entries[f.path]['findings']]
+        results[tool.name] = ToolResult(
+            tool.name,
+            returncode=1 if any(entry['failed'] for entry in entries.values()) else 0,
+            duration=max((ran.duration for ran in shard_results.values()), default=0.0),
+            findings=findings
+        )
+
+    return results
+
+
+def _failure(result: ToolResult) -> Finding:
+    """Report a tool run that produced no usable findings."""
+    return tool_failure(result.name, result.returncode, result.stderr,
+                        result.timed_out, result.cancelled)
+
+
+def resolve_cache_dir(config: Dict[str, Any]) -> Optional[str]:
+    """
+    Return the cache directory configured in the `analysis` config section.
+
+    Args:
+        config: The bot configuration dictionary
+
+    Returns:
+        `analysis.cache_dir`, $REVIEW_BOT_CACHE_DIR or the default location,
+        or None if `analysis.cache` is false
+    """
+    analysis_config = config.get('analysis', {})
+    if not analysis_config.get('cache', True):
+        return None
+    return os.path.expanduser(
+        analysis_config.get('cache_dir') or os.environ.get('REVIEW_BOT_CACHE_DIR') or DEFAULT_CACHE_DIR
+    )
+
+
+def build_result_cache(config: Dict[str, Any]) -> Optional[ResultCache]:
+    """
+    Create the result cache configured in the `analysis` config section.
+
+    Args:
+        config: The bot configuration dictionary
+
+    Returns:
+        ResultCache at `analysis.cache_dir` (or $REVIEW_BOT_CACHE_DIR), or
+        None if `analysis.cache` is false
+    """
+    cache_dir = resolve_cache_dir(config)
+    if cache_dir is None:
+        return None
+    max_mb = config.get('analysis', {}).get('cache_max_mb', DEFAULT_CACHE_MAX_MB)
+    return ResultCache(cache_dir, int(max_mb) * 1024 * 1024)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Script to optionally persist analysis results to a run-scoped directory.
+"""
+
+import json
+import os
+import tempfile
+from typing import Any, Dict, List, Optional
+
+# Prefix of the per-run results directories
+RUN_DIR_PREFIX = 'review-bot-'
+
+
+class ResultSink:
+    """
+    On-disk copy of the analysis results of a single run.
+
+    Each run writes into its own fresh directory, so results of a previous
+    run can never be mixed into the current one and the repository's
+    working directory is left untouched.
+    """
+
+    def __init__(self, parent_dir: Optional[str] = None):
+        if parent_dir is not None:
+            os.makedirs(parent_dir, exist_ok=True)
+        self.directory = tempfile.mkdtemp(prefix=RUN_DIR_PREFIX, dir=parent_dir)
+
+    def write(self, name: str, issues: List[Dict[str, Any]]) -> str:
+        """
+        Persist the issues of one analyzer.
+
+        Args:
+            name: Analyzer name, e.g. 'python' or 'frontend'
+            issues: Issues reported by the analyzer
+
+        Returns:
+            Path of the written file
+        """
+        path = os.path.join(self.directory, f'{name}_analysis_results.json')
+        with open(path, 'w') as f:
+            json.dump(issues, f, indent=2)
+        return path
+
+
+def build_result_sink(config: Dict[str, Any]) -> Optional[ResultSink]:
+    """
+    Create the result sink configured in the `analysis` config section.
+
+    Args:
+        config: The bot configuration dictionary
+
+    Returns:
+        ResultSink under `analysis.results_dir` (default: the system temp
+        directory) if `analysis.persist_results` is true, otherwise None
+    """
+    analysis_config = config.get('analysis', {})
+    if not analysis_config.get('persist_results', False):
+        return None
+    return ResultSink(analysis_config.get('results_dir'))
+
+
+def load_results(directory: str) -> List[Dict[str, Any]]:
+    """
+    Load every analyzer's issues persisted in a run directory.
+
+    Args:
+        directory: Directory created by a ResultSink
+
+    Returns:
+        Combined list of issues, in analyzer file name order
+    """
+    issues: List[Dict[str, Any]] = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('_analysis_results.json'):
+            with open(os.path.join(directory, name)) as f:
+                issues.extend(json.load(f))
+    return issues
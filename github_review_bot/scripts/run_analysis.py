@@ -5,186 +5,421 @@ Script to run code analysis based on repository type and configuration.
 
 import os
 import sys
-import json
-import subprocess
+import functools
+import threading
 import yaml
 from pathlib import Path
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Callable, Iterator, List, Optional, Sequence, Tuple
 from github import PullRequest
 from unittest.mock import Mock
 
 # Import our new checkers
 from .check_nextjs import check_nextjs
 from .check_vercel import check_vercel
+from .check_ai import check_ai
+from .check_api import check_api
 from .load_config import load_config
+from .tool_executor import ToolExecutor, DEFAULT_TOOL_TIMEOUT
+from .changed_files import ChangedFiles, JS_LANGUAGES, build_changed_files
+from .result_cache import CachedTool, ResultCache, build_result_cache, resolve_cache_dir, run_with_cache
+from .node_deps import NodeModulesCache, prepare_node_dependencies
+from .result_sink import build_result_sink
+from .findings import parse_bandit_json, parse_black, parse_eslint_json, parse_flake8
+from .typecheck import BuildInfoStore, TypeScriptCheck
+from .python_linters import BACKENDS, BACKEND_SUBPROCESS, INPROCESS_CHECKS
+from .repo_index import RepoIndex
+from .manifests import ManifestCache
+from .bundle_budget import BundleBudget
+from .secret_scan import scan_changed_files as scan_secrets
+from .pii_scan import scan_changed_files as scan_pii
+from .python_rules import check_changed_files as check_python_rules
+from .coverage_report import check_coverage
+from .workspaces import (
+    NEXT_CONFIGS, VERCEL_MARKERS, Workspace, check_workspaces, discover_workspaces, touched_workspaces
+)
+from .check_registry import Check, CheckContext, CheckRegistry, format_plan
+from .time_budget import CostModel, TimeBudget
 
-def run_python_analysis():
+# Per-file Python tools, with the parser of their native output format
+PYTHON_TOOLS = [
+    CachedTool('flake8', lambda files: ['flake8'] + files,
+               lambda result: parse_flake8(result.stdout.splitlines()),
+               ['flake8', '--version'], ['setup.cfg', 'tox.ini', '.flake8']),
+    CachedTool('black', lambda files: ['black', '--check'] + files,
+               lambda result: parse_black(result.stderr.splitlines()),
+               ['black', '--version'], ['pyproject.toml']),
+    CachedTool('bandit', lambda files: ['bandit', '-q', '-f', 'json'] + files,
+               lambda result: parse_bandit_json(result.stdout),
+               ['bandit', '--version'], ['.bandit', 'pyproject.toml'])
+]
+
+def python_tools(backend: str = BACKEND_SUBPROCESS) -> List[CachedTool]:
+    """
+    Return the Python tools for a backend.
+    
+    Both backends produce identical findings and share cache entries.
+    
+    Args:
+        backend: 'subprocess' to start each tool, or 'inprocess' to call
+            the tools' Python APIs
+        
+    Returns:
+        The PYTHON_TOOLS, wired to the in-process APIs if requested
+        
+    Raises:
+        ValueError: If backend is not a known backend
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"python.backend must be one of {BACKENDS}, got {backend!r}")
+    if backend == BACKEND_SUBPROCESS:
+        return PYTHON_TOOLS
+    return [CachedTool(tool.name, tool.build_args, tool.parse, tool.version_args,
+                       tool.config_files, call=INPROCESS_CHECKS[tool.name])
+            for tool in PYTHON_TOOLS]
+
+# Per-file JavaScript/TypeScript tools
+JS_TOOLS = [
+    CachedTool('eslint', lambda files: ['npx', 'eslint', '--format', 'json'] + files,
+               lambda result: parse_eslint_json(result.stdout),
+               ['npx', 'eslint', '--version'],
+               ['.eslintrc', '.eslintrc.js', '.eslintrc.cjs', '.eslintrc.json', '.eslintrc.yml',
+                '.eslintrc.yaml', 'eslint.config.js', 'eslint.config.mjs', 'package.json'])
+]
+
+# Outcome of one analyzer: whether its checks passed, and its issues
+AnalyzerResult = Tuple[bool, List[Dict[str, Any]]]
+
+def run_python_analysis(changed_files: ChangedFiles, executor: Optional[ToolExecutor] = None,
+                        cache: Optional[ResultCache] = None,
+                        shard_count: Optional[int] = None,
+                        backend: str = BACKEND_SUBPROCESS) -> AnalyzerResult:
     """Run Python code analysis tools."""
     print("Running Python code analysis...")
     
     # Get changed Python files
-    result = subprocess.run(
-        ['git', 'diff', '--name-only', 'origin/main'],
-        capture_output=True,
-        text=True
-    )
-    py_files = [f for f in result.stdout.splitlines() if f.endswith('.py')]
+    py_files = changed_files.lint_files('python')
     
     if not py_files:
         print("No Python files changed in this PR")
-        return True
-    
-    # Run flake8
-    flake8_result = subprocess.run(
-        ['flake8'] + py_files,
-        capture_output=True,
-        text=True
-    )
-    
-    # Run black
-    black_result = subprocess.run(
-        ['black', '--check'] + py_files,
-        capture_output=True,
-        text=True
-    )
-    
-    # Run bandit for security
-    bandit_result = subprocess.run(
-        ['bandit', '-r'] + py_files,
-        capture_output=True,
-        text=True
-    )
+        return True, []
     
-    # Save results
-    with open('analysis_results.json', 'w') as f:
-        json.dump({
-            'flake8': flake8_result.stdout,
-            'black': black_result.stdout,
-            'bandit': bandit_result.stdout
-        }, f)
+    # Run flake8, black and bandit (for security) side by side on the
+    # files whose results are not cached yet, sharded across cores
+    executor = executor or ToolExecutor()
+    tool_results = run_with_cache(executor, cache, python_tools(backend), py_files,
+                                  shard_count=shard_count)
     
-    return all(r.returncode == 0 for r in [flake8_result, black_result, bandit_result])
+    issues = [finding.to_dict() for r in tool_results.values() for finding in r.findings]
+    return all(r.ok for r in tool_results.values()), issues
 
-def run_js_analysis():
+def run_python_rules_analysis(changed_files: ChangedFiles,
+                              config: Optional[Dict[str, Any]] = None,
+                              cancel: Optional[threading.Event] = None) -> AnalyzerResult:
+    """Check changed Python files against the complexity, length, size and docstring rules."""
+    print("Checking Python files against the configured rules...")
+    issues = [finding.to_dict() for finding in check_python_rules(changed_files, config, cancel=cancel)]
+    return not any(issue['type'] == 'error' for issue in issues), issues
+
+def run_coverage_analysis(changed_files: ChangedFiles, config: Optional[Dict[str, Any]] = None,
+                          stats: Optional[Dict[str, Any]] = None) -> AnalyzerResult:
+    """Measure test coverage of the added lines from the workflow's coverage report."""
+    print("Checking test coverage of added lines...")
+    issues = [finding.to_dict() for finding in check_coverage(changed_files, config, stats)]
+    return not any(issue['type'] == 'error' for issue in issues), issues
+
+def run_js_analysis(changed_files: ChangedFiles, executor: Optional[ToolExecutor] = None,
+                    cache: Optional[ResultCache] = None,
+                    shard_count: Optional[int] = None, cache_dir: Optional[str] = None,
+                    stats: Optional[Dict[str, Any]] = None,
+                    incremental_typescript: bool = True,
+                    prepare_dependencies: bool = True,
+                    repo_index: Optional[RepoIndex] = None) -> AnalyzerResult:
     """Run JavaScript/TypeScript code analysis."""
     print("Running JavaScript/TypeScript analysis...")
+    exists = repo_index.is_file if repo_index is not None else os.path.exists
     
     # Get changed JS/TS files
-    result = subprocess.run(
-        ['git', 'diff', '--name-only', 'origin/main'],
-        capture_output=True,
-        text=True
-    )
-    js_files = [f for f in result.stdout.splitlines() 
-                if f.endswith(('.js', '.jsx', '.ts', '.tsx'))]
+    js_files = changed_files.lint_files(*JS_LANGUAGES)
     
     if not js_files:
         print("No JavaScript/TypeScript files changed in this PR")
-        return True
+        return True, []
     
     # Check if package.json exists
-    if not os.path.exists('package.json'):
+    if not exists('package.json'):
         print("No package.json found, skipping JavaScript analysis")
-        return True
-    
-    # Install dependencies if needed
-    subprocess.run(['npm', 'install'], capture_output=True)
-    
-    # Run ESLint
-    eslint_result = subprocess.run(
-        ['npx', 'eslint'] + js_files,
-        capture_output=True,
-        text=True
-    )
-    
-    # Run TypeScript type checking if tsconfig.json exists
-    ts_result = True
-    if os.path.exists('tsconfig.json'):
-        ts_result = subprocess.run(
-            ['npx', 'tsc', '--noEmit'],
-            capture_output=True,
-            text=True
-        )
-    
-    # Save results
-    with open('js_analysis_results.json', 'w') as f:
-        json.dump({
-            'eslint': eslint_result.stdout,
-            'typescript': ts_result.stdout if isinstance(ts_result, subprocess.CompletedProcess) else ''
-        }, f)
-    
-    return all(r.returncode == 0 for r in [eslint_result, ts_result] 
-              if isinstance(r, subprocess.CompletedProcess))
+        return True, []
+    
+    # Install dependencies unless node_modules already matches the lockfile
+    if prepare_dependencies:
+        deps_stats = prepare_node_dependencies(changed_files, '.',
+                                               NodeModulesCache(cache_dir) if cache_dir else None)
+        if stats is not None:
+            stats['node_dependencies'] = deps_stats
+    
+    # Run ESLint on uncached files, plus TypeScript type checking scoped to
+    # the PR if tsconfig.json exists
+    specs = []
+    typecheck = None
+    if exists('tsconfig.json'):
+        typecheck = TypeScriptCheck(changed_files, BuildInfoStore(cache_dir) if cache_dir else None,
+                                    incremental_typescript)
+        specs.append(typecheck.spec())
+    executor = executor or ToolExecutor()
+    tool_results = run_with_cache(executor, cache, JS_TOOLS, js_files, specs, shard_count=shard_count)
+    if typecheck:
+        typecheck.finish(tool_results['typescript'])
+    if typecheck and stats is not None:
+        stats['typescript'] = typecheck.stats(tool_results['typescript'])
+    
+    issues = [finding.to_dict() for r in tool_results.values() for finding in r.findings]
+    return all(r.ok for r in tool_results.values()), issues
 
-def run_nextjs_analysis() -> bool:
-    """Run Next.js specific analysis."""
-    print("Running Next.js analysis...")
+def _check_projects(checker: Callable[..., List[Dict[str, Any]]], applies: Callable[[Workspace], bool],
+                    changed_files: ChangedFiles, repo_index: Optional[RepoIndex],
+                    manifests: Optional[ManifestCache], workspaces: Sequence[Workspace],
+                    max_workers: Optional[int]) -> List[Dict[str, Any]]:
+    """Run a project checker on the root and on the touched workspaces it applies to."""
     repo_path = os.getcwd()
-    issues = check_nextjs(repo_path)
-    
-    # Save results
-    with open('nextjs_analysis_results.json', 'w') as f:
-        json.dump(issues, f, indent=2)
+    issues = []
+    # A monorepo root is only checked when it is a project itself
+    if not workspaces or applies(Workspace('', '', repo_index, manifests or ManifestCache(repo_path, repo_index))):
+        issues = checker(repo_path, changed_files, repo_index, manifests)
+    projects = [w for w in touched_workspaces(workspaces, changed_files) if applies(w)]
+    issues.extend(check_workspaces(
+        projects,
+        lambda w: checker(os.path.join(repo_path, w.path), changed_files, w.index, w.manifests),
+        max_workers
+    ))
+    return issues
+
+def run_nextjs_analysis(changed_files: ChangedFiles,
+                        repo_index: Optional[RepoIndex] = None,
+                        manifests: Optional[ManifestCache] = None,
+                        workspaces: Sequence[Workspace] = (),
+                        max_workers: Optional[int] = None,
+                        bundle_budget: Optional[BundleBudget] = None) -> AnalyzerResult:
+    """Run Next.js specific analysis on the root and the touched Next.js workspaces."""
+    print("Running Next.js analysis...")
+    checker = functools.partial(check_nextjs, bundle_budget=bundle_budget)
+    issues = _check_projects(checker, lambda w: w.is_nextjs, changed_files,
+                             repo_index, manifests, workspaces, max_workers)
     
     # Consider the check failed if there are any error-level issues
-    return not any(issue['type'] == 'error' for issue in issues)
+    return not any(issue['type'] == 'error' for issue in issues), issues
 
-def run_vercel_analysis() -> bool:
-    """Run Vercel deployment analysis."""
+def run_vercel_analysis(changed_files: ChangedFiles,
+                        repo_index: Optional[RepoIndex] = None,
+                        manifests: Optional[ManifestCache] = None,
+                        workspaces: Sequence[Workspace] = (),
+                        max_workers: Optional[int] = None) -> AnalyzerResult:
+    """Run Vercel deployment analysis on the root and the touched Vercel workspaces."""
     print("Running Vercel deployment analysis...")
-    repo_path = os.getcwd()
-    issues = check_vercel(repo_path)
-    
-    # Save results
-    with open('vercel_analysis_results.json', 'w') as f:
-        json.dump(issues, f, indent=2)
+    issues = _check_projects(check_vercel, lambda w: w.is_vercel, changed_files,
+                             repo_index, manifests, workspaces, max_workers)
     
     # Consider the check failed if there are any error-level issues
-    return not any(issue['type'] == 'error' for issue in issues)
+    return not any(issue['type'] == 'error' for issue in issues), issues
 
-def run_frontend_analysis() -> bool:
-    """Run frontend-specific analysis."""
-    print("Running frontend analysis...")
-    all_checks_passed = True
-    
-    # Run Next.js checks if it's a Next.js project
-    if os.path.exists('next.config.js'):
-        all_checks_passed &= run_nextjs_analysis()
-    
-    # Run Vercel checks if it's a Vercel project
-    if os.path.exists('vercel.json') or os.path.exists('.vercel'):
-        all_checks_passed &= run_vercel_analysis()
-    
-    # Run general JS/TS analysis
-    all_checks_passed &= run_js_analysis()
-    
-    return all_checks_passed
+def run_secret_analysis(changed_files: ChangedFiles) -> AnalyzerResult:
+    """Scan the lines the PR adds for committed credentials."""
+    print("Scanning added lines for secrets...")
+    issues = [finding.to_dict() for finding in scan_secrets(changed_files)]
+    return not any(issue['type'] == 'error' for issue in issues), issues
 
-def run_ai_analysis():
+def run_pii_analysis(changed_files: ChangedFiles, allowlist: Sequence[str] = (),
+                     max_workers: Optional[int] = None,
+                     cancel: Optional[threading.Event] = None) -> AnalyzerResult:
+    """Scan the lines the PR adds for personal data."""
+    print("Scanning added lines for personal data...")
+    issues = [finding.to_dict() for finding in scan_pii(changed_files, allowlist, max_workers, cancel=cancel)]
+    return not any(issue['type'] == 'error' for issue in issues), issues
+
+def run_ai_analysis(changed_files: ChangedFiles, config: Optional[Dict[str, Any]] = None,
+                    repo_index: Optional[RepoIndex] = None, cache_dir: Optional[str] = None,
+                    stats: Optional[Dict[str, Any]] = None,
+                    cancel: Optional[threading.Event] = None) -> AnalyzerResult:
     """Run AI-specific analysis."""
     print("Running AI-specific analysis...")
-    # TODO: Implement AI-specific checks
-    return True
+    issues = check_ai(changed_files, config, repo_index, cache_dir, stats, cancel)
+    return not any(issue['type'] == 'error' for issue in issues), issues
 
-def run_api_analysis():
+def run_api_analysis(changed_files: ChangedFiles, config: Optional[Dict[str, Any]] = None,
+                     repo_index: Optional[RepoIndex] = None, cache_dir: Optional[str] = None,
+                     stats: Optional[Dict[str, Any]] = None, max_workers: Optional[int] = None,
+                     cancel: Optional[threading.Event] = None) -> AnalyzerResult:
     """Run API-specific analysis."""
     print("Running API-specific analysis...")
-    # TODO: Implement API-specific checks
-    return True
+    issues = check_api(changed_files, config, repo_index, cache_dir, stats, max_workers, cancel)
+    return not any(issue['type'] == 'error' for issue in issues), issues
+
+def build_executor(config: Dict[str, Any]) -> ToolExecutor:
+    """
+    Create the tool executor for a run from the `analysis` config section.
+    
+    Args:
+        config: The bot configuration dictionary
+        
+    Returns:
+        ToolExecutor capped at `analysis.max_workers` (default: CPU count)
+        with `analysis.tool_timeout` seconds per tool
+    """
+    analysis_config = config.get('analysis', {})
+    return ToolExecutor(
+        max_workers=analysis_config.get('max_workers'),
+        default_timeout=analysis_config.get('tool_timeout', DEFAULT_TOOL_TIMEOUT)
+    )
+
+def _prepare_dependencies(context: CheckContext) -> Optional[Dict[str, Any]]:
+    if not context.resources['repo_index'].is_file('package.json'):
+        return None
+    cache_dir = context.resources['cache_dir']
+    stats = prepare_node_dependencies(context.changed_files, '.',
+                                      NodeModulesCache(cache_dir) if cache_dir else None)
+    context.stats['node_dependencies'] = stats
+    return stats
+
+def _run_python(context: CheckContext) -> AnalyzerResult:
+    return run_python_analysis(context.changed_files, context.resources['executor'],
+                               context.resources['cache'], context.analysis('shard_count'),
+                               context.config.get('python', {}).get('backend', BACKEND_SUBPROCESS))
+
+def _run_projects(analysis: Callable[..., AnalyzerResult], context: CheckContext,
+                  **options: Any) -> AnalyzerResult:
+    return analysis(context.changed_files, context.resources['repo_index'], context.resources['manifests'],
+                    context.resources['workspaces'], context.resources['executor'].max_workers, **options)
+
+def _run_nextjs(context: CheckContext) -> AnalyzerResult:
+    budget = BundleBudget.from_config(context.config, context.resources['cache_dir'],
+                                      context.changed_files.base_sha)
+    return _run_projects(run_nextjs_analysis, context, bundle_budget=budget)
+
+def _run_pii(context: CheckContext) -> AnalyzerResult:
+    return run_pii_analysis(context.changed_files, context.config.get('data_privacy', {}).get('allowlist', ()),
+                            context.resources['executor'].max_workers, context.cancel_event)
+
+def _run_ai(context: CheckContext) -> AnalyzerResult:
+    return run_ai_analysis(context.changed_files, context.config, context.resources['repo_index'],
+                           context.resources['cache_dir'], context.stats, context.cancel_event)
+
+def _run_api(context: CheckContext) -> AnalyzerResult:
+    return run_api_analysis(context.changed_files, context.config, context.resources['repo_index'],
+                            context.resources['cache_dir'], context.stats,
+                            context.resources['executor'].max_workers, context.cancel_event)
+
+def _run_js(context: CheckContext) -> AnalyzerResult:
+    return run_js_analysis(context.changed_files, context.resources['executor'],
+                           context.resources['cache'], context.analysis('shard_count'),
+                           context.resources['cache_dir'], context.stats,
+                           context.analysis('incremental_typescript', True),
+                           prepare_dependencies=False, repo_index=context.resources['repo_index'])
+
+# Every check the bot can run; each runs at most once per review. value
+# and cost (expected seconds until learned) decide what runs first when
+# the time budget is tight
+CHECKS = CheckRegistry([
+    Check('node_dependencies', _prepare_dependencies, report=False, cost=60,
+          description='Install or restore node_modules for the lockfile'),
+    Check('python', _run_python, config_key='code_style', languages=('python',), value=3, cost=20,
+          description='flake8, black and bandit on changed Python files'),
+    Check('python_rules', lambda context: run_python_rules_analysis(context.changed_files, context.config,
+                                                                   context.cancel_event),
+          languages=('python',), value=2, cost=1,
+          description='Complexity, function length, file size and docstrings in one pass per file'),
+    Check('javascript', _run_js, requires=('node_dependencies',), config_key='code_style',
+          languages=JS_LANGUAGES, value=3, cost=60, description='ESLint and tsc on changed JS/TS files'),
+    Check('secrets', lambda context: run_secret_analysis(context.changed_files), config_key='security',
+          value=3, cost=2, description='Credentials in added lines and committed env files'),
+    Check('pii', _run_pii, config_key='data_privacy.pii_scan', value=2, cost=2,
+          description='Emails, phone numbers, national IDs, card numbers and IPs in added lines'),
+    Check('coverage', lambda context: run_coverage_analysis(context.changed_files, context.config, context.stats),
+          config_key='test_coverage', value=2, cost=1,
+          description='Coverage of added lines from coverage.xml or lcov.info against min_test_coverage'),
+    Check('nextjs', _run_nextjs, repo_types=('frontend',),
+          files=NEXT_CONFIGS, in_workspaces=True, value=2, cost=2,
+          description='Next.js project checks on the root and touched workspaces'),
+    Check('vercel', functools.partial(_run_projects, run_vercel_analysis), repo_types=('frontend',),
+          files=VERCEL_MARKERS, in_workspaces=True, cost=1,
+          description='Vercel deployment checks on the root and touched workspaces'),
+    Check('ai', _run_ai, repo_types=('ai_agent',), value=2, cost=5,
+          description='Model versions, model-output parsing and prompts in changed files'),
+    Check('api', _run_api, repo_types=('api',), value=2, cost=2,
+          description='OpenAPI spec changes, and auth, rate limits and error handling of changed routes')
+])
+
+def build_time_budget(config: Dict[str, Any]) -> TimeBudget:
+    """
+    Start the review time budget from the `analysis` config section.
+    
+    Args:
+        config: The bot configuration dictionary
+        
+    Returns:
+        TimeBudget of `analysis.time_budget` seconds, unlimited if unset,
+        keeping `analysis.review_reserve` seconds for posting the review
+    """
+    analysis_config = config.get('analysis', {})
+    return TimeBudget(analysis_config.get('time_budget'), analysis_config.get('review_reserve'))
+
+def stream_analysis(changed_files: ChangedFiles, config: Dict[str, Any],
+                    stats: Dict[str, Any],
+                    budget: Optional[TimeBudget] = None) -> Iterator[Tuple[str, AnalyzerResult]]:
+    """
+    Run the checks that apply to the repository and stream their results.
+    
+    Args:
+        changed_files: Index of the files changed by the PR
+        config: The bot configuration dictionary
+        stats: Statistics dictionary updated with run details
+        budget: Time budget of the review; started from the config when
+            not given
+        
+    Yields:
+        (check name, (passed, issues)) pairs as checks finish; checks the
+        budget cannot fit are listed in stats['skipped_checks'] instead
+    """
+    # The tools of every check share one bounded executor and run side by side
+    executor = build_executor(config)
+    cache = build_result_cache(config)
+    cache_dir = resolve_cache_dir(config)
+    # One walk of the checkout answers every checker's file lookups
+    repo_index = RepoIndex.build(changed_files.repo_path)
+    # and manifests are parsed once, however many checkers read them
+    manifests = ManifestCache(changed_files.repo_path, repo_index)
+    workspaces = discover_workspaces(repo_index, manifests)
+    if workspaces:
+        stats['workspaces'] = len(workspaces)
+    context = CheckContext(changed_files, config, stats, executor=executor, cache=cache,
+                           cache_dir=cache_dir, repo_index=repo_index, manifests=manifests,
+                           workspaces=workspaces)
+    # Running out of time kills the tools still running
+    context.on_cancel(executor.cancel)
+    yield from CHECKS.run(context, budget=budget or build_time_budget(config),
+                          costs=CostModel(cache_dir), parallelism=executor.max_workers)
+    if cache:
+        stats['cache'] = {'hits': cache.hits, 'misses': cache.misses}
+        # Once per review rather than per tool run; it walks the whole cache
+        cache.evict()
 
-def run_analysis(pr, config) -> Dict[str, Any]:
+def run_analysis(pr, config, changed_files: Optional[ChangedFiles] = None,
+                 budget: Optional[TimeBudget] = None) -> Dict[str, Any]:
     """
     Main analysis function that runs all configured checks on a PR.
     
     Args:
         pr: The GitHub pull request object
         config: The bot configuration dictionary
+        changed_files: Index of the files changed by the PR; built from
+            pr.get_files() when not given
+        budget: Time budget of the review; started from the config when
+            not given
     
     Returns:
         Dict containing analysis results with keys:
         - passed: bool indicating if all checks passed
         - issues: list of found issues
-        - stats: dict of analysis statistics
+        - stats: dict of analysis statistics, including the checks the
+          time budget cut in skipped_checks
         
     Raises:
         TypeError: If pr is not a PullRequest object or config is not a dictionary
@@ -195,65 +430,46 @@ def run_analysis(pr, config) -> Dict[str, Any]:
     if not isinstance(config, dict):
         raise TypeError(f"config must be a dictionary, got {type(config)}")
     
+    if changed_files is not None and not isinstance(changed_files, ChangedFiles):
+        raise TypeError(f"changed_files must be a ChangedFiles index, got {type(changed_files)}")
+    
     print(f"Running analysis on PR #{pr.number}...")
+    if changed_files is None:
+        changed_files = build_changed_files(pr)
     results = {
         'passed': True,
         'issues': [],
-        'stats': {}
+        'stats': {'changed_files': len(changed_files)}
     }
     
-    # Run general code analysis based on file types
-    if config.get('rules', {}).get('code_style', True):
-        if any(f.endswith('.py') for f in os.listdir('.')):
-            py_passed = run_python_analysis()
-            results['passed'] &= py_passed
-            
-        if any(f.endswith(('.js', '.jsx', '.ts', '.tsx')) for f in os.listdir('.')):
-            js_passed = run_js_analysis()
-            results['passed'] &= js_passed
-    
-    # Run specialized analysis based on repo type
-    repo_type = config.get('type', 'default')
-    if repo_type == 'frontend':
-        frontend_passed = run_frontend_analysis()
-        results['passed'] &= frontend_passed
-    elif repo_type == 'ai_agent':
-        ai_passed = run_ai_analysis()
-        results['passed'] &= ai_passed
-    elif repo_type == 'api':
-        api_passed = run_api_analysis()
-        results['passed'] &= api_passed
-    
-    # Load and combine all results
-    for result_file in ['analysis_results.json', 'js_analysis_results.json', 
-                       'nextjs_analysis_results.json', 'vercel_analysis_results.json']:
-        if os.path.exists(result_file):
-            with open(result_file) as f:
-                file_results = json.load(f)
-                results['issues'].extend(file_results if isinstance(file_results, list) 
-                                      else [{'tool': k, 'output': v} for k, v in file_results.items()])
+    # Collect results in memory as analyzers finish, optionally keeping a
+    # copy on disk in a run-scoped directory
+    sink = build_result_sink(config)
+    for name, (passed, issues) in stream_analysis(changed_files, config, results['stats'], budget):
+        results['passed'] &= passed
+        results['issues'].extend(issues)
+        if sink:
+            sink.write(name, issues)
+    if sink:
+        results['stats']['results_dir'] = sink.directory
     
     return results
 
 def main():
     config = load_config()
-    all_checks_passed = True
+    changed_files = ChangedFiles.from_git()
     
-    # Run general code analysis based on file types
-    if config.get('rules', {}).get('code_style', True):
-        if any(f.endswith('.py') for f in os.listdir('.')):
-            all_checks_passed &= run_python_analysis()
-        if any(f.endswith(('.js', '.jsx', '.ts', '.tsx')) for f in os.listdir('.')):
-            all_checks_passed &= run_js_analysis()
+    # Show which checks would run, and why, without running them
+    if '--dry-run' in sys.argv[1:]:
+        repo_index = RepoIndex.build(changed_files.repo_path)
+        plan = CHECKS.plan(config, changed_files, repo_index, discover_workspaces(repo_index))
+        print(format_plan(plan, CostModel(resolve_cache_dir(config))))
+        sys.exit(0)
+    
+    all_checks_passed = True
     
-    # Run specialized analysis based on repo type
-    repo_type = config.get('type', 'default')
-    if repo_type == 'frontend':
-        all_checks_passed &= run_frontend_analysis()
-    elif repo_type == 'ai_agent':
-        all_checks_passed &= run_ai_analysis()
-    elif repo_type == 'api':
-        all_checks_passed &= run_api_analysis()
+    for _, (passed, _) in stream_analysis(changed_files, config, {}):
+        all_checks_passed &= passed
     
     # Set GitHub Actions output
     with open(os.environ['GITHUB_OUTPUT'], 'a') as f:
@@ -263,4 +479,4 @@ def main():
     sys.exit(0 if all_checks_passed else 1)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
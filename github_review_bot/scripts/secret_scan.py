@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Script to find credentials in the lines a pull request adds.
+"""
+
+import math
+import os
+import re
+import subprocess
+from collections import Counter
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+from .changed_files import ChangedFiles
+from .diff_index import UnpatchedAddedLines, iter_added_lines, normalize_path
+from .findings import Finding
+
+# Known credential formats: (rule, description, pattern)
+SECRET_RULES: Sequence[Tuple[str, str, str]] = (
+    ('aws-access-key-id', 'AWS access key ID', r'\b(?:AKIA|ASIA|ABIA|ACCA)[0-9A-Z]{16}\b'),
+    ('github-token', 'GitHub token', r'\b(?:gh[pousr]_[A-Za-z0-9]{36,255}|github_pat_[A-Za-z0-9_]{22,255})\b'),
+    ('slack-token', 'Slack token', r'\bxox[abposr]-[A-Za-z0-9-]{10,}'),
+    ('slack-webhook', 'Slack webhook URL', r'https://hooks\.slack\.com/services/[A-Za-z0-9_/-]{20,}'),
+    ('stripe-secret-key', 'Stripe secret key', r'\b[sr]k_live_[A-Za-z0-9]{20,}\b'),
+    ('google-api-key', 'Google API key', r'\bAIza[0-9A-Za-z_-]{35}\b'),
+    ('anthropic-api-key', 'Anthropic API key', r'\bsk-ant-[A-Za-z0-9_-]{32,}'),
+    ('openai-api-key', 'OpenAI API key', r'\bsk-(?:proj-|svcacct-|admin-)[A-Za-z0-9_-]{32,}|\bsk-[A-Za-z0-9]{48}\b'),
+    ('npm-token', 'npm access token', r'\bnpm_[A-Za-z0-9]{36}\b'),
+    ('sendgrid-api-key', 'SendGrid API key', r'\bSG\.[A-Za-z0-9_-]{22}\.[A-Za-z0-9_-]{43}\b'),
+    ('private-key', 'private key', r'-----BEGIN (?:[A-Z]+ )?PRIVATE KEY-----'),
+    ('jwt', 'JSON web token', r'\beyJ[A-Za-z0-9_-]{10,}\.eyJ[A-Za-z0-9_-]{10,}\.[A-Za-z0-9_-]{10,}'),
+)
+
+# Assignments whose key names a credential: KEY = "value", key: value
+ASSIGNMENT = re.compile(
+    r'''(?<![\w.-])(?P<key>[A-Za-z_][\w.-]*)["']?\s*(?::=|=>|[:=])\s*[bru]?["'`]?(?P<value>[A-Za-z0-9+/=_.~-]{16,})'''
+)
+SECRET_KEY = re.compile(r'secret|token|passw(?:or)?d|pwd|api_?key|apikey|private_?key|credential|auth',
+                        re.IGNORECASE)
+HEX = re.compile(r'\A[0-9a-fA-F]+\Z')
+
+# Bits of entropy per character above which a value looks random
+MIN_ENTROPY = 3.5
+MIN_HEX_ENTROPY = 3.0
+
+# Values that are placeholders rather than credentials
+PLACEHOLDERS = re.compile(r'example|placeholder|changeme|change_me|dummy|your[_-]|xxxx|\*\*\*|<|\$\{|process\.env',
+                          re.IGNORECASE)
+
+# Marker accepted by detect-secrets and similar tools to allow a line
+ALLOW_MARKER = 'pragma: allowlist secret'
+
+# Files full of hashes that are not secrets
+SKIPPED_FILES = ('package-lock.json', 'yarn.lock', 'pnpm-lock.yaml', 'poetry.lock', 'Pipfile.lock')
+
+ENV_FILE = re.compile(r'(?:^|/)\.env(?:\.[\w.-]+)?$')
+
+
+def shannon_entropy(value: str) -> float:
+    """Return the Shannon entropy of a string in bits per character."""
+    if not value:
+        return 0.0
+    length = len(value)
+    return -sum(count / length * math.log2(count / length) for count in Counter(value).values())
+
+
+def redact(value: str) -> str:
+    """Show only enough of a secret to find it."""
+    return value[:4] + '…' if len(value) > 8 else '…'
+
+
+class SecretScanner:
+    """
+    Finds credentials line by line.
+
+    Known token formats are matched by one combined regular expression,
+    so each line is searched once whatever the number of rules. Values
+    assigned to credential-like keys are then checked for high entropy.
+    """
+
+    def __init__(self, rules: Sequence[Tuple[str, str, str]] = SECRET_RULES):
+        self._rules = {f"r{i}": (rule, description) for i, (rule, description, _) in enumerate(rules)}
+        self._pattern = re.compile('|'.join(f"(?P<r{i}>{pattern})"
+                                            for i, (_, _, pattern) in enumerate(rules)))
+
+    def scan_line(self, text: str) -> Iterator[Tuple[str, str, str, int, str]]:
+        """
+        Find the credentials on one line.
+
+        Yields:
+            (rule, description, severity, column, value) per credential
+        """
+        if ALLOW_MARKER in text:
+            return
+        matched: List[Tuple[int, int]] = []
+        for match in self._pattern.finditer(text):
+            if match.lastgroup is None:
+                continue
+            rule, description = self._rules[match.lastgroup]
+            matched.append(match.span())
+            yield rule, description, 'error', match.start() + 1, match.group()
+        for match in ASSIGNMENT.finditer(text):
+            value = match.group('value')
+            start = match.start('value')
+            if any(s <= start < e for s, e in matched) or not SECRET_KEY.search(match.group('key')):
+                continue
+            if PLACEHOLDERS.search(value) or PLACEHOLDERS.search(text[start:start + len(value) + 2]):
+                continue
+            threshold = MIN_HEX_ENTROPY if HEX.match(value) else MIN_ENTROPY
+            if shannon_entropy(value) >= threshold:
+                yield 'high-entropy-secret', f"high-entropy value of {match.group('key')}", 'warning', \
+                    start + 1, value
+
+    def scan_lines(self, path: str, lines: Iterable[Tuple[int, str]]) -> Iterator[Finding]:
+        """
+        Scan numbered lines of one file.
+
+        Args:
+            path: Repository-relative path, for the findings
+            lines: (line number, text) pairs, e.g. from iter_added_lines
+
+        Yields:
+            Finding per credential, with the value redacted
+        """
+        for number, text in lines:
+            for rule, description, severity, column, value in self.scan_line(text):
+                yield Finding('secrets', rule, severity, path, number, column,
+                              f"Possible {description} ({redact(value)}) committed; remove it and "
+                              f"rotate the credential")
+
+    def scan_file(self, path: str, repo_path: str = '.') -> Iterator[Finding]:
+        """Scan a whole file line by line, without reading it at once."""
+        try:
+            with open(os.path.join(repo_path, path), encoding='utf-8', errors='replace') as f:
+                yield from self.scan_lines(path, enumerate((line.rstrip('\n') for line in f), 1))
+        except OSError:
+            return
+
+
+def is_env_file(path: str) -> bool:
+    """Whether a path is a dotenv file such as .env.local."""
+    return bool(ENV_FILE.search(path))
+
+
+def tracked_env_files(repo_path: str = '.') -> List[str]:
+    """Return the dotenv files committed to a git checkout; empty when git fails."""
+    try:
+        result = subprocess.run(['git', 'ls-files', '-z', '--', ':(glob)**/.env*'],
+                                capture_output=True, text=True, cwd=repo_path, timeout=60)
+    except (OSError, subprocess.TimeoutExpired):
+        return []
+    if result.returncode != 0:
+        return []
+    return [path for path in result.stdout.split('\0') if path and is_env_file(path)]
+
+
+def scan_changed_files(changed_files: ChangedFiles,
+                       scanner: Optional[SecretScanner] = None) -> List[Finding]:
+    """
+    Scan the lines added by a pull request for credentials.
+
+    Patches are streamed line by line. Files without a patch (diffs too
+    large for the API, or indexes built from git) are scanned whole from
+    the checkout when they are new or dotenv files; for other files the
+    added lines are taken from a git diff against the merge-base.
+    Committed dotenv files the PR left alone are scanned whole as well;
+    as the PR did not add their credentials, those are warnings.
+
+    Args:
+        changed_files: Index of the files changed by the PR
+        scanner: Scanner to use; one with the default rules when not given
+
+    Returns:
+        Findings sorted by location
+
+    Raises:
+        TypeError: If changed_files is not a ChangedFiles index
+    """
+    if not isinstance(changed_files, ChangedFiles):
+        raise TypeError(f"changed_files must be a ChangedFiles index, got {type(changed_files)}")
+    scanner = scanner or SecretScanner()
+    unpatched = UnpatchedAddedLines(changed_files)
+    findings: List[Finding] = []
+    for changed_file in changed_files:
+        if os.path.basename(changed_file.path) in SKIPPED_FILES or changed_file.status == 'removed':
+            continue
+        if changed_file.patch is not None:
+            findings.extend(scanner.scan_lines(changed_file.path, iter_added_lines(changed_file.patch)))
+        elif changed_file.status == 'added' or is_env_file(changed_file.path):
+            findings.extend(scanner.scan_file(changed_file.path, changed_files.repo_path))
+        else:
+            lines = unpatched.get(changed_file.path)
+            if lines is None:
+                print(f"No diff for {changed_file.path}, skipping its credential scan")
+                continue
+            findings.extend(scanner.scan_lines(changed_file.path, lines))
+
+    changed = {normalize_path(f.path) for f in changed_files}
+    for path in tracked_env_files(changed_files.repo_path):
+        if path in changed:
+            continue
+        for finding in scanner.scan_file(path, changed_files.repo_path):
+            finding.severity = 'warning'
+            findings.append(finding)
+    return sorted(findings, key=Finding.sort_key)
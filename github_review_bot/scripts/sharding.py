@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Script to split large file lists into size-balanced shards for linting.
+"""
+
+import heapq
+from typing import List, Optional, Sequence
+from .changed_files import ChangedFile
+
+# Do not bother sharding less than this much source per shard
+MIN_SHARD_BYTES = 256 * 1024
+
+# Keep every invocation's file arguments well below common ARG_MAX limits
+MAX_SHARD_ARGV_CHARS = 64 * 1024
+
+
+def shard_count_for(files: Sequence[ChangedFile], max_workers: int,
+                    configured: Optional[int] = None) -> int:
+    """
+    Decide how many shards a file list should be split into.
+
+    Args:
+        files: Files to lint
+        max_workers: Number of tool processes that can run at once
+        configured: Explicit shard count from `analysis.shard_count`, or None
+            to size shards automatically
+
+    Returns:
+        Number of shards, at least 1 and never more than the number of files
+    """
+    if not files:
+        return 1
+    if configured is not None:
+        count = configured
+    else:
+        total_bytes = sum(f.size or 0 for f in files)
+        count = min(max_workers, total_bytes // MIN_SHARD_BYTES)
+    # Long file lists must be split regardless, or the tool cannot be started
+    argv_chars = sum(len(f.path) + 1 for f in files)
+    count = max(count, -(-argv_chars // MAX_SHARD_ARGV_CHARS))
+    return max(1, min(count, len(files)))
+
+
+def shard_files(files: Sequence[ChangedFile], shard_count: int) -> List[List[ChangedFile]]:
+    """
+    Split files into shards of roughly equal total byte size.
+
+    Uses the longest-processing-time rule: files are assigned largest first
+    to the currently smallest shard. Each shard keeps the original file
+    order, so merged results come out in a stable order.
+
+    Args:
+        files: Files to split
+        shard_count: Number of shards
+
+    Returns:
+        Non-empty shards
+
+    Raises:
+        ValueError: If shard_count is not positive
+    """
+    if shard_count < 1:
+        raise ValueError(f"shard_count must be positive, got {shard_count}")
+    if shard_count == 1:
+        return [list(files)] if files else []
+
+    order = {f.path: i for i, f in enumerate(files)}
+    # (bytes, files, shard index): ties on size go to the shard with fewer files
+    heap = [(0, 0, i) for i in range(shard_count)]
+    shards: List[List[ChangedFile]] = [[] for _ in range(shard_count)]
+    for changed_file in sorted(files, key=lambda f: (-(f.size or 0), order[f.path])):
+        size, count, i = heapq.heappop(heap)
+        shards[i].append(changed_file)
+        heapq.heappush(heap, (size + (changed_file.size or 0), count + 1, i))
+    return [sorted(shard, key=lambda f: order[f.path]) for shard in shards if shard]
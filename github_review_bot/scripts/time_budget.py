@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Script to track the review time budget and learn how long each check takes.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+# Cost assumed for a check that has never run and declares no estimate
+DEFAULT_CHECK_COST = 30.0
+
+# Weight of the latest run in the moving average of a check's cost
+COST_SMOOTHING = 0.3
+
+COSTS_FILE = 'check_costs.json'
+
+# Share of a limited budget held back for posting the review, and its cap
+REVIEW_RESERVE_SHARE = 0.1
+MAX_REVIEW_RESERVE = 60.0
+
+
+class TimeBudget:
+    """
+    Wall-clock budget of one review, started on creation.
+
+    The last `reserve` seconds are kept for posting the review, so checks
+    only get the rest.
+    """
+
+    def __init__(self, seconds: Optional[float] = None, reserve: Optional[float] = None):
+        if seconds is not None and (not isinstance(seconds, (int, float)) or seconds <= 0):
+            raise ValueError(f"time budget must be a positive number of seconds, got {seconds!r}")
+        if reserve is None:
+            reserve = min(MAX_REVIEW_RESERVE, seconds * REVIEW_RESERVE_SHARE) if seconds else 0.0
+        if not isinstance(reserve, (int, float)) or reserve < 0 or (seconds is not None and reserve >= seconds):
+            raise ValueError(f"review reserve must be a number of seconds below the budget, got {reserve!r}")
+        self.seconds = seconds
+        self.reserve = reserve
+        self.start = time.monotonic()
+
+    @property
+    def limited(self) -> bool:
+        """Whether there is a budget at all."""
+        return self.seconds is not None
+
+    def elapsed(self) -> float:
+        """Seconds spent since the budget started."""
+        return time.monotonic() - self.start
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left for checks, never negative, or None without a budget."""
+        if self.seconds is None:
+            return None
+        return max(0.0, self.seconds - self.reserve - self.elapsed())
+
+
+class CostModel:
+    """
+    Per-check cost estimates learned from past runs.
+
+    Each completed check updates an exponential moving average of its
+    duration. The averages are stored as JSON in the cache directory,
+    so estimates carry over between runs that share the cache.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.path = os.path.join(cache_dir, COSTS_FILE) if cache_dir else None
+        self._lock = threading.Lock()
+        self._costs: Dict[str, float] = {}
+        if self.path:
+            try:
+                with open(self.path) as f:
+                    stored = json.load(f)
+                self._costs = {name: float(cost) for name, cost in stored.items()}
+            except (OSError, ValueError, TypeError, AttributeError):
+                self._costs = {}
+
+    def estimate(self, name: str, prior: Optional[float] = None) -> float:
+        """
+        Return the expected duration of a check in seconds.
+
+        Args:
+            name: Check name
+            prior: Estimate to use before the check has ever run
+        """
+        with self._lock:
+            if name in self._costs:
+                return self._costs[name]
+        return prior if prior is not None else DEFAULT_CHECK_COST
+
+    def record(self, name: str, seconds: float) -> None:
+        """Fold the duration of a completed check into its estimate."""
+        with self._lock:
+            previous = self._costs.get(name)
+            self._costs[name] = seconds if previous is None else \
+                COST_SMOOTHING * seconds + (1 - COST_SMOOTHING) * previous
+
+    def save(self) -> None:
+        """Store the estimates atomically; failures only lose what was learned."""
+        if not self.path:
+            return
+        with self._lock:
+            costs = dict(self._costs)
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(costs, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Could not save check cost estimates: {e}")
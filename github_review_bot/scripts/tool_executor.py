@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Script to run independent analysis tools concurrently in a bounded pool.
+"""
+
+import multiprocessing
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set
+from .findings import Finding
+
+# Default per-tool timeout in seconds
+DEFAULT_TOOL_TIMEOUT = 600
+
+
+class ToolSpec:
+    """
+    Description of a single tool invocation.
+
+    parse, when given, turns the finished ToolResult into findings; it runs
+    on the worker thread, so parsing overlaps with the other tools.
+
+    call, when given, runs the tool in-process instead of starting args as
+    a subprocess and returns a ToolResult with its findings already set.
+    In-process calls hold a worker slot and cannot be killed, so the
+    timeout does not apply to them; they are expected to stop between
+    files once the executor's cancel_event is set.
+    """
+
+    def __init__(self, name: str, args: Sequence[str], timeout: Optional[float] = None,
+                 cwd: Optional[str] = None,
+                 parse: Optional[Callable[['ToolResult'], Iterable[Finding]]] = None,
+                 call: Optional[Callable[[], 'ToolResult']] = None):
+        self.name = name
+        self.args = list(args)
+        self.timeout = timeout
+        self.cwd = cwd
+        self.parse = parse
+        self.call = call
+
+
+class ToolResult:
+    """Outcome of a single tool invocation."""
+
+    def __init__(self, name: str, returncode: Optional[int] = None, stdout: str = '',
+                 stderr: str = '', duration: float = 0.0, timed_out: bool = False,
+                 cancelled: bool = False, error: Optional[str] = None,
+                 findings: Optional[List[Finding]] = None):
+        self.name = name
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.duration = duration
+        self.timed_out = timed_out
+        self.cancelled = cancelled
+        self.error = error
+        self.findings: List[Finding] = findings or []
+
+    @property
+    def ok(self) -> bool:
+        """Whether the tool ran to completion with a zero exit status."""
+        return self.returncode == 0
+
+
+class ToolExecutionError(RuntimeError):
+    """Raised when a tool cannot be executed at all, e.g. it is not installed."""
+
+    def __init__(self, name: str, cause: BaseException):
+        super().__init__(f"Could not run {name}: {cause}")
+        self.name = name
+        self.cause = cause
+
+
+class ToolExecutor:
+    """
+    Run tool invocations concurrently with per-tool timeouts.
+
+    A single executor caps the number of live tool processes across every
+    call to run(), so analyzers sharing it never oversubscribe the runner.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None,
+                 default_timeout: float = DEFAULT_TOOL_TIMEOUT):
+        if max_workers is not None and (not isinstance(max_workers, int) or max_workers < 1):
+            raise ValueError(f"max_workers must be a positive integer, got {max_workers!r}")
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.default_timeout = default_timeout
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self._cancelled = threading.Event()
+        self._live_lock = threading.Lock()
+        self._live: Set[subprocess.Popen] = set()
+
+    @property
+    def cancel_event(self) -> threading.Event:
+        """Event set by cancel(), for in-process tools to test between files."""
+        return self._cancelled
+
+    def cancel(self) -> None:
+        """
+        Kill every running tool and make all later tools report cancelled.
+
+        Used when the review runs out of time; safe to call from any thread.
+        """
+        self._cancelled.set()
+        with self._live_lock:
+            for proc in self._live:
+                if proc.poll() is None:
+                    proc.kill()
+
+    def run(self, specs: Sequence[ToolSpec]) -> Dict[str, ToolResult]:
+        """
+        Run the given tools concurrently and wait for all of them.
+
+        Args:
+            specs: Tool invocations to run; names must be unique
+
+        Returns:
+            Dictionary mapping tool name to its ToolResult
+
+        Raises:
+            TypeError: If specs contains something other than ToolSpec objects
+            ToolExecutionError: If a tool could not be started; all other
+                tools of the same call are cancelled before raising
+        """
+        if not all(isinstance(spec, ToolSpec) for spec in specs):
+            raise TypeError("specs must be a sequence of ToolSpec objects")
+        if not specs:
+            return {}
+
+        cancel = threading.Event()
+        lock = threading.Lock()
+        running: Dict[str, subprocess.Popen] = {}
+        fatal: List[ToolExecutionError] = []
+
+        def cancelled() -> bool:
+            if self._cancelled.is_set():
+                cancel.set()
+            return cancel.is_set()
+
+        def cancel_all() -> None:
+            cancel.set()
+            with lock:
+                for proc in running.values():
+                    if proc.poll() is None:
+                        proc.kill()
+
+        def run_in_process(spec: ToolSpec, start: float) -> ToolResult:
+            try:
+                result = spec.call()
+            except Exception as e:
+                # Reported like a crashed tool rather than aborting the run
+                result = ToolResult(spec.name, stderr=f"{type(e).__name__}: {e}", error=str(e))
+            result.name = spec.name
+            result.duration = time.monotonic() - start
+            return result
+
+        def run_one(spec: ToolSpec) -> ToolResult:
+            with self._slots:
+                if cancelled():
+                    return ToolResult(spec.name, cancelled=True)
+                start = time.monotonic()
+                if spec.call:
+                    return run_in_process(spec, start)
+                try:
+                    proc = subprocess.Popen(
+                        spec.args,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.PIPE,
+                        text=True,
+                        cwd=spec.cwd
+                    )
+                except OSError as e:
+                    with lock:
+                        fatal.append(ToolExecutionError(spec.name, e))
+                    cancel_all()
+                    return ToolResult(spec.name, error=str(e))
+
+                with lock, self._live_lock:
+                    running[spec.name] = proc
+                    self._live.add(proc)
+                    # A fatal error or a cancel may have come while this tool started
+                    if cancelled():
+                        proc.kill()
+                timeout = spec.timeout if spec.timeout is not None else self.default_timeout
+                try:
+                    stdout, stderr = proc.communicate(timeout=timeout)
+                    timed_out = False
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    stdout, stderr = proc.communicate()
+                    timed_out = True
+                finally:
+                    with lock, self._live_lock:
+                        running.pop(spec.name, None)
+                        self._live.discard(proc)
+
+                result = ToolResult(
+                    spec.name,
+                    returncode=None if timed_out or cancelled() else proc.returncode,
+                    stdout=stdout or '',
+                    stderr=stderr or '',
+                    duration=time.monotonic() - start,
+                    timed_out=timed_out,
+                    cancelled=cancel.is_set() and not timed_out
+                )
+            if spec.parse and result.returncode is not None:
+                result.findings = list(spec.parse(result))
+                # Keep the compact findings, not the raw text they came from
+                result.stdout = ''
+            return result
+
+        with ThreadPoolExecutor(max_workers=len(specs)) as pool:
+            futures = {spec.name: pool.submit(run_one, spec) for spec in specs}
+            results = {name: future.result() for name, future in futures.items()}
+
+        if fatal:
+            raise fatal[0]
+        return results
+
+
+def process_pool_context() -> multiprocessing.context.BaseContext:
+    """
+    Return the start method for process pools opened by analyzers.
+
+    Analyzers run on registry worker threads, where forking could copy a
+    lock another thread holds; forkserver (spawn where it is missing)
+    starts workers from a clean process instead.
+    """
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
@@ -0,0 +1,540 @@
+#!/usr/bin/env python3
+"""
+Script to type-check TypeScript projects incrementally, scoped to the PR.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+from .changed_files import ChangedFiles, JS_LANGUAGES
+from .diff_index import normalize_path
+from .findings import Finding, parse_tsc
+from .tool_executor import ToolResult, ToolSpec
+
+# Type-check modes reported in the run stats
+MODE_FULL = 'full'
+MODE_INCREMENTAL = 'incremental'
+MODE_BUILD = 'build'
+
+# Base commits whose build info is kept in the cache
+DEFAULT_MAX_BASES = 5
+
+# Snapshot of `tsc -b` outputs kept for a base commit in the store
+BUILD_OUTPUTS = 'build'
+
+# compilerOptions holding paths relative to the config that sets them
+PATH_OPTIONS = ('outDir', 'declarationDir', 'tsBuildInfoFile')
+
+# Directories that never hold project sources
+SKIP_DIRS = {'node_modules', '.git', '.next', 'dist', 'build', 'coverage'}
+
+SOURCE_EXTENSIONS = ('.ts', '.tsx', '.mts', '.cts', '.js', '.jsx', '.mjs', '.cjs')
+
+# Candidates tried when resolving a relative import specifier
+RESOLVE_SUFFIXES = ('', '.ts', '.tsx', '.d.ts', '.js', '.jsx', '/index.ts', '/index.tsx', '/index.js')
+
+# Relative module specifiers of import/export ... from, import(), require()
+IMPORT_SPECIFIER = re.compile(r'''\b(?:from|import|require)\s*\(?\s*['"](\.{1,2}/[^'"]+)['"]''')
+
+# Strings are matched first so comment markers inside them are left alone
+JSONC_TOKEN = re.compile(r'"(?:\\.|[^"\\])*"|//[^\n]*|/\*.*?\*/', re.S)
+TRAILING_COMMA = re.compile(r',(\s*[}\]])')
+
+
+def load_tsconfig(path: str) -> Dict[str, Any]:
+    """
+    Read a tsconfig file, which may contain comments and trailing commas.
+
+    Args:
+        path: Path to the tsconfig file
+
+    Returns:
+        Parsed configuration, or an empty dict if it cannot be read
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+        text = JSONC_TOKEN.sub(lambda m: m.group(0) if m.group(0).startswith('"') else '', text)
+        config = json.loads(TRAILING_COMMA.sub(r'\1', text))
+    except (OSError, ValueError):
+        return {}
+    return config if isinstance(config, dict) else {}
+
+
+def project_references(repo_path: str, tsconfig: str) -> Dict[str, List[str]]:
+    """
+    Collect the project reference graph reachable from a tsconfig.
+
+    Args:
+        repo_path: Path to the repository root
+        tsconfig: Repository-relative path of the root tsconfig
+
+    Returns:
+        Dictionary mapping each project's tsconfig path to the tsconfig
+        paths it references, all repository-relative
+    """
+    graph: Dict[str, List[str]] = {}
+    pending = [normalize_path(tsconfig)]
+    while pending:
+        project = pending.pop()
+        if project in graph:
+            continue
+        graph[project] = []
+        for reference in load_tsconfig(os.path.join(repo_path, project)).get('references', []):
+            ref_path = reference.get('path') if isinstance(reference, dict) else None
+            if not isinstance(ref_path, str):
+                continue
+            target = os.path.normpath(os.path.join(os.path.dirname(project), ref_path))
+            if os.path.isdir(os.path.join(repo_path, target)):
+                target = os.path.join(target, 'tsconfig.json')
+            target = normalize_path(target)
+            graph[project].append(target)
+            pending.append(target)
+    return graph
+
+
+def compiler_options(repo_path: str, tsconfig: str) -> Dict[str, Any]:
+    """
+    Read the compilerOptions of a project, following relative `extends`.
+
+    Args:
+        repo_path: Path to the repository root
+        tsconfig: Repository-relative tsconfig path
+
+    Returns:
+        Merged options; PATH_OPTIONS are repository-relative, resolved
+        against the config that sets them
+    """
+    chain = []
+    current: Optional[str] = normalize_path(tsconfig)
+    while current and current not in (path for path, _ in chain):
+        config = load_tsconfig(os.path.join(repo_path, current))
+        options = config.get('compilerOptions')
+        chain.append((current, options if isinstance(options, dict) else {}))
+        extends = config.get('extends')
+        current = None
+        # Package configs such as @tsconfig/node18 do not set output paths
+        if isinstance(extends, str) and extends.startswith('.'):
+            target = os.path.normpath(os.path.join(os.path.dirname(chain[-1][0]), extends))
+            current = normalize_path(target if target.endswith('.json') else target + '.json')
+
+    merged: Dict[str, Any] = {}
+    for path, options in reversed(chain):
+        for key, value in options.items():
+            if key in PATH_OPTIONS and isinstance(value, str):
+                value = normalize_path(os.path.normpath(os.path.join(os.path.dirname(path), value)))
+            merged[key] = value
+    return merged
+
+
+def build_outputs(repo_path: str, graph: Dict[str, List[str]]) -> Optional[List[str]]:
+    """
+    List where `tsc -b` writes the outputs and build info of each project.
+
+    Args:
+        repo_path: Path to the repository root
+        graph: Project reference graph from project_references
+
+    Returns:
+        Sorted repository-relative paths, outermost only, or None when a
+        project emits beside its sources or outside the repository, where
+        its outputs cannot be moved aside
+    """
+    outputs: Set[str] = set()
+    for project in graph:
+        config = load_tsconfig(os.path.join(repo_path, project))
+        # Solution configs only build their references
+        if config.get('files') == [] and not config.get('include'):
+            continue
+        options = compiler_options(repo_path, project)
+        if options.get('noEmit'):
+            default = os.path.splitext(project)[0] + '.tsbuildinfo'
+            paths = [options.get('tsBuildInfoFile') or normalize_path(default)]
+        elif options.get('outDir'):
+            paths = [options[key] for key in PATH_OPTIONS if options.get(key)]
+        else:
+            return None
+        if any(path == '.' or path.startswith('../') or os.path.isabs(path) for path in paths):
+            return None
+        outputs.update(paths)
+    return sorted(path for path in outputs if not any(path.startswith(other + '/') for other in outputs))
+
+
+def affected_projects(graph: Dict[str, List[str]], root: str, paths: Iterable[str]) -> Optional[List[str]]:
+    """
+    Select the referenced projects a change can break.
+
+    A file belongs to the project with the deepest directory containing
+    it; the projects owning changed files and every project referencing
+    them, directly or not, are affected.
+
+    Args:
+        graph: Project reference graph from project_references
+        root: tsconfig path of the root (solution) project
+        paths: Changed file paths
+
+    Returns:
+        Sorted tsconfig paths of affected projects, or None when a changed
+        file belongs to the root project itself and everything is affected
+    """
+    projects = [p for p in graph if p != root]
+    dependents: Dict[str, Set[str]] = {p: set() for p in graph}
+    for project, references in graph.items():
+        for reference in references:
+            dependents.setdefault(reference, set()).add(project)
+
+    affected: Set[str] = set()
+    for path in paths:
+        owners = [p for p in projects if _within(path, os.path.dirname(p))]
+        if not owners:
+            return None
+        pending = [max(owners, key=lambda p: len(os.path.dirname(p)))]
+        while pending:
+            project = pending.pop()
+            if project not in affected and project != root:
+                affected.add(project)
+                pending.extend(dependents.get(project, ()))
+    return sorted(affected)
+
+
+def _within(path: str, directory: str) -> bool:
+    return not directory or path.startswith(directory + '/')
+
+
+def _source_files(repo_path: str) -> Iterator[str]:
+    """Yield the repository-relative paths of JS/TS sources."""
+    for dirpath, dirnames, filenames in os.walk(repo_path):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        for filename in filenames:
+            if filename.endswith(SOURCE_EXTENSIONS):
+                yield normalize_path(os.path.relpath(os.path.join(dirpath, filename), repo_path))
+
+
+def find_importers(repo_path: str, paths: Iterable[str]) -> Set[str]:
+    """
+    Find the sources that import any of the given files by relative path.
+
+    Args:
+        repo_path: Path to the repository root
+        paths: Repository-relative paths of the imported files
+
+    Returns:
+        Repository-relative paths of the direct importers
+    """
+    targets = set(paths)
+    importers: Set[str] = set()
+    if not targets:
+        return importers
+    for source in _source_files(repo_path):
+        try:
+            with open(os.path.join(repo_path, source), encoding='utf-8', errors='replace') as f:
+                text = f.read()
+        except OSError:
+            continue
+        for specifier in IMPORT_SPECIFIER.findall(text):
+            base = os.path.normpath(os.path.join(os.path.dirname(source), specifier))
+            # TypeScript ESM sources import './a.js' to mean './a.ts'
+            stem = base[:-3] if base.endswith('.js') else base
+            candidates = {normalize_path(c + suffix) for c in (base, stem) for suffix in RESOLVE_SUFFIXES}
+            if candidates & targets:
+                importers.add(source)
+                break
+    return importers
+
+
+class BuildInfoStore:
+    """
+    tsbuildinfo files kept between runs, keyed by base commit.
+
+    Files live at `<cache_dir>/tsbuildinfo/<base_sha>/<project>.tsbuildinfo`.
+    A base commit seen for the first time is seeded with the most recent
+    build info of the same project, which tsc revalidates by file hash, so
+    only the files that differ are checked again.
+    """
+
+    def __init__(self, cache_dir: str, max_bases: int = DEFAULT_MAX_BASES):
+        if not isinstance(cache_dir, str):
+            raise TypeError(f"cache_dir must be a string, got {type(cache_dir)}")
+        self.root = os.path.join(cache_dir, 'tsbuildinfo')
+        self.max_bases = max_bases
+
+    @staticmethod
+    def project_key(tsconfig: str) -> str:
+        """Name a project's build info after its tsconfig path."""
+        return hashlib.sha256(normalize_path(tsconfig).encode()).hexdigest()[:16]
+
+    def prepare(self, base_sha: Optional[str], tsconfig: str) -> str:
+        """
+        Return the build info path for a project, seeding it when missing.
+
+        Args:
+            base_sha: Base commit of the pull request, if known
+            tsconfig: Repository-relative tsconfig path
+
+        Returns:
+            Path to pass as --tsBuildInfoFile
+        """
+        name = self.project_key(tsconfig) + '.tsbuildinfo'
+        directory = os.path.join(self.root, base_sha or 'unknown')
+        path = os.path.join(directory, name)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            if not os.path.exists(path):
+                seeds = [os.path.join(entry.path, name) for entry in os.scandir(self.root)
+                         if entry.is_dir() and os.path.exists(os.path.join(entry.path, name))]
+                if seeds:
+                    shutil.copy2(max(seeds, key=os.path.getmtime), path)
+            os.utime(directory)
+        except OSError as e:
+            print(f"Could not prepare TypeScript build info: {e}")
+        return path
+
+    def restore_outputs(self, base_sha: Optional[str], outputs: Iterable[str], repo_path: str) -> bool:
+        """
+        Copy the stored `tsc -b` outputs of a base commit into the checkout.
+
+        A base commit seen for the first time starts from the most recently
+        stored outputs; tsc -b revalidates them against the sources.
+
+        Args:
+            base_sha: Base commit of the pull request, if known
+            outputs: Repository-relative output paths from build_outputs
+            repo_path: Path to the checkout
+
+        Returns:
+            Whether any output was restored
+        """
+        snapshot = os.path.join(self.root, base_sha or 'unknown', BUILD_OUTPUTS)
+        if not os.path.isdir(snapshot):
+            try:
+                seeds = [os.path.join(entry.path, BUILD_OUTPUTS) for entry in os.scandir(self.root)
+                         if entry.is_dir() and os.path.isdir(os.path.join(entry.path, BUILD_OUTPUTS))]
+            except OSError:
+                return False
+            if not seeds:
+                return False
+            snapshot = max(seeds, key=os.path.getmtime)
+        restored = False
+        for output in outputs:
+            source = os.path.join(snapshot, output)
+            target = os.path.join(repo_path, output)
+            try:
+                if os.path.isdir(source):
+                    shutil.copytree(source, target, symlinks=True)
+                elif os.path.isfile(source):
+                    os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+                    shutil.copy2(source, target)
+                else:
+                    continue
+                restored = True
+            except (OSError, shutil.Error) as e:
+                print(f"Could not restore TypeScript build outputs: {e}")
+        return restored
+
+    def save_outputs(self, base_sha: Optional[str], outputs: Iterable[str], repo_path: str,
+                     keep: bool = True) -> None:
+        """
+        Move `tsc -b` outputs out of the checkout, so they never reach the review.
+
+        Args:
+            base_sha: Base commit of the pull request, if known
+            outputs: Repository-relative output paths from build_outputs
+            repo_path: Path to the checkout
+            keep: Store the outputs for the base commit; outputs of a cut
+                or crashed build are only removed
+        """
+        outputs = list(outputs)
+        directory = os.path.join(self.root, base_sha or 'unknown')
+        tmp_dir = None
+        try:
+            if keep:
+                os.makedirs(directory, exist_ok=True)
+                tmp_dir = tempfile.mkdtemp(dir=directory, prefix='.tmp-')
+                for output in outputs:
+                    source = os.path.join(repo_path, output)
+                    if os.path.lexists(source):
+                        target = os.path.join(tmp_dir, output)
+                        os.makedirs(os.path.dirname(target), exist_ok=True)
+                        shutil.move(source, target)
+                snapshot = os.path.join(directory, BUILD_OUTPUTS)
+                shutil.rmtree(snapshot, ignore_errors=True)
+                os.rename(tmp_dir, snapshot)
+                tmp_dir = None
+                os.utime(directory)
+        except (OSError, shutil.Error) as e:
+            print(f"Could not store TypeScript build outputs: {e}")
+        finally:
+            if tmp_dir:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+            # Whatever was not moved is removed all the same
+            for output in outputs:
+                path = os.path.join(repo_path, output)
+                if os.path.isdir(path) and not os.path.islink(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                elif os.path.lexists(path):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+
+    def timings(self, tsconfig: str) -> Dict[str, float]:
+        """Return the recorded cold and warm durations of a project."""
+        try:
+            with open(os.path.join(self.root, self.project_key(tsconfig) + '.json')) as f:
+                timings = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return timings if isinstance(timings, dict) else {}
+
+    def record(self, tsconfig: str, warm: bool, seconds: float) -> None:
+        """Remember the latest cold or warm duration of a project."""
+        timings = self.timings(tsconfig)
+        timings['warm_seconds' if warm else 'cold_seconds'] = seconds
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            with open(os.path.join(self.root, self.project_key(tsconfig) + '.json'), 'w') as f:
+                json.dump(timings, f)
+        except OSError:
+            pass
+
+    def evict(self) -> int:
+        """
+        Drop the build info of the least recently used base commits.
+
+        Returns:
+            Number of base commits removed
+        """
+        if not os.path.isdir(self.root):
+            return 0
+        bases = sorted((entry for entry in os.scandir(self.root) if entry.is_dir()),
+                       key=lambda entry: entry.stat().st_mtime, reverse=True)
+        for entry in bases[self.max_bases:]:
+            shutil.rmtree(entry.path, ignore_errors=True)
+        return max(0, len(bases) - self.max_bases)
+
+
+class TypeScriptCheck:
+    """
+    Type check of the project containing a pull request's changes.
+
+    In incremental mode tsc reuses build info from earlier runs, solution
+    configs with project references are built with `tsc -b` limited to the
+    affected projects, and diagnostics are kept only for changed files and
+    the files importing them. The outputs and build info `tsc -b` writes
+    are restored from the store before the build and moved back after it,
+    so none of them stay in the checkout.
+    """
+
+    def __init__(self, changed_files: ChangedFiles, store: Optional[BuildInfoStore] = None,
+                 incremental: bool = True, tsconfig: str = 'tsconfig.json'):
+        if not isinstance(changed_files, ChangedFiles):
+            raise TypeError(f"changed_files must be a ChangedFiles index, got {type(changed_files)}")
+        self.changed_files = changed_files
+        self.repo_path = changed_files.repo_path
+        self.store = store
+        self.tsconfig = tsconfig
+        self.changed = [f.path for f in changed_files.lint_files(*JS_LANGUAGES)]
+        self.build_info: Optional[str] = None
+        self.warm = False
+        self.projects: List[str] = []
+        self.graph: Dict[str, List[str]] = {}
+        # Build mode outputs moved between the store and the checkout
+        self.outputs: Optional[List[str]] = None
+        self.mode = MODE_INCREMENTAL if incremental else MODE_FULL
+        self.suppressed = 0
+
+        if incremental:
+            self.graph = project_references(self.repo_path, tsconfig)
+            if len(self.graph) > 1:
+                affected = affected_projects(self.graph, normalize_path(tsconfig), self.changed)
+                self.mode = MODE_BUILD
+                self.projects = affected or [tsconfig]
+
+    def spec(self) -> ToolSpec:
+        """Build the tsc invocation for the selected mode."""
+        if self.mode == MODE_BUILD:
+            # Build mode keeps its build info next to each project's outputs,
+            # which are swapped in from the store and taken back by finish()
+            if self.store and self.outputs is None:
+                outputs = build_outputs(self.repo_path, self.graph)
+                if outputs is None:
+                    print("TypeScript projects emit beside their sources; tsc -b outputs stay in the checkout")
+                    self.outputs = []
+                else:
+                    self.outputs = [path for path in outputs
+                                    if not os.path.lexists(os.path.join(self.repo_path, path))]
+                    self.warm = self.store.restore_outputs(self.changed_files.base_sha, self.outputs,
+                                                           self.repo_path)
+            args = ['npx', 'tsc', '-b', '--pretty', 'false'] + self.projects
+        else:
+            args = ['npx', 'tsc', '--noEmit', '--pretty', 'false', '-p', self.tsconfig]
+            if self.mode == MODE_INCREMENTAL and self.store:
+                self.build_info = self.store.prepare(self.changed_files.base_sha, self.tsconfig)
+                self.warm = os.path.exists(self.build_info)
+                args += ['--incremental', '--tsBuildInfoFile', self.build_info]
+        return ToolSpec('typescript', args, cwd=self.repo_path, parse=self._parse)
+
+    def finish(self, result: ToolResult) -> None:
+        """
+        Move build mode outputs out of the checkout once tsc has exited.
+
+        They are kept in the store for the next run when the build
+        completed, and dropped when it was cut or crashed.
+        """
+        if self.outputs and self.store:
+            self.store.save_outputs(self.changed_files.base_sha, self.outputs, self.repo_path,
+                                    keep=result.returncode is not None)
+
+    def _parse(self, result: ToolResult) -> List[Finding]:
+        findings = self.narrow(parse_tsc(result.stdout.splitlines()))
+        # Errors outside the PR's reach alone do not fail the scoped check;
+        # errors without a location are kept by narrow() and still do
+        if not findings and self.suppressed:
+            result.returncode = 0
+        return findings
+
+    def narrow(self, findings: Iterable[Finding]) -> List[Finding]:
+        """
+        Keep diagnostics in changed files and in the files importing them.
+
+        Findings without a location are always kept. In full mode nothing
+        is dropped.
+        """
+        findings = list(findings)
+        if self.mode == MODE_FULL:
+            return findings
+        scope = set(self.changed) | find_importers(self.repo_path, self.changed)
+        kept = [f for f in findings if not f.path or f.path in scope]
+        self.suppressed = len(findings) - len(kept)
+        return kept
+
+    def stats(self, result: ToolResult) -> Dict[str, Any]:
+        """
+        Record the timing of a finished check and describe it for the run stats.
+
+        Args:
+            result: Result of the invocation built by spec()
+
+        Returns:
+            Dictionary with mode, warm, seconds, reported and suppressed,
+            plus the projects built in build mode and the last recorded
+            cold/warm durations in incremental mode
+        """
+        stats: Dict[str, Any] = {
+            'mode': self.mode,
+            'warm': self.warm,
+            'seconds': round(result.duration, 3),
+            'reported': len(result.findings),
+            'suppressed': self.suppressed
+        }
+        if self.mode == MODE_BUILD:
+            stats['projects'] = self.projects
+        if (self.build_info or self.outputs) and self.store and result.returncode is not None:
+            self.store.record(self.tsconfig, self.warm, stats['seconds'])
+            stats.update(self.store.timings(self.tsconfig))
+            self.store.evict()
+        return stats
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Script to discover the workspaces of a monorepo and run checks on them.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatchcase
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import yaml
+from .changed_files import ChangedFiles
+from .diff_index import normalize_path
+from .manifests import ManifestCache
+from .repo_index import RepoIndex
+
+# Layout assumed by turbo and nx when the package manager declares nothing
+DEFAULT_TURBO_PATTERNS = ('apps/*', 'packages/*')
+DEFAULT_NX_LAYOUT = {'appsDir': 'apps', 'libsDir': 'libs'}
+
+NEXT_CONFIGS = ('next.config.js', 'next.config.mjs', 'next.config.ts')
+VERCEL_MARKERS = ('vercel.json', '.vercel')
+
+
+class Workspace:
+    """
+    One package of a monorepo.
+
+    index and manifests are scoped to the workspace directory, so checkers
+    written for a repository root run on a workspace unchanged.
+    """
+
+    def __init__(self, name: str, path: str, index: RepoIndex, manifests: ManifestCache):
+        self.name = name
+        self.path = path
+        self.index = index
+        self.manifests = manifests
+
+    @property
+    def is_nextjs(self) -> bool:
+        """Whether the workspace is a Next.js app."""
+        if any(self.index.is_file(name) for name in NEXT_CONFIGS):
+            return True
+        package = self.manifests.get('package.json').data or {}
+        return any('next' in (package.get(section) or {})
+                   for section in ('dependencies', 'devDependencies'))
+
+    @property
+    def is_vercel(self) -> bool:
+        """Whether the workspace is deployed with Vercel."""
+        return any(self.index.exists(name) for name in VERCEL_MARKERS)
+
+    def contains(self, path: str) -> bool:
+        """Whether a repository-relative path belongs to the workspace."""
+        return path.startswith(self.path + '/')
+
+    def __repr__(self) -> str:
+        return f"Workspace({self.name!r}, {self.path!r})"
+
+
+def _patterns_from_package(package: Any) -> List[str]:
+    """Read npm/yarn `workspaces`, either a list or {packages: [...]}."""
+    if not package:
+        return []
+    workspaces = package.get('workspaces')
+    if hasattr(workspaces, 'get'):
+        workspaces = workspaces.get('packages')
+    return [p for p in workspaces or () if isinstance(p, str)]
+
+
+def workspace_patterns(repo_index: RepoIndex, manifests: ManifestCache) -> List[str]:
+    """
+    Collect the workspace globs declared by the package manager or build tool.
+
+    Reads npm/yarn `workspaces` in package.json and pnpm-workspace.yaml;
+    turbo.json and nx.json fall back to their conventional layouts when
+    neither declares any.
+
+    Returns:
+        Glob patterns relative to the repository root; `!` excludes
+    """
+    patterns = _patterns_from_package(manifests.get('package.json').data)
+    pnpm = repo_index.read_text('pnpm-workspace.yaml')
+    if pnpm:
+        try:
+            packages = (yaml.safe_load(pnpm) or {}).get('packages') or []
+        except (yaml.YAMLError, AttributeError):
+            packages = []
+        patterns.extend(p for p in packages if isinstance(p, str))
+    if patterns:
+        return patterns
+
+    nx = manifests.get('nx.json')
+    if nx.exists:
+        layout = dict(DEFAULT_NX_LAYOUT)
+        if nx.data and hasattr(nx.data.get('workspaceLayout'), 'get'):
+            layout.update(nx.data['workspaceLayout'])
+        patterns.extend(f"{layout[key]}/*" for key in ('appsDir', 'libsDir'))
+    if repo_index.is_file('turbo.json'):
+        patterns.extend(DEFAULT_TURBO_PATTERNS)
+    return list(dict.fromkeys(patterns))
+
+
+def _match(path: str, pattern: str) -> bool:
+    """Match a directory against a workspace glob, where `**` spans directories."""
+    def match(parts: Sequence[str], globs: Sequence[str]) -> bool:
+        if not globs:
+            return not parts
+        if globs[0] == '**':
+            return any(match(parts[i:], globs[1:]) for i in range(len(parts) + 1))
+        return bool(parts) and fnmatchcase(parts[0], globs[0]) and match(parts[1:], globs[1:])
+    return match(path.split('/'), pattern.strip('/').split('/'))
+
+
+def discover_workspaces(repo_index: RepoIndex,
+                        manifests: Optional[ManifestCache] = None) -> List[Workspace]:
+    """
+    Find the workspaces of a monorepo.
+
+    A directory is a workspace when it matches an included pattern, no
+    excluded one, and has a package.json (or an nx project.json).
+
+    Args:
+        repo_index: Index of the checkout
+        manifests: Manifest cache of the repository root
+
+    Returns:
+        Workspaces sorted by path; empty for a single-package repository
+
+    Raises:
+        TypeError: If repo_index is not a RepoIndex
+    """
+    if not isinstance(repo_index, RepoIndex):
+        raise TypeError(f"repo_index must be a RepoIndex, got {type(repo_index)}")
+    manifests = manifests or ManifestCache(repo_index.root, repo_index)
+    patterns = workspace_patterns(repo_index, manifests)
+    included = [normalize_path(p) for p in patterns if not p.startswith('!')]
+    excluded = [normalize_path(p[1:]) for p in patterns if p.startswith('!')]
+    if not included:
+        return []
+
+    workspaces = []
+    for path in sorted(repo_index.dirs()):
+        if not any(_match(path, p) for p in included) or any(_match(path, p) for p in excluded):
+            continue
+        if not (repo_index.is_file(f"{path}/package.json") or repo_index.is_file(f"{path}/project.json")):
+            continue
+        index = repo_index.scoped(path)
+        workspace_manifests = ManifestCache(index.root, index)
+        package = workspace_manifests.get('package.json').data or {}
+        name = package.get('name') if isinstance(package.get('name'), str) else path
+        workspaces.append(Workspace(name, path, index, workspace_manifests))
+    return workspaces
+
+
+def touched_workspaces(workspaces: Sequence[Workspace], changed_files: ChangedFiles) -> List[Workspace]:
+    """Return the workspaces containing at least one file changed by the PR."""
+    return [w for w in workspaces if any(w.contains(f.path) for f in changed_files)]
+
+
+def check_workspaces(workspaces: Sequence[Workspace],
+                     check: Callable[[Workspace], List[Dict[str, Any]]],
+                     max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Run a checker on several workspaces in parallel and label its issues.
+
+    Args:
+        workspaces: Workspaces to check
+        check: Returns the issues of one workspace, with paths relative
+            to the workspace
+        max_workers: Size of the worker pool (default: CPU count)
+
+    Returns:
+        Issues in workspace order, with `workspace` set to the workspace
+        name and `file` made repository-relative
+    """
+    if not workspaces:
+        return []
+    workers = min(len(workspaces), max_workers or os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(check, workspaces))
+
+    issues = []
+    for workspace, workspace_issues in zip(workspaces, results):
+        for issue in workspace_issues:
+            issue = dict(issue, workspace=workspace.name)
+            if issue.get('file'):
+                issue['file'] = f"{workspace.path}/{issue['file']}"
+            issues.append(issue)
+    return issues
@@ -0,0 +1,107 @@
+"""
+Tests for ai_index.py script.
+"""
+
+import threading
+import pytest
+from github_review_bot.scripts.ai_index import (
+    MODEL_TRIE, AIIndex, AIIndexStore, FileEntry, model_id, scan_source
+)
+from github_review_bot.scripts.changed_files import ChangedFile, ChangedFiles
+from github_review_bot.scripts.manifests import git_blob_sha
+from github_review_bot.scripts.repo_index import RepoIndex
+
+AGENT = '''import json
+from openai import OpenAI
+
+SYSTEM_PROMPT = """You are a helpful agent."""
+MODEL = "gpt-4o"
+
+def plan(client, task, user):
+    messages = [{"role": "system", "content": f"Plan for {user}"}]
+    response = client.chat.completions.create(model=MODEL, messages=messages)
+    try:
+        steps = json.loads(response.choices[0].message.content)
+    except ValueError:
+        steps = []
+    return json.loads(response.choices[0].message.content), steps
+'''
+
+def test_ai_index_interface(tmp_path):
+    """Test the interface of AIIndex."""
+    with pytest.raises(TypeError):
+        AIIndex.build(["agent.py"])  # type: ignore
+    with pytest.raises(TypeError):
+        AIIndexStore(None)  # type: ignore
+    index = AIIndex.build(ChangedFiles([], str(tmp_path)))
+    assert index.files == {} and index.changed == ()
+
+def test_model_trie():
+    """Test longest-prefix matching on separators, and snapshot pinning."""
+    assert MODEL_TRIE.longest_match("gpt-4o-2024-08-06") == ("gpt-4o", "family")
+    assert MODEL_TRIE.longest_match("gpt-4-0314") == ("gpt-4-0314", "deprecated")
+    assert MODEL_TRIE.longest_match("gpt-4x") is None
+    assert MODEL_TRIE.classify("claude-sonnet-4-5-20250929") == "pinned"
+    assert MODEL_TRIE.classify("claude-sonnet-4-5") == "unpinned"
+    assert MODEL_TRIE.classify("claude-3-5-sonnet-latest") == "deprecated"
+    assert model_id("us.anthropic.claude-3-haiku-20240307-v1:0") == "claude-3-haiku-20240307-v1:0"
+    assert model_id("openai/gpt-4.1") == "gpt-4.1"
+    assert model_id("prompts/gpt-4.txt") is None
+
+def test_scan_source():
+    """Test that models, SDK calls, prompts and output parsing are indexed."""
+    entry = scan_source(AGENT, "agent.py")
+    assert entry.models == [(5, 10, "gpt-4o")]
+    assert entry.calls == [(9, "chat.completions.create")]
+    assert entry.prompts == [(4, "SYSTEM_PROMPT")]
+    assert entry.interpolations == [(8, 18)]
+    assert [(line, parser, checked) for line, _, parser, checked in entry.parses] == \
+        [(11, "json.loads", True), (14, "json.loads", False)]
+
+    js = "try {\n  const data = JSON.parse(completion.choices[0].message.content);\n} catch {}\n" \
+         "const raw = JSON.parse(completion.choices[0].message.content);\n" \
+         "const ok = Plan.parse(JSON.parse(completion.choices[0].message.content));\n"
+    assert [(line, checked) for line, _, _, checked in scan_source(js, "agent.ts").parses] == \
+        [(2, True), (4, False), (5, True)]
+    assert scan_source("Summarize {{ text }}", "prompts/summarize.md").prompts == [(1, "summarize.md")]
+
+def test_incremental_base_index(tmp_path):
+    """Test that unchanged files come from the base index and only changed files are read again."""
+    (tmp_path / "agent.py").write_text(AGENT)
+    (tmp_path / "tools.py").write_text('MODEL = "claude-sonnet-4-5-20250929"\n')
+    store = AIIndexStore(str(tmp_path / "cache"))
+    changed = ChangedFiles([ChangedFile("agent.py", "modified", len(AGENT))], str(tmp_path), "base1")
+
+    first = AIIndex.build(changed, RepoIndex.build(str(tmp_path)), store)
+    assert first.stats == {'files': 2, 'scanned': 2, 'reused': 0, 'pending': 0}
+    assert set(store.load("base1")) == {"tools.py"}
+    assert store.load("base1")["tools.py"].sha == git_blob_sha(b'MODEL = "claude-sonnet-4-5-20250929"\n')
+
+    # tools.py is not read again for the same base
+    (tmp_path / "tools.py").write_text('MODEL = "gpt-4o"\n')
+    second = AIIndex.build(changed, RepoIndex.build(str(tmp_path)), store)
+    assert second.stats == {'files': 2, 'scanned': 1, 'reused': 1, 'pending': 0}
+    assert second.files["tools.py"].models[0][2] == "claude-sonnet-4-5-20250929"
+    assert set(second.model_references()) == {"gpt-4o", "claude-sonnet-4-5-20250929"}
+
+    entry = FileEntry.from_json(first.files["agent.py"].to_json())
+    assert entry.parses == first.files["agent.py"].parses
+
+def test_cold_index_is_capped(tmp_path):
+    """Test that a cold index reads a bounded number of files per run and needs a store."""
+    for name in ('a', 'b', 'c'):
+        (tmp_path / f"{name}.py").write_text('MODEL = "gpt-4o"\n')
+    changed = ChangedFiles([], str(tmp_path), "base1")
+    repo_index = RepoIndex.build(str(tmp_path))
+    assert AIIndex.build(changed, repo_index).files == {}
+
+    store = AIIndexStore(str(tmp_path / "cache"))
+    first = AIIndex.build(changed, repo_index, store, max_scan=2)
+    assert first.stats == {'files': 2, 'scanned': 2, 'reused': 0, 'pending': 1}
+    second = AIIndex.build(changed, repo_index, store, max_scan=2)
+    assert second.stats == {'files': 3, 'scanned': 1, 'reused': 2, 'pending': 0}
+
+    cancel = threading.Event()
+    cancel.set()
+    cut = AIIndex.build(changed, repo_index, AIIndexStore(str(tmp_path / "other")), cancel=cancel)
+    assert cut.stats['pending'] == 3
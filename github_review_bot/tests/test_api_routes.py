@@ -0,0 +1,136 @@
+"""
+Tests for api_routes.py script.
+"""
+
+import threading
+import pytest
+from github_review_bot.scripts.api_routes import analyze_changed_files, analyze_source
+from github_review_bot.scripts.changed_files import ChangedFile, ChangedFiles
+
+FLASK = '''import requests
+from flask import Blueprint, jsonify, request
+from flask_login import login_required
+
+bp = Blueprint("orders", __name__)
+
+@bp.route("/health")
+def health():
+    return "ok"
+
+@bp.route("/orders", methods=["POST"])
+def create_order():
+    data = request.get_json()
+    try:
+        requests.post("https://payments.example.com", json=data)
+    except Exception:
+        pass
+    return jsonify(data)
+
+@bp.get("/orders/<int:order_id>")
+@login_required
+@limiter.limit("5/minute")
+def get_order(order_id):
+    try:
+        return jsonify(db.find(order_id))
+    except LookupError as e:
+        return jsonify(error=str(e)), 404
+'''
+
+FASTAPI = '''from fastapi import APIRouter, Depends, Security
+
+router = APIRouter()
+admin = APIRouter(dependencies=[Depends(verify_admin_token)])
+
+@router.get("/items/{item_id}")
+async def read_item(item_id: int, user=Depends(get_current_user)):
+    return {"id": item_id}
+
+@router.post("/items")
+async def create_item(item: dict):
+    return item
+
+@admin.delete("/items/{item_id}")
+async def delete_item(item_id: int):
+    return None
+
+@router.put("/items/{item_id}")
+async def replace_item(item_id: int, user=Security(scheme, scopes=["items"])):
+    return None
+'''
+
+DJANGO = '''from django.contrib.auth.mixins import LoginRequiredMixin
+from django.views import View
+from rest_framework.permissions import AllowAny
+from rest_framework.viewsets import ModelViewSet
+
+def order_detail(request):
+    return Order.objects.get(pk=int(request.GET["id"]))
+
+class OrderView(LoginRequiredMixin, View):
+    def get(self, request):
+        return None
+
+class CatalogViewSet(ModelViewSet):
+    permission_classes = [AllowAny]
+    throttle_classes = [AnonRateThrottle]
+
+    def list(self, request):
+        return []
+'''
+
+def _rules(source, path="app.py"):
+    return [(finding.rule, finding.line) for finding in analyze_source(source, path).findings]
+
+def test_api_routes_interface(tmp_path):
+    """Test the interface of analyze_changed_files."""
+    with pytest.raises(TypeError):
+        analyze_changed_files(["app.py"])  # type: ignore
+    assert analyze_changed_files(ChangedFiles([], str(tmp_path))) == []
+    assert analyze_source("import flask\ndef broken(:\n", "app.py").routes == []
+    assert analyze_source("def index(request):\n    pass\n", "views.py").routes == []
+
+def test_flask_routes():
+    """Test route discovery and the three rules on Flask handlers."""
+    analysis = analyze_source(FLASK, "orders.py")
+    assert [(route.label, route.auth, route.rate_limited, route.public) for route in analysis.routes] == [
+        ("GET /health (health)", False, False, True),
+        ("POST /orders (create_order)", False, False, False),
+        ("GET /orders/<int:order_id> (get_order)", True, True, False),
+    ]
+    assert _rules(FLASK) == [('missing-auth', 12), ('unhandled-errors', 13), ('broad-except', 16),
+                             ('exception-leak', 27), ('missing-rate-limit', 8)]
+
+def test_fastapi_and_django_routes():
+    """Test FastAPI dependencies and router dependencies, and Django views and viewsets."""
+    assert _rules(FASTAPI) == [('missing-auth', 11), ('missing-rate-limit', 7)]
+    analysis = analyze_source(DJANGO, "shop/views.py")
+    assert [route.label for route in analysis.routes] == \
+        ["view order_detail", "view OrderView.get", "view CatalogViewSet.list"]
+    assert _rules(DJANGO, "shop/views.py") == \
+        [('missing-auth', 6), ('unhandled-errors', 7), ('missing-rate-limit', 6)]
+    assert "Order.objects.get()" in analysis.findings[1].message
+
+def test_analyze_changed_files(tmp_path):
+    """Test the worker pool, rule selection and application-wide setup across files."""
+    for name, source in (("orders.py", FLASK), ("items.py", FASTAPI)):
+        (tmp_path / name).write_text(source)
+    changed = ChangedFiles([ChangedFile("orders.py", "modified"), ChangedFile("items.py", "added"),
+                            ChangedFile("gone.py", "removed")], str(tmp_path))
+    stats = {}
+    inline = analyze_changed_files(changed, max_workers=1, stats=stats)
+    assert analyze_changed_files(changed, max_workers=2, files_per_task=1) == inline
+    assert stats == {'files': 2, 'handlers': 7}
+    cancel = threading.Event()
+    cancel.set()
+    assert analyze_changed_files(changed, max_workers=1, cancel=cancel) == []
+    assert analyze_changed_files(changed, max_workers=2, files_per_task=1, cancel=cancel) == []
+    assert {finding.rule for finding in analyze_changed_files(changed, frozenset({'missing-auth'}))} == \
+        {'missing-auth'}
+
+    (tmp_path / "app.py").write_text("from flask import Flask\nfrom flask_limiter import Limiter\n"
+                                     "app = Flask(__name__)\n"
+                                     "limiter = Limiter(app, default_limits=['100/hour'])\n"
+                                     "app.register_error_handler(500, handle_error)\n")
+    changed = ChangedFiles(list(changed) + [ChangedFile("app.py", "modified")], str(tmp_path))
+    rules = {finding.rule for finding in analyze_changed_files(changed)}
+    assert rules == {'missing-auth', 'broad-except', 'exception-leak'}
@@ -0,0 +1,90 @@
+"""
+Tests for app_router.py script.
+"""
+
+import types
+import pytest
+from github_review_bot.scripts.app_router import (
+    find_app_dir, iter_route_files, route_of, scan_app_router
+)
+from github_review_bot.scripts.changed_files import ChangedFile, ChangedFiles
+from github_review_bot.scripts.check_nextjs import check_nextjs
+from github_review_bot.scripts.repo_index import RepoIndex
+
+def _write(root, path, content):
+    target = root / path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(content)
+
+def _app(tmp_path):
+    _write(tmp_path, "app/layout.tsx", "export default function RootLayout() {}\n")
+    _write(tmp_path, "app/page.tsx", "export const metadata = { title: 'Home' }\n")
+    _write(tmp_path, "app/(shop)/cart/page.tsx", "'use client'\nexport const metadata = {}\n")
+    _write(tmp_path, "app/dashboard/layout.tsx", "/* header */\n\"use client\"\nexport default function L() {}\n")
+    _write(tmp_path, "app/dashboard/@panel/loading.tsx", "export default function Loading() {}\n")
+    _write(tmp_path, "app/api/users/route.ts", "export async function GET() {}\n")
+    _write(tmp_path, "app/editor/page.tsx", "'use client'\n" + "// filler\n" * 8000)
+    _write(tmp_path, "app/_components/page.tsx", "'use client'\n")
+    _write(tmp_path, "app/dashboard/chart.tsx", "'use client'\n")
+    return RepoIndex.build(str(tmp_path))
+
+def test_scan_app_router_interface(tmp_path):
+    """Test the interface of scan_app_router."""
+    index = _app(tmp_path)
+    issues = scan_app_router(index)
+    assert isinstance(issues, types.GeneratorType)
+    issues = list(issues)
+    assert all(set(issue) == {"type", "message", "file"} for issue in issues)
+    with pytest.raises(TypeError):
+        list(scan_app_router("app"))  # type: ignore
+
+def test_route_files_found(tmp_path):
+    """Test that every special file is found with its URL route."""
+    index = _app(tmp_path)
+    assert find_app_dir(index) == "app"
+    found = sorted((f.path, f.kind, f.route) for f in iter_route_files(index))
+    assert found == [
+        ("app/(shop)/cart/page.tsx", "page", "/cart"),
+        ("app/api/users/route.ts", "route", "/api/users"),
+        ("app/dashboard/@panel/loading.tsx", "loading", "/dashboard"),
+        ("app/dashboard/layout.tsx", "layout", "/dashboard"),
+        ("app/editor/page.tsx", "page", "/editor"),
+        ("app/layout.tsx", "layout", "/"),
+        ("app/page.tsx", "page", "/"),
+    ]
+    assert route_of([]) == "/"
+
+def test_per_file_checks(tmp_path):
+    """Test the client layout, oversized client component and metadata checks."""
+    issues = {(issue["file"], issue["type"]): issue["message"] for issue in scan_app_router(_app(tmp_path))}
+    assert "client component" in issues[("app/dashboard/layout.tsx", "warning")]
+    assert "KB" in issues[("app/editor/page.tsx", "warning")]
+    assert "server components" in issues[("app/(shop)/cart/page.tsx", "error")]
+    assert "root layout" in issues[("app/layout.tsx", "info")]
+    assert not any(path == "app/page.tsx" for path, _ in issues)
+
+def test_only_touched_files_read(tmp_path, monkeypatch):
+    """Test that the checker reads only the route files the PR changed."""
+    index = _app(tmp_path)
+    read = []
+    real_open = open
+
+    def tracking_open(path, *args, **kwargs):
+        read.append(str(path))
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", tracking_open)
+    changed = ChangedFiles([ChangedFile("app/dashboard/layout.tsx", "modified", size=1)], str(tmp_path))
+    issues = check_nextjs(str(tmp_path), changed, repo_index=index)
+    app_issues = [issue for issue in issues if issue["file"].startswith("app")]
+    assert [issue["file"] for issue in app_issues] == ["app/dashboard/layout.tsx"]
+    assert [path for path in read if "/app/" in path] == [str(tmp_path / "app/dashboard/layout.tsx")]
+
+def test_src_app_directory(tmp_path):
+    """Test that src/app is used when there is no top-level app directory."""
+    _write(tmp_path, "src/app/layout.tsx", "export const metadata = {}\n")
+    index = RepoIndex.build(str(tmp_path))
+    assert find_app_dir(index) == "src/app"
+    assert [f.route for f in iter_route_files(index, "src/app")] == ["/"]
+    paths = ["src/app/layout.tsx", "src/lib/page.tsx", "src/app/gone/page.tsx"]
+    assert [f.path for f in iter_route_files(index, "src/app", paths)] == ["src/app/layout.tsx"]
@@ -0,0 +1,86 @@
+"""
+Tests for bundle_budget.py script.
+"""
+
+import gzip
+import json
+import os
+from github_review_bot.scripts.bundle_budget import (
+    BundleBaselineStore, BundleBudget, first_load_sizes, gzip_size, record_baselines, route_chunks
+)
+from github_review_bot.scripts.check_nextjs import check_nextjs
+
+def _build(root, page_js=b"console.log('page');\n"):
+    build = root / ".next"
+    chunks = build / "static" / "chunks"
+    (chunks / "pages").mkdir(parents=True)
+    (chunks / "app" / "about").mkdir(parents=True)
+    (chunks / "framework.js").write_bytes(b"var framework = 1;\n" * 2000)
+    (chunks / "main-app.js").write_bytes(b"var app = 2;\n" * 500)
+    (chunks / "pages" / "_app.js").write_bytes(b"var shell = 3;\n")
+    (chunks / "pages" / "index.js").write_bytes(page_js)
+    (chunks / "app" / "about" / "page.js").write_bytes(b"var about = 4;\n")
+    (build / "build-manifest.json").write_text(json.dumps({
+        "rootMainFiles": ["static/chunks/main-app.js"],
+        "pages": {
+            "/_app": ["static/chunks/framework.js", "static/chunks/pages/_app.js"],
+            "/": ["static/chunks/framework.js", "static/chunks/pages/index.js", "static/css/a.css"],
+            "/_error": ["static/chunks/pages/_error.js"]
+        }
+    }))
+    (build / "app-build-manifest.json").write_text(json.dumps({
+        "pages": {
+            "/about/page": ["static/chunks/app/about/page.js"],
+            "/layout": ["static/chunks/app/layout.js"]
+        }
+    }))
+    return str(build)
+
+def test_bundle_budget_interface(tmp_path):
+    """Test the interface of BundleBudget."""
+    assert BundleBudget.from_config({'nextjs': {'bundle_budget': False}}) is None
+    budget = BundleBudget.from_config({'nextjs': {'bundle_budget': {'max_first_load_kb': 1}}})
+    assert budget.max_first_load_kb == 1 and budget.max_growth_kb == 10
+    issues = budget.check({'/': 4096, '/small': 100})
+    assert [issue['type'] for issue in issues] == ['error']
+    assert "4.0 KB" in issues[0]['message']
+    assert first_load_sizes(str(tmp_path / ".next")) == {}
+
+def test_route_chunks(tmp_path):
+    """Test that pages and app routes load their own and shared JS chunks."""
+    chunks = route_chunks(_build(tmp_path))
+    assert chunks == {
+        "/": ["static/chunks/framework.js", "static/chunks/pages/_app.js", "static/chunks/pages/index.js"],
+        "/about": ["static/chunks/main-app.js", "static/chunks/app/about/page.js"]
+    }
+
+def test_gzip_size_streams(tmp_path, monkeypatch):
+    """Test that chunks are sized in windows and match gzip."""
+    data = os.urandom(1000) * 300
+    (tmp_path / "chunk.js").write_bytes(data)
+    monkeypatch.setattr("github_review_bot.scripts.bundle_budget.READ_WINDOW", 4096)
+    assert abs(gzip_size(str(tmp_path / "chunk.js")) - len(gzip.compress(data, 9))) < 64
+    (tmp_path / "empty.js").write_bytes(b"")
+    assert gzip_size(str(tmp_path / "empty.js")) == 0
+
+def test_growth_over_baseline(tmp_path):
+    """Test that growth is compared with the baseline recorded for the base commit."""
+    repo = tmp_path / "repo"
+    _build(repo)
+    cache_dir = str(tmp_path / "cache")
+    baseline = record_baselines(str(repo), cache_dir, "base123")
+    assert set(baseline["."]) == {"/", "/about"}
+    assert BundleBaselineStore(cache_dir).load("base123") == baseline
+
+    grown = tmp_path / "grown"
+    _build(grown, os.urandom(30 * 1024))
+    budget = BundleBudget(store=BundleBaselineStore(cache_dir), base_sha="base123")
+    issues = [issue for issue in check_nextjs(str(grown), bundle_budget=budget)
+              if "First-load JS" in issue["message"]]
+    assert len(issues) == 1
+    assert issues[0]["type"] == "warning" and issues[0]["message"].startswith("First-load JS of / grew by")
+
+    # Without a baseline for the base commit only absolute limits apply
+    unknown = BundleBudget(store=BundleBaselineStore(cache_dir), base_sha="other")
+    assert not any("First-load JS" in issue["message"]
+                   for issue in check_nextjs(str(grown), bundle_budget=unknown))
@@ -0,0 +1,97 @@
+"""
+Tests for changed_files.py script.
+"""
+
+import subprocess
+from unittest.mock import Mock
+from github import File
+from github_review_bot.scripts.changed_files import (
+    ChangedFiles,
+    build_changed_files,
+    detect_language
+)
+
+class MockPullRequest:
+    """A simple class that mimics the PullRequest interface."""
+    def __init__(self, files):
+        self._files = files
+
+    def get_files(self):
+        return self._files
+
+def mock_file(filename: str, status: str = "modified", patch=None) -> Mock:
+    """Create a mock PR file."""
+    pr_file = Mock(spec=File)
+    pr_file.filename = filename
+    pr_file.status = status
+    if patch is not None:
+        pr_file.patch = patch
+    return pr_file
+
+def test_changed_files_interface(tmp_path):
+    """Test the interface of the changed-file index."""
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "module.py").write_text("x = 1\n")
+    pr = MockPullRequest([
+        mock_file("pkg/module.py", patch="@@ -1 +1 @@\n-x = 0\n+x = 1"),
+        mock_file("web/app.tsx", status="removed")
+    ])
+
+    index = build_changed_files(pr, str(tmp_path))
+    assert isinstance(index, ChangedFiles)
+    assert len(index) == 2
+    assert "pkg/module.py" in index
+
+    module = index.get("pkg/module.py")
+    assert module.language == "python"
+    assert module.size == 6
+    assert module.patch.startswith("@@")
+    # Mock attributes that are not strings are not mistaken for data
+    assert module.sha is None
+
+def test_changed_files_functionality(tmp_path):
+    """Test language queries and lint targets."""
+    (tmp_path / "app.py").write_text("print('hi')\n")
+    pr = MockPullRequest([
+        mock_file("app.py"),
+        mock_file("deleted.py", status="removed"),
+        mock_file("src/deep/component.tsx")
+    ])
+    index = ChangedFiles.from_pull_request(pr, str(tmp_path))
+
+    # Nested sources are found without scanning the working directory
+    assert index.has_language("typescript")
+    assert not index.has_language("javascript")
+    assert [f.path for f in index.by_language("python")] == ["app.py", "deleted.py"]
+    # Removed or missing files are never handed to linters
+    assert index.lint_targets("python") == ["app.py"]
+    assert index.lint_targets("typescript") == []
+
+    assert detect_language("a/b/C.PY") == "python"
+    assert detect_language("README") is None
+
+def test_changed_files_from_git(tmp_path):
+    """Test building the index with a single git diff against the merge-base."""
+    def git(*args):
+        subprocess.run(['git', *args], cwd=tmp_path, check=True, capture_output=True)
+
+    git('init', '-q', '-b', 'main')
+    git('config', 'user.email', 'bot@example.com')
+    git('config', 'user.name', 'bot')
+    (tmp_path / "keep.py").write_text("a = 1\n")
+    (tmp_path / "old.js").write_text("var a;\n")
+    git('add', '.')
+    git('commit', '-qm', 'base')
+    git('checkout', '-qb', 'feature')
+    (tmp_path / "keep.py").write_text("a = 2\n")
+    git('mv', 'old.js', 'new.js')
+    git('commit', '-qam', 'change')
+
+    index = ChangedFiles.from_git('main', str(tmp_path))
+    assert index.get("keep.py").status == "modified"
+    assert index.get("new.js").status == "renamed"
+    assert "old.js" not in index
+    assert index.base_sha == subprocess.run(['git', 'rev-parse', 'main'], cwd=tmp_path,
+                                            capture_output=True, text=True).stdout.strip()
+
+    assert len(ChangedFiles.from_git('no-such-branch', str(tmp_path))) == 0
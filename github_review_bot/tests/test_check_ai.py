@@ -0,0 +1,54 @@
+"""
+Tests for check_ai.py script.
+"""
+
+from github_review_bot.scripts.changed_files import ChangedFile, ChangedFiles
+from github_review_bot.scripts.check_ai import check_ai
+from github_review_bot.scripts.repo_index import RepoIndex
+
+AGENT = '''import json
+
+FAST = "claude-3-5-sonnet-20241022"
+SMART = "gpt-4o"
+STABLE = "gpt-4o-2024-08-06"
+SYSTEM = "You plan tasks."
+
+def run(client, user):
+    reply = client.messages.create(model=FAST, system=f"Help {user}", messages=[])
+    plan = json.loads(reply.content[0].text)
+    return eval(reply.content[0].text), plan
+'''
+
+def _changed(tmp_path):
+    (tmp_path / "agent.py").write_text(AGENT)
+    return ChangedFiles([ChangedFile("agent.py", "modified", len(AGENT))], str(tmp_path))
+
+def test_check_ai_interface(tmp_path):
+    """Test the interface of check_ai."""
+    assert check_ai(ChangedFiles([], str(tmp_path))) == []
+    issue = check_ai(_changed(tmp_path))[0]
+    assert set(issue) == {'tool', 'rule', 'type', 'message', 'file', 'line', 'column'}
+
+def test_ai_checks(tmp_path):
+    """Test each rule on a changed agent file."""
+    (tmp_path / "legacy.py").write_text('MODEL = "gpt-4o-2024-05-13"\n')
+    stats = {}
+    issues = check_ai(_changed(tmp_path), {}, RepoIndex.build(str(tmp_path)), str(tmp_path / "cache"), stats)
+    assert [(issue['rule'], issue['line'], issue['type']) for issue in issues] == [
+        ('deprecated-model', 3, 'error'),
+        ('unpinned-model', 4, 'warning'),
+        ('model-snapshot-drift', 5, 'info'),
+        ('unvalidated-response-parse', 10, 'warning'),
+        ('eval-model-output', 11, 'error'),
+        ('system-prompt-interpolation', 9, 'warning'),
+    ]
+    assert "legacy.py:1" in issues[2]['message']
+    assert stats['ai_index']['files'] == 2 and stats['ai_index']['models'] == 4
+
+def test_ai_checks_follow_config(tmp_path):
+    """Test the ai_checks flags and extra deprecated models."""
+    config = {'ai_checks': {'model_versioning': True, 'response_validation': False,
+                            'prompt_engineering': False},
+              'ai_agent': {'deprecated_models': ['gpt-4o-2024-08-06']}}
+    rules = [issue['rule'] for issue in check_ai(_changed(tmp_path), config)]
+    assert rules == ['deprecated-model', 'unpinned-model', 'deprecated-model']
@@ -0,0 +1,103 @@
+"""
+Tests for check_api.py script.
+"""
+
+import subprocess
+import pytest
+from github_review_bot.scripts.changed_files import ChangedFile, ChangedFiles
+from github_review_bot.scripts.check_api import check_api
+from github_review_bot.scripts.repo_index import RepoIndex
+
+BASE = '''openapi: 3.0.3
+info: {title: Pets, version: "1.0"}
+paths:
+  /pets:
+    get:
+      responses:
+        "200": {description: ok}
+    delete:
+      responses:
+        "204": {description: gone}
+'''
+
+HEAD = '''openapi: 3.0.3
+info: {title: Pets, version: "1.1"}
+paths:
+  /pets:
+    get:
+      responses:
+        "200": {description: ok}
+  /owners/{id}:
+    get:
+      responses: {}
+'''
+
+def _repo(tmp_path):
+    def git(*args):
+        return subprocess.run(['git', *args], cwd=tmp_path, check=True, capture_output=True, text=True).stdout
+
+    git('init', '-q')
+    git('config', 'user.email', 'bot@example.com')
+    git('config', 'user.name', 'bot')
+    (tmp_path / "openapi.yaml").write_text(BASE)
+    git('add', '.')
+    git('commit', '-qm', 'base')
+    (tmp_path / "openapi.yaml").write_text(HEAD)
+    return git('rev-parse', 'HEAD').strip()
+
+def test_check_api_interface(tmp_path):
+    """Test the interface of check_api."""
+    with pytest.raises(TypeError):
+        check_api(["openapi.yaml"])  # type: ignore
+    assert check_api(ChangedFiles([], str(tmp_path))) == []
+    (tmp_path / "openapi.yaml").write_text(HEAD)
+    issue = check_api(ChangedFiles([ChangedFile("openapi.yaml", "added")], str(tmp_path)))[0]
+    assert set(issue) == {'tool', 'rule', 'type', 'message', 'file', 'line', 'column'}
+
+def test_api_checks_against_base(tmp_path):
+    """Test breaking changes against the base revision and validation of the changed units."""
+    base_sha = _repo(tmp_path)
+    changed = ChangedFiles([ChangedFile("openapi.yaml", "modified")], str(tmp_path), base_sha)
+    stats = {}
+    issues = check_api(changed, {}, cache_dir=str(tmp_path / "cache"), stats=stats)
+    assert [(issue['rule'], issue['message']) for issue in issues] == [
+        ('breaking-change', 'DELETE /pets was removed'),
+        ('invalid-spec', 'GET /owners/{id} has no responses'),
+        ('invalid-spec', 'GET /owners/{id} does not declare path parameter id'),
+    ]
+    # The unchanged GET /pets is not validated again
+    assert stats['openapi'] == {'specs': 1, 'units': 5, 'validated': 3, 'cache_hits': 0, 'cache_misses': 2}
+
+    check_api(changed, {}, cache_dir=str(tmp_path / "cache"), stats=stats)
+    assert stats['openapi']['cache_hits'] == 2
+
+def test_api_checks_follow_config(tmp_path):
+    """Test the api_checks flags, api.spec_paths and api.require_openapi."""
+    base_sha = _repo(tmp_path)
+    (tmp_path / "api.yml").write_text("openapi: 3.0.3\npaths: {}\n")
+    changed = ChangedFiles([ChangedFile("openapi.yaml", "modified"), ChangedFile("api.yml", "added")],
+                           str(tmp_path), base_sha)
+    config = {'api_checks': {'openapi_validation': False}, 'api': {'spec_paths': ['api.yml']}}
+    assert [issue['rule'] for issue in check_api(changed, config)] == ['breaking-change']
+    config = {'api_checks': {'breaking_changes': False}, 'api': {'spec_paths': ['api.yml']}}
+    assert [issue['file'] for issue in check_api(changed, config)] == ['openapi.yaml', 'openapi.yaml', 'api.yml']
+
+    (tmp_path / "openapi.yaml").unlink()
+    (tmp_path / "api.yml").unlink()
+    config = {'api': {'require_openapi': True}}
+    rules = [issue['rule'] for issue in check_api(ChangedFiles([], str(tmp_path)), config,
+                                                  RepoIndex.build(str(tmp_path)))]
+    assert rules == ['missing-spec']
+
+def test_route_checks_follow_config(tmp_path):
+    """Test that route rules run on changed Python files and follow their api_checks flags."""
+    (tmp_path / "items.py").write_text('from fastapi import APIRouter\nrouter = APIRouter()\n\n'
+                                       '@router.post("/items")\ndef create_item(item: dict):\n'
+                                       '    return json.loads(item)\n')
+    changed = ChangedFiles([ChangedFile("items.py", "added")], str(tmp_path))
+    stats = {}
+    assert [issue['rule'] for issue in check_api(changed, {}, stats=stats)] == \
+        ['missing-auth', 'missing-rate-limit', 'unhandled-errors']
+    assert stats['api_routes'] == {'files': 1, 'handlers': 1}
+    config = {'api_checks': {'authentication': False, 'rate_limiting': False, 'error_handling': False}}
+    assert check_api(changed, config) == []
@@ -0,0 +1,151 @@
+"""
+Tests for check_registry.py script.
+"""
+
+import threading
+import pytest
+from github_review_bot.scripts.changed_files import ChangedFile, ChangedFiles
+from github_review_bot.scripts.check_registry import (
+    Check, CheckContext, CheckRegistry, format_plan, repo_type_of
+)
+from github_review_bot.scripts.run_analysis import CHECKS
+from github_review_bot.scripts.time_budget import CostModel, TimeBudget
+
+def _changed(tmp_path, *paths):
+    return ChangedFiles([ChangedFile(p, "modified", size=1) for p in paths], str(tmp_path))
+
+def test_check_registry_interface(tmp_path):
+    """Test the interface of the check registry."""
+    registry = CheckRegistry([Check('lint', lambda context: (True, []))])
+    with pytest.raises(TypeError):
+        registry.register(lambda context: (True, []))
+    with pytest.raises(ValueError):
+        registry.register(Check('lint', lambda context: (True, [])))
+    with pytest.raises(ValueError):
+        registry.register(Check('deploy', lambda context: (True, []), requires=('build',)))
+
+    context = CheckContext(_changed(tmp_path, "a.py"), {})
+    assert list(registry.run(context)) == [('lint', (True, []))]
+    assert context.stats['checks'] == ['lint']
+
+def test_shared_prerequisite_runs_once(tmp_path):
+    """Test that work shared by several checks is memoized."""
+    calls = []
+    lock = threading.Lock()
+
+    def install(context):
+        with lock:
+            calls.append('install')
+        return 'node_modules'
+
+    registry = CheckRegistry([
+        Check('install', install, report=False),
+        Check('eslint', lambda context: (True, [{'dep': context.result('install')}]), requires=('install',)),
+        Check('tsc', lambda context: (False, []), requires=('install',))
+    ])
+    results = dict(registry.run(CheckContext(_changed(tmp_path, "a.ts"), {})))
+    assert calls == ['install']
+    assert results == {'eslint': (True, [{'dep': 'node_modules'}]), 'tsc': (False, [])}
+
+def test_plan_explains_selection(tmp_path):
+    """Test the dry-run plan for a frontend repository."""
+    (tmp_path / "next.config.js").write_text("module.exports = {}\n")
+    changed = _changed(tmp_path, "app/page.tsx")
+    config = {'type': 'frontend', 'rules': {'code_style': True}}
+
+    plan = {entry.name: entry for entry in CHECKS.plan(config, changed)}
+    assert [name for name, entry in plan.items() if entry.selected] == \
+        ['node_dependencies', 'javascript', 'secrets', 'pii', 'coverage', 'nextjs']
+    assert plan['vercel'].reason == 'no vercel.json or .vercel found'
+    assert plan['python'].reason == 'no python files changed'
+    assert plan['api'].reason == 'repository type is frontend'
+
+    # JS analysis is planned once, and dropped with code_style
+    plan = CHECKS.plan({'repo_type': 'frontend', 'enabled_checks': {'code_style': False}}, changed)
+    assert [entry.name for entry in plan if entry.selected] == ['secrets', 'pii', 'coverage', 'nextjs']
+
+    text = format_plan(CHECKS.plan(config, changed))
+    assert "run  javascript (after node_dependencies): applies" in text
+    assert "skip ai: repository type is frontend" in text
+
+def test_prerequisites_pulled_in(tmp_path):
+    """Test that a prerequisite runs for its dependents even when it would not apply."""
+    registry = CheckRegistry([
+        Check('schema', lambda context: 'schema', repo_types=('api',), report=False),
+        Check('docs', lambda context: (True, []), requires=('schema',))
+    ])
+    plan = registry.plan({}, _changed(tmp_path, "a.py"))
+    assert [(entry.name, entry.selected, entry.reason) for entry in plan] == [
+        ('schema', True, 'required by docs'),
+        ('docs', True, 'applies')
+    ]
+    assert repo_type_of({}) == 'default'
+
+def test_budget_runs_valuable_cheap_checks_first(tmp_path):
+    """Test that checks the budget cannot fit are dropped, most valuable per second kept."""
+    costs = CostModel()
+    registry = CheckRegistry([
+        Check('install', lambda context: None, report=False, cost=50),
+        Check('eslint', lambda context: (True, []), requires=('install',), value=3, cost=10),
+        Check('nextjs', lambda context: (True, []), value=2, cost=1),
+        Check('vercel', lambda context: (True, []), value=1, cost=1)
+    ])
+    checks = [entry.check for entry in registry.plan({}, _changed(tmp_path, "a.ts"))]
+    order, skipped = registry.schedule(checks, costs, TimeBudget(30))
+    assert [check.name for check in order] == ['nextjs', 'vercel']
+    assert [name for name, _ in skipped] == ['eslint']
+
+    context = CheckContext(_changed(tmp_path, "a.ts"), {})
+    results = dict(registry.run(context, budget=TimeBudget(30), costs=costs))
+    assert set(results) == {'nextjs', 'vercel'}
+    assert context.stats['skipped_checks'][0]['check'] == 'eslint'
+
+def test_budget_cuts_running_checks(tmp_path):
+    """Test that a check overrunning the budget is cut, its stats dropped, and the rest still reported."""
+    cancelled = []
+
+    def fast(context):
+        context.stats['fast'] = 1
+        return (True, [])
+
+    def slow(context):
+        # An in-process check stops at its next file once the run is cut
+        context.cancel_event.wait(5)
+        context.stats['slow'] = 1
+        return (False, [{'message': 'late'}])
+
+    registry = CheckRegistry([
+        Check('fast', fast, cost=0.01),
+        Check('slow', slow, cost=0.01)
+    ])
+    context = CheckContext(_changed(tmp_path, "a.py"), {})
+    context.on_cancel(lambda: cancelled.append(True))
+    results = list(registry.run(context, budget=TimeBudget(0.2, reserve=0)))
+
+    assert results == [('fast', (True, []))]
+    assert cancelled == [True]
+    assert context.stats['skipped_checks'] == [
+        {'check': 'slow', 'reason': 'cut off when the time budget ran out'}
+    ]
+    context.result('slow')
+    assert context.stats['fast'] == 1 and 'slow' not in context.stats
+
+def test_failing_check_reported_with_the_rest(tmp_path):
+    """Test that a check raising, and the ones requiring it, fail without hiding the other results."""
+    def broken(context):
+        raise AttributeError("'NoneType' object has no attribute '_fields'")
+
+    registry = CheckRegistry([
+        Check('python', broken),
+        Check('install', broken, report=False),
+        Check('eslint', lambda context: (True, [context.result('install')]), requires=('install',)),
+        Check('docs', lambda context: (True, []))
+    ])
+    results = dict(registry.run(CheckContext(_changed(tmp_path, "a.py"), {})))
+    assert results['docs'] == (True, [])
+    for name in ('python', 'eslint'):
+        passed, issues = results[name]
+        assert not passed
+        assert [(issue['tool'], issue['rule'], issue['type']) for issue in issues] == \
+            [(name, 'tool-error', 'error')]
+        assert "AttributeError" in issues[0]['message']
@@ -0,0 +1,84 @@
+"""
+Tests for coverage_report.py script.
+"""
+
+import pytest
+from github_review_bot.scripts.changed_files import ChangedFile, ChangedFiles
+from github_review_bot.scripts.coverage_report import PathMatcher, check_coverage, read_cobertura, read_lcov
+
+COBERTURA = '''<?xml version="1.0" ?>
+<coverage version="7.4" line-rate="0.5">
+  <sources><source>{root}/src</source></sources>
+  <packages>
+    <package name="app">
+      <classes>
+        <class name="orders.py" filename="app/orders.py" line-rate="0.5">
+          <methods><method name="f"><lines><line number="99" hits="0"/></lines></method></methods>
+          <lines>
+            <line number="1" hits="1"/>
+            <line number="3" hits="1"/>
+            <line number="4" hits="0"/>
+            <line number="5" hits="0"/>
+            <line number="9" hits="0"/>
+          </lines>
+        </class>
+        <class name="other.py" filename="app/other.py" line-rate="0">
+          <lines><line number="1" hits="0"/></lines>
+        </class>
+      </classes>
+    </package>
+  </packages>
+</coverage>
+'''
+
+LCOV = '''TN:
+SF:{root}/src/app/orders.py
+DA:1,1
+DA:3,2
+DA:4,0
+DA:5,0
+DA:9,0
+end_of_record
+SF:src/app/other.py
+DA:1,0
+end_of_record
+'''
+
+# Adds lines 3-5 and 7
+PATCH = "@@ -1,3 +1,6 @@\n line 1\n line 2\n-old\n+new 3\n+new 4\n+new 5\n line 6\n+new 7\n"
+
+def _changed(tmp_path):
+    return ChangedFiles([ChangedFile("src/app/orders.py", "modified", 10, PATCH)], str(tmp_path))
+
+def test_coverage_report_interface(tmp_path):
+    """Test the interface of check_coverage."""
+    with pytest.raises(TypeError):
+        check_coverage(["src/app/orders.py"])  # type: ignore
+    assert check_coverage(_changed(tmp_path)) == []
+    (tmp_path / "coverage.xml").write_text("<coverage>")
+    assert [finding.rule for finding in check_coverage(_changed(tmp_path))] == ['coverage-report']
+
+def test_read_reports(tmp_path):
+    """Test that both formats keep only the wanted files, with class-level lines."""
+    (tmp_path / "coverage.xml").write_text(COBERTURA.format(root=tmp_path))
+    (tmp_path / "lcov.info").write_text(LCOV.format(root=tmp_path))
+    expected = {"src/app/orders.py": {1: 1, 3: 1, 4: 0, 5: 0, 9: 0}}
+    assert read_cobertura(str(tmp_path / "coverage.xml"), PathMatcher(["src/app/orders.py"], str(tmp_path))) \
+        == expected
+    lcov = read_lcov(str(tmp_path / "lcov.info"), PathMatcher(["src/app/orders.py"], str(tmp_path)))
+    assert lcov == {"src/app/orders.py": {1: 1, 3: 2, 4: 0, 5: 0, 9: 0}}
+    assert PathMatcher(["a.py"], str(tmp_path)).match("./a.py") == "a.py"
+
+@pytest.mark.parametrize("report", ["coverage.xml", "lcov.info"])
+def test_patch_coverage(tmp_path, report):
+    """Test patch coverage over added executable lines against min_test_coverage."""
+    (tmp_path / report).write_text((COBERTURA if report.endswith('.xml') else LCOV).format(root=tmp_path))
+    stats = {}
+    findings = check_coverage(_changed(tmp_path), {'rules': {'min_test_coverage': 50}}, stats)
+    assert [(finding.rule, finding.severity, finding.line) for finding in findings] == [
+        ('patch-coverage', 'error', None), ('uncovered-lines', 'info', 4)]
+    assert "33.3% (1 of 3 added lines)" in findings[0].message
+    assert findings[1].message == "Added lines 4-5 are not covered by tests."
+    assert stats['coverage']['lines'] == 3 and stats['coverage']['files'] == 1
+    config = {'rules': {'min_test_coverage': 30, 'coverage_report': report}}
+    assert [finding.rule for finding in check_coverage(_changed(tmp_path), config)] == ['uncovered-lines']
@@ -0,0 +1,84 @@
+"""
+Tests for diff_index.py script.
+"""
+
+import pytest
+from github_review_bot.scripts.changed_files import ChangedFile, ChangedFiles
+from github_review_bot.scripts.diff_index import (
+    ChangedLineIndex,
+    LineIntervals,
+    parse_patch,
+    parse_unified_diff
+)
+
+PATCH = """@@ -1,4 +1,5 @@
+ import os
+-import sys
++import sys, json
++import re
+ 
+ def main():
+@@ -20,3 +21,4 @@ def main():
+     pass
++    return 1
+ 
+\\ No newline at end of file"""
+
+def test_diff_index_interface():
+    """Test the interface of the changed-line index."""
+    with pytest.raises(TypeError):
+        ChangedLineIndex.from_changed_files({})  # type: ignore
+
+    index = ChangedLineIndex.from_changed_files(ChangedFiles([
+        ChangedFile("app.py", "modified", patch=PATCH),
+        ChangedFile("logo.png", "added")
+    ]))
+    assert isinstance(index, ChangedLineIndex)
+    assert index.covers("app.py")
+    assert index.covers("./app.py")
+    assert not index.covers("logo.png")
+
+def test_parse_patch():
+    """Test that only added lines of the new revision are indexed."""
+    intervals = parse_patch(PATCH)
+    assert list(intervals) == [(2, 3), (22, 22)]
+    assert 1 not in intervals
+    assert 2 in intervals and 3 in intervals
+    assert 21 not in intervals
+    assert 22 in intervals
+    assert intervals.line_count() == 3
+
+def test_line_intervals_merge():
+    """Test that overlapping and adjacent ranges are merged."""
+    intervals = LineIntervals([(10, 12), (1, 3), (4, 5), (11, 20)])
+    assert list(intervals) == [(1, 5), (10, 20)]
+    assert 7 not in intervals
+    assert "7" not in intervals
+
+def test_parse_unified_diff():
+    """Test parsing a multi-file git diff."""
+    diff = "\n".join([
+        "diff --git a/a.py b/a.py",
+        "index 111..222 100644",
+        "--- a/a.py",
+        "+++ b/a.py",
+        "@@ -3 +3,2 @@",
+        "-x = 1",
+        "+x = 2",
+        "+y = 3",
+        "diff --git a/gone.py b/gone.py",
+        "deleted file mode 100644",
+        "--- a/gone.py",
+        "+++ /dev/null",
+        "@@ -1 +0,0 @@",
+        "-z = 1",
+        "diff --git a/new.py b/new.py",
+        "--- /dev/null",
+        "+++ b/new.py",
+        "@@ -0,0 +1 @@",
+        "+++counter",
+    ])
+    files = parse_unified_diff(diff)
+    assert set(files) == {"a.py", "new.py"}
+    assert list(files["a.py"]) == [(3, 4)]
+    assert list(files["new.py"]) == [(1, 1)]
@@ -0,0 +1,58 @@
+"""
+Tests for filter_findings.py script.
+"""
+
+import pytest
+from github_review_bot.scripts.diff_index import ChangedLineIndex, LineIntervals
+from github_review_bot.scripts.filter_findings import filter_findings
+
+@pytest.fixture
+def line_index() -> ChangedLineIndex:
+    """Index where only lines 10-12 of app.py changed."""
+    return ChangedLineIndex({"app.py": LineIntervals([(10, 12)])})
+
+def test_filter_findings_interface(line_index):
+    """Test the interface of filter_findings function."""
+    with pytest.raises(TypeError):
+        filter_findings("not a dict", line_index, {})  # type: ignore
+
+    with pytest.raises(TypeError):
+        filter_findings({}, {}, {})  # type: ignore
+
+    with pytest.raises(ValueError):
+        filter_findings({}, line_index, {'analysis': {'scope': 'everything'}})
+
+    result = filter_findings({'passed': True, 'issues': [], 'stats': {}}, line_index, {})
+    assert isinstance(result, dict)
+    assert result['issues'] == []
+
+def test_filter_findings_functionality(line_index):
+    """Test that findings on untouched lines are dropped."""
+    results = {
+        'passed': False,
+        'issues': [
+            {'type': 'warning', 'message': 'old', 'file': 'app.py', 'line': 2},
+            {'type': 'warning', 'message': 'new', 'file': 'app.py', 'line': 12},
+            {'type': 'info', 'message': 'file level', 'file': 'next.config.js'},
+            {'type': 'info', 'message': 'untracked', 'file': 'other.py', 'line': 1},
+        ],
+        'stats': {}
+    }
+    result = filter_findings(results, line_index, {})
+    assert result['issues'] == [
+        {'type': 'warning', 'message': 'new', 'file': 'app.py', 'line': 12},
+        {'type': 'info', 'message': 'file level', 'file': 'next.config.js'},
+        {'type': 'info', 'message': 'untracked', 'file': 'other.py', 'line': 1},
+    ]
+    assert result['stats']['filtered_findings'] == 1
+    assert result['passed'] is False
+    # The input is left untouched
+    assert len(results['issues']) == 4
+
+    # Whole-file mode keeps everything
+    assert filter_findings(results, line_index, {'analysis': {'scope': 'whole_file'}}) is results
+
+    # A PR whose only findings are on untouched lines passes
+    untouched = {'passed': False, 'issues': [{'tool': 'flake8', 'rule': 'F401', 'type': 'error',
+                                              'message': 'unused', 'file': 'app.py', 'line': 3}]}
+    assert filter_findings(untouched, line_index, {})['passed'] is True
@@ -0,0 +1,95 @@
+"""
+Tests for findings.py script.
+"""
+
+import json
+import os
+from github_review_bot.scripts.findings import (
+    Finding,
+    parse_bandit_json,
+    parse_black,
+    parse_eslint_json,
+    parse_flake8,
+    parse_tsc,
+    tool_failure
+)
+
+def test_finding_interface():
+    """Test the interface of the Finding record."""
+    finding = Finding('flake8', 'E501', 'warning', 'a.py', 3, 80, 'line too long')
+    assert not hasattr(finding, '__dict__')
+    assert Finding.from_tuple(finding.as_tuple()) == finding
+    assert finding.to_dict() == {
+        'tool': 'flake8',
+        'rule': 'E501',
+        'type': 'warning',
+        'message': 'line too long',
+        'file': 'a.py',
+        'line': 3,
+        'column': 80
+    }
+
+def test_parse_flake8_and_black():
+    """Test the line-oriented parsers."""
+    flake8 = list(parse_flake8([
+        "./pkg/a.py:3:1: F401 'os' imported but unused",
+        "pkg/a.py:10:80: E501 line too long (90 > 79 characters)",
+        "not a finding"
+    ]))
+    assert [(f.path, f.line, f.column, f.rule, f.severity) for f in flake8] == [
+        ('pkg/a.py', 3, 1, 'F401', 'error'),
+        ('pkg/a.py', 10, 80, 'E501', 'warning')
+    ]
+
+    black = list(parse_black(["would reformat pkg/a.py", "Oh no! 💥 💔 💥"]))
+    assert [(f.path, f.line) for f in black] == [('pkg/a.py', None)]
+
+def test_parse_json_reports():
+    """Test the bandit and eslint JSON parsers."""
+    bandit = json.dumps({'results': [{
+        'filename': './app.py', 'line_number': 2, 'col_offset': 0, 'test_id': 'B602',
+        'issue_severity': 'HIGH', 'issue_text': 'shell=True'
+    }]})
+    assert [(f.path, f.rule, f.severity) for f in parse_bandit_json(bandit)] == [
+        ('app.py', 'B602', 'error')
+    ]
+
+    eslint = json.dumps([{
+        'filePath': os.path.join(os.getcwd(), 'src', 'index.ts'),
+        'messages': [
+            {'ruleId': 'no-var', 'severity': 2, 'message': 'Unexpected var', 'line': 1, 'column': 1},
+            {'ruleId': None, 'fatal': True, 'severity': 2, 'message': 'Parsing error', 'line': 4}
+        ]
+    }])
+    assert [(f.path, f.rule, f.severity) for f in parse_eslint_json(eslint)] == [
+        ('src/index.ts', 'no-var', 'error'),
+        ('src/index.ts', 'parse-error', 'error')
+    ]
+
+    # Broken output yields nothing instead of raising
+    assert list(parse_bandit_json('{oops')) == []
+    assert list(parse_eslint_json('')) == []
+
+def test_parse_tsc():
+    """Test that tsc message chains are folded into one finding."""
+    findings = list(parse_tsc([
+        "src/a.ts(3,7): error TS2322: Type 'string' is not assignable to type 'number'.",
+        "src/b.ts(1,1): error TS2345: Argument of type 'A' is not assignable.",
+        "  Property 'x' is missing in type 'A'.",
+        "error TS5023: Unknown compiler option 'strictest'.",
+        "Found 3 errors."
+    ]))
+    assert [(f.path, f.line, f.rule) for f in findings] == [
+        ('src/a.ts', 3, 'TS2322'),
+        ('src/b.ts', 1, 'TS2345'),
+        ('', None, 'TS5023')
+    ]
+    assert findings[1].message.endswith("Property 'x' is missing in type 'A'.")
+
+def test_tool_failure():
+    """Test reporting of tools that produced no usable output."""
+    assert tool_failure('eslint', None, '', timed_out=True).message == 'eslint timed out'
+    failure = tool_failure('black', 123, 'error: cannot format a.py\n')
+    assert failure.rule == 'tool-error'
+    assert failure.severity == 'error'
+    assert 'cannot format a.py' in failure.message
@@ -82,9 +82,41 @@ def test_generate_review_functionality(mock_config):
     # Test failing case
     failing_results = {
         'passed': False,
-        'issues': [{'tool': 'flake8', 'output': 'E501 line too long'}],
+        'issues': [{'tool': 'flake8', 'rule': 'E501', 'type': 'warning', 'message': 'line too long',
+                    'file': 'a.py', 'line': 1}],
         'stats': {}
     }
     review_body, review_action = generate_review(failing_results, mock_config)
     assert "⚠️ Some issues were found" in review_body
-    assert review_action == 'REQUEST_CHANGES' 
\ No newline at end of file
+    assert review_action == 'REQUEST_CHANGES' 
+
+def test_generate_review_structured_findings(mock_config):
+    """Test that structured findings are grouped by tool and sorted by location."""
+    results = {
+        'passed': False,
+        'issues': [
+            {'tool': 'flake8', 'rule': 'E501', 'type': 'warning', 'message': 'line too long',
+             'file': 'b.py', 'line': 9, 'column': 80},
+            {'tool': 'flake8', 'rule': 'F401', 'type': 'error', 'message': 'unused import',
+             'file': 'a.py', 'line': 1, 'column': 1},
+            {'type': 'info', 'message': 'Consider adding @vercel/analytics', 'file': 'package.json'}
+        ],
+        'stats': {}
+    }
+    review_body, review_action = generate_review(results, mock_config)
+    assert "## Flake8 Issues" in review_body
+    assert "## Project Checks Issues" in review_body
+    assert review_body.index("`a.py:1:1` F401") < review_body.index("`b.py:9:80` E501")
+    assert review_action == 'REQUEST_CHANGES'
+
+def test_generate_review_partial(mock_config):
+    """Test that checks cut by the time budget are listed and block approval."""
+    results = {
+        'passed': True,
+        'issues': [],
+        'stats': {'skipped_checks': [{'check': 'javascript', 'reason': 'cut off when the time budget ran out'}]}
+    }
+    review_body, review_action = generate_review(results, mock_config)
+    assert "## Skipped Checks" in review_body
+    assert "- javascript: cut off when the time budget ran out" in review_body
+    assert review_action == 'COMMENT'
@@ -0,0 +1,98 @@
+"""
+Tests for js_config.py script.
+"""
+
+import pytest
+from github_review_bot.scripts.js_config import (
+    ARRAY, DYNAMIC, OBJECT, ConfigParseCache, extract_object, tokenize
+)
+from github_review_bot.scripts.check_nextjs import check_nextjs
+
+NEXT_CONFIG = '''// images.unoptimized is not set here, and neither is "swcMinify"
+/** @type {import('next').NextConfig} */
+const nextConfig = {
+  reactStrictMode: true,
+  swcMinify: false,
+  images: { unoptimized: true, remotePatterns: [{ protocol: 'https', hostname: 'cdn.example.com' }] },
+  env: { API_URL: process.env.API_URL, LABEL: `static`, HOST: `${host}/` },
+  async headers() { return [{ source: '/(.*)', headers: [] }] },
+  webpack: (config) => { if (/\\/\\*/.test(config.name)) {} return config },
+  experimental: { ...shared, typedRoutes: true },
+  'page-extensions': ['tsx', 'mdx'],
+}
+
+module.exports = withBundleAnalyzer(nextConfig)
+'''
+
+def test_extract_object_interface():
+    """Test the interface of extract_object."""
+    with pytest.raises(TypeError):
+        extract_object()  # type: ignore
+    with pytest.raises(TypeError):
+        ConfigParseCache().get(123)  # type: ignore
+
+    assert extract_object("module.exports = require('./config')") is None
+    assert extract_object("export default { poweredByHeader: false }") == {'poweredByHeader': False}
+
+def test_key_paths():
+    """Test that nested keys, arrays and expressions map to key paths."""
+    values = extract_object(NEXT_CONFIG)
+    assert values['reactStrictMode'] is True
+    assert values['swcMinify'] is False
+    assert values['images'] is OBJECT and values['images.unoptimized'] is True
+    assert values['images.remotePatterns'] is ARRAY
+    assert values['images.remotePatterns.0.hostname'] == 'cdn.example.com'
+    assert values['env.API_URL'] is DYNAMIC and values['env.HOST'] is DYNAMIC
+    assert values['env.LABEL'] == 'static'
+    assert values['headers'] is DYNAMIC and values['webpack'] is DYNAMIC
+    assert values['experimental.typedRoutes'] is True
+    assert values['page-extensions.1'] == 'mdx'
+
+def test_export_forms():
+    """Test TypeScript, ESM and function configs."""
+    typescript = '''import type { NextConfig } from "next";
+const config: NextConfig = { output: "standalone" };
+export default config;
+'''
+    assert extract_object(typescript) == {'output': 'standalone'}
+    function = '''module.exports = (phase, { defaultConfig }) => {
+  const local = { ignored: 1 };
+  return { distDir: 'build', basePath: '/docs' };
+}'''
+    assert extract_object(function) == {'distDir': 'build', 'basePath': '/docs'}
+    curried = '''const config = { output: "export" };
+export default withBundleAnalyzer({ enabled: process.env.ANALYZE === "true" })(config);
+'''
+    assert extract_object(curried) == {'output': 'export'}
+    assert extract_object("module.exports = withPWA({ dest: 'public' })({ trailingSlash: true })") == \
+        {'trailingSlash': True}
+
+def test_comments_and_strings_ignored():
+    """Test that keys mentioned in comments or strings are not read as config."""
+    kinds = [token.kind for token in tokenize("a / b; x = /\\//g; s = 'images.unoptimized' // c")]
+    assert kinds == ['name', 'punct', 'name', 'punct', 'name', 'punct', 'regex', 'punct',
+                     'name', 'punct', 'string']
+    values = extract_object('const note = "images.unoptimized"; module.exports = { swcMinify: true }')
+    assert values == {'swcMinify': True}
+
+def test_parse_cache_by_content():
+    """Test that an unchanged config is parsed once."""
+    cache = ConfigParseCache(maxsize=1)
+    first = cache.get(NEXT_CONFIG)
+    assert cache.get(NEXT_CONFIG) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+    with pytest.raises(TypeError):
+        first['swcMinify'] = True  # type: ignore
+    cache.get("export default {}")
+    cache.get(NEXT_CONFIG)
+    assert cache.misses == 3
+
+def test_checker_reads_keys(tmp_path):
+    """Test that the Next.js checker no longer misfires on comments."""
+    (tmp_path / "next.config.mjs").write_text(NEXT_CONFIG.replace("swcMinify: false", "swcMinify: true"))
+    messages = [(issue["file"], issue["message"]) for issue in check_nextjs(str(tmp_path))]
+    assert ("next.config.mjs", "Images are set to unoptimized. Consider enabling image optimization.") in messages
+    assert not any("swcMinify" in message for _, message in messages)
+
+    (tmp_path / "next.config.mjs").write_text("// images.unoptimized\nexport default { swcMinify: true }\n")
+    assert not any(issue["file"] == "next.config.mjs" for issue in check_nextjs(str(tmp_path)))
@@ -0,0 +1,70 @@
+"""
+Tests for manifests.py script.
+"""
+
+import subprocess
+import pytest
+from github_review_bot.scripts.manifests import ManifestCache, freeze, git_blob_sha
+from github_review_bot.scripts.check_nextjs import check_nextjs
+from github_review_bot.scripts.check_vercel import check_vercel
+
+def test_manifest_cache_interface(tmp_path):
+    """Test the interface of ManifestCache."""
+    with pytest.raises(TypeError):
+        ManifestCache(123)  # type: ignore
+
+    (tmp_path / "package.json").write_text('{"scripts": {"build": "next build"}, "files": ["dist"]}')
+    cache = ManifestCache(str(tmp_path))
+    manifest = cache.get("package.json")
+    assert manifest.exists and manifest.error is None
+    assert manifest.data["scripts"]["build"] == "next build"
+    assert manifest.data["files"] == ("dist",)
+    assert cache.get("./package.json") is manifest
+
+    missing = cache.get("vercel.json")
+    assert not missing.exists and missing.data is None
+
+def test_views_are_read_only(tmp_path):
+    """Test that checkers cannot change what other checkers read."""
+    data = freeze({"dependencies": {"next": "14.0.0"}})
+    with pytest.raises(TypeError):
+        data["dependencies"]["next"] = "12.0.0"  # type: ignore
+    with pytest.raises(TypeError):
+        data["name"] = "app"  # type: ignore
+
+def test_blob_sha_matches_git(tmp_path):
+    """Test that the blob SHA is the one git computes."""
+    content = b'{"name": "app"}\n'
+    (tmp_path / "package.json").write_bytes(content)
+    try:
+        expected = subprocess.run(['git', 'hash-object', str(tmp_path / "package.json")],
+                                  capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pytest.skip("git is not available")
+    assert git_blob_sha(content) == expected
+    assert ManifestCache(str(tmp_path)).get("package.json").blob_sha == expected
+
+def test_invalidated_by_blob_sha(tmp_path):
+    """Test that a cached manifest is parsed again when its blob SHA changes."""
+    (tmp_path / "package.json").write_text('{"name": "old"}')
+    cache = ManifestCache(str(tmp_path))
+    old = cache.get("package.json")
+
+    (tmp_path / "package.json").write_text('{"name": "new"}')
+    assert cache.get("package.json").data["name"] == "old"
+    assert cache.get("package.json", old.blob_sha) is old
+    new_sha = git_blob_sha(b'{"name": "new"}')
+    assert cache.get("package.json", new_sha).data["name"] == "new"
+
+def test_parse_error_reported_once(tmp_path):
+    """Test that an invalid package.json is reported once across checkers."""
+    (tmp_path / "package.json").write_text('{"dependencies": ')
+    (tmp_path / "vercel.json").write_text('[]')
+    cache = ManifestCache(str(tmp_path))
+
+    issues = check_nextjs(str(tmp_path), manifests=cache) + check_vercel(str(tmp_path), manifests=cache)
+    invalid = [issue for issue in issues if issue["message"].startswith("Invalid")]
+    assert sorted(issue["message"] for issue in invalid) == [
+        "Invalid package.json format.",
+        "Invalid vercel.json format."
+    ]
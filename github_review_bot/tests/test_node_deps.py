@@ -0,0 +1,101 @@
+"""
+Tests for node_deps.py script.
+"""
+
+import os
+import pytest
+from github_review_bot.scripts import node_deps
+from github_review_bot.scripts.changed_files import ChangedFile, ChangedFiles
+from github_review_bot.scripts.node_deps import NodeModulesCache, find_lockfile, prepare_node_dependencies
+
+@pytest.fixture
+def project(tmp_path):
+    """A project with an npm lockfile and a changed TypeScript file."""
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "package.json").write_text('{"name": "app"}')
+    (repo / "package-lock.json").write_text('{"lockfileVersion": 3}')
+    (repo / "index.ts").write_text("export const a = 1;\n")
+    return repo
+
+@pytest.fixture
+def installs(monkeypatch):
+    """Replace the package manager with one that writes a tiny node_modules."""
+    calls = []
+
+    def fake_install(command, repo_path):
+        calls.append(command)
+        os.makedirs(os.path.join(repo_path, 'node_modules', 'left-pad'))
+        with open(os.path.join(repo_path, 'node_modules', 'left-pad', 'index.js'), 'w') as f:
+            f.write('module.exports = 1;\n')
+        return True
+
+    monkeypatch.setattr(node_deps, '_install', fake_install)
+    return calls
+
+def test_prepare_node_dependencies_interface(project, installs):
+    """Test the interface of prepare_node_dependencies."""
+    with pytest.raises(TypeError):
+        prepare_node_dependencies(["index.ts"], str(project))
+
+    changed = ChangedFiles([ChangedFile("index.ts", "modified", size=20)], str(project))
+    stats = prepare_node_dependencies(changed, str(project))
+    assert set(stats) == {'status', 'lockfile', 'seconds', 'saved_seconds'}
+    assert stats['status'] == 'installed'
+    assert stats['lockfile'] == 'package-lock.json'
+    assert installs[0][:2] == ['npm', 'ci']
+    assert '--prefer-offline' in installs[0]
+
+def test_skips_install_without_js_changes(project, installs):
+    """Test that a PR touching no lintable JS/TS never installs."""
+    changed = ChangedFiles([ChangedFile("README.md", "modified"),
+                            ChangedFile("old.ts", "removed")], str(project))
+    assert prepare_node_dependencies(changed, str(project))['status'] == 'skipped'
+    assert installs == []
+
+def test_reuses_install_by_lockfile(tmp_path, project, installs):
+    """Test that an install is reused until the lockfile changes."""
+    cache = NodeModulesCache(str(tmp_path / "cache"))
+    changed = ChangedFiles([ChangedFile("index.ts", "modified", size=20)], str(project))
+
+    assert prepare_node_dependencies(changed, str(project), cache)['status'] == 'installed'
+    # Same tree still in place
+    assert prepare_node_dependencies(changed, str(project), cache)['status'] == 'current'
+
+    # Fresh checkout: restored from the cache, not reinstalled
+    node_deps.shutil.rmtree(project / "node_modules")
+    stats = prepare_node_dependencies(changed, str(project), cache)
+    assert stats['status'] == 'restored'
+    assert stats['saved_seconds'] >= 0
+    assert (project / "node_modules" / "left-pad" / "index.js").read_text() == 'module.exports = 1;\n'
+    assert len(installs) == 1
+
+    # Tools writing into the restored tree leave the cached tree alone
+    (project / "node_modules" / "left-pad" / "index.js").write_text('patched\n')
+    node_deps.shutil.rmtree(project / "node_modules")
+    assert prepare_node_dependencies(changed, str(project), cache)['status'] == 'restored'
+    assert (project / "node_modules" / "left-pad" / "index.js").read_text() == 'module.exports = 1;\n'
+
+    (project / "package-lock.json").write_text('{"lockfileVersion": 3, "packages": {}}')
+    assert prepare_node_dependencies(changed, str(project), cache)['status'] == 'installed'
+    assert len(installs) == 2
+
+def test_cache_keeps_recent_installs(tmp_path):
+    """Test that only the most recently used trees are kept."""
+    source = tmp_path / "node_modules"
+    source.mkdir()
+    (source / "a.js").write_text("1")
+    cache = NodeModulesCache(str(tmp_path / "cache"), max_installs=2)
+    for key in ('k1', 'k2', 'k3'):
+        cache.save(key, str(source), 1.0)
+        os.utime(os.path.join(cache.root, key, node_deps.META_FILE), (0, {'k1': 1, 'k2': 2, 'k3': 3}[key]))
+    cache.evict()
+    assert sorted(os.listdir(cache.root)) == ['k2', 'k3']
+
+def test_find_lockfile(tmp_path):
+    """Test package manager detection from the lockfile."""
+    assert find_lockfile(str(tmp_path)) is None
+    (tmp_path / "pnpm-lock.yaml").write_text("lockfileVersion: '6.0'\n")
+    name, command = find_lockfile(str(tmp_path))
+    assert name == 'pnpm-lock.yaml'
+    assert command[0] == 'pnpm'
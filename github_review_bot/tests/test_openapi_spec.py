@@ -0,0 +1,124 @@
+"""
+Tests for openapi_spec.py script.
+"""
+
+import io
+from github_review_bot.scripts.openapi_spec import (
+    ParsedSpec, SpecCache, SpecDiff, breaking_changes, describe, load_spec, normalize, pointer, spec_units,
+    validate_units
+)
+
+BASE = '''openapi: 3.0.3
+info: {title: Pets, version: "1.0"}
+paths:
+  /pets:
+    get:
+      operationId: listPets
+      parameters:
+        - {name: limit, in: query, schema: {type: integer}}
+      responses:
+        200: {description: ok}
+    post:
+      operationId: createPet
+      responses:
+        "201": {description: created}
+components:
+  schemas:
+    Pet:
+      type: object
+      required: [id]
+      properties:
+        id: {type: string}
+        tag: {type: string}
+        kind: {type: string, enum: [cat, dog]}
+'''
+
+HEAD = '''openapi: 3.0.3
+info: {title: Pets, version: "1.0"}
+paths:
+  /pets:
+    get:
+      operationId: listPets
+      parameters:
+        - {name: limit, in: query, required: true, schema: {type: integer}}
+      responses:
+        200: {description: ok}
+  /pets/{id}:
+    get:
+      operationId: listPets
+      responses:
+        200: {content: {application/json: {schema: {$ref: "#/components/schemas/Missing"}}}}
+components:
+  schemas:
+    Pet:
+      type: object
+      required: [id, name]
+      properties:
+        id: {type: integer}
+        kind: {type: string, enum: [cat]}
+        name: {type: string}
+'''
+
+def _parse(text):
+    return ParsedSpec(None, normalize(load_spec(io.BytesIO(text.encode()), "openapi.yaml")))
+
+def test_openapi_spec_interface():
+    """Test the interface of the spec helpers."""
+    spec = _parse(BASE)
+    assert set(spec.units) == {'#/info', '#/paths/~1pets', '#/paths/~1pets/get', '#/paths/~1pets/post',
+                               '#/components/schemas/Pet'}
+    assert spec.units['#/paths/~1pets/get']['responses'] == {'200': {'description': 'ok'}}
+    assert pointer('paths', '/pets/{id}', 'get') == '#/paths/~1pets~1{id}/get'
+    assert describe('#/paths/~1pets~1{id}/get') == 'GET /pets/{id}'
+    assert describe('#/components/schemas/Pet') == 'schema Pet'
+    assert spec_units(None) == {}
+
+def test_spec_diff_and_breaking_changes():
+    """Test that only changed units are diffed and compared."""
+    base, head = _parse(BASE), _parse(HEAD)
+    diff = SpecDiff(base, head)
+    assert diff.added == ['#/paths/~1pets~1{id}', '#/paths/~1pets~1{id}/get']
+    assert diff.removed == ['#/paths/~1pets/post']
+    assert diff.changed == ['#/components/schemas/Pet', '#/paths/~1pets/get']
+    assert [message for _, message in breaking_changes(base, head, diff)] == [
+        'POST /pets was removed',
+        'schema Pet property tag was removed',
+        'schema Pet property name is now required',
+        'schema Pet.id changed type from string to integer',
+        'schema Pet.kind no longer allows dog',
+        'GET /pets: query parameter limit is now required',
+    ]
+
+def test_validate_units():
+    """Test validation of the given units only."""
+    head = _parse(HEAD)
+    assert [message for _, message in validate_units(head, ['#/paths/~1pets~1{id}/get'])] == [
+        'GET /pets/{id} reuses operationId listPets',
+        'GET /pets/{id} does not declare path parameter id',
+        'GET /pets/{id} references missing #/components/schemas/Missing',
+    ]
+    assert validate_units(head, ['#/info', '#/components/schemas/Pet']) == []
+    broken = _parse('swagger: "1.2"\ninfo: {title: Pets}\ndefinitions:\n  Pet: {required: [id], properties: {}}\n')
+    assert [message for _, message in validate_units(broken, sorted(broken.units))] == [
+        'schema Pet requires undefined properties id',
+        "Document must declare `openapi: 3.x` or `swagger: '2.0'`",
+        'info.title and info.version are required',
+    ]
+
+def test_spec_cache(tmp_path):
+    """Test that parsed specs are reused from memory and from disk by blob SHA."""
+    opened = []
+
+    def open_stream():
+        opened.append(1)
+        return io.BytesIO(BASE.encode())
+
+    cache = SpecCache(str(tmp_path))
+    first = cache.get("abc", "openapi.yaml", open_stream)
+    assert cache.get("abc", "openapi.yaml", open_stream) is first
+    second = SpecCache(str(tmp_path)).get("abc", "openapi.yaml", open_stream)
+    assert len(opened) == 1 and second.hashes == first.hashes and second.spec == first.spec
+
+    invalid = cache.get("def", "openapi.json", lambda: io.BytesIO(b"{"))
+    assert invalid.error.startswith("Could not parse openapi.json") and invalid.units == {}
+    assert not (tmp_path / "openapi" / "def.json").exists()
@@ -0,0 +1,92 @@
+"""
+Tests for pii_scan.py script.
+"""
+
+import subprocess
+import threading
+import pytest
+from github_review_bot.scripts.changed_files import ChangedFile, ChangedFiles
+from github_review_bot.scripts.check_registry import check_enabled
+from github_review_bot.scripts.pii_scan import PIIScanner, iter_chunks, luhn_valid, scan_changed_files
+
+def _rules(scanner, text):
+    return [rule for rule, _, _, _, _ in scanner.scan_line(text)]
+
+def test_scan_changed_files_interface():
+    """Test the interface of scan_changed_files."""
+    with pytest.raises(TypeError):
+        scan_changed_files({"a.py": "+x"})  # type: ignore
+    with pytest.raises(TypeError):
+        PIIScanner("me@acme.io")  # type: ignore
+    assert scan_changed_files(ChangedFiles([])) == []
+    assert luhn_valid("4539148803436467") and not luhn_valid("4539148803436468")
+
+def test_detects_and_validates():
+    """Test each kind of personal data, and the validators that cut false positives."""
+    scanner = PIIScanner()
+    assert _rules(scanner, 'owner = "jane.doe@acme.io"') == ['email']
+    assert _rules(scanner, 'owner = "jane@example.com"') == []
+    assert _rules(scanner, 'call("415-867-5309", "+447911123456")') == ['phone-number', 'phone-number']
+    assert _rules(scanner, 'ssn = "123-45-6789"; nino = "AB 12 34 56 C"') == ['us-ssn', 'uk-nino']
+    assert _rules(scanner, 'card = "4539 1488 0343 6467"') == ['card-number']
+    assert _rules(scanner, 'card = "4539 1488 0343 6468"') == []
+    assert _rules(scanner, 'stripe_test = "4242424242424242"') == []
+    assert _rules(scanner, 'hosts = ["8.8.8.8", "10.0.0.1", "192.0.2.1", "2001:4860:4860::8888"]') == \
+        ['ip-address', 'ip-address']
+    assert _rules(scanner, 'std::vector<int> v; at = "12:30:45"; ts = 1700000000000') == []
+
+def test_allowlists():
+    """Test configured allowlist patterns and the line marker."""
+    scanner = PIIScanner([r"support@acme\.io", r"8\.8\.[48]\.[48]"])
+    assert _rules(scanner, 'to = "support@acme.io"; dns = "8.8.4.4"') == []
+    assert _rules(scanner, 'to = "jane@acme.io"') == ['email']
+    assert _rules(PIIScanner(), 'SAMPLE = "jane@acme.io"  # pragma: allowlist pii') == []
+
+def test_chunks_and_pool_agree(tmp_path):
+    """Test that chunked scanning across processes finds what one pass finds."""
+    lines = "".join(f"+user_{i} = 'user{i}@acme.io'\n+value = {i}\n" for i in range(300))
+    (tmp_path / "new.py").write_text("owner = 'ops@acme.io'\n")
+    changed = ChangedFiles([
+        ChangedFile("users.py", "modified", 100, "@@ -1,0 +1,600 @@\n" + lines),
+        ChangedFile("new.py", "added", 20),
+        ChangedFile("old.py", "removed", None, "@@ -1 +0,0 @@\n-owner = 'ops@acme.io'"),
+    ], str(tmp_path))
+
+    chunks = list(iter_chunks(changed, chunk_bytes=1024))
+    assert len(chunks) > 5 and sum(len(chunk) for chunk in chunks) == 601
+    assert chunks[0][0] == ("users.py", 1, "user_0 = 'user0@acme.io'")
+
+    inline = scan_changed_files(changed, max_workers=1, chunk_bytes=1024)
+    pooled = scan_changed_files(changed, max_workers=2, chunk_bytes=1024)
+    assert inline == pooled
+    assert len(pooled) == 301
+    assert (pooled[0].path, pooled[0].line, pooled[0].rule) == ("new.py", 1, "email")
+    assert "user0@acme.io" not in pooled[1].message
+
+    cancel = threading.Event()
+    cancel.set()
+    assert scan_changed_files(changed, max_workers=1, chunk_bytes=1024, cancel=cancel) == []
+    assert len(scan_changed_files(changed, max_workers=2, chunk_bytes=1024, cancel=cancel)) < len(pooled)
+
+def test_modified_files_from_git(tmp_path):
+    """Test that modified files of a git-built index are scanned on their added lines only."""
+    def git(*args):
+        subprocess.run(['git', *args], cwd=tmp_path, check=True, capture_output=True)
+
+    git('init', '-q', '-b', 'main')
+    git('config', 'user.email', 'bot@example.com')
+    git('config', 'user.name', 'bot')
+    (tmp_path / "users.py").write_text("owner = 'ops@acme.io'\n")
+    git('add', '.')
+    git('commit', '-qm', 'base')
+    git('checkout', '-qb', 'feature')
+    (tmp_path / "users.py").write_text("owner = 'ops@acme.io'\nbackup = 'oncall@acme.io'\n")
+    git('commit', '-qam', 'change')
+
+    findings = scan_changed_files(ChangedFiles.from_git('main', str(tmp_path)), max_workers=1)
+    assert [(finding.path, finding.line, finding.rule) for finding in findings] == [("users.py", 2, "email")]
+
+def test_pii_scan_config_key():
+    """Test that the check follows data_privacy.pii_scan."""
+    assert check_enabled({}, 'data_privacy.pii_scan')
+    assert not check_enabled({'data_privacy': {'pii_scan': False}}, 'data_privacy.pii_scan')
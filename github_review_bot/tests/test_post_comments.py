@@ -21,8 +21,10 @@ def mock_analysis_results():
     return {
         'passed': False,
         'issues': [
-            {'tool': 'flake8', 'output': 'E501 line too long'},
-            {'tool': 'mypy', 'output': 'Type error found'}
+            {'tool': 'flake8', 'rule': 'E501', 'type': 'warning', 'message': 'line too long',
+             'file': 'a.py', 'line': 1},
+            {'tool': 'mypy', 'rule': 'arg-type', 'type': 'error', 'message': 'Type error found',
+             'file': 'a.py', 'line': 2}
         ]
     }
 
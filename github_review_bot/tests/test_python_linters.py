@@ -0,0 +1,64 @@
+"""
+Tests for python_linters.py script.
+"""
+
+import shutil
+import threading
+import pytest
+from github_review_bot.scripts.changed_files import ChangedFile
+from github_review_bot.scripts.python_linters import INPROCESS_CHECKS, black_check
+from github_review_bot.scripts.result_cache import run_with_cache
+from github_review_bot.scripts.run_analysis import python_tools
+from github_review_bot.scripts.tool_executor import ToolExecutor, ToolResult
+
+SOURCES = {
+    "messy.py": "import os, sys\ndef f( x ):\n    eval(x)\n    return   os.path.join('a',\"b\")\nl = 1\n",
+    "clean.py": "x = 1\n",
+    "quiet.py": "import subprocess  # noqa: F401\n"
+}
+
+@pytest.fixture
+def sources(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name, text in SOURCES.items():
+        (tmp_path / name).write_text(text)
+    return [ChangedFile(name, "modified", size=len(text)) for name, text in SOURCES.items()]
+
+def test_python_linters_interface(sources):
+    """Test the interface of the in-process linters."""
+    assert set(INPROCESS_CHECKS) == {'flake8', 'black', 'bandit'}
+    result = black_check(["messy.py", "clean.py"])
+    assert isinstance(result, ToolResult)
+    assert result.returncode == 1
+    assert [f.path for f in result.findings] == ["messy.py"]
+
+    with pytest.raises(ValueError):
+        python_tools('threads')
+
+@pytest.mark.skipif(not all(shutil.which(t) for t in INPROCESS_CHECKS), reason="linters not installed")
+def test_backends_report_identical_findings(sources):
+    """Test that the in-process backend matches the subprocess backend finding for finding."""
+    executor = ToolExecutor(max_workers=2)
+    subprocess_results = run_with_cache(executor, None, python_tools('subprocess'), sources)
+    inprocess_results = run_with_cache(executor, None, python_tools('inprocess'), sources)
+
+    for name in INPROCESS_CHECKS:
+        assert inprocess_results[name].findings == subprocess_results[name].findings, name
+        assert inprocess_results[name].returncode == subprocess_results[name].returncode, name
+    assert any(f.rule == 'B307' for f in inprocess_results['bandit'].findings)
+    assert not any(f.path == "quiet.py" for f in inprocess_results['flake8'].findings)
+
+def test_black_reports_unparsable_files(sources, tmp_path):
+    """Test that a syntax error is reported like black's CLI does."""
+    (tmp_path / "broken.py").write_text("def broken(:\n")
+    result = black_check(["broken.py"])
+    assert result.returncode == 123
+    assert "cannot format broken.py" in result.stderr
+
+def test_checks_stop_when_cancelled(sources):
+    """Test that a set cancel event stops each in-process check before its next file."""
+    cancel = threading.Event()
+    cancel.set()
+    for name, check in INPROCESS_CHECKS.items():
+        result = check(["messy.py", "clean.py"], cancel)
+        assert result.cancelled and result.returncode is None and not result.findings, name
@@ -0,0 +1,90 @@
+"""
+Tests for python_rules.py script.
+"""
+
+import threading
+import pytest
+from github_review_bot.scripts.changed_files import ChangedFile, ChangedFiles
+from github_review_bot.scripts.python_rules import (
+    ComplexityRule, DocstringRule, FileSizeRule, FunctionLengthRule, Rule, RuleEngine, build_rules,
+    check_changed_files
+)
+
+SOURCE = '''"""Orders."""
+
+def route(order, user):
+    """Pick a route."""
+    if order.express and user.premium:
+        return "air"
+    for item in order.items:
+        if item.fragile or item.heavy:
+            return "truck"
+    try:
+        return "post" if order.small else "van"
+    except KeyError:
+        return [leg for leg in order.legs if leg]
+
+class Order:
+    def total(self):
+        def add(a, b):
+            return a + b
+        return add(1, 2)
+'''
+
+def _rules(findings):
+    return [(finding.rule, finding.line) for finding in findings]
+
+def test_python_rules_interface(tmp_path):
+    """Test the interface of check_changed_files."""
+    with pytest.raises(TypeError):
+        check_changed_files(["module.py"])  # type: ignore
+    assert check_changed_files(ChangedFiles([], str(tmp_path))) == []
+    assert [type(rule) for rule in build_rules({})] == [ComplexityRule, FunctionLengthRule, FileSizeRule,
+                                                        DocstringRule]
+    assert [type(rule) for rule in build_rules({'rules': {'max_file_size_kb': 0, 'documentation': False}})] == \
+        [ComplexityRule, FunctionLengthRule]
+
+def test_rules_share_one_traversal():
+    """Test each rule, run together in one engine."""
+    engine = RuleEngine([ComplexityRule(8), FunctionLengthRule(4), FileSizeRule(0), DocstringRule()])
+    findings = engine.check_source(SOURCE, "orders.py")
+    assert _rules(findings) == [('file-size', 1), ('function-length', 3), ('complexity', 3),
+                                ('missing-docstring', 15), ('missing-docstring', 16)]
+    assert "complexity of 9 (max 8)" in findings[2].message
+    assert _rules(RuleEngine([DocstringRule()]).check_source(SOURCE, "test_orders.py")) == []
+    assert _rules(RuleEngine([DocstringRule(), FileSizeRule(0)]).check_source("def (:", "bad.py")) == \
+        [('file-size', 1)]
+
+def test_rules_skip_empty_ast_fields():
+    """Test that None entries in AST lists, as for kw-only arguments and dict unpacking, are walked past."""
+    engine = RuleEngine(build_rules())
+    assert engine.check_source('"""m"""\ndef f(*, a):\n    """d"""\n    return a\n', 'x.py') == []
+    assert engine.check_source('"""m"""\ndef f(a):\n    """d"""\n    return {**a, "b": 1}\n', 'x.py') == []
+
+def test_custom_rule_hooks():
+    """Test that visit and leave hooks see nodes in order, with enclosing functions tracked."""
+    events = []
+
+    class Recorder(Rule):
+        def visit_FunctionDef(self, node, context):
+            events.append(('visit', node.name, len(context.functions)))
+
+        def leave_FunctionDef(self, node, context):
+            events.append(('leave', node.name, len(context.functions)))
+
+    RuleEngine([Recorder()]).check_source(SOURCE, "orders.py")
+    assert events == [('visit', 'route', 0), ('leave', 'route', 0), ('visit', 'total', 0),
+                      ('visit', 'add', 1), ('leave', 'add', 1), ('leave', 'total', 0)]
+
+def test_check_changed_files(tmp_path):
+    """Test that the thresholds come from the rules section."""
+    (tmp_path / "orders.py").write_text(SOURCE)
+    changed = ChangedFiles([ChangedFile("orders.py", "modified", len(SOURCE)), ChangedFile("gone.py", "removed")],
+                           str(tmp_path))
+    config = {'rules': {'max_complexity': 5, 'max_function_lines': 100, 'documentation': False}}
+    findings = check_changed_files(changed, config)
+    assert [(finding.rule, finding.severity) for finding in findings] == [('complexity', 'warning')]
+    assert findings[0].tool == 'python-rules'
+    cancel = threading.Event()
+    cancel.set()
+    assert check_changed_files(changed, config, cancel=cancel) == []
@@ -0,0 +1,82 @@
+"""
+Tests for repo_index.py script.
+"""
+
+import os
+import pytest
+from github_review_bot.scripts.repo_index import RepoIndex
+from github_review_bot.scripts.check_nextjs import check_nextjs
+from github_review_bot.scripts.check_vercel import check_vercel
+
+def _checkout(tmp_path):
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "layout.tsx").write_text("export default function Layout() {}\n")
+    (tmp_path / "next.config.js").write_text("module.exports = { swcMinify: true }\n")
+    (tmp_path / "package.json").write_text('{"dependencies": {"next": "14.0.0"}}')
+    (tmp_path / ".env.local").write_text("SECRET=1\n")
+    (tmp_path / "node_modules" / "next").mkdir(parents=True)
+    (tmp_path / "node_modules" / "next" / "package.json").write_text("{}")
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "HEAD").write_text("ref: refs/heads/main\n")
+    return tmp_path
+
+def test_repo_index_interface(tmp_path):
+    """Test the interface of RepoIndex."""
+    with pytest.raises(TypeError):
+        RepoIndex.build(123)  # type: ignore
+
+    index = RepoIndex.build(str(_checkout(tmp_path)))
+    assert index.is_file("next.config.js")
+    assert index.is_dir("app") and not index.is_file("app")
+    assert index.exists("./app/layout.tsx")
+    assert index.size("package.json") == len('{"dependencies": {"next": "14.0.0"}}')
+    assert index.mtime("package.json") == os.stat(tmp_path / "package.json").st_mtime
+    assert index.size("missing.json") is None and index.mtime("missing.json") is None
+    assert index.read_text("app/layout.tsx").startswith("export default")
+    assert index.read_text("missing.json") is None
+
+def test_ignored_directories_not_descended(tmp_path):
+    """Test that node_modules, .git and .next are recorded but not walked."""
+    index = RepoIndex.build(str(_checkout(tmp_path)))
+    assert index.is_dir("node_modules") and index.is_dir(".git")
+    assert not index.exists("node_modules/next/package.json")
+    assert not index.exists(".git/HEAD")
+    assert sorted(index.files()) == [".env.local", "app/layout.tsx", "next.config.js", "package.json"]
+    assert list(index.files("app")) == ["app/layout.tsx"]
+
+def test_stat_is_lazy_and_cached(tmp_path, monkeypatch):
+    """Test that the walk stats nothing, and each path is stat at most once."""
+    root = _checkout(tmp_path)
+    calls = []
+    real_stat = os.stat
+
+    def counting_stat(path, *args, **kwargs):
+        calls.append(path)
+        return real_stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "stat", counting_stat)
+    index = RepoIndex.build(str(root))
+    assert calls == []
+    assert index.size("package.json") == index.size("package.json") > 0
+    assert index.mtime("package.json") > 0
+    assert len(calls) == 1
+
+def test_missing_root_is_empty(tmp_path):
+    """Test that an unreadable root yields an empty index."""
+    assert len(RepoIndex.build(str(tmp_path / "missing"))) == 0
+
+def test_checkers_answer_from_index(tmp_path):
+    """Test that the checkers look files up in the index they are given."""
+    root = _checkout(tmp_path)
+    index = RepoIndex.build(str(root))
+    # A file created after the scan is invisible to the checkers
+    (root / ".vercelignore").write_text("node_modules\n")
+
+    messages = [issue["message"] for issue in check_vercel(str(root), repo_index=index)]
+    assert any(".env.local found" in m for m in messages)
+    assert any(".vercelignore" in m for m in messages)
+
+    issues = check_nextjs(str(root), repo_index=index)
+    assert not any(issue["file"] in ("next.config.js", "app") and issue["type"] == "warning"
+                   for issue in issues)
+    assert any(issue["file"] == "app/layout.tsx" for issue in issues)
@@ -0,0 +1,121 @@
+"""
+Tests for result_cache.py script.
+"""
+
+import os
+import sys
+import pytest
+from github_review_bot.scripts.changed_files import ChangedFile
+from github_review_bot.scripts.result_cache import (
+    CachedTool,
+    ResultCache,
+    blob_sha,
+    run_with_cache
+)
+from github_review_bot.scripts.findings import parse_flake8
+from github_review_bot.scripts.tool_executor import ToolExecutor
+
+# A fake linter that logs its arguments and reports one finding per file
+FAKE_LINTER = """
+import sys
+with open(sys.argv[1], 'a') as log:
+    log.write(' '.join(sys.argv[2:]) + '\\n')
+for path in sys.argv[2:]:
+    print(f'./{path}:1:1: X100 finding in {path}')
+sys.exit(1)
+"""
+
+def test_result_cache_interface(tmp_path):
+    """Test the interface of ResultCache."""
+    with pytest.raises(TypeError):
+        ResultCache(123)  # type: ignore
+
+    cache = ResultCache(str(tmp_path))
+    key = ResultCache.key('abc', 'flake8', '7.0', 'cfg', 'a.py')
+    assert key != ResultCache.key('abc', 'flake8', '7.1', 'cfg', 'a.py')
+    assert key != ResultCache.key('abc', 'flake8', '7.0', 'cfg', 'b.py')
+    assert cache.get(key) is None
+
+    cache.put(key, {'findings': [['flake8', 'E1', 'error', 'a.py', 1, 1, 'x']], 'failed': True})
+    assert cache.get(key) == {'findings': [['flake8', 'E1', 'error', 'a.py', 1, 1, 'x']], 'failed': True}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_result_cache_evicts_least_recently_used(tmp_path):
+    """Test LRU eviction by total size."""
+    cache = ResultCache(str(tmp_path), max_bytes=0)
+    keys = [ResultCache.key(str(i), 't', 'v', 'c', 'a.py') for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, {'findings': [], 'padding': 'x' * 100})
+        os.utime(cache._path(key), (1000 + i, 1000 + i))
+    entry_size = os.path.getsize(cache._path(keys[0]))
+
+    cache.max_bytes = 2 * entry_size
+    assert cache.evict() == 1
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[2]) is not None
+
+def test_blob_sha_matches_git(tmp_path):
+    """Test that locally computed blob SHAs match git hash-object."""
+    (tmp_path / "a.py").write_text("hello\n")
+    assert blob_sha(ChangedFile("a.py", "added"), str(tmp_path)) == \
+        "ce013625030ba8dba906f756967f9e9ca394464a"
+    assert blob_sha(ChangedFile("a.py", "added", sha="f00"), str(tmp_path)) == "f00"
+
+def test_run_with_cache_only_runs_new_blobs(tmp_path, monkeypatch):
+    """Test that cached blobs never reach the tool again."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "lint.py").write_text(FAKE_LINTER)
+    (tmp_path / "a.py").write_text("a = 1\n")
+    (tmp_path / "b.py").write_text("b = 1\n")
+    log = tmp_path / "calls.log"
+    tool = CachedTool('fake', lambda files: [sys.executable, 'lint.py', str(log)] + files,
+                      lambda result: parse_flake8(result.stdout.splitlines()),
+                      [sys.executable, '--version'])
+    cache = ResultCache(str(tmp_path / "cache"))
+    executor = ToolExecutor()
+
+    def changed(*paths):
+        return [ChangedFile(p, "modified", size=os.path.getsize(p)) for p in paths]
+
+    first = run_with_cache(executor, cache, [tool], changed("a.py", "b.py"))
+    assert first['fake'].returncode == 1
+    assert [(f.path, f.rule, f.message) for f in first['fake'].findings] == [
+        ("a.py", "X100", "finding in a.py"),
+        ("b.py", "X100", "finding in b.py")
+    ]
+
+    (tmp_path / "b.py").write_text("b = 2\n")
+    second = run_with_cache(executor, cache, [tool], changed("a.py", "b.py"))
+    assert second['fake'].findings == first['fake'].findings
+    assert log.read_text().splitlines() == ["a.py b.py", "b.py"]
+
+    # Fully cached runs do not start the tool at all
+    run_with_cache(executor, cache, [tool], changed("a.py", "b.py"))
+    assert len(log.read_text().splitlines()) == 2
+
+    # Tools that crash are reported and never cached
+    crash = CachedTool('crash', lambda files: [sys.executable, '-c', 'import sys; sys.exit(3)'],
+                       lambda result: [], [sys.executable, '--version'])
+    crashed = run_with_cache(executor, cache, [crash], changed("a.py"))['crash']
+    assert [f.rule for f in crashed.findings] == ['tool-error']
+    assert run_with_cache(executor, cache, [crash], changed("a.py"))['crash'].returncode == 3
+
+    # Without a cache every file is linted
+    run_with_cache(executor, None, [tool], changed("a.py"))
+    assert log.read_text().splitlines()[-1] == "a.py"
+
+def test_run_with_cache_keeps_paths_of_identical_blobs(tmp_path, monkeypatch):
+    """Test that files sharing one blob each get findings at their own path."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "lint.py").write_text(FAKE_LINTER)
+    (tmp_path / "a.py").write_text("import os\n")
+    (tmp_path / "b.py").write_text("import os\n")
+    tool = CachedTool('fake', lambda files: [sys.executable, 'lint.py', str(tmp_path / "calls.log")] + files,
+                      lambda result: parse_flake8(result.stdout.splitlines()),
+                      [sys.executable, '--version'])
+    cache = ResultCache(str(tmp_path / "cache"))
+    executor = ToolExecutor()
+
+    run_with_cache(executor, cache, [tool], [ChangedFile("a.py", "modified", size=10)])
+    second = run_with_cache(executor, cache, [tool], [ChangedFile("b.py", "modified", size=10)])
+    assert [(f.path, f.message) for f in second['fake'].findings] == [("b.py", "finding in b.py")]
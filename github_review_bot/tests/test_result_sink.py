@@ -0,0 +1,28 @@
+"""
+Tests for result_sink.py script.
+"""
+
+import os
+from github_review_bot.scripts.result_sink import ResultSink, build_result_sink, load_results
+
+def test_result_sink_interface(tmp_path):
+    """Test the interface of the result sink."""
+    assert build_result_sink({}) is None
+
+    sink = build_result_sink({'analysis': {'persist_results': True, 'results_dir': str(tmp_path)}})
+    assert isinstance(sink, ResultSink)
+    assert os.path.dirname(sink.directory) == str(tmp_path)
+
+    path = sink.write('python', [{'type': 'error', 'message': 'boom', 'file': 'a.py'}])
+    assert os.path.exists(path)
+
+def test_result_sink_is_run_scoped(tmp_path):
+    """Test that every run gets a fresh directory, so stale results never leak."""
+    first = ResultSink(str(tmp_path))
+    first.write('python', [{'type': 'error', 'message': 'stale'}])
+    second = ResultSink(str(tmp_path))
+    second.write('frontend', [{'type': 'info', 'message': 'fresh'}])
+    second.write('api', [])
+
+    assert first.directory != second.directory
+    assert load_results(second.directory) == [{'type': 'info', 'message': 'fresh'}]
@@ -2,6 +2,7 @@
 Tests for run_analysis.py script.
 """
 
+import os
 import pytest
 from typing import Dict, Any, List, Union
 from unittest.mock import Mock, create_autospec
@@ -76,4 +77,26 @@ def test_run_analysis_functionality(mock_pr):
     result = run_analysis(mock_pr, config)
     assert isinstance(result['passed'], bool)
     assert isinstance(result['issues'], list)
-    assert isinstance(result['stats'], dict) 
\ No newline at end of file
+    assert isinstance(result['stats'], dict)
+
+
+def test_run_analysis_keeps_results_in_memory(tmp_path, monkeypatch):
+    """Test that analyzers no longer write result files into the working directory."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "module.py").write_text("import os\n")
+    mock_file = Mock(spec=File)
+    mock_file.filename = "module.py"
+    mock_file.status = "added"
+    pr = MockPullRequest(7, [mock_file])
+    results_dir = tmp_path.parent / f"{tmp_path.name}-results"
+    config = {
+        'rules': {'code_style': True},
+        'analysis': {'cache': False, 'persist_results': True, 'results_dir': str(results_dir)}
+    }
+
+    result = run_analysis(pr, config)
+    assert sorted(os.listdir(tmp_path)) == ["module.py"]
+    assert any(issue.get('rule') == 'F401' for issue in result['issues'])
+    assert sorted(os.listdir(result['stats']['results_dir'])) == \
+        ['coverage_analysis_results.json', 'pii_analysis_results.json', 'python_analysis_results.json',
+         'python_rules_analysis_results.json', 'secrets_analysis_results.json']
@@ -0,0 +1,72 @@
+"""
+Tests for sharding.py script.
+"""
+
+import sys
+import pytest
+from github_review_bot.scripts.changed_files import ChangedFile
+from github_review_bot.scripts.findings import parse_flake8
+from github_review_bot.scripts.result_cache import CachedTool, run_with_cache
+from github_review_bot.scripts.sharding import (
+    MAX_SHARD_ARGV_CHARS,
+    MIN_SHARD_BYTES,
+    shard_count_for,
+    shard_files
+)
+from github_review_bot.scripts.tool_executor import ToolExecutor
+
+def files_of(*sizes):
+    """Build changed files with the given byte sizes."""
+    return [ChangedFile(f"f{i}.py", "modified", size=size) for i, size in enumerate(sizes)]
+
+def test_shard_files_interface():
+    """Test the interface of shard_files."""
+    with pytest.raises(ValueError):
+        shard_files(files_of(1), 0)
+
+    assert shard_files([], 4) == []
+    shards = shard_files(files_of(1, 2, 3), 8)
+    assert isinstance(shards, list)
+    assert len(shards) == 3
+
+def test_shard_files_balances_bytes():
+    """Test that shards are size balanced and keep the original order."""
+    files = files_of(60, 10, 50, 40, 30, 20)
+    shards = shard_files(files, 3)
+    totals = sorted(sum(f.size for f in shard) for shard in shards)
+    assert totals == [70, 70, 70]
+    for shard in shards:
+        assert shard == sorted(shard, key=files.index)
+    assert sorted(f.path for shard in shards for f in shard) == sorted(f.path for f in files)
+
+    # Files of unknown size are spread by count
+    assert [len(s) for s in shard_files(files_of(*[None] * 6), 3)] == [2, 2, 2]
+
+def test_shard_count_for():
+    """Test automatic and configured shard counts."""
+    assert shard_count_for([], 8) == 1
+    assert shard_count_for(files_of(100, 100), 8) == 1
+    assert shard_count_for(files_of(*[MIN_SHARD_BYTES] * 20), 8) == 8
+    assert shard_count_for(files_of(1, 1, 1), 8, configured=5) == 3
+
+    # Argument lists that would not fit one command line are always split
+    long_paths = [ChangedFile("x" * 1000 + f"{i}.py", "modified", size=1) for i in range(200)]
+    assert shard_count_for(long_paths, 1) >= (200 * 1005) // MAX_SHARD_ARGV_CHARS
+
+def test_run_with_cache_merges_shards_in_order(tmp_path, monkeypatch):
+    """Test that sharded runs report the same findings as a single run."""
+    monkeypatch.chdir(tmp_path)
+    files = []
+    for i in range(6):
+        (tmp_path / f"m{i}.py").write_text("x = 1\n" * (i + 1))
+        files.append(ChangedFile(f"m{i}.py", "modified", size=6 * (i + 1)))
+    linter = "import sys\nfor p in sys.argv[1:]: print(f'{p}:1:1: X1 in {p}')\nsys.exit(1)"
+    tool = CachedTool('fake', lambda paths: [sys.executable, '-c', linter] + paths,
+                      lambda result: parse_flake8(result.stdout.splitlines()),
+                      [sys.executable, '--version'])
+
+    single = run_with_cache(ToolExecutor(), None, [tool], files)['fake']
+    sharded = run_with_cache(ToolExecutor(max_workers=3), None, [tool], files, shard_count=3)['fake']
+    assert sharded.findings == single.findings
+    assert [f.path for f in sharded.findings] == [f"m{i}.py" for i in range(6)]
+    assert sharded.returncode == 1
@@ -0,0 +1,41 @@
+"""
+Tests for time_budget.py script.
+"""
+
+import pytest
+from github_review_bot.scripts.time_budget import DEFAULT_CHECK_COST, CostModel, TimeBudget
+
+def test_time_budget_interface():
+    """Test the interface of the time budget."""
+    assert TimeBudget().remaining() is None
+    assert not TimeBudget().limited
+    budget = TimeBudget(60)
+    assert budget.limited
+    assert 0 < budget.remaining() <= 60
+    with pytest.raises(ValueError):
+        TimeBudget(0)
+
+def test_time_budget_keeps_a_review_reserve():
+    """Test that checks do not get the seconds held back for posting the review."""
+    assert TimeBudget(60).reserve == 6 and TimeBudget(1200).reserve == 60
+    assert 53 < TimeBudget(60).remaining() <= 54
+    assert 29 < TimeBudget(60, reserve=30).remaining() <= 30
+    assert TimeBudget(None, reserve=5).remaining() is None
+    with pytest.raises(ValueError):
+        TimeBudget(60, reserve=60)
+
+def test_cost_model_learns_and_persists(tmp_path):
+    """Test that cost estimates move toward observed durations and survive runs."""
+    costs = CostModel(str(tmp_path))
+    assert costs.estimate('python') == DEFAULT_CHECK_COST
+    assert costs.estimate('python', 5) == 5
+
+    costs.record('python', 10)
+    assert costs.estimate('python', 5) == 10
+    costs.record('python', 20)
+    assert costs.estimate('python') == pytest.approx(13)
+    costs.save()
+
+    assert CostModel(str(tmp_path)).estimate('python') == pytest.approx(13)
+    (tmp_path / "check_costs.json").write_text("not json")
+    assert CostModel(str(tmp_path)).estimate('python') == DEFAULT_CHECK_COST
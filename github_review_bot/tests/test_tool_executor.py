@@ -0,0 +1,71 @@
+"""
+Tests for tool_executor.py script.
+"""
+
+import sys
+import time
+import pytest
+from github_review_bot.scripts.tool_executor import (
+    ToolExecutor,
+    ToolSpec,
+    ToolResult,
+    ToolExecutionError
+)
+
+def python_tool(name: str, code: str, timeout=None) -> ToolSpec:
+    """Build a ToolSpec that runs a Python snippet."""
+    return ToolSpec(name, [sys.executable, '-c', code], timeout=timeout)
+
+def test_tool_executor_interface():
+    """Test the interface of ToolExecutor."""
+    # Test wrong argument types
+    with pytest.raises(ValueError):
+        ToolExecutor(max_workers=0)
+
+    with pytest.raises(TypeError):
+        ToolExecutor().run(["not a spec"])  # type: ignore
+
+    # Test return type
+    assert ToolExecutor().run([]) == {}
+    results = ToolExecutor().run([python_tool('echo', 'print("hi")')])
+    assert isinstance(results['echo'], ToolResult)
+    assert results['echo'].ok
+    assert results['echo'].stdout.strip() == 'hi'
+
+def test_tool_executor_runs_tools_concurrently():
+    """Test that independent tools overlap instead of running back to back."""
+    executor = ToolExecutor(max_workers=3)
+    start = time.monotonic()
+    results = executor.run([
+        python_tool(f'sleep{i}', 'import time; time.sleep(0.5)') for i in range(3)
+    ])
+    elapsed = time.monotonic() - start
+
+    assert all(r.ok for r in results.values())
+    assert elapsed < 1.4
+
+def test_tool_executor_timeout_and_exit_status():
+    """Test per-tool timeouts and non-zero exit codes."""
+    results = ToolExecutor().run([
+        python_tool('slow', 'import time; time.sleep(10)', timeout=0.2),
+        python_tool('lint', 'import sys; print("E501"); sys.exit(1)')
+    ])
+
+    assert results['slow'].timed_out
+    assert results['slow'].returncode is None
+    assert not results['slow'].ok
+    assert results['lint'].returncode == 1
+    assert 'E501' in results['lint'].stdout
+
+def test_tool_executor_cancels_on_fatal_error():
+    """Test that a tool that cannot start cancels the others."""
+    executor = ToolExecutor(max_workers=2)
+    start = time.monotonic()
+    with pytest.raises(ToolExecutionError) as excinfo:
+        executor.run([
+            python_tool('slow', 'import time; time.sleep(10)'),
+            ToolSpec('missing', ['definitely-not-an-installed-tool'])
+        ])
+
+    assert excinfo.value.name == 'missing'
+    assert time.monotonic() - start < 5
@@ -0,0 +1,154 @@
+"""
+Tests for typecheck.py script.
+"""
+
+import os
+import pytest
+from github_review_bot.scripts.changed_files import ChangedFile, ChangedFiles
+from github_review_bot.scripts.tool_executor import ToolResult, ToolSpec
+from github_review_bot.scripts.typecheck import (
+    BuildInfoStore, TypeScriptCheck, affected_projects, build_outputs, find_importers,
+    load_tsconfig, project_references
+)
+
+def _changed(repo, *paths):
+    return ChangedFiles([ChangedFile(p, "modified", size=1) for p in paths], str(repo), base_sha="b1")
+
+def test_typescript_check_interface(tmp_path):
+    """Test the interface of the TypeScript check."""
+    (tmp_path / "tsconfig.json").write_text('{"compilerOptions": {"strict": true}}')
+    with pytest.raises(TypeError):
+        TypeScriptCheck(["a.ts"])
+
+    check = TypeScriptCheck(_changed(tmp_path, "a.ts"), BuildInfoStore(str(tmp_path / "cache")))
+    spec = check.spec()
+    assert isinstance(spec, ToolSpec)
+    assert spec.name == 'typescript'
+    assert '--incremental' in spec.args
+    build_info = spec.args[spec.args.index('--tsBuildInfoFile') + 1]
+    assert os.path.join('tsbuildinfo', 'b1') in build_info
+
+    stats = check.stats(ToolResult('typescript', returncode=0, duration=1.5))
+    assert stats['mode'] == 'incremental'
+    assert stats['warm'] is False
+    assert stats['cold_seconds'] == 1.5
+
+def test_load_tsconfig_accepts_comments(tmp_path):
+    """Test that tsconfig comments and trailing commas are tolerated."""
+    (tmp_path / "tsconfig.json").write_text(
+        '{\n  // comment\n  "extends": "./base.json", /* block */\n'
+        '  "include": ["src/**/*", "http://x//y"],\n}\n'
+    )
+    config = load_tsconfig(str(tmp_path / "tsconfig.json"))
+    assert config == {'extends': './base.json', 'include': ['src/**/*', 'http://x//y']}
+    assert load_tsconfig(str(tmp_path / "missing.json")) == {}
+
+def test_affected_projects_follow_references(tmp_path):
+    """Test that only changed projects and the ones referencing them are built."""
+    for name in ('core', 'web', 'docs'):
+        (tmp_path / name).mkdir()
+    (tmp_path / "tsconfig.json").write_text(
+        '{"files": [], "references": [{"path": "./core"}, {"path": "./web"}, {"path": "./docs"}]}'
+    )
+    (tmp_path / "core" / "tsconfig.json").write_text('{"compilerOptions": {"composite": true}}')
+    (tmp_path / "web" / "tsconfig.json").write_text('{"references": [{"path": "../core"}]}')
+    (tmp_path / "docs" / "tsconfig.json").write_text('{}')
+
+    graph = project_references(str(tmp_path), 'tsconfig.json')
+    assert graph['web/tsconfig.json'] == ['core/tsconfig.json']
+    assert affected_projects(graph, 'tsconfig.json', ['core/src/a.ts']) == \
+        ['core/tsconfig.json', 'web/tsconfig.json']
+    assert affected_projects(graph, 'tsconfig.json', ['docs/x.ts']) == ['docs/tsconfig.json']
+    assert affected_projects(graph, 'tsconfig.json', ['scripts/build.ts']) is None
+
+    check = TypeScriptCheck(_changed(tmp_path, "docs/x.ts"))
+    assert check.spec().args[:3] == ['npx', 'tsc', '-b']
+    assert check.spec().args[-1] == 'docs/tsconfig.json'
+
+def test_diagnostics_scoped_to_changes_and_importers(tmp_path):
+    """Test that diagnostics outside the changed files and their importers are dropped."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "tsconfig.json").write_text('{}')
+    (tmp_path / "src" / "util.ts").write_text("export const a = 1;\n")
+    (tmp_path / "src" / "page.tsx").write_text("import { a } from './util';\n")
+    (tmp_path / "src" / "esm.ts").write_text("export * from './util.js';\n")
+    (tmp_path / "src" / "other.ts").write_text("import x from 'react';\n")
+    (tmp_path / "node_modules" / "dep.ts").write_text("import '../src/util';\n")
+    assert find_importers(str(tmp_path), ['src/util.ts']) == {'src/page.tsx', 'src/esm.ts'}
+
+    check = TypeScriptCheck(_changed(tmp_path, "src/util.ts"))
+    output = (
+        "src/page.tsx(1,10): error TS2305: Module has no exported member 'a'.\n"
+        "src/other.ts(3,1): error TS2304: Cannot find name 'b'.\n"
+    )
+    result = ToolResult('typescript', returncode=2, stdout=output)
+    findings = check.spec().parse(result)
+    assert [f.path for f in findings] == ['src/page.tsx']
+    assert check.suppressed == 1
+
+    # Errors that are all out of scope do not fail the check
+    result = ToolResult('typescript', returncode=2, stdout="src/other.ts(3,1): error TS2304: x\n")
+    assert check.spec().parse(result) == []
+    assert result.returncode == 0
+
+    # tsconfig errors have no location and keep the check failing
+    result = ToolResult('typescript', returncode=2, stdout="src/other.ts(3,1): error TS2304: x\n"
+                        "error TS5023: Unknown compiler option 'strictest'.\n")
+    assert [(f.path, f.rule) for f in check.spec().parse(result)] == [('', 'TS5023')]
+    assert result.returncode == 2
+
+def test_build_info_seeded_across_bases(tmp_path):
+    """Test that a new base commit starts from the latest build info."""
+    store = BuildInfoStore(str(tmp_path), max_bases=1)
+    first = store.prepare('b1', 'tsconfig.json')
+    with open(first, 'w') as f:
+        f.write('{"program": {}}')
+    second = store.prepare('b2', 'tsconfig.json')
+    assert second != first
+    with open(second) as f:
+        assert f.read() == '{"program": {}}'
+
+    os.utime(os.path.dirname(first), (0, 0))
+    assert store.evict() == 1
+    assert not os.path.exists(first)
+    assert os.path.exists(second)
+
+def test_build_outputs_kept_out_of_checkout(tmp_path):
+    """Test that tsc -b outputs are moved into the store and restored from it."""
+    repo = tmp_path / "repo"
+    for name in ('core', 'web'):
+        (repo / name).mkdir(parents=True)
+    (repo / "tsconfig.json").write_text('{"files": [], "references": [{"path": "./core"}, {"path": "./web"}]}')
+    (repo / "tsconfig.base.json").write_text('{"compilerOptions": {"outDir": "out"}}')
+    (repo / "core" / "tsconfig.json").write_text(
+        '{"extends": "../tsconfig.base.json", "compilerOptions": {"composite": true, "outDir": "dist"}}'
+    )
+    (repo / "web" / "tsconfig.json").write_text('{"extends": "../tsconfig.base", "references": [{"path": "../core"}]}')
+    graph = project_references(str(repo), 'tsconfig.json')
+    assert build_outputs(str(repo), graph) == ['core/dist', 'out']
+
+    store = BuildInfoStore(str(tmp_path / "cache"))
+    check = TypeScriptCheck(_changed(repo, "core/a.ts"), store)
+    check.spec()
+    assert check.outputs == ['core/dist', 'out'] and check.warm is False
+    (repo / "core" / "dist").mkdir()
+    (repo / "core" / "dist" / "tsconfig.tsbuildinfo").write_text('{"program": {}}')
+    check.finish(ToolResult('typescript', returncode=0))
+    assert not (repo / "core" / "dist").exists()
+    assert check.stats(ToolResult('typescript', returncode=0, duration=2))['cold_seconds'] == 2
+
+    check = TypeScriptCheck(ChangedFiles([ChangedFile("core/a.ts", "modified", size=1)], str(repo), base_sha="b2"),
+                            store)
+    check.spec()
+    assert check.warm is True
+    assert (repo / "core" / "dist" / "tsconfig.tsbuildinfo").read_text() == '{"program": {}}'
+    # Outputs of a cut build are dropped rather than stored
+    (repo / "core" / "dist" / "half.js").write_text('')
+    check.finish(ToolResult('typescript', cancelled=True))
+    assert not (repo / "core" / "dist").exists()
+    assert not (tmp_path / "cache" / "tsbuildinfo" / "b2").exists()
+
+    # Projects emitting beside their sources leave the checkout as tsc writes it
+    (repo / "web" / "tsconfig.json").write_text('{"references": [{"path": "../core"}]}')
+    assert build_outputs(str(repo), project_references(str(repo), 'tsconfig.json')) is None
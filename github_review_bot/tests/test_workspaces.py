@@ -0,0 +1,97 @@
+"""
+Tests for workspaces.py script.
+"""
+
+import json
+import pytest
+from github_review_bot.scripts.changed_files import ChangedFile, ChangedFiles
+from github_review_bot.scripts.repo_index import RepoIndex
+from github_review_bot.scripts.run_analysis import CHECKS, run_nextjs_analysis
+from github_review_bot.scripts.workspaces import (
+    check_workspaces, discover_workspaces, touched_workspaces
+)
+
+def _write(root, path, content):
+    target = root / path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(content if isinstance(content, str) else json.dumps(content))
+
+def _monorepo(tmp_path):
+    _write(tmp_path, "package.json", {"name": "root", "workspaces": ["apps/*", "packages/*", "!packages/legacy"]})
+    _write(tmp_path, "apps/web/package.json", {"name": "@acme/web", "dependencies": {"next": "14.0.0"}})
+    _write(tmp_path, "apps/web/next.config.js", "module.exports = {}\n")
+    _write(tmp_path, "apps/web/app/page.tsx", "export default function Page() {}\n")
+    _write(tmp_path, "apps/docs/package.json", {"name": "@acme/docs", "dependencies": {"next": "12.3.0"}})
+    _write(tmp_path, "apps/docs/vercel.json", {"rewrites": []})
+    _write(tmp_path, "packages/ui/package.json", {"name": "@acme/ui"})
+    _write(tmp_path, "packages/legacy/package.json", {"name": "legacy"})
+    _write(tmp_path, "node_modules/@acme/web/package.json", {"name": "@acme/web"})
+    return RepoIndex.build(str(tmp_path))
+
+def _changed(tmp_path, *paths):
+    return ChangedFiles([ChangedFile(p, "modified", size=1) for p in paths], str(tmp_path))
+
+def test_discover_workspaces_interface(tmp_path):
+    """Test the interface of discover_workspaces."""
+    with pytest.raises(TypeError):
+        discover_workspaces(str(tmp_path))  # type: ignore
+
+    workspaces = discover_workspaces(_monorepo(tmp_path))
+    assert [(w.name, w.path) for w in workspaces] == [
+        ("@acme/docs", "apps/docs"), ("@acme/web", "apps/web"), ("@acme/ui", "packages/ui")
+    ]
+    assert [w.path for w in workspaces if w.is_nextjs] == ["apps/docs", "apps/web"]
+    assert [w.path for w in workspaces if w.is_vercel] == ["apps/docs"]
+    # Workspace views answer lookups relative to the workspace
+    web = workspaces[1]
+    assert web.index.is_file("next.config.js") and list(web.index.files("app")) == ["app/page.tsx"]
+
+def test_single_package_has_no_workspaces(tmp_path):
+    """Test that a repository without workspace declarations is not a monorepo."""
+    _write(tmp_path, "package.json", {"name": "app"})
+    _write(tmp_path, "apps/web/package.json", {"name": "web"})
+    assert discover_workspaces(RepoIndex.build(str(tmp_path))) == []
+
+def test_tool_layouts(tmp_path):
+    """Test pnpm, nx and turbo workspace layouts."""
+    _write(tmp_path, "pnpm-workspace.yaml", "packages:\n  - 'services/**'\n")
+    _write(tmp_path, "services/api/v2/package.json", {"name": "api"})
+    assert [w.path for w in discover_workspaces(RepoIndex.build(str(tmp_path)))] == ["services/api/v2"]
+
+    nx_root = tmp_path / "nx"
+    _write(nx_root, "nx.json", {"workspaceLayout": {"appsDir": "projects"}})
+    _write(nx_root, "projects/shop/project.json", {"name": "shop"})
+    _write(nx_root, "libs/auth/project.json", {"name": "auth"})
+    assert [w.path for w in discover_workspaces(RepoIndex.build(str(nx_root)))] == ["libs/auth", "projects/shop"]
+
+    turbo_root = tmp_path / "turbo"
+    _write(turbo_root, "turbo.json", {"pipeline": {}})
+    _write(turbo_root, "apps/site/package.json", {"name": "site"})
+    assert [w.name for w in discover_workspaces(RepoIndex.build(str(turbo_root)))] == ["site"]
+
+def test_only_touched_workspaces_checked(tmp_path, monkeypatch):
+    """Test that Next.js checks run per touched workspace and are labelled."""
+    index = _monorepo(tmp_path)
+    workspaces = discover_workspaces(index)
+    changed = _changed(tmp_path, "apps/docs/app/page.tsx", "packages/ui/button.tsx")
+    assert [w.path for w in touched_workspaces(workspaces, changed)] == ["apps/docs", "packages/ui"]
+
+    monkeypatch.chdir(tmp_path)
+    passed, issues = run_nextjs_analysis(changed, index, None, workspaces, max_workers=2)
+    assert {issue["workspace"] for issue in issues} == {"@acme/docs"}
+    assert any(issue["file"] == "apps/docs/package.json" and "Next.js 12" in issue["message"]
+               for issue in issues)
+    # The monorepo root is not a Next.js app and is not checked
+    assert not any(issue["file"] == "next.config.js" for issue in issues)
+
+    plan = {entry.name: entry for entry in CHECKS.plan({'type': 'frontend'}, changed, index, workspaces)}
+    assert plan['nextjs'].selected and plan['vercel'].selected
+
+def test_check_workspaces_labels_issues(tmp_path):
+    """Test that workspace issues get repository-relative paths."""
+    workspaces = discover_workspaces(_monorepo(tmp_path))
+    issues = check_workspaces(workspaces[:2], lambda w: [{"type": "info", "message": w.name, "file": "a.js"}])
+    assert [(i["workspace"], i["file"]) for i in issues] == [
+        ("@acme/docs", "apps/docs/a.js"), ("@acme/web", "apps/web/a.js")
+    ]
+    assert check_workspaces([], lambda w: []) == []